@@ -3,214 +3,679 @@
 GitHub Actions Workflow Manager for Pinball Game
 - Trigger Godot CI/CD workflows
 - Get workflow run results
-- Monitor test status
+- Monitor test status (many runs at once)
+Talks to the GitHub REST API directly from asyncio over a small keep-alive
+connection pool (no gh CLI, no subprocess). GET requests are conditional:
+the ETag of every response is cached in .tools_cache/github_ci.json with the
+run metadata it carried, so an unchanged poll is a 304 (free against the
+rate limit) and completed runs are never fetched again. `wait` watches every
+pending run concurrently: one batched run-list request per cycle covers all
+of them (runs that fell off the page are fetched individually in parallel),
+and the poll interval backs off while nothing changes and snaps back when a
+run moves on. `selftest` runs the client against a local stub of the API.
+Usage: python3 github_test.py [trigger|status|results|wait|runs|selftest] [--api URL] [--repo OWNER/NAME]
 """
 
-import os
+import argparse
+import asyncio
+import hashlib
 import json
-import subprocess
-from datetime import datetime
+import os
+import random
+import re
+import ssl
+import sys
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlsplit
 
 # Configuration
 REPO_OWNER = "LuckyJunjie"
 REPO_NAME = "pin-ball"
 WORKFLOW_FILE = "ci.yml"
-GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
-
-def run_command(cmd, check=True):
-    """Run shell command and return output"""
-    result = subprocess.run(cmd, shell=True, capture_output=True, text=True)
-    if check and result.returncode != 0:
-        print(f"❌ Command failed: {cmd}")
-        print(f"   Error: {result.stderr}")
+GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN") or os.environ.get("GH_TOKEN", "")
+API_URL = os.environ.get("GITHUB_API_URL", "https://api.github.com")
+CACHE_PATH = Path(__file__).parent / ".tools_cache" / "github_ci.json"
+CACHE_VERSION = 1
+
+MAX_CONNECTIONS = 4
+TIMEOUT = 30
+RETRIES = 3
+POLL_MIN = 5.0        # Seconds between polls right after a change
+POLL_MAX = 60.0       # Ceiling while nothing changes
+POLL_BACKOFF = 1.6    # Growth factor per unchanged poll
+WAIT_TIMEOUT = 1800
+RUN_FIELDS = ("id", "name", "head_branch", "status", "conclusion", "event",
+              "display_title", "html_url", "created_at", "updated_at", "run_number")
+
+Response = namedtuple("Response", "status headers body")
+
+
+class CIError(Exception):
+    """An API request that failed after its retries"""
+
+
+# ---------------------------------------------------------------------------
+# HTTP
+# ---------------------------------------------------------------------------
+
+class HTTPPool:
+    """Keep-alive HTTP/1.1 connections to one host, at most `limit` in flight"""
+
+    def __init__(self, base_url, limit=MAX_CONNECTIONS, timeout=TIMEOUT):
+        parts = urlsplit(base_url)
+        self.https = parts.scheme == "https"
+        self.host = parts.hostname
+        self.port = parts.port or (443 if self.https else 80)
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.limit = limit
+        self.idle = []
+        self.slots = None
+        self.opened = 0
+
+    async def _connect(self):
+        context = ssl.create_default_context() if self.https else None
+        conn = await asyncio.wait_for(asyncio.open_connection(self.host, self.port, ssl=context), self.timeout)
+        self.opened += 1
+        return conn
+
+    async def _exchange(self, conn, method, target, headers, body):
+        reader, writer = conn
+        lines = [f"{method} {self.prefix}{target} HTTP/1.1", f"Host: {self.host}"]
+        lines += [f"{k}: {v}" for k, v in headers.items()]
+        if body is not None:
+            lines.append(f"Content-Length: {len(body)}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode() + (body or b""))
+        await writer.drain()
+
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before the response")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            response_headers[name.strip().lower()] = value.strip()
+
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            data = b""
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readline()
+            data = b"".join(chunks)
+        elif "content-length" in response_headers:
+            data = await reader.readexactly(int(response_headers["content-length"]))
+        else:
+            data = await reader.read()
+            response_headers["connection"] = "close"
+        return Response(status, response_headers, data)
+
+    async def request(self, method, target, headers, body=None):
+        if self.slots is None:
+            self.slots = asyncio.Semaphore(self.limit)
+        async with self.slots:
+            for attempt in range(2):
+                reused = bool(self.idle)
+                conn = self.idle.pop() if reused else await self._connect()
+                try:
+                    response = await asyncio.wait_for(self._exchange(conn, method, target, headers, body),
+                                                      self.timeout)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    conn[1].close()
+                    if reused and attempt == 0:
+                        continue  # The server dropped an idle keep-alive connection
+                    raise
+                except BaseException:
+                    conn[1].close()
+                    raise
+                if response.headers.get("connection", "").lower() == "close":
+                    conn[1].close()
+                else:
+                    self.idle.append(conn)
+                return response
+
+    async def close(self):
+        for _, writer in self.idle:
+            writer.close()
+        self.idle.clear()
+
+
+# ---------------------------------------------------------------------------
+# GitHub client
+# ---------------------------------------------------------------------------
+
+def run_record(data):
+    """The fields of a workflow run we keep (and cache)"""
+    return {field: data.get(field) for field in RUN_FIELDS}
+
+
+def summary(run):
+    """Run in the shape the older gh-based helpers returned"""
+    return {"id": str(run["id"]), "status": run["status"] or "", "conclusion": run["conclusion"] or "",
+            "branch": run["head_branch"] or "", "message": run["display_title"] or ""}
+
+
+class GitHubClient:
+    """Async Actions API client with conditional requests and a local run cache"""
+
+    def __init__(self, repo=f"{REPO_OWNER}/{REPO_NAME}", api=API_URL, token=GITHUB_TOKEN,
+                 cache_path=CACHE_PATH, use_cache=True):
+        self.repo = repo
+        self.token = token
+        self.pool = HTTPPool(api)
+        self.cache_path = cache_path
+        self.use_cache = use_cache
+        self.etags, self.runs = self._load_cache() if use_cache else ({}, {})
+        self.stats = {"requests": 0, "not_modified": 0, "retries": 0}
+        self.retry_after = 0.0
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+            if cache.get("version") == CACHE_VERSION and cache.get("repo") == self.repo:
+                return cache["etags"], {int(k): v for k, v in cache["runs"].items()}
+        except (OSError, ValueError, KeyError):
+            pass
+        return {}, {}
+
+    def save_cache(self):
+        if not self.use_cache:
+            return
+        self.cache_path.parent.mkdir(exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump({"version": CACHE_VERSION, "repo": self.repo, "etags": self.etags,
+                       "runs": self.runs}, f, separators=(",", ":"))
+        os.replace(tmp, self.cache_path)
+
+    async def close(self):
+        self.save_cache()
+        await self.pool.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _headers(self):
+        headers = {"Accept": "application/vnd.github+json", "User-Agent": f"{REPO_NAME}-ci-monitor",
+                   "X-GitHub-Api-Version": "2022-11-28", "Accept-Encoding": "identity"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    async def _send(self, method, target, headers, body=None):
+        """Request with retries on connection errors, 5xx and rate limiting"""
+        for attempt in range(RETRIES + 1):
+            try:
+                self.stats["requests"] += 1
+                response = await self.pool.request(method, target, headers, body)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+                error = f"{type(e).__name__}: {e}"
+            else:
+                limited = response.status in (403, 429) and (
+                    response.headers.get("x-ratelimit-remaining") == "0" or "retry-after" in response.headers)
+                if response.status < 500 and not limited:
+                    return response
+                error = f"HTTP {response.status}"
+                if limited:
+                    reset = float(response.headers.get("x-ratelimit-reset", 0)) - time.time()
+                    self.retry_after = max(float(response.headers.get("retry-after", 0)), reset, 0.0)
+            if attempt == RETRIES:
+                raise CIError(f"{method} {target}: {error}")
+            self.stats["retries"] += 1
+            delay = max(self.retry_after, min(POLL_MAX, 0.5 * 2 ** attempt) * random.uniform(0.5, 1.0))
+            self.retry_after = 0.0
+            await asyncio.sleep(delay)
+
+    async def get_json(self, path, params=None, shape=lambda data: data):
+        """(shaped data, changed): conditional GET, answered from the cache on 304"""
+        target = f"/repos/{self.repo}/{path}" + (f"?{urlencode(params)}" if params else "")
+        headers = self._headers()
+        cached = self.etags.get(target)
+        if cached:
+            headers["If-None-Match"] = cached["etag"]
+        response = await self._send("GET", target, headers)
+        if response.status == 304 and cached:
+            self.stats["not_modified"] += 1
+            return cached["data"], False
+        if response.status != 200:
+            raise CIError(f"GET {target}: HTTP {response.status} {response.body[:200].decode(errors='replace')}")
+        data = shape(json.loads(response.body))
+        if response.headers.get("etag"):
+            self.etags[target] = {"etag": response.headers["etag"], "data": data}
+        return data, True
+
+    def _remember(self, runs):
+        for run in runs:
+            self.runs[run["id"]] = run
+        return runs
+
+    async def list_runs(self, workflow=WORKFLOW_FILE, branch=None, limit=5, event=None):
+        """Most recent runs of a workflow (one request, any number of branches)"""
+        params = {"per_page": limit}
+        if branch:
+            params["branch"] = branch
+        if event:
+            params["event"] = event
+        runs, _ = await self.get_json(f"actions/workflows/{workflow}/runs", params,
+                                      lambda d: [run_record(r) for r in d.get("workflow_runs", [])])
+        return self._remember(runs)
+
+    async def get_run(self, run_id):
+        """One run; completed runs come straight from the local cache"""
+        run_id = int(run_id)
+        cached = self.runs.get(run_id)
+        if cached and cached["status"] == "completed":
+            return cached
+        run, _ = await self.get_json(f"actions/runs/{run_id}", shape=run_record)
+        return self._remember([run])[0]
+
+    async def dispatch(self, ref="main", workflow=WORKFLOW_FILE):
+        """Start a workflow_dispatch run; returns the run once it appears (or None)"""
+        if not self.token:
+            raise CIError("GITHUB_TOKEN (or GH_TOKEN) is required to trigger a workflow")
+        started = datetime.now(timezone.utc).replace(microsecond=0)
+        headers = self._headers()
+        headers["Content-Type"] = "application/json"
+        target = f"/repos/{self.repo}/actions/workflows/{workflow}/dispatches"
+        response = await self._send("POST", target, headers, json.dumps({"ref": ref}).encode())
+        if response.status != 204:
+            raise CIError(f"POST {target}: HTTP {response.status} {response.body[:200].decode(errors='replace')}")
+        # The run shows up a moment after the dispatch is accepted
+        delay = 0.5
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            for run in await self.list_runs(workflow, branch=ref, limit=5, event="workflow_dispatch"):
+                if run["created_at"] and _parse_time(run["created_at"]) >= started:
+                    return run
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, POLL_MIN)
         return None
-    return result.stdout.strip()
 
-def get_api_url(endpoint):
-    """Build GitHub API URL"""
-    return f"https://api.github.com/repos/{REPO_OWNER}/{REPO_NAME}/{endpoint}"
+    async def watch(self, run_ids, timeout=WAIT_TIMEOUT, poll_min=POLL_MIN, poll_max=POLL_MAX,
+                    on_change=None, workflow=WORKFLOW_FILE):
+        """Poll runs until all complete; returns {id: run} (incomplete ones as last seen)
+
+        Each cycle makes one batched list request (plus parallel single-run
+        requests for runs not on that page); the interval grows by
+        POLL_BACKOFF while no run changes and resets to poll_min on a change.
+        """
+        run_ids = [int(r) for r in run_ids]
+        latest = {}
+        pending = set()
+        for run_id in run_ids:
+            cached = self.runs.get(run_id)
+            if cached and cached["status"] == "completed":
+                latest[run_id] = cached
+            else:
+                pending.add(run_id)
+        interval = poll_min
+        deadline = time.monotonic() + timeout
+        while pending:
+            if len(pending) == 1:
+                found = {}
+            else:
+                page = await self.list_runs(workflow, limit=min(100, max(20, 2 * len(pending))))
+                found = {run["id"]: run for run in page if run["id"] in pending}
+            missing = [run_id for run_id in pending if run_id not in found]
+            for run in await asyncio.gather(*(self.get_run(run_id) for run_id in missing)):
+                found[run["id"]] = run
 
-def trigger_workflow():
+            changed = False
+            for run_id, run in found.items():
+                before = latest.get(run_id)
+                if before is None or (before["status"], before["conclusion"]) != (run["status"], run["conclusion"]):
+                    changed = True
+                    if on_change:
+                        on_change(run, before)
+                latest[run_id] = run
+                if run["status"] == "completed":
+                    pending.discard(run_id)
+            remaining = deadline - time.monotonic()
+            if not pending or remaining <= 0:
+                break
+            interval = poll_min if changed else min(poll_max, interval * POLL_BACKOFF)
+            await asyncio.sleep(min(remaining, max(interval, self.retry_after) * random.uniform(0.9, 1.1)))
+        self.save_cache()
+        return latest
+
+
+def _parse_time(stamp):
+    return datetime.strptime(stamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc)
+
+
+# ---------------------------------------------------------------------------
+# Commands
+# ---------------------------------------------------------------------------
+
+def _icon(run):
+    if run["status"] != "completed":
+        return "🔄"
+    return "✅" if run["conclusion"] == "success" else "❌"
+
+
+async def trigger_workflow(client, ref="main"):
     """Trigger GitHub Actions workflow"""
     print("🚀 Triggering GitHub Actions workflow...")
-    
-    if not GITHUB_TOKEN:
-        print("⚠️ GITHUB_TOKEN not set")
-        print("💡 Setting token for you...")
-        return None
-    
-    # Use gh CLI if available
-    result = run_command(f"gh workflow run {WORKFLOW_FILE} --repo {REPO_OWNER}/{REPO_NAME}")
-    
-    if result is None:
-        print("❌ Failed to trigger workflow")
-        return None
-    
+    run = await client.dispatch(ref)
     print("✅ Workflow triggered!")
-    print(f"📋 View: https://github.com/{REPO_OWNER}/{REPO_NAME}/actions/workflows/{WORKFLOW_FILE}")
-    return True
-
-def get_workflow_runs(limit=5):
-    """Get recent workflow runs"""
-    print(f"📊 Getting recent workflow runs...")
-    
-    result = run_command(f"gh run list --workflow {WORKFLOW_FILE} --limit {limit} --repo {REPO_OWNER}/{REPO_NAME}")
-    
-    if result is None:
-        print("❌ Failed to get workflow runs")
-        return []
-    
-    lines = result.split('\n')
-    runs = []
-    
-    for line in lines:
-        if line.strip():
-            parts = line.split()
-            if len(parts) >= 4:
-                run = {
-                    'id': parts[0],
-                    'status': parts[1],
-                    'conclusion': parts[2] if len(parts) > 2 else '',
-                    'branch': parts[3] if len(parts) > 3 else '',
-                    'message': ' '.join(parts[4:]) if len(parts) > 4 else ''
-                }
-                runs.append(run)
-    
-    return runs
-
-def get_workflow_run_status():
-    """Get latest workflow run status"""
-    runs = get_workflow_runs(1)
-    
-    if not runs:
-        return None
-    
-    run = runs[0]
-    
-    print(f"\n📋 Latest Workflow Run:")
-    print(f"   ID: {run['id']}")
-    print(f"   Status: {run['status']}")
-    print(f"   Conclusion: {run['conclusion']}")
-    print(f"   Branch: {run['branch']}")
-    
+    if run:
+        print(f"📋 Run {run['id']}: {run['html_url']}")
+    else:
+        print(f"📋 View: https://github.com/{client.repo}/actions/workflows/{WORKFLOW_FILE}")
     return run
 
-def wait_for_completion(run_id, timeout=300):
-    """Wait for workflow run to complete"""
-    import time
-    
-    print(f"⏳ Waiting for workflow {run_id} to complete...")
-    start = datetime.now()
-    
-    while (datetime.now() - start).seconds < timeout:
-        result = run_command(f"gh run view {run_id} --repo {REPO_OWNER}/{REPO_NAME} --json status,conclusion")
-        
-        if result:
-            try:
-                import json
-                data = json.loads(result)
-                status = data.get('status', '')
-                conclusion = data.get('conclusion', '')
-                
-                if status == 'completed':
-                    print(f"\n✅ Workflow completed!")
-                    print(f"   Conclusion: {conclusion}")
-                    return conclusion
-                elif status == 'in_progress' or status == 'queued':
-                    print(f"   Status: {status}...")
-                    time.sleep(10)
-                else:
-                    print(f"   Status: {status}")
-                    return None
-            except:
-                pass
-        
-        time.sleep(5)
-    
-    print("⏰ Timeout reached")
-    return None
-
-def get_test_results():
+
+async def get_workflow_runs(client, limit=5, branch=None):
+    """Get recent workflow runs (as id/status/conclusion/branch/message dicts)"""
+    return [summary(run) for run in await client.list_runs(limit=limit, branch=branch)]
+
+
+async def wait_for_completion(client, run_ids, timeout=WAIT_TIMEOUT, poll_min=POLL_MIN):
+    """Wait for workflow runs to complete; returns {run id: conclusion or None}"""
+    print(f"⏳ Waiting for {len(run_ids)} workflow run(s): {', '.join(str(r) for r in run_ids)}")
+
+    def on_change(run, before):
+        if run["status"] == "completed":
+            print(f"   {_icon(run)} {run['id']} ({run['head_branch']}) completed: {run['conclusion']}")
+        else:
+            print(f"   🔄 {run['id']} ({run['head_branch']}) {run['status']}...")
+
+    start = time.monotonic()
+    runs = await client.watch(run_ids, timeout=timeout, poll_min=poll_min, on_change=on_change)
+    elapsed = time.monotonic() - start
+    done = {run_id: run["conclusion"] if run["status"] == "completed" else None for run_id, run in runs.items()}
+    if all(c is not None for c in done.values()):
+        print(f"\n✅ All runs completed in {elapsed:.0f}s")
+    else:
+        print("⏰ Timeout reached")
+    return done
+
+
+async def get_test_results(client):
     """Get test results from latest run"""
     print("\n📊 Test Results:")
-    
-    runs = get_workflow_runs(1)
-    
+    runs = await client.list_runs(limit=1)
     if not runs:
         print("   No workflow runs found")
-        return
-    
-    latest_run = runs[0]
-    
-    # Check status
-    if latest_run['status'] == 'completed':
-        if latest_run['conclusion'] == 'success':
+        return None
+    latest = runs[0]
+    if latest["status"] == "completed":
+        if latest["conclusion"] == "success":
             print("   ✅ All tests passed!")
         else:
-            print(f"   ❌ Tests failed: {latest_run['conclusion']}")
-    elif latest_run['status'] == 'in_progress':
+            print(f"   ❌ Tests failed: {latest['conclusion']}")
+    elif latest["status"] == "in_progress":
         print("   🔄 Tests in progress...")
     else:
-        print(f"   ⚠️ Status: {latest_run['status']}")
+        print(f"   ⚠️ Status: {latest['status']}")
+    return summary(latest)
 
-def show_workflow_info():
+
+async def show_workflow_info(client, limit=3):
     """Show workflow information"""
     print(f"\n📋 Workflow: {WORKFLOW_FILE}")
-    print(f"📁 Repo: {REPO_OWNER}/{REPO_NAME}")
-    print(f"🔗 URL: https://github.com/{REPO_OWNER}/{REPO_NAME}/actions/workflows/{WORKFLOW_FILE}")
-    
-    # Show workflow runs
-    runs = get_workflow_runs(3)
-    
+    print(f"📁 Repo: {client.repo}")
+    print(f"🔗 URL: https://github.com/{client.repo}/actions/workflows/{WORKFLOW_FILE}")
+    runs = await client.list_runs(limit=limit)
     if runs:
-        print(f"\n📊 Recent Runs:")
+        print("\n📊 Recent Runs:")
         for run in runs:
-            icon = "✅" if run['conclusion'] == 'success' else "❌" if run['conclusion'] == 'failure' else "🔄"
-            print(f"   {icon} {run['id']} | {run['status']} | {run['branch']}")
+            print(f"   {_icon(run)} {run['id']} | {run['status']} | {run['conclusion'] or '-'} | "
+                  f"{run['head_branch']} | {run['display_title']}")
+
+
+async def pending_run_ids(client, limit=20):
+    """Runs still queued or in progress among the recent ones (else the latest run)"""
+    runs = await client.list_runs(limit=limit)
+    pending = [run["id"] for run in runs if run["status"] != "completed"]
+    return pending or [run["id"] for run in runs[:1]]
+
+
+# ---------------------------------------------------------------------------
+# Stand-in API server for offline testing
+# ---------------------------------------------------------------------------
+
+class StubHandler(BaseHTTPRequestHandler):
+    """The slice of the Actions API this client uses, with ETags and timed runs
+
+    Runs move queued -> in_progress -> completed on wall-clock timers set per
+    run; with server.flaky every seventh request answers 503.
+    """
+
+    protocol_version = "HTTP/1.1"
+    RUNS = re.compile(r"^/repos/([^/]+/[^/]+)/actions/workflows/([^/]+)/runs$")
+    RUN = re.compile(r"^/repos/([^/]+/[^/]+)/actions/runs/(\d+)$")
+    DISPATCH = re.compile(r"^/repos/([^/]+/[^/]+)/actions/workflows/([^/]+)/dispatches$")
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _count(self):
+        with self.server.lock:
+            self.server.requests += 1
+            return self.server.requests
+
+    def do_GET(self):
+        if self._count() % 7 == 0 and self.server.flaky:
+            return self._send(503, b"")
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        if self.RUNS.match(parts.path):
+            runs = [self.server.render(run) for run in reversed(self.server.runs)]
+            if "branch" in query:
+                runs = [r for r in runs if r["head_branch"] == query["branch"]]
+            if "event" in query:
+                runs = [r for r in runs if r["event"] == query["event"]]
+            body = {"total_count": len(runs), "workflow_runs": runs[:int(query.get("per_page", 30))]}
+        else:
+            match = self.RUN.match(parts.path)
+            run = match and next((r for r in self.server.runs if r["id"] == int(match.group(2))), None)
+            if not run:
+                return self._send(404, b'{"message": "Not Found"}')
+            body = self.server.render(run)
+        data = json.dumps(body).encode()
+        etag = f'W/"{hashlib.sha1(data).hexdigest()}"'
+        if self.headers.get("If-None-Match") == etag:
+            with self.server.lock:
+                self.server.not_modified += 1
+            return self._send(304, b"", etag)
+        self._send(200, data, etag)
+
+    def do_POST(self):
+        self._count()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if not self.DISPATCH.match(urlsplit(self.path).path):
+            return self._send(404, b'{"message": "Not Found"}')
+        ref = json.loads(body or b"{}").get("ref", "main")
+        self.server.add_run(ref, "workflow_dispatch", queued=0.1, running=0.3, conclusion="success")
+        self._send(204, b"")
+
+    def _send(self, status, data, etag=None):
+        self.send_response(status)
+        if etag:
+            self.send_header("ETag", etag)
+        if status not in (204, 304):
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, flaky=False):
+        super().__init__(("127.0.0.1", port), StubHandler)
+        self.flaky = flaky
+        self.lock = threading.Lock()
+        self.runs = []
+        self.requests = self.not_modified = self.connections = 0
+
+    def add_run(self, branch, event="push", queued=0.2, running=1.0, conclusion="success"):
+        with self.lock:
+            run_id = 1000 + len(self.runs)
+            self.runs.append({"id": run_id, "branch": branch, "event": event, "start": time.time(),
+                              "queued": queued, "running": running, "conclusion": conclusion})
+        return run_id
+
+    def render(self, run):
+        """GitHub-shaped run JSON for the current moment"""
+        age = time.time() - run["start"]
+        if age < run["queued"]:
+            status, conclusion, changed = "queued", None, 0
+        elif age < run["queued"] + run["running"]:
+            status, conclusion, changed = "in_progress", None, run["queued"]
+        else:
+            status, conclusion, changed = "completed", run["conclusion"], run["queued"] + run["running"]
+
+        def stamp(offset):
+            return datetime.fromtimestamp(int(run["start"] + offset), timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        return {"id": run["id"], "name": "Pinball Godot CI/CD", "head_branch": run["branch"],
+                "status": status, "conclusion": conclusion, "event": run["event"],
+                "display_title": f"Stub run on {run['branch']}", "run_number": run["id"] - 999,
+                "html_url": f"https://github.com/stub/actions/runs/{run['id']}",
+                "created_at": stamp(0), "updated_at": stamp(changed)}
+
+
+def serve(port=0, flaky=False):
+    """Start the stub API on a background thread; returns (server, base URL)"""
+    server = StubServer(port, flaky)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+async def _selftest(base, server, cache_path):
+    plan = [("main", 0.1, 0.4, "success"), ("main", 0.2, 0.9, "failure"), ("feature/flippers", 0.1, 0.6, "success"),
+            ("feature/audio", 0.3, 1.2, "success"), ("release", 0.1, 0.3, "cancelled"), ("develop", 0.2, 1.5, "success")]
+    expected = {server.add_run(b, queued=q, running=r, conclusion=c): c for b, q, r, c in plan}
+    ok = True
+    async with GitHubClient("stub/pin-ball", base, token="stub-token", cache_path=cache_path) as client:
+        start = time.monotonic()
+        done = await wait_for_completion(client, list(expected), timeout=20, poll_min=0.05)
+        elapsed = time.monotonic() - start
+        ok &= done == expected
+        run = await trigger_workflow(client, "main")
+        ok &= run is not None and (await wait_for_completion(client, [run["id"]], timeout=10,
+                                                            poll_min=0.05))[run["id"]] == "success"
+        await client.list_runs(limit=5)
+        stats = dict(client.stats)
+    # A fresh client finds completed runs in the cache and the run list unchanged
+    server.flaky = False
+    async with GitHubClient("stub/pin-ball", base, token="stub-token", cache_path=cache_path) as client:
+        before = server.requests
+        await client.list_runs(limit=5)
+        cached = await asyncio.gather(*(client.get_run(run_id) for run_id in expected))
+        ok &= all(run["conclusion"] == expected[run["id"]] for run in cached)
+        ok &= client.stats["not_modified"] == 1 and server.requests - before == 1
+    return ok, stats, elapsed
+
+
+def selftest():
+    """Watch several stub runs concurrently, trigger one, then re-read from the cache"""
+    import tempfile
+
+    print("🧪 CI monitor self-test (stub GitHub API)")
+    print("=" * 60)
+    server, base = serve(flaky=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        ok, stats, elapsed = asyncio.run(_selftest(base, server, Path(tmp) / "github_ci.json"))
+    server.shutdown()
+    print("=" * 60)
+    print(f"📊 {stats['requests']} requests ({stats['not_modified']} not modified, {stats['retries']} retried), "
+          f"{server.connections} connections, {elapsed:.2f}s for 6 concurrent runs")
+    print("✅ Self-test passed" if ok else "❌ Self-test failed")
+    return ok
+
+
+async def run_command(args):
+    async with GitHubClient(args.repo, args.api, use_cache=not args.no_cache) as client:
+        if args.command == "trigger":
+            run = await trigger_workflow(client, args.ref)
+            if run and args.wait:
+                await wait_for_completion(client, [run["id"]], args.timeout)
+        elif args.command == "status":
+            await show_workflow_info(client)
+            await get_test_results(client)
+        elif args.command == "results":
+            await get_test_results(client)
+        elif args.command == "wait":
+            run_ids = args.run_ids or await pending_run_ids(client)
+            if not run_ids:
+                print("   No workflow runs found")
+                return True
+            done = await wait_for_completion(client, run_ids, args.timeout)
+            return all(c == "success" for c in done.values())
+        elif args.command == "runs":
+            for run in await get_workflow_runs(client, args.limit, args.branch):
+                print(f"   {run['id']} | {run['status']} | {run['conclusion'] or '-'} | {run['branch']} | {run['message']}")
+    return True
+
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="GitHub Actions workflow manager for the pinball game")
+    parser.add_argument("command", nargs="?", default="status",
+                        choices=["trigger", "status", "results", "wait", "runs", "selftest"])
+    parser.add_argument("run_ids", nargs="*", type=int, help="runs to wait for (default: every pending run)")
+    parser.add_argument("--api", default=API_URL, help="API base URL (e.g. a stub started with --serve)")
+    parser.add_argument("--repo", default=f"{REPO_OWNER}/{REPO_NAME}", help="OWNER/NAME")
+    parser.add_argument("--ref", default="main", help="branch to trigger")
+    parser.add_argument("--wait", action="store_true", help="wait for the triggered run")
+    parser.add_argument("--branch", help="only runs on this branch (runs)")
+    parser.add_argument("--limit", type=int, default=10, help="number of runs to list (runs)")
+    parser.add_argument("--timeout", type=float, default=WAIT_TIMEOUT, help="seconds to wait")
+    parser.add_argument("--no-cache", action="store_true", help="ignore the local ETag/run cache")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="run the stub API until interrupted")
+    args = parser.parse_args()
+
     print("=" * 60)
     print("🎮 GitHub Actions Workflow Manager for Pinball Game")
     print("=" * 60)
-    
-    import sys
-    
-    command = sys.argv[1] if len(sys.argv) > 1 else "status"
-    
-    if command == "trigger":
-        trigger_workflow()
-    elif command == "status":
-        show_workflow_info()
-        get_test_results()
-    elif command == "wait":
-        runs = get_workflow_runs(1)
-        if runs:
-            wait_for_completion(runs[0]['id'])
-    elif command == "results":
-        get_test_results()
-    elif command == "runs":
-        get_workflow_runs(10)
-    elif command == "help":
-        print("""
-Usage: github_test.py [command]
-
-Commands:
-  trigger  - Trigger the CI/CD workflow
-  status   - Show workflow status and recent runs
-  results  - Get test results from latest run
-  wait     - Wait for latest run to complete
-  runs     - Show recent workflow runs (10)
-  help     - Show this help
-
-Examples:
-  python github_test.py trigger
-  python github_test.py status
-  python github_test.py wait
-        """)
-    else:
-        print(f"Unknown command: {command}")
-        print("Run: python github_test.py help")
+    if args.serve is not None:
+        server, base = serve(args.serve)
+        for branch, conclusion in (("main", "success"), ("develop", "failure")):
+            server.add_run(branch, queued=5, running=30, conclusion=conclusion)
+        print(f"🌐 Stub API at {base} (Ctrl+C to stop); try --api {base} --repo stub/pin-ball")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+    if args.command == "selftest":
+        sys.exit(0 if selftest() else 1)
+    try:
+        ok = asyncio.run(run_command(args))
+    except CIError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    sys.exit(0 if ok else 1)
+
 
 if __name__ == "__main__":
     main()
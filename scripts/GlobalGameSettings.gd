@@ -3,6 +3,8 @@ extends Node
 ## Global game settings and configuration singleton (Autoload)
 ## Manages game version, equipped items, and global settings
 
+const ItemCatalog := preload("res://scripts/v4/ItemCatalogV4.gd")
+
 var game_version: String = "v1.x"  # "v1.x", "v2.0", or "v3.0"
 var equipped_items: Dictionary = {
 	"ball": "ball_standard",
@@ -32,8 +34,11 @@ func get_equipped_item(category: String) -> String:
 	"""Get the equipped item ID for a category"""
 	return equipped_items.get(category, "")
 
-func set_equipped_item(category: String, item_id: String):
-	"""Set the equipped item for a category"""
+func set_equipped_item(category: String, item_id: String) -> bool:
+	"""Set the equipped item for a category (must be an item of that category in the catalog)"""
+	if ItemCatalog.get_category(item_id) != category:
+		push_warning("[GlobalGameSettings] Cannot equip %s as %s" % [item_id, category])
+		return false
 	equipped_items[category] = item_id
 	print("[GlobalGameSettings] Equipped ", category, ": ", item_id)
 	
@@ -41,6 +46,11 @@ func set_equipped_item(category: String, item_id: String):
 	var save_mgr = get_node_or_null("/root/SaveManager")
 	if save_mgr:
 		save_mgr.save_equipped_items(equipped_items)
+	return true
+
+func get_equipped_stats(category: String) -> Dictionary:
+	"""physics_stats of the equipped item for a category, from the items catalog"""
+	return ItemCatalog.get_physics_stats(get_equipped_item(category))
 
 func get_equipped_ball() -> String:
 	"""Get equipped ball ID"""
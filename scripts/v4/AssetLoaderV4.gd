@@ -19,13 +19,20 @@ const ZONE_PATHS: Dictionary = {
 	"sparky_scorch": "res://assets/sprites/v3.0/"
 }
 
+# Sprite atlas index written by tools/pack_atlases.py (optional)
+const ATLAS_INDEX_PATH: String = "res://assets/atlases/atlas_index.json"
+
 # Cache loaded assets
 var theme_cache: Dictionary = {}
 var zone_cache: Dictionary = {}
 
+# Original sprite path -> packed AtlasTexture path
+var atlas_textures: Dictionary = {}
+
 
 func _ready() -> void:
 	add_to_group("asset_loader_v4")
+	load_atlas_index()
 	
 	# Preload default theme
 	load_theme_assets("sparky")
@@ -79,8 +86,40 @@ func get_background_texture(theme_key: String) -> Texture2D:
 	return assets.get("background", null)
 
 
+func load_atlas_index(index_path: String = ATLAS_INDEX_PATH) -> int:
+	## Map original sprite paths to their packed AtlasTextures; returns the number mapped
+	atlas_textures.clear()
+	if not FileAccess.file_exists(index_path):
+		return 0
+	var index = JSON.parse_string(FileAccess.get_file_as_string(index_path))
+	if not index is Dictionary:
+		push_warning("AssetLoaderV4: Invalid atlas index: %s" % index_path)
+		return 0
+	var sprites = index.get("sprites", {})
+	if typeof(sprites) != TYPE_DICTIONARY:
+		push_warning("AssetLoaderV4: Atlas index 'sprites' is not an object: %s" % index_path)
+		return 0
+	for sprite_path in sprites:
+		var entry = sprites[sprite_path]
+		var texture_path = entry.get("texture") if typeof(entry) == TYPE_DICTIONARY else null
+		if typeof(texture_path) == TYPE_STRING:
+			atlas_textures[sprite_path] = texture_path
+		elif typeof(entry) != TYPE_DICTIONARY or texture_path != null:
+			# null is a rotated sprite left out of the atlas; anything else is a broken index
+			push_warning("AssetLoaderV4: Invalid atlas entry for %s in %s" % [sprite_path, index_path])
+	return atlas_textures.size()
+
+
+func resolve_texture_path(path: String) -> String:
+	## Path to load for a sprite: its AtlasTexture when packed, otherwise the file itself
+	return atlas_textures.get(path, path)
+
+
 func _load_texture(path: String) -> Texture2D:
 	## Helper to load texture with error handling
+	var atlas_path = resolve_texture_path(path)
+	if atlas_path != path and ResourceLoader.exists(atlas_path):
+		return load(atlas_path)
 	if FileAccess.file_exists(path):
 		return load(path)
 	else:
@@ -0,0 +1,122 @@
+extends RefCounted
+## v4.0 Item catalog: shop listing and equip lookups over the compiled items table.
+## The table is generated from config/items_database.json by tools/items_db.py,
+## so nothing is parsed at startup; lookups by id, category, tier and stat are
+## constant-time and price ranges are two binary searches.
+
+const Table := preload("res://scripts/v4/ItemsTableV4.gd")
+
+## True if the id names an item in the database.
+static func has_item(item_id: String) -> bool:
+	return Table.ID_INDEX.has(item_id)
+
+## Number of items in the database.
+static func get_item_count() -> int:
+	return Table.ID.size()
+
+## Category ("ball" or "flipper") of an item, or "" if unknown.
+static func get_category(item_id: String) -> String:
+	var row = Table.ID_INDEX.get(item_id, -1)
+	return _text(Table.CATEGORY[row]) if row >= 0 else ""
+
+## Price of an item as {"currency", "amount"}, or {} if unknown.
+static func get_price(item_id: String) -> Dictionary:
+	var row = Table.ID_INDEX.get(item_id, -1)
+	if row < 0:
+		return {}
+	return {"currency": _text(Table.CURRENCY[row]), "amount": Table.PRICE[row]}
+
+## One physics stat of an item (e.g. "mass", "length"), or default if the item or stat is unknown.
+static func get_stat(item_id: String, stat: String, default: float = 0.0) -> float:
+	var row = Table.ID_INDEX.get(item_id, -1)
+	if row < 0:
+		return default
+	var slot = Table.STAT_KEYS[_text(Table.CATEGORY[row])].find(stat)
+	return Table.STATS[Table.STAT_START[row] + slot] if slot >= 0 else default
+
+## physics_stats of an item, as in the JSON.
+static func get_physics_stats(item_id: String) -> Dictionary:
+	var row = Table.ID_INDEX.get(item_id, -1)
+	return _stats(row) if row >= 0 else {}
+
+## Full item Dictionary, shaped like its entry in config/items_database.json ({} if unknown).
+static func get_item(item_id: String) -> Dictionary:
+	var row = Table.ID_INDEX.get(item_id, -1)
+	if row < 0:
+		return {}
+	var category = _text(Table.CATEGORY[row])
+	var visual = {}
+	var keys: PackedStringArray = Table.VISUAL_KEYS[category]
+	for i in keys.size():
+		var index = Table.VISUALS[Table.VISUAL_START[row] + i]
+		visual[keys[i]] = _text(index) if index >= 0 else null
+	return {
+		"id": item_id,
+		"name": _text(Table.NAME[row]),
+		"category": category,
+		"tier": _text(Table.TIER[row]),
+		"price": {"currency": _text(Table.CURRENCY[row]), "amount": Table.PRICE[row]},
+		"owned": Table.FLAGS[row] & Table.FLAG_OWNED != 0,
+		"equipped": Table.FLAGS[row] & Table.FLAG_EQUIPPED != 0,
+		"physics_stats": _stats(row),
+		"visual_stats": visual,
+		"special_abilities": _abilities(row),
+		"description": _text(Table.DESCRIPTION[row]),
+	}
+
+## special_abilities of an item, as in the JSON.
+static func get_abilities(item_id: String) -> Array:
+	var row = Table.ID_INDEX.get(item_id, -1)
+	return _abilities(row) if row >= 0 else []
+
+## Item ids of a category, in database order.
+static func get_ids_by_category(category: String) -> PackedStringArray:
+	return _ids(Table.BY_CATEGORY.get(category, PackedInt32Array()))
+
+## Item ids of a tier, in database order.
+static func get_ids_by_tier(tier: String) -> PackedStringArray:
+	return _ids(Table.BY_TIER.get(tier, PackedInt32Array()))
+
+## Item ids priced within [min_amount, max_amount] in one currency, cheapest first.
+static func get_ids_in_price_range(currency: String, min_amount: int, max_amount: int) -> PackedStringArray:
+	var prices: PackedInt32Array = Table.PRICE_SORTED.get(currency, PackedInt32Array())
+	var rows: PackedInt32Array = Table.BY_PRICE.get(currency, PackedInt32Array())
+	return _ids(rows.slice(prices.bsearch(min_amount, true), prices.bsearch(max_amount, false)))
+
+## Items a new profile owns before buying anything.
+static func get_default_owned_ids() -> PackedStringArray:
+	var result = PackedStringArray()
+	for row in Table.ID.size():
+		if Table.FLAGS[row] & Table.FLAG_OWNED:
+			result.append(_text(Table.ID[row]))
+	return result
+
+static func _text(index: int) -> String:
+	return Table.STRINGS[index]
+
+static func _ids(rows: PackedInt32Array) -> PackedStringArray:
+	var result = PackedStringArray()
+	result.resize(rows.size())
+	for i in rows.size():
+		result[i] = Table.STRINGS[Table.ID[rows[i]]]
+	return result
+
+static func _stats(row: int) -> Dictionary:
+	var stats = {}
+	var keys: PackedStringArray = Table.STAT_KEYS[_text(Table.CATEGORY[row])]
+	var start = Table.STAT_START[row]
+	for i in keys.size():
+		var value = Table.STATS[start + i]
+		stats[keys[i]] = int(value) if keys[i] in Table.INTEGER_STATS else value
+	return stats
+
+static func _abilities(row: int) -> Array:
+	var result = []
+	for slot in range(Table.ABILITY_START[row], Table.ABILITY_START[row + 1]):
+		var kind = _text(Table.ABILITY_TYPE[slot])
+		var ability = {"type": kind}
+		var keys: PackedStringArray = Table.ABILITY_KEYS[kind]
+		for i in keys.size():
+			ability[keys[i]] = Table.ABILITY_PARAMS[Table.ABILITY_PARAM_START[slot] + i]
+		result.append(ability)
+	return result
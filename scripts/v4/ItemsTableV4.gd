@@ -0,0 +1,96 @@
+extends RefCounted
+## Compiled items database for ItemCatalogV4.
+## Generated by tools/items_db.py from config/items_database.json; do not edit by hand.
+## Run `python3 tools/items_db.py --export` after changing the database.
+
+const FLAG_OWNED: int = 1
+const FLAG_EQUIPPED: int = 2
+const STAT_KEYS: Dictionary = {"ball": PackedStringArray(["mass", "bounce", "linear_damp", "gravity_scale"]), "flipper": PackedStringArray(["length", "rotation_speed", "power_multiplier"])}
+const INTEGER_STATS: PackedStringArray = PackedStringArray(["length"])
+const VISUAL_KEYS: Dictionary = {"ball": PackedStringArray(["icon", "texture", "trail_type"]), "flipper": PackedStringArray(["icon", "texture"])}
+const ABILITY_KEYS: Dictionary = {"magnetic_attraction": PackedStringArray(["force", "radius"])}
+
+## Every distinct string once; the columns below hold indexes into it (-1 = null).
+const STRINGS: PackedStringArray = PackedStringArray([
+	"ball_standard",
+	"Standard Ball",
+	"The default ball with balanced physics.",
+	"ball",
+	"common",
+	"coins",
+	"standard",
+	"ball_heavy",
+	"Heavy Ball",
+	"Increased mass for more momentum and harder hits.",
+	"ball_bouncy",
+	"Bouncy Ball",
+	"Higher bounce coefficient for more energy retention.",
+	"ball_magnetic",
+	"Magnetic Ball",
+	"Attracts to obstacles within range. Perfect for combo scoring!",
+	"premium",
+	"gems",
+	"electric",
+	"magnetic_attraction",
+	"flipper_standard",
+	"Standard Flipper",
+	"The default flipper with balanced control.",
+	"flipper",
+	"flipper_long",
+	"Long Flipper",
+	"Wider hitbox for better ball coverage.",
+	"flipper_power",
+	"Power Flipper",
+	"Increased impulse force for stronger hits.",
+])
+
+## Per-row string columns.
+const ID: PackedInt32Array = PackedInt32Array([0, 7, 10, 13, 20, 24, 27])
+const NAME: PackedInt32Array = PackedInt32Array([1, 8, 11, 14, 21, 25, 28])
+const DESCRIPTION: PackedInt32Array = PackedInt32Array([2, 9, 12, 15, 22, 26, 29])
+const CATEGORY: PackedInt32Array = PackedInt32Array([3, 3, 3, 3, 23, 23, 23])
+const TIER: PackedInt32Array = PackedInt32Array([4, 4, 4, 16, 4, 4, 16])
+const CURRENCY: PackedInt32Array = PackedInt32Array([5, 5, 5, 17, 5, 5, 17])
+
+## Price amount in CURRENCY.
+const PRICE: PackedInt32Array = PackedInt32Array([0, 500, 1000, 50, 0, 1000, 50])
+
+## Defaults for a new profile: FLAG_OWNED | FLAG_EQUIPPED.
+const FLAGS: PackedInt32Array = PackedInt32Array([1, 0, 0, 0, 1, 0, 0])
+
+## physics_stats: STATS[STAT_START[row] + i] is STAT_KEYS[category][i].
+const STAT_START: PackedInt32Array = PackedInt32Array([0, 4, 8, 12, 16, 19, 22])
+const STATS: PackedFloat64Array = PackedFloat64Array([0.5, 0.8, 0.05, 1.0, 0.8, 0.8, 0.07, 1.0, 0.5, 1.0, 0.05, 1.0, 0.6, 0.75, 0.07, 1.0, 64.0, 20.0, 1.0, 80.0, 20.0, 1.0, 64.0, 20.0, 1.3])
+
+## visual_stats: VISUALS[VISUAL_START[row] + i] is VISUAL_KEYS[category][i].
+const VISUAL_START: PackedInt32Array = PackedInt32Array([0, 3, 6, 9, 12, 14, 16])
+const VISUALS: PackedInt32Array = PackedInt32Array([-1, -1, 6, -1, -1, 6, -1, -1, 6, -1, -1, 18, -1, -1, -1, -1, -1, -1])
+
+## special_abilities of a row: ABILITY_TYPE[ABILITY_START[row]] up to ABILITY_START[row + 1].
+const ABILITY_START: PackedInt32Array = PackedInt32Array([0, 0, 0, 0, 1, 1, 1, 1])
+const ABILITY_TYPE: PackedInt32Array = PackedInt32Array([19])
+
+## Ability parameters: ABILITY_PARAMS[ABILITY_PARAM_START[slot] + i] is ABILITY_KEYS[type][i].
+const ABILITY_PARAM_START: PackedInt32Array = PackedInt32Array([0])
+const ABILITY_PARAMS: PackedFloat64Array = PackedFloat64Array([150.0, 150.0])
+
+## Row of each item id.
+const ID_INDEX: Dictionary = {
+	"ball_standard": 0,
+	"ball_heavy": 1,
+	"ball_bouncy": 2,
+	"ball_magnetic": 3,
+	"flipper_standard": 4,
+	"flipper_long": 5,
+	"flipper_power": 6,
+}
+
+## Rows per category, in database order.
+const BY_CATEGORY: Dictionary = {"ball": PackedInt32Array([0, 1, 2, 3]), "flipper": PackedInt32Array([4, 5, 6])}
+
+## Rows per tier, in database order.
+const BY_TIER: Dictionary = {"common": PackedInt32Array([0, 1, 2, 4, 5]), "premium": PackedInt32Array([3, 6])}
+
+## Rows per currency, cheapest first; PRICE_SORTED holds their prices for bsearch.
+const BY_PRICE: Dictionary = {"coins": PackedInt32Array([0, 4, 1, 2, 5]), "gems": PackedInt32Array([3, 6])}
+const PRICE_SORTED: Dictionary = {"coins": PackedInt32Array([0, 0, 500, 1000, 1000]), "gems": PackedInt32Array([50, 50])}
@@ -0,0 +1,67 @@
+extends RefCounted
+## v4 table layout lookup tables.
+## Generated by tools/layout.py from config/layout_v4.json; do not edit by hand.
+## Run `python3 tools/layout.py --export` after changing the layout.
+
+const SCALE: float = 5.0
+const CENTER: Vector2 = Vector2(400.0, 300.0)
+const BOARD_SIZE: Vector2 = Vector2(508.0, 719.0)
+
+## Godot position of every component (aliases included).
+const POSITIONS: Dictionary = {
+	"flipper_left": Vector2(339.75, 518.0),
+	"flipper_right": Vector2(424.0, 518.0),
+	"launcher": Vector2(605.0, 518.5),
+	"rocket": Vector2(614.0, 611.5),
+	"kicker_left": Vector2(287.8, 425.5),
+	"kicker_right": Vector2(512.2, 425.5),
+	"google_word": Vector2(377.75, 309.0),
+	"multiplier_x2": Vector2(302.0, 290.0),
+	"multiplier_x3": Vector2(464.0, 253.0),
+	"multiplier_x4": Vector2(398.5, 194.0),
+	"multiplier_x5": Vector2(355.5, 160.0),
+	"multiplier_x6": Vector2(449.0, 146.5),
+	"android_spaceship": Vector2(267.5, 157.5),
+	"android_bumper_a": Vector2(274.0, 307.5),
+	"android_bumper_b": Vector2(235.5, 253.5),
+	"android_bumper_cow": Vector2(296.5, 235.0),
+	"sparky_bumper_a": Vector2(285.5, 91.75),
+	"sparky_bumper_b": Vector2(293.75, 10.5),
+	"sparky_bumper_c": Vector2(383.5, 37.25),
+	"sparky_animatronic": Vector2(330.0, 9.0),
+	"flutter_forest_signpost": Vector2(439.75, 8.25),
+	"dash_bumper_a": Vector2(492.75, 3.25),
+	"dash_bumper_b": Vector2(444.75, 40.25),
+	"dash_bumper_main": Vector2(509.0, 66.25),
+	"dash_animatronic": Vector2(500.0, -30.0),
+	"chrome_dino": Vector2(461.0, 265.5),
+	"android_acres_zone": Vector2(200.0, 150.0),
+	"dino_desert_zone": Vector2(600.0, 150.0),
+	"flutter_forest_zone": Vector2(200.0, 400.0),
+	"sparky_scorch_zone": Vector2(600.0, 400.0),
+	"google_gallery": Vector2(400.0, 250.0),
+	"drain": Vector2(400.0, 660.0),
+	"skill_shot": Vector2(400.0, 200.0),
+	"ramp": Vector2(180.0, 180.0),
+	"launcher_flutter": Vector2(605.0, 518.5),
+}
+
+## Solid footprint radius in pixels (components without one are not listed).
+const RADII: Dictionary = {
+	"flipper_left": 32.0,
+	"flipper_right": 32.0,
+	"launcher": 12.0,
+	"kicker_left": 15.0,
+	"kicker_right": 15.0,
+	"android_spaceship": 27.0,
+	"android_bumper_a": 25.0,
+	"android_bumper_b": 25.0,
+	"android_bumper_cow": 25.0,
+	"sparky_bumper_a": 25.0,
+	"sparky_bumper_b": 25.0,
+	"sparky_bumper_c": 25.0,
+	"dash_bumper_a": 25.0,
+	"dash_bumper_b": 25.0,
+	"dash_bumper_main": 25.0,
+	"chrome_dino": 25.0,
+}
@@ -7,6 +7,7 @@ signal currency_updated(new_amount: int)
 signal item_equipped(item_id: String)
 
 const SHOP_FILE = "user://saves/shop.json"
+const ItemCatalog := preload("res://scripts/v4/ItemCatalogV4.gd")
 
 var _currency: int = 0
 var _items: Array = []
@@ -167,8 +168,26 @@ func get_item(item_id: String) -> Dictionary:
 			result["owned"] = owned
 			result["equipped"] = equipped
 			return result
+	if ItemCatalog.has_item(item_id):
+		return _equipment_item(item_id)
 	return {}
 
+## Balls or flippers from the items catalog, in database order.
+func get_equipment(category: String) -> Array:
+	var result = []
+	for item_id in ItemCatalog.get_ids_by_category(category):
+		result.append(_equipment_item(item_id))
+	return result
+
+## Catalog item shaped like a shop item ("type" is its category, "cost" its coin price).
+func _equipment_item(item_id: String) -> Dictionary:
+	var item = ItemCatalog.get_item(item_id)
+	item["type"] = item["category"]
+	item["cost"] = item["price"]["amount"] if item["price"]["currency"] == "coins" else -1
+	item["owned"] = _is_item_owned(item_id)
+	item["equipped"] = _is_item_equipped(item_id)
+	return item
+
 func get_items_by_type(item_type: String) -> Array:
 	var result = []
 	for item in SHOP_ITEMS:
@@ -187,7 +206,7 @@ func purchase_item(item_id: String) -> bool:
 		purchase_completed.emit(item_id, false)
 		return false
 	
-	if _is_item_owned(item_id):
+	if _is_item_owned(item_id) or item["cost"] < 0:
 		purchase_completed.emit(item_id, false)
 		return false
 	
@@ -207,15 +226,21 @@ func purchase_item(item_id: String) -> bool:
 	return true
 
 func _is_item_owned(item_id: String) -> bool:
-	return item_id in _items
+	return item_id in _items or item_id in ItemCatalog.get_default_owned_ids()
 
 func equip_item(item_id: String) -> bool:
 	if not _is_item_owned(item_id):
 		return false
 	
 	var item = get_item(item_id)
-	if item.is_empty() or item["type"] not in ["theme", "cosmetic", "title"]:
-		return False
+	if item.is_empty() or item["type"] not in ["theme", "cosmetic", "title", "ball", "flipper"]:
+		return false
+	
+	# Balls and flippers are equipped game-wide, where the physics read them
+	if ItemCatalog.has_item(item_id):
+		var settings = get_node_or_null("/root/GlobalGameSettings")
+		if settings == null or not settings.set_equipped_item(item["type"], item_id):
+			return false
 	
 	_equipped_items[item["type"]] = item_id
 	_save_shop_data()
@@ -228,6 +253,9 @@ func unequip_item(item_type: String) -> void:
 		_save_shop_data()
 
 func _is_item_equipped(item_id: String) -> bool:
+	if ItemCatalog.has_item(item_id):
+		var settings = get_node_or_null("/root/GlobalGameSettings")
+		return settings != null and settings.get_equipped_item(ItemCatalog.get_category(item_id)) == item_id
 	for item_type in _equipped_items:
 		if _equipped_items[item_type] == item_id:
 			return true
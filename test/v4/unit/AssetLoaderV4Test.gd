@@ -0,0 +1,57 @@
+extends "res://addons/gut/test.gd"
+## Unit tests for AssetLoaderV4.gd atlas index lookup
+
+const TEST_INDEX_PATH := "user://test_atlas_index.json"
+
+var asset_loader: Node = null
+
+func before_each():
+	asset_loader = autoqfree(load("res://scripts/v4/AssetLoaderV4.gd").new())
+
+func after_all():
+	if FileAccess.file_exists(TEST_INDEX_PATH):
+		DirAccess.remove_absolute(ProjectSettings.globalize_path(TEST_INDEX_PATH))
+
+func _write_index(data: Dictionary) -> void:
+	var file = FileAccess.open(TEST_INDEX_PATH, FileAccess.WRITE)
+	file.store_string(JSON.stringify(data))
+	file.close()
+
+func test_missing_index_maps_nothing():
+	assert_eq(asset_loader.load_atlas_index("user://no_such_index.json"), 0)
+	var path = "res://assets/sprites/android/ball.png"
+	assert_eq(asset_loader.resolve_texture_path(path), path, "Unpacked sprites keep their own path")
+
+func test_index_maps_packed_sprites():
+	_write_index({
+		"version": 1,
+		"sprites": {
+			"res://assets/sprites/flipper/left.png": {"texture": "res://assets/atlases/flipper/left.tres"},
+			"res://assets/sprites/flipper/right.png": {"texture": null}
+		}
+	})
+	assert_eq(asset_loader.load_atlas_index(TEST_INDEX_PATH), 1, "Rotated (texture-less) entries are skipped")
+	assert_eq(asset_loader.resolve_texture_path("res://assets/sprites/flipper/left.png"),
+		"res://assets/atlases/flipper/left.tres")
+	assert_eq(asset_loader.resolve_texture_path("res://assets/sprites/flipper/right.png"),
+		"res://assets/sprites/flipper/right.png")
+
+func test_invalid_index_is_ignored():
+	var file = FileAccess.open(TEST_INDEX_PATH, FileAccess.WRITE)
+	file.store_string("not json")
+	file.close()
+	assert_eq(asset_loader.load_atlas_index(TEST_INDEX_PATH), 0)
+
+func test_malformed_entries_are_skipped():
+	_write_index({"version": 1, "sprites": ["res://assets/sprites/ball.png"]})
+	assert_eq(asset_loader.load_atlas_index(TEST_INDEX_PATH), 0, "A non-object sprites field maps nothing")
+	_write_index({
+		"version": 1,
+		"sprites": {
+			"res://assets/sprites/flipper/left.png": {"texture": "res://assets/atlases/flipper/left.tres"},
+			"res://assets/sprites/flipper/right.png": "res://assets/atlases/flipper/right.tres",
+			"res://assets/sprites/ball.png": {"texture": 3}
+		}
+	})
+	assert_eq(asset_loader.load_atlas_index(TEST_INDEX_PATH), 1)
+	assert_eq(asset_loader.resolve_texture_path("res://assets/sprites/ball.png"), "res://assets/sprites/ball.png")
@@ -0,0 +1,32 @@
+extends "res://addons/gut/test.gd"
+## Unit tests for CoordinateConverterV4.gd and the generated LayoutTableV4.gd
+
+const Converter := preload("res://scripts/v4/CoordinateConverterV4.gd")
+const LayoutTable := preload("res://scripts/v4/LayoutTableV4.gd")
+
+func test_flutter_round_trip():
+	var flutter = Vector2(-12.05, 43.6)
+	var godot = Converter.flutter_to_godot(flutter)
+	assert_almost_eq(godot, Vector2(339.75, 518.0), Vector2(0.001, 0.001))
+	assert_almost_eq(Converter.godot_to_flutter(godot), flutter, Vector2(0.001, 0.001))
+
+func test_component_positions_match_flutter_layout():
+	assert_almost_eq(Converter.get_component_position("flipper_left"), Converter.flutter_to_godot(Vector2(-12.05, 43.6)), Vector2(0.001, 0.001))
+	assert_almost_eq(Converter.get_component_position("flipper_right"), Vector2(424, 518), Vector2(0.001, 0.001))
+	assert_almost_eq(Converter.get_component_position("launcher"), Vector2(605, 518.5), Vector2(0.001, 0.001))
+	assert_almost_eq(Converter.get_component_position("android_bumper_cow"), Converter.flutter_to_godot(Vector2(-20.7, -13.0)), Vector2(0.001, 0.001))
+
+func test_godot_placed_components():
+	assert_eq(Converter.get_component_position("drain"), Vector2(400, 660))
+	assert_eq(Converter.get_component_position("android_acres_zone"), Vector2(200, 150))
+
+func test_alias_matches_target():
+	assert_eq(Converter.get_component_position("launcher_flutter"), Converter.get_component_position("launcher"))
+
+func test_unknown_component_returns_zero():
+	assert_eq(Converter.get_component_position("no_such_component"), Vector2.ZERO)
+
+func test_constants_come_from_layout_table():
+	assert_eq(Converter.SCALE, LayoutTable.SCALE)
+	assert_eq(Vector2(Converter.CENTER_X, Converter.CENTER_Y), LayoutTable.CENTER)
+	assert_true(LayoutTable.RADII.has("android_bumper_a"), "Bumpers should have a footprint radius")
@@ -0,0 +1,45 @@
+extends "res://addons/gut/test.gd"
+## Unit tests for ItemCatalogV4.gd and the generated ItemsTableV4.gd
+
+const Catalog := preload("res://scripts/v4/ItemCatalogV4.gd")
+
+func _json_items() -> Dictionary:
+	var file = FileAccess.open("res://config/items_database.json", FileAccess.READ)
+	var json = JSON.new()
+	assert_eq(json.parse(file.get_as_text()), OK)
+	return json.data["items"]
+
+func test_table_round_trips_to_json():
+	var items = _json_items()
+	assert_eq(Catalog.get_item_count(), items.size())
+	for item_id in items:
+		var expected = items[item_id]
+		var item = Catalog.get_item(item_id)
+		assert_eq(item["name"], expected["name"])
+		assert_eq(item["tier"], expected["tier"])
+		assert_eq(item["price"]["currency"], expected["price"]["currency"])
+		# Godot's JSON parser returns every number as float
+		assert_eq(float(item["price"]["amount"]), float(expected["price"]["amount"]))
+		assert_eq(item["owned"], expected["owned"])
+		assert_eq(item["visual_stats"], expected["visual_stats"])
+		assert_eq(item["special_abilities"], expected["special_abilities"])
+		for stat in expected["physics_stats"]:
+			assert_almost_eq(float(item["physics_stats"][stat]), float(expected["physics_stats"][stat]), 0.0001, item_id + "." + stat)
+
+func test_lookups():
+	assert_true(Catalog.has_item("ball_magnetic"))
+	assert_false(Catalog.has_item("no_such_item"))
+	assert_eq(Catalog.get_category("flipper_long"), "flipper")
+	assert_eq(Catalog.get_price("ball_heavy"), {"currency": "coins", "amount": 500})
+	assert_almost_eq(Catalog.get_stat("ball_heavy", "mass"), 0.8, 0.0001)
+	assert_eq(Catalog.get_stat("ball_heavy", "length", -1.0), -1.0)
+	assert_eq(Catalog.get_physics_stats("flipper_long")["length"], 80)
+	assert_eq(Catalog.get_abilities("ball_magnetic")[0]["type"], "magnetic_attraction")
+	assert_eq(Catalog.get_item("no_such_item"), {})
+
+func test_indexes():
+	assert_eq(Catalog.get_ids_by_category("ball"), PackedStringArray(["ball_standard", "ball_heavy", "ball_bouncy", "ball_magnetic"]))
+	assert_eq(Catalog.get_ids_by_tier("premium"), PackedStringArray(["ball_magnetic", "flipper_power"]))
+	assert_eq(Catalog.get_ids_in_price_range("coins", 400, 1000), PackedStringArray(["ball_heavy", "ball_bouncy", "flipper_long"]))
+	assert_eq(Catalog.get_ids_in_price_range("gems", 0, 10), PackedStringArray())
+	assert_eq(Catalog.get_default_owned_ids(), PackedStringArray(["ball_standard", "flipper_standard"]))
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Asset size and memory budget analyzer for the assets/ tree
+Reads only file headers (PNG IHDR, JPEG SOF, WAV fmt/data, OGG identification
+and last page) plus each file's .import settings, and reports per file and per
+group the on-disk size, the runtime memory Godot will hold (VRAM for textures,
+sample data for audio) and the fully decoded size.
+Groups follow AssetLoaderV4's theme keys (character files such as ball.png in
+assets/sprites/<theme>/) and zone keys (see ZONE_FOLDERS); everything else is
+"common" or "audio".
+Flags oversized and non-power-of-two textures and uncompressed audio, and exits
+with status 1 when a group exceeds its budget in config/asset_budgets.json.
+Usage: python3 tools/asset_budget.py [--files] [--sort COLUMN] [--json PATH|-] [--budgets PATH]
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from png_reader import read_header
+
+BASE_DIR = Path(__file__).parent.parent
+ASSETS_DIR = BASE_DIR / "assets"
+LOADER_PATH = BASE_DIR / "scripts" / "v4" / "AssetLoaderV4.gd"
+BUDGETS_PATH = BASE_DIR / "config" / "asset_budgets.json"
+
+# Board folders under assets/sprites belonging to each AssetLoaderV4 zone key
+# (the layout of the original Flutter board)
+ZONE_FOLDERS = {
+    "android_acres": ["android"],
+    "dino_desert": ["dino", "slingshot"],
+    "google_gallery": ["google_word", "google_rollover"],
+    "flutter_forest": ["dash", "signpost"],
+    "sparky_scorch": ["sparky"],
+}
+COMMON_GROUP = "common"
+AUDIO_GROUP = "audio"
+
+MAX_TEXTURE_SIZE = 2048  # Largest texture side considered safe on low-end mobile
+
+# PNG colour type -> bytes per pixel once imported (palette: see _png_channels)
+PNG_CHANNELS = {0: 1, 2: 3, 4: 2, 6: 4}
+
+# Godot texture import compress/mode values
+TEXTURE_VRAM_COMPRESSED = (2, 4)  # VRAM compressed, Basis Universal
+# Godot WAV import compress/mode: bits per sample kept in memory
+WAV_IMPORT_BITS = {1: 4, 2: 3.2}  # IMA-ADPCM, QOA; 0 (disabled) keeps PCM
+
+AssetInfo = namedtuple("AssetInfo", "path group kind width height disk memory decoded flags")
+COLUMNS = ("path", "group", "kind", "disk", "memory", "decoded")
+
+
+# ---------------------------------------------------------------------------
+# Groups from AssetLoaderV4
+# ---------------------------------------------------------------------------
+
+def loader_keys(loader_path=LOADER_PATH):
+    """Theme keys, zone keys and per-theme file names declared in AssetLoaderV4.gd"""
+    source = loader_path.read_text()
+
+    def dict_keys(name):
+        match = re.search(rf"const {name}: Dictionary = \{{(.*?)\n\}}", source, re.S)
+        return re.findall(r'^\s*"(\w+)"\s*:', match.group(1), re.M) if match else []
+
+    theme_files = re.findall(r'_load_texture\("%s([\w.]+)" % base_path\)', source)
+    return dict_keys("THEME_PATHS"), dict_keys("ZONE_PATHS"), set(theme_files)
+
+
+def make_grouper(loader_path=LOADER_PATH):
+    """Function mapping an assets/-relative path to its group key"""
+    themes, zones, theme_files = loader_keys(loader_path)
+    folder_zone = {folder: zone for zone in zones for folder in ZONE_FOLDERS.get(zone, [])}
+
+    def group_of(rel):
+        parts = rel.parts
+        if parts[0] == "sounds":
+            return AUDIO_GROUP
+        if parts[0] != "sprites" or len(parts) < 3:
+            return COMMON_GROUP
+        if len(parts) == 3 and parts[1] in themes and parts[2] in theme_files:
+            return parts[1]
+        return folder_zone.get(parts[1], COMMON_GROUP)
+
+    return group_of
+
+
+# ---------------------------------------------------------------------------
+# Header parsing
+# ---------------------------------------------------------------------------
+
+def import_params(path):
+    """[params] of a Godot .import file next to path, as strings"""
+    params = {}
+    try:
+        lines = Path(f"{path}.import").read_text().splitlines()
+    except OSError:
+        return params
+    section = None
+    for line in lines:
+        line = line.strip()
+        if line.startswith("["):
+            section = line
+        elif section == "[params]" and "=" in line:
+            key, value = line.split("=", 1)
+            params[key] = value.strip('"')
+    return params
+
+
+def _png_channels(path, color_type):
+    """Bytes per pixel Godot uses for a PNG; palette images need a tRNS scan"""
+    if color_type != 3:
+        return PNG_CHANNELS[color_type]
+    # Walk chunk headers up to the first IDAT, seeking over the data
+    with open(path, "rb") as f:
+        f.seek(8)
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                return 3
+            length, chunk_type = struct.unpack(">I4s", head)
+            if chunk_type == b"tRNS":
+                return 4
+            if chunk_type == b"IDAT":
+                return 3
+            f.seek(length + 4, os.SEEK_CUR)
+
+
+def jpeg_size(path):
+    """(width, height) from the first SOF marker of a JPEG"""
+    with open(path, "rb") as f:
+        if f.read(2) != b"\xff\xd8":
+            raise ValueError("not a JPEG file")
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                raise ValueError("JPEG has no SOF marker")
+            if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+                continue
+            length, = struct.unpack(">H", f.read(2))
+            if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(">xHH", f.read(5))
+                return width, height
+            f.seek(length - 2, os.SEEK_CUR)
+
+
+def wav_info(path):
+    """(format tag, channels, sample rate, bits per sample, data bytes) from the RIFF chunks"""
+    with open(path, "rb") as f:
+        riff, _, wave = struct.unpack("<4sI4s", f.read(12))
+        if riff != b"RIFF" or wave != b"WAVE":
+            raise ValueError("not a WAV file")
+        fmt = None
+        while True:
+            head = f.read(8)
+            if len(head) < 8:
+                raise ValueError("WAV has no data chunk")
+            chunk_id, size = struct.unpack("<4sI", head)
+            if chunk_id == b"fmt ":
+                fmt = struct.unpack("<HHIIHH", f.read(16))
+                f.seek(size - 16 + (size & 1), os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    raise ValueError("WAV data chunk before fmt chunk")
+                return fmt[0], fmt[1], fmt[2], fmt[5], size
+            else:
+                f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def ogg_info(path):
+    """(channels, sample rate, total samples) from the Vorbis header and the last page"""
+    with open(path, "rb") as f:
+        head = f.read(27 + 255 + 30)
+        if head[:4] != b"OggS":
+            raise ValueError("not an OGG file")
+        segments = head[26]
+        packet = head[27 + segments:]
+        if packet[:7] != b"\x01vorbis":
+            raise ValueError("OGG stream is not Vorbis")
+        channels, rate = struct.unpack("<BI", packet[11:16])
+        size = f.seek(0, os.SEEK_END)
+        f.seek(max(0, size - 65536))
+        tail = f.read()
+    last = tail.rfind(b"OggS")
+    samples = struct.unpack("<q", tail[last + 6:last + 14])[0] if last >= 0 else 0
+    return channels, rate, max(samples, 0)
+
+
+# ---------------------------------------------------------------------------
+# Analysis
+# ---------------------------------------------------------------------------
+
+def _is_pot(n):
+    return n > 0 and n & (n - 1) == 0
+
+
+def analyze_texture(path, kind, max_texture=MAX_TEXTURE_SIZE):
+    """(width, height, memory, decoded, flags) of a PNG or JPEG texture"""
+    if kind == "png":
+        header = read_header(path)
+        width, height = header.width, header.height
+        channels = _png_channels(path, header.color_type)
+    else:
+        width, height = jpeg_size(path)
+        channels = 3
+    params = import_params(path)
+    decoded = width * height * channels
+    mode = int(params.get("compress/mode", "0"))
+    # VRAM compressed formats (ETC2/BPTC/ASTC 4x4) spend one byte per pixel
+    memory = width * height if mode in TEXTURE_VRAM_COMPRESSED else decoded
+    if params.get("mipmaps/generate") == "true":
+        memory = memory * 4 // 3
+    flags = []
+    if max(width, height) > max_texture:
+        flags.append(f"oversized ({width}x{height} > {max_texture})")
+    if not (_is_pot(width) and _is_pot(height)):
+        flags.append("non-power-of-two")
+    return width, height, memory, decoded, flags
+
+
+def analyze_audio(path, kind):
+    """(channels, rate, memory, decoded, flags) of a WAV or OGG file"""
+    flags = []
+    if kind == "wav":
+        tag, channels, rate, bits, data = wav_info(path)
+        samples = data * 8 // max(bits, 1)
+        decoded = samples * 2
+        mode = int(import_params(path).get("compress/mode", "0"))
+        if mode in WAV_IMPORT_BITS:
+            memory = int(samples * WAV_IMPORT_BITS[mode] / 8)
+        else:
+            memory = data
+            flags.append(f"uncompressed audio ({'float' if tag == 3 else 'PCM'} {bits}-bit in memory)")
+        return channels, rate, memory, decoded, flags
+    channels, rate, samples = ogg_info(path)
+    # Godot keeps the Vorbis packets and decodes while streaming
+    return channels, rate, path.stat().st_size, samples * channels * 2, flags
+
+
+def analyze(assets_dir=ASSETS_DIR, max_texture=MAX_TEXTURE_SIZE, loader_path=LOADER_PATH):
+    """AssetInfo for every texture and sound under assets_dir"""
+    group_of = make_grouper(loader_path)
+    infos = []
+    for path in sorted(assets_dir.rglob("*")):
+        kind = path.suffix.lower().lstrip(".").replace("jpeg", "jpg")
+        if kind not in ("png", "jpg", "wav", "ogg") or not path.is_file():
+            continue
+        rel = path.relative_to(assets_dir)
+        if kind in ("png", "jpg"):
+            width, height, memory, decoded, flags = analyze_texture(path, kind, max_texture)
+        else:
+            width, height, memory, decoded, flags = analyze_audio(path, kind)
+        infos.append(AssetInfo(rel.as_posix(), group_of(rel), kind, width, height,
+                               path.stat().st_size, memory, decoded, flags))
+    return infos
+
+
+def load_budgets(path=BUDGETS_PATH):
+    """Per-group memory budgets in bytes: ({group: bytes}, default bytes or None)"""
+    try:
+        with open(path) as f:
+            config = json.load(f)
+    except FileNotFoundError:
+        return {}, None
+    mib = 1 << 20
+    groups = {k: int(v * mib) for k, v in config.get("groups_mib", {}).items()}
+    default = config.get("default_mib")
+    return groups, int(default * mib) if default is not None else None
+
+
+def summarize(infos, budgets, default_budget):
+    """Per-group totals with budget status, largest memory first"""
+    groups = {}
+    for info in infos:
+        g = groups.setdefault(info.group, {"group": info.group, "files": 0, "disk": 0, "memory": 0,
+                                           "decoded": 0, "flagged": 0})
+        g["files"] += 1
+        g["disk"] += info.disk
+        g["memory"] += info.memory
+        g["decoded"] += info.decoded
+        g["flagged"] += bool(info.flags)
+    for g in groups.values():
+        budget = budgets.get(g["group"], default_budget)
+        g["budget"] = budget
+        g["over_budget"] = budget is not None and g["memory"] > budget
+    return sorted(groups.values(), key=lambda g: g["memory"], reverse=True)
+
+
+def _mib(n):
+    return f"{n / (1 << 20):9.2f}"
+
+
+def print_tables(infos, summary, sort, show_files):
+    if show_files:
+        reverse = sort in ("disk", "memory", "decoded")
+        print(f"{'path':58} {'group':15} {'size':>11} {'disk MiB':>9} {'mem MiB':>9} {'dec MiB':>9}  flags")
+        print("-" * 125)
+        for info in sorted(infos, key=lambda i: getattr(i, sort), reverse=reverse):
+            size = f"{info.width}x{info.height}" if info.kind in ("png", "jpg") else f"{info.height} Hz"
+            print(f"{info.path:58} {info.group:15} {size:>11} {_mib(info.disk)} {_mib(info.memory)} "
+                  f"{_mib(info.decoded)}  {'; '.join(info.flags)}")
+        print()
+    print(f"{'group':18} {'files':>5} {'disk MiB':>9} {'mem MiB':>9} {'dec MiB':>9} {'budget':>9} {'flagged':>7}  status")
+    print("-" * 86)
+    for g in summary:
+        budget = _mib(g["budget"]) if g["budget"] is not None else f"{'-':>9}"
+        status = "❌ over budget" if g["over_budget"] else "✅"
+        print(f"{g['group']:18} {g['files']:5d} {_mib(g['disk'])} {_mib(g['memory'])} {_mib(g['decoded'])} "
+              f"{budget} {g['flagged']:7d}  {status}")
+    print("-" * 86)
+    total = {k: sum(g[k] for g in summary) for k in ("files", "disk", "memory", "decoded", "flagged")}
+    print(f"{'total':18} {total['files']:5d} {_mib(total['disk'])} {_mib(total['memory'])} "
+          f"{_mib(total['decoded'])} {'':9} {total['flagged']:7d}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asset size and memory budget analyzer")
+    parser.add_argument("--files", action="store_true", help="also list every file")
+    parser.add_argument("--sort", choices=COLUMNS, default="memory", help="file table sort column")
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON ('-' for stdout)")
+    parser.add_argument("--budgets", type=Path, default=BUDGETS_PATH, help="per-group budget file")
+    parser.add_argument("--max-texture", type=int, default=MAX_TEXTURE_SIZE, help="flag textures larger than this")
+    args = parser.parse_args()
+
+    infos = analyze(max_texture=args.max_texture)
+    budgets, default_budget = load_budgets(args.budgets)
+    summary = summarize(infos, budgets, default_budget)
+    report = {
+        "groups": summary,
+        "files": [dict(info._asdict()) for info in infos],
+    }
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=1)
+        print()
+    else:
+        print("📦 Asset Budget Report")
+        print("=" * 60)
+        print_tables(infos, summary, args.sort, args.files)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(report, f, indent=1)
+            print(f"\n✅ JSON report written to {args.json}")
+
+    over = [g["group"] for g in summary if g["over_budget"]]
+    if over:
+        print(f"\n❌ Over budget: {', '.join(over)}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Manifest-driven, hash-verified asset sync between version sets
+The version sets are the main asset folders (assets/sounds, assets/sprites), the
+v1.0-v2.0 backups and the v3.0 assets. assets/asset_manifest.json records size,
+mtime and SHA-256 for every file of every set; a file whose size and mtime
+still match its entry is not re-read, so a no-op sync costs one stat per file.
+A sync only touches files whose hashes differ, places them with a reflink or
+hardlink where the filesystem allows (falling back to a copy), and swaps each
+one in atomically through a temporary file.
+Usage: python3 tools/asset_sync.py [manifest|backup|activate] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+BASE_DIR = Path(__file__).parent.parent
+ASSETS_DIR = BASE_DIR / "assets"
+MANIFEST_PATH = ASSETS_DIR / "asset_manifest.json"
+MANIFEST_VERSION = 1
+
+# Version set -> {category: directory}; only the top level of each directory
+# belongs to a set (the main folders contain the other sets as subfolders)
+SETS = {
+    "main": {"sounds": ASSETS_DIR / "sounds", "sprites": ASSETS_DIR / "sprites"},
+    "v1.0-v2.0": {"sounds": ASSETS_DIR / "sounds" / "v1.0-v2.0", "sprites": ASSETS_DIR / "sprites" / "v1.0-v2.0"},
+    "v3.0": {"sounds": ASSETS_DIR / "sounds" / "v3.0", "sprites": ASSETS_DIR / "sprites" / "v3.0"},
+}
+EXTENSIONS = {"sounds": (".wav", ".ogg"), "sprites": (".png",)}
+
+FICLONE = 0x40049409  # Linux ioctl: share the source's extents copy-on-write
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def set_path(set_name, rel):
+    """Absolute path of a manifest key ('sounds/x.wav') inside a version set"""
+    category, name = rel.split("/", 1)
+    return SETS[set_name][category] / name
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_PATH) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        manifest = {"version": MANIFEST_VERSION, "sets": {}}
+    return manifest
+
+
+def save_manifest(manifest):
+    """Atomically write the manifest (sorted, so unchanged trees give identical bytes)"""
+    MANIFEST_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = MANIFEST_PATH.with_name(f".{MANIFEST_PATH.name}.tmp")
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, MANIFEST_PATH)
+
+
+def scan_set(set_name, manifest):
+    """Refresh a set's manifest entries; returns how many files had to be hashed
+
+    Entries whose size and mtime match the file on disk keep their recorded hash.
+    """
+    old = manifest["sets"].get(set_name, {})
+    entries = {}
+    hashed = 0
+    for category, directory in SETS[set_name].items():
+        if not directory.is_dir():
+            continue
+        with os.scandir(directory) as it:
+            for item in it:
+                if not item.name.endswith(EXTENSIONS[category]) or not item.is_file():
+                    continue
+                rel = f"{category}/{item.name}"
+                st = item.stat()
+                entry = old.get(rel)
+                if not entry or entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns:
+                    entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": file_sha256(item.path)}
+                    hashed += 1
+                entries[rel] = entry
+    manifest["sets"][set_name] = entries
+    return hashed
+
+
+def prefer_ogg(entries):
+    """Drop sounds whose OGG version is also present"""
+    return {rel: e for rel, e in entries.items()
+            if not (rel.endswith(".wav") and rel[:-4] + ".ogg" in entries)}
+
+
+def plan_sync(src, dst, overwrite=True):
+    """Minimal list of (action, key) turning dst into a superset of src
+
+    action is "add" for missing files and "update" for files whose hash differs
+    (only when overwrite is set); files in dst that src lacks are left alone.
+    """
+    actions = []
+    for rel, entry in sorted(src.items()):
+        current = dst.get(rel)
+        if current is None:
+            actions.append(("add", rel))
+        elif overwrite and current["sha256"] != entry["sha256"]:
+            actions.append(("update", rel))
+    return actions
+
+
+def _reflink(src, dst):
+    if fcntl is None:
+        return False
+    try:
+        with open(src, 'rb') as s, open(dst, 'wb') as d:
+            fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+    except OSError:
+        try:
+            os.unlink(dst)
+        except OSError:
+            pass
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+
+def place_file(src, dst, hardlink=True):
+    """Atomically make dst hold src's bytes; returns "reflink", "hardlink" or "copy"
+
+    Hardlinks share the inode, so they are only used where a later in-place
+    write to one side may legitimately show up on the other.
+    """
+    tmp = dst.with_name(f".{dst.name}.sync-tmp")
+    if tmp.exists():
+        tmp.unlink()
+    if _reflink(src, tmp):
+        method = "reflink"
+    else:
+        method = "copy"
+        if hardlink:
+            try:
+                os.link(src, tmp)
+                method = "hardlink"
+            except OSError:
+                pass
+        if method == "copy":
+            shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+    return method
+
+
+def sync(src_set, dst_set, overwrite=True, hardlink=True, select=None, dry_run=False, verbose=True):
+    """Bring dst_set up to date with src_set; returns the list of (action, key, method)"""
+    manifest = load_manifest()
+    before = json.dumps(manifest, sort_keys=True)
+    hashed = scan_set(src_set, manifest) + scan_set(dst_set, manifest)
+    src = manifest["sets"][src_set]
+    if select:
+        src = select(src)
+    actions = plan_sync(src, manifest["sets"][dst_set], overwrite)
+
+    done = []
+    for action, rel in actions:
+        method = "dry-run"
+        if not dry_run:
+            dst_path = set_path(dst_set, rel)
+            dst_path.parent.mkdir(parents=True, exist_ok=True)
+            method = place_file(set_path(src_set, rel), dst_path, hardlink)
+            st = dst_path.stat()
+            manifest["sets"][dst_set][rel] = dict(src[rel], size=st.st_size, mtime_ns=st.st_mtime_ns)
+        done.append((action, rel, method))
+        if verbose:
+            print(f"✅ {action:6} {rel} ({method})")
+
+    if not dry_run and json.dumps(manifest, sort_keys=True) != before:
+        save_manifest(manifest)
+    if verbose:
+        checked = len(src) + len(manifest["sets"][dst_set])
+        print(f"📊 {src_set} → {dst_set}: {len(done)} changed, {checked} checked, {hashed} hashed")
+    return done
+
+
+def update_manifest(verbose=True):
+    """Refresh every set in the manifest; returns the manifest"""
+    manifest = load_manifest()
+    before = json.dumps(manifest, sort_keys=True)
+    hashed = sum(scan_set(name, manifest) for name in SETS)
+    if json.dumps(manifest, sort_keys=True) != before:
+        save_manifest(manifest)
+    if verbose:
+        counts = ", ".join(f"{name}: {len(manifest['sets'][name])}" for name in SETS)
+        print(f"📋 Asset manifest {MANIFEST_PATH.relative_to(BASE_DIR)} ({counts}; {hashed} hashed)")
+    return manifest
+
+
+def backup_main(dry_run=False, verbose=True):
+    """Copy main assets missing from v1.0-v2.0; existing backups are never overwritten"""
+    # No hardlinks: generators rewrite main files in place, which must not reach the backup
+    return sync("main", "v1.0-v2.0", overwrite=False, hardlink=False, dry_run=dry_run, verbose=verbose)
+
+
+def activate_v3(dry_run=False, verbose=True):
+    """Make the main folders hold the v3.0 assets (OGG preferred over WAV)"""
+    # No hardlinks either: a generator rewriting a main file would write through into v3.0
+    return sync("v3.0", "main", hardlink=False, select=prefer_ogg, dry_run=dry_run, verbose=verbose)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hash-verified sync between asset version sets")
+    parser.add_argument("command", nargs="?", default="manifest", choices=["manifest", "backup", "activate"],
+                        help="refresh the manifest, back up main to v1.0-v2.0, or activate v3.0 in main")
+    parser.add_argument("--dry-run", action="store_true", help="show what would change without touching files")
+    args = parser.parse_args()
+
+    if args.command == "manifest":
+        update_manifest()
+    elif args.command == "backup":
+        backup_main(args.dry_run)
+    else:
+        activate_v3(args.dry_run)
+
+
+if __name__ == "__main__":
+    main()
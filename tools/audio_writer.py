@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Audio output for generated sounds: WAV writer and batch OGG encoder
+WAV files are written as PCM16, PCM24 or float32, mono or interleaved stereo,
+straight from the sample buffer (NumPy array, array('f'), memoryview or list)
+in fixed-size blocks through memoryviews, so no per-sample struct.pack and no
+whole-file byte strings are built. resample() and interleave() prepare buffers
+for other rates and channel layouts.
+read_wav() loads WAV files back as float samples; ffmpeg_decode() does the same
+for any format ffmpeg reads (OGG). OGG encoding runs ffmpeg over a whole
+directory in a bounded worker pool and skips every WAV whose OGG is already newer.
+Usage: python3 tools/audio_writer.py DIR [DIR ...] [--jobs N] [--quality Q] [--force]
+"""
+
+import argparse
+import io
+import os
+import shutil
+import struct
+import subprocess
+import sys
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+SAMPLE_RATE = 44100
+
+# Sample formats: name -> (WAV format tag, bytes per sample)
+PCM16 = 'pcm16'
+PCM24 = 'pcm24'
+FLOAT32 = 'float32'
+SAMPLE_FORMATS = {PCM16: (1, 2), PCM24: (1, 3), FLOAT32: (3, 4)}
+
+# Samples converted per block while streaming
+BLOCK_SAMPLES = 1 << 16
+
+# Default libvorbis quality (-q:a), as used by the download scripts
+OGG_QUALITY = 5
+
+LITTLE_ENDIAN = sys.byteorder == 'little'
+
+
+def wav_header(num_frames, sample_rate, channels=1, sample_format=PCM16):
+    """RIFF/WAVE header (plus fact chunk for float) for the given data size"""
+    tag, width = SAMPLE_FORMATS[sample_format]
+    block_align = channels * width
+    data_size = num_frames * block_align
+    fmt = struct.pack('<HHIIHH', tag, channels, sample_rate, sample_rate * block_align,
+                      block_align, 8 * width)
+    chunks = [b'fmt ', struct.pack('<I', len(fmt)), fmt]
+    if tag == 3:
+        # Non-PCM formats carry a cbSize field and a fact chunk
+        chunks[1:] = [struct.pack('<I', len(fmt) + 2), fmt, b'\x00\x00',
+                      b'fact', struct.pack('<II', 4, num_frames * channels)]
+    body = b''.join(chunks)
+    return b''.join([b'RIFF', struct.pack('<I', 4 + len(body) + 8 + data_size), b'WAVE',
+                     body, b'data', struct.pack('<I', data_size)])
+
+
+def _flat(samples):
+    """Samples as a flat sequence plus the channel count of a 2-D (frames, channels) array"""
+    if NUMPY_AVAILABLE and isinstance(samples, np.ndarray) and samples.ndim == 2:
+        return samples.reshape(-1), samples.shape[1]
+    return samples, None
+
+
+def _blocks_numpy(samples, sample_format):
+    """Yield little-endian sample blocks as byte memoryviews"""
+    data = np.asarray(samples)
+    if not np.issubdtype(data.dtype, np.floating):
+        data = data.astype(np.float32)
+    if sample_format == FLOAT32:
+        data = np.ascontiguousarray(data, dtype='<f4')
+        for start in range(0, len(data), BLOCK_SAMPLES):
+            # Already float32: these are views of the caller's buffer
+            yield memoryview(data[start:start + BLOCK_SAMPLES]).cast('B')
+        return
+    scale = 32767 if sample_format == PCM16 else 8388607
+    for start in range(0, len(data), BLOCK_SAMPLES):
+        block = np.clip(data[start:start + BLOCK_SAMPLES], -1.0, 1.0) * scale
+        if sample_format == PCM16:
+            yield memoryview(block.astype('<i2')).cast('B')
+        else:
+            # Low three bytes of each little-endian int32
+            wide = block.astype('<i4').view(np.uint8).reshape(-1, 4)
+            yield memoryview(np.ascontiguousarray(wide[:, :3])).cast('B')
+
+
+def _blocks_python(samples, sample_format):
+    """Pure-Python counterpart of _blocks_numpy built on array()"""
+    if (sample_format == FLOAT32 and LITTLE_ENDIAN and isinstance(samples, memoryview)
+            and samples.format == 'f'):
+        yield samples.cast('B')
+        return
+    for start in range(0, len(samples), BLOCK_SAMPLES):
+        block = samples[start:start + BLOCK_SAMPLES]
+        if sample_format == FLOAT32:
+            out = array('f', block)
+        else:
+            scale = 32767 if sample_format == PCM16 else 8388607
+            out = array('h' if sample_format == PCM16 else 'i',
+                        [int(max(-1.0, min(1.0, s)) * scale) for s in block])
+        if not LITTLE_ENDIAN:
+            out.byteswap()
+        if sample_format == PCM24:
+            # Keep the low three bytes of each int32 via extended slices
+            wide = memoryview(out).cast('B')
+            packed = bytearray(3 * len(out))
+            packed[0::3] = wide[0::4]
+            packed[1::3] = wide[1::4]
+            packed[2::3] = wide[2::4]
+            yield memoryview(packed)
+        else:
+            yield memoryview(out).cast('B')
+
+
+def write_wav(f, samples, sample_rate=SAMPLE_RATE, sample_format=PCM16, channels=1):
+    """Stream samples in [-1, 1] to an open binary file as WAV
+
+    samples is flat and interleaved when channels > 1; a 2-D NumPy array of
+    shape (frames, channels) sets the channel count itself. Integer formats
+    clip to [-1, 1] and truncate toward zero; float32 is written unclipped.
+    """
+    samples, array_channels = _flat(samples)
+    channels = array_channels or channels
+    if len(samples) % channels:
+        raise ValueError(f"{len(samples)} samples do not split into {channels} channels")
+    f.write(wav_header(len(samples) // channels, sample_rate, channels, sample_format))
+    blocks = _blocks_numpy if NUMPY_AVAILABLE else _blocks_python
+    for block in blocks(samples, sample_format):
+        f.write(block)
+
+
+def encode_wav(samples, sample_rate=SAMPLE_RATE, sample_format=PCM16, channels=1):
+    """Encode samples and return the WAV file contents"""
+    out = io.BytesIO()
+    write_wav(out, samples, sample_rate, sample_format, channels)
+    return out.getvalue()
+
+
+def save_wav(path, samples, sample_rate=SAMPLE_RATE, sample_format=PCM16, channels=1):
+    """Encode samples straight to a WAV file on disk"""
+    with open(path, 'wb') as f:
+        write_wav(f, samples, sample_rate, sample_format, channels)
+
+
+def interleave(*channels):
+    """Interleave equal-length channel buffers (e.g. left, right) into one float32 buffer"""
+    count = len(channels)
+    frames = len(channels[0])
+    if any(len(c) != frames for c in channels):
+        raise ValueError("channels differ in length")
+    if NUMPY_AVAILABLE:
+        out = np.empty(frames * count, dtype=np.float32)
+        for i, channel in enumerate(channels):
+            out[i::count] = channel
+        return out
+    out = array('f', bytes(4 * frames * count))
+    for i, channel in enumerate(channels):
+        out[i::count] = array('f', channel)
+    return out
+
+
+def resample(samples, source_rate, target_rate, channels=1):
+    """Linearly resample interleaved samples from source_rate to target_rate"""
+    if source_rate == target_rate:
+        return samples
+    frames = len(samples) // channels
+    if not frames:
+        return np.empty(0, dtype=np.float32) if NUMPY_AVAILABLE else array('f')
+    out_frames = max(1, round(frames * target_rate / source_rate))
+    step = source_rate / target_rate
+    if NUMPY_AVAILABLE:
+        data = np.asarray(samples, dtype=np.float32).reshape(frames, channels)
+        positions = np.minimum(np.arange(out_frames) * step, frames - 1)
+        grid = np.arange(frames)
+        out = np.empty((out_frames, channels), dtype=np.float32)
+        for c in range(channels):
+            out[:, c] = np.interp(positions, grid, data[:, c])
+        return out.reshape(-1)
+    out = array('f', bytes(4 * out_frames * channels))
+    for j in range(out_frames):
+        x = min(j * step, frames - 1)
+        i = int(x)
+        u = x - i
+        k = min(i + 1, frames - 1)
+        for c in range(channels):
+            a = samples[i * channels + c]
+            out[j * channels + c] = a + (samples[k * channels + c] - a) * u
+    return out
+
+
+def _wav_chunks(f):
+    """fmt fields and (offset, size) of the data chunk of an open WAV file"""
+    riff, _, wave = struct.unpack('<4sI4s', f.read(12))
+    if riff != b'RIFF' or wave != b'WAVE':
+        raise ValueError("not a WAV file")
+    fmt = None
+    while True:
+        head = f.read(8)
+        if len(head) < 8:
+            raise ValueError("WAV has no data chunk")
+        chunk_id, size = struct.unpack('<4sI', head)
+        if chunk_id == b'fmt ':
+            body = f.read(size + (size & 1))
+            fmt = list(struct.unpack('<HHIIHH', body[:16]))
+            if fmt[0] == 0xFFFE and size >= 26:
+                # WAVE_FORMAT_EXTENSIBLE: the sub-format GUID starts with the real tag
+                fmt[0] = struct.unpack('<H', body[24:26])[0]
+        elif chunk_id == b'data':
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            return fmt, f.tell(), size
+        else:
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def read_wav(path):
+    """Load a PCM (8/16/24/32-bit) or float32 WAV file
+
+    Returns (samples, sample rate, channels) with samples as interleaved
+    float32 in [-1, 1]: an ndarray, or array('f') without NumPy.
+    """
+    with open(path, 'rb') as f:
+        (tag, channels, sample_rate, _, _, bits), _, size = _wav_chunks(f)
+        data = f.read(size)
+    width = bits // 8
+    data = data[:len(data) - len(data) % width]
+    if tag == 3 and bits == 32:
+        samples = array('f', data)
+        if not LITTLE_ENDIAN:
+            samples.byteswap()
+        return (np.frombuffer(samples, dtype=np.float32) if NUMPY_AVAILABLE else samples), sample_rate, channels
+    if tag != 1 or width not in (1, 2, 3, 4):
+        raise ValueError(f"unsupported WAV encoding (format {tag}, {bits}-bit)")
+    scale = float(1 << (bits - 1))
+    if NUMPY_AVAILABLE:
+        if width == 1:
+            values = np.frombuffer(data, dtype=np.uint8).astype(np.int16) - 128
+        elif width == 3:
+            raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+            values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+            values = np.where(values & 0x800000, values - (1 << 24), values)
+        else:
+            values = np.frombuffer(data, dtype='<i2' if width == 2 else '<i4')
+        return (values / scale).astype(np.float32), sample_rate, channels
+    if width == 1:
+        values = [b - 128 for b in data]
+    elif width == 3:
+        values = [int.from_bytes(data[i:i + 3], 'little', signed=True) for i in range(0, len(data), 3)]
+    else:
+        values = array('h' if width == 2 else 'i', data)
+        if not LITTLE_ENDIAN:
+            values.byteswap()
+    return array('f', [v / scale for v in values]), sample_rate, channels
+
+
+def ffmpeg_decode(path, sample_rate=SAMPLE_RATE, channels=1):
+    """Decode any audio file ffmpeg can read to interleaved float32 samples, or None"""
+    try:
+        result = subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-i", str(path),
+             "-f", "f32le", "-ac", str(channels), "-ar", str(sample_rate), "-"],
+            check=True,
+            capture_output=True
+        )
+    except (subprocess.CalledProcessError, FileNotFoundError):
+        return None
+    samples = array('f', result.stdout[:len(result.stdout) // 4 * 4])
+    if not LITTLE_ENDIAN:
+        samples.byteswap()
+    return np.frombuffer(samples, dtype=np.float32) if NUMPY_AVAILABLE else samples
+
+
+# ---------------------------------------------------------------------------
+# OGG encoding
+# ---------------------------------------------------------------------------
+
+def check_ffmpeg():
+    """Check if ffmpeg is available"""
+    return shutil.which('ffmpeg') is not None
+
+
+def encode_ogg(wav_path, ogg_path=None, quality=OGG_QUALITY):
+    """Convert one WAV file to OGG Vorbis with ffmpeg; returns True on success
+
+    ffmpeg writes to a temporary file that replaces ogg_path atomically, so a
+    failed or interrupted encode never leaves a truncated OGG behind.
+    """
+    wav_path = Path(wav_path)
+    ogg_path = Path(ogg_path) if ogg_path else wav_path.with_suffix('.ogg')
+    tmp = ogg_path.with_name(f".{ogg_path.stem}.tmp.ogg")
+    try:
+        subprocess.run(
+            ["ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", str(wav_path),
+             "-c:a", "libvorbis", "-q:a", str(quality), str(tmp)],
+            check=True,
+            capture_output=True
+        )
+        os.replace(tmp, ogg_path)
+        return True
+    except (subprocess.CalledProcessError, FileNotFoundError, OSError):
+        if tmp.exists():
+            tmp.unlink()
+        return False
+
+
+def is_ogg_current(wav_path, ogg_path):
+    """True when the OGG exists and is at least as new as its WAV"""
+    try:
+        return os.stat(ogg_path).st_mtime_ns >= os.stat(wav_path).st_mtime_ns
+    except OSError:
+        return False
+
+
+def encode_directory(directory, jobs=None, quality=OGG_QUALITY, force=False, recursive=False):
+    """Encode every WAV in a directory to an OGG next to it
+
+    Up to `jobs` ffmpeg processes (default: CPU count) run at once; WAVs whose
+    OGG is already newer are skipped unless force is set. Returns a list of
+    (wav path, status, seconds) with status "encoded", "skipped" or "failed".
+    """
+    directory = Path(directory)
+    wavs = sorted(directory.rglob('*.wav') if recursive else directory.glob('*.wav'))
+    results = []
+    pending = []
+    for wav in wavs:
+        if not force and is_ogg_current(wav, wav.with_suffix('.ogg')):
+            results.append((wav, "skipped", 0.0))
+        else:
+            pending.append(wav)
+
+    def encode(wav):
+        start = time.perf_counter()
+        ok = encode_ogg(wav, quality=quality)
+        return wav, "encoded" if ok else "failed", time.perf_counter() - start
+
+    if pending:
+        # ffmpeg does the work in its own process; threads only wait on it
+        with ThreadPoolExecutor(max_workers=min(jobs or os.cpu_count() or 1, len(pending))) as pool:
+            results.extend(pool.map(encode, pending))
+    order = {wav: i for i, wav in enumerate(wavs)}
+    return sorted(results, key=lambda r: order[r[0]])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Encode every WAV in the given directories to OGG")
+    parser.add_argument("directories", nargs="+", type=Path, help="directories holding WAV files")
+    parser.add_argument("--jobs", type=int, default=None, help="parallel ffmpeg processes (default: CPU count)")
+    parser.add_argument("--quality", type=int, default=OGG_QUALITY, help="libvorbis quality, -1..10")
+    parser.add_argument("--force", action="store_true", help="re-encode even when the OGG is newer")
+    parser.add_argument("--recursive", action="store_true", help="include subdirectories")
+    args = parser.parse_args()
+
+    if not check_ffmpeg():
+        print("⚠️  ffmpeg not found. Install ffmpeg to convert WAV to OGG.")
+        sys.exit(1)
+
+    print("🎵 WAV -> OGG")
+    print("=" * 60)
+    start = time.perf_counter()
+    results = []
+    for directory in args.directories:
+        results.extend(encode_directory(directory, args.jobs, args.quality, args.force, args.recursive))
+    for wav, status, elapsed in results:
+        icon = {"encoded": "✅", "skipped": "⏭️ ", "failed": "❌"}[status]
+        print(f"{icon} {str(wav):45} {status:8} {elapsed * 1000:8.1f} ms")
+    counts = {s: sum(1 for _, status, _ in results if status == s) for s in ("encoded", "skipped", "failed")}
+    print("=" * 60)
+    print(f"📊 {len(results)} files: {counts['encoded']} encoded, {counts['skipped']} skipped, "
+          f"{counts['failed']} failed in {time.perf_counter() - start:.2f} s")
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
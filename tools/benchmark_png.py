@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming PNG encoder against the original create_png
+Renders every sprite in generate_sprites.SPRITES once, then encodes the same
+pixels with both encoders and compares encode time and file size.
+Usage: python3 tools/benchmark_png.py [--repeat N] [--skip-legacy-above PIXELS]
+"""
+
+import argparse
+import struct
+import time
+import zlib
+
+import generate_sprites
+from png_writer import encode_png
+
+
+def legacy_create_png(width, height, pixels):
+    """The original create_png from generate_sprites.py (filter 0, one-shot zlib)"""
+    # IHDR chunk
+    ihdr_data = struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0)
+
+    # IDAT chunk - compress pixel data
+    # PNG scanlines: each row starts with filter byte (0 = none)
+    scanlines = b''
+    for y in range(height):
+        scanlines += b'\x00'  # Filter byte
+        for x in range(width):
+            idx = (y * width + x) * 4
+            scanlines += bytes(pixels[idx:idx+4])
+
+    idat_data = zlib.compress(scanlines)
+
+    return (
+        b'\x89PNG\r\n\x1a\n' +
+        struct.pack('>I', len(ihdr_data)) +
+        b'IHDR' +
+        ihdr_data +
+        struct.pack('>I', zlib.crc32(b'IHDR' + ihdr_data) & 0xffffffff) +
+        struct.pack('>I', len(idat_data)) +
+        b'IDAT' +
+        idat_data +
+        struct.pack('>I', zlib.crc32(b'IDAT' + idat_data) & 0xffffffff) +
+        struct.pack('>I', 0) +
+        b'IEND' +
+        struct.pack('>I', zlib.crc32(b'IEND') & 0xffffffff)
+    )
+
+
+def render_sprites():
+    """Render every sprite recipe to raw RGBA bytes: [(name, width, height, pixels)]"""
+    rendered = []
+    original = generate_sprites.create_png
+    generate_sprites.create_png = lambda width, height, pixels: (width, height, bytes(pixels))
+    try:
+        for name, builder, args in generate_sprites.SPRITES:
+            width, height, pixels = builder(*args)
+            rendered.append((name, width, height, pixels))
+    finally:
+        generate_sprites.create_png = original
+    return rendered
+
+
+def time_encoder(encoder, width, height, pixels, repeat):
+    """Best-of-N wall time (seconds) and output size of one encode"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        data = encoder(width, height, pixels)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='runs per encoder (best time is kept)')
+    parser.add_argument('--skip-legacy-above', type=int, default=None, metavar='PIXELS',
+                        help='skip the (quadratic) legacy encoder for sprites larger than this')
+    args = parser.parse_args()
+
+    print("=" * 78)
+    print(f"{'sprite':22} {'size':>9} {'legacy ms':>10} {'new ms':>9} {'legacy B':>9} {'new B':>8} {'ratio':>6}")
+    print("=" * 78)
+    totals = [0.0, 0.0, 0, 0]
+    for name, width, height, pixels in render_sprites():
+        new_time, new_size = time_encoder(lambda w, h, p: encode_png(p, w, h), width, height, pixels, args.repeat)
+        if args.skip_legacy_above is not None and width * height > args.skip_legacy_above:
+            print(f"{name:22} {width:>4}x{height:<4} {'skipped':>10} {new_time * 1000:9.2f} {'-':>9} {new_size:8d}")
+            continue
+        old_time, old_size = time_encoder(legacy_create_png, width, height, pixels, args.repeat)
+        totals[0] += old_time
+        totals[1] += new_time
+        totals[2] += old_size
+        totals[3] += new_size
+        print(f"{name:22} {width:>4}x{height:<4} {old_time * 1000:10.2f} {new_time * 1000:9.2f} "
+              f"{old_size:9d} {new_size:8d} {new_size / old_size:6.2f}")
+    print("-" * 78)
+    if totals[2]:
+        print(f"{'total (compared)':22} {'':9} {totals[0] * 1000:10.2f} {totals[1] * 1000:9.2f} "
+              f"{totals[2]:9d} {totals[3]:8d} {totals[3] / totals[2]:6.2f}")
+        print(f"\n📊 Encode speed-up: {totals[0] / totals[1]:.1f}x, size: {100 * totals[3] / totals[2]:.1f}% of legacy")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Benchmark the synthesis graph on every sound effect bank
+Renders each effect of generate_sounds.EFFECTS / EFFECTS_V3 on its own and then
+each whole bank into its shared buffer, reporting best-of-N render time.
+Usage: python3 tools/benchmark_synth.py [--repeat N]
+"""
+
+import argparse
+import time
+
+from generate_sounds import BANKS
+from synth import NUMPY_AVAILABLE, SAMPLE_RATE, Bank, render
+
+
+def best_time(func, repeat):
+    """Best-of-N wall time (seconds) of func()"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help='runs per effect (best time is kept)')
+    args = parser.parse_args()
+
+    print(f"🔊 Synth benchmark ({'numpy' if NUMPY_AVAILABLE else 'pure Python'}, {SAMPLE_RATE} Hz)")
+    print("=" * 60)
+    print(f"{'bank':6} {'effect':22} {'samples':>8} {'ms':>9} {'x realtime':>11}")
+    print("=" * 60)
+    for bank_name, effects in BANKS.items():
+        total_samples = 0
+        for effect in effects.values():
+            samples = round(SAMPLE_RATE * effect.duration)
+            total_samples += samples
+            elapsed = best_time(lambda: render(effect), args.repeat)
+            print(f"{bank_name:6} {effect.name:22} {samples:8d} {elapsed * 1000:9.3f} "
+                  f"{effect.duration / elapsed:11.0f}")
+        bank = Bank(effects.values())
+        elapsed = best_time(bank.render, args.repeat)
+        print("-" * 60)
+        print(f"{bank_name:6} {'(whole bank)':22} {total_samples:8d} {elapsed * 1000:9.3f} "
+              f"{total_samples / SAMPLE_RATE / elapsed:11.0f}")
+        print()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Build every generated asset (sprites and sounds) incrementally
+Recipes come from the SPRITES / SOUNDS / SOUNDS_V3 tables in generate_sprites.py
+and generate_sounds.py. Each recipe is keyed by a hash of its arguments plus the
+source of its generator module (and the tools modules it imports); recipes
+whose output is already up to date are skipped with a single stat, the rest
+run on a process pool, and files are only rewritten when their bytes change
+so Godot does not re-import untouched assets.
+With --ogg the built WAVs are then encoded to OGG by parallel ffmpeg workers
+(see audio_writer.py), skipping every OGG that is already newer than its WAV.
+Usage: python3 tools/build_assets.py [--force] [--jobs N] [--only SUBSTRING] [--list] [--ogg]
+"""
+
+import argparse
+import ast
+import hashlib
+import importlib
+import importlib.util
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+TOOLS_DIR = Path(__file__).parent
+BASE_DIR = TOOLS_DIR.parent
+CACHE_DIR = BASE_DIR / ".tools_cache"
+CACHE_PATH = CACHE_DIR / "build_assets.json"
+
+# Generator tables and where their outputs go: (module, table, output dir,
+# create function). Each table lists (file name, builder, args); the optional
+# create function turns one entry into bytes, otherwise the builder does.
+GENERATORS = [
+    ("generate_sprites", "SPRITES", "assets/sprites", None),
+    ("generate_sounds", "SOUNDS", "assets/sounds", "create_sound"),
+    ("generate_sounds", "SOUNDS_V3", "assets/sounds/v3.0", "create_sound"),
+]
+
+Recipe = namedtuple("Recipe", "output module builder args create")
+
+
+def load_registry():
+    """Collect every recipe from the generator tables"""
+    recipes = []
+    for module_name, table, out_dir, create in GENERATORS:
+        module = importlib.import_module(module_name)
+        for name, builder, args in getattr(module, table):
+            recipes.append(Recipe(f"{out_dir}/{name}", module_name, builder.__name__, tuple(args), create))
+    return recipes
+
+
+def _local_imports(module_name):
+    """Names of tools/ modules imported by a tools/ module"""
+    tree = ast.parse((TOOLS_DIR / f"{module_name}.py").read_text())
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            names.add(node.module)
+    return {n for n in names if (TOOLS_DIR / f"{n}.py").exists()}
+
+
+def source_hash(module_name, _memo={}):
+    """Hash of a generator's source together with every tools/ module it pulls in"""
+    if module_name not in _memo:
+        seen = set()
+        pending = [module_name]
+        while pending:
+            name = pending.pop()
+            if name not in seen:
+                seen.add(name)
+                pending.extend(_local_imports(name))
+        digest = hashlib.sha256()
+        for name in sorted(seen):
+            digest.update(name.encode())
+            digest.update((TOOLS_DIR / f"{name}.py").read_bytes())
+        _memo[module_name] = digest.hexdigest()
+    return _memo[module_name]
+
+
+def recipe_key(recipe, numpy_available):
+    """Content key of a recipe: its parameters, generator source and NumPy backend"""
+    params = json.dumps([recipe.module, recipe.builder, repr(recipe.args), numpy_available])
+    return hashlib.sha256((params + source_hash(recipe.module)).encode()).hexdigest()
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(cache):
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp, CACHE_PATH)
+
+
+def is_up_to_date(recipe, key, cache):
+    """True when the cached key matches and the output is untouched since (one stat)"""
+    entry = cache.get(recipe.output)
+    if not entry or entry.get("key") != key:
+        return False
+    try:
+        st = os.stat(BASE_DIR / recipe.output)
+    except OSError:
+        return False
+    return st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime_ns"]
+
+
+def run_recipe(recipe):
+    """Render one recipe (runs in a worker process); returns (bytes, seconds)"""
+    start = time.perf_counter()
+    module = importlib.import_module(recipe.module)
+    builder = getattr(module, recipe.builder)
+    if recipe.create:
+        data = getattr(module, recipe.create)(builder, *recipe.args)
+    else:
+        data = builder(*recipe.args)
+    return bytes(data), time.perf_counter() - start
+
+
+def write_if_changed(path, data):
+    """Atomically replace path with data unless it already holds exactly these bytes"""
+    try:
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except OSError:
+        pass
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+    return True
+
+
+def build_assets(force=False, jobs=None, only=None, verbose=True):
+    """Build stale assets; returns a list of (output, status, seconds)
+
+    status is "cached" (skipped), "built" (written) or "unchanged" (rebuilt
+    but byte-identical, so the file was left alone).
+    """
+    sys.path.insert(0, str(TOOLS_DIR))
+    numpy_available = importlib.util.find_spec("numpy") is not None
+    recipes = [r for r in load_registry() if not only or only in r.output]
+    cache = load_cache()
+    keys = {r.output: recipe_key(r, numpy_available) for r in recipes}
+
+    results = []
+    stale = []
+    for recipe in recipes:
+        if not force and is_up_to_date(recipe, keys[recipe.output], cache):
+            results.append((recipe.output, "cached", 0.0))
+        else:
+            stale.append(recipe)
+
+    jobs = jobs or os.cpu_count() or 1
+    if stale:
+        if jobs > 1 and len(stale) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as pool:
+                rendered = list(pool.map(run_recipe, stale))
+        else:
+            rendered = [run_recipe(r) for r in stale]
+        for recipe, (data, elapsed) in zip(stale, rendered):
+            path = BASE_DIR / recipe.output
+            status = "built" if write_if_changed(path, data) else "unchanged"
+            st = path.stat()
+            cache[recipe.output] = {"key": keys[recipe.output], "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+            results.append((recipe.output, status, elapsed))
+        save_cache(cache)
+
+    if verbose:
+        order = {r.output: i for i, r in enumerate(recipes)}
+        for output, status, elapsed in sorted(results, key=lambda r: order[r[0]]):
+            icon = {"cached": "⏭️ ", "built": "✅", "unchanged": "🟰"}[status]
+            print(f"{icon} {output:45} {status:9} {elapsed * 1000:8.1f} ms")
+    return results
+
+
+def encode_sounds(jobs=None, verbose=True):
+    """Encode the WAVs of every sound table to OGG; returns encode_directory results"""
+    from audio_writer import check_ffmpeg, encode_directory
+
+    if not check_ffmpeg():
+        print("⚠️  ffmpeg not found. WAV files won't be converted to OGG.")
+        return []
+    sys.path.insert(0, str(TOOLS_DIR))
+    directories = sorted({str(Path(r.output).parent) for r in load_registry() if r.output.endswith(".wav")})
+    results = []
+    for directory in directories:
+        results.extend(encode_directory(BASE_DIR / directory, jobs=jobs))
+    if verbose:
+        for wav, status, elapsed in results:
+            icon = {"encoded": "✅", "skipped": "⏭️ ", "failed": "❌"}[status]
+            print(f"{icon} {str(wav.relative_to(BASE_DIR)):45} {status:9} {elapsed * 1000:8.1f} ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build generated sprites and sounds incrementally")
+    parser.add_argument("--force", action="store_true", help="rebuild everything, ignoring the cache")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--only", default=None, metavar="SUBSTRING", help="only recipes whose output contains this")
+    parser.add_argument("--list", action="store_true", help="list registered recipes and exit")
+    parser.add_argument("--ogg", action="store_true", help="also encode generated WAVs to OGG (needs ffmpeg)")
+    args = parser.parse_args()
+
+    if args.list:
+        sys.path.insert(0, str(TOOLS_DIR))
+        for recipe in load_registry():
+            print(f"{recipe.output:45} {recipe.module}.{recipe.builder}{recipe.args}")
+        return
+
+    print("🎮 Pinball Asset Build")
+    print("=" * 60)
+    start = time.perf_counter()
+    results = build_assets(force=args.force, jobs=args.jobs, only=args.only)
+    wall = time.perf_counter() - start
+    counts = {s: sum(1 for _, status, _ in results if status == s) for s in ("cached", "built", "unchanged")}
+    print("=" * 60)
+    print(f"📊 {len(results)} assets: {counts['built']} built, {counts['unchanged']} unchanged, "
+          f"{counts['cached']} cache hits in {wall:.2f} s")
+
+    if args.ogg:
+        print("\n🎵 OGG encoding")
+        print("=" * 60)
+        start = time.perf_counter()
+        encoded = encode_sounds(jobs=args.jobs)
+        if encoded:
+            done = sum(1 for _, status, _ in encoded if status == "encoded")
+            print("=" * 60)
+            print(f"📊 {len(encoded)} sounds: {done} encoded in {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,27 @@
 #!/usr/bin/env python3
 """
 Calculate Flutter Pinball coordinates to Godot coordinates conversion.
+The layout tables below are loaded from config/layout_v4.json (shared with
+CoordinateConverterV4.gd through tools/layout.py); pinball_sim.py builds its
+table from them.
 """
 
-SCALE = 5.0  # Meters to pixels (adjusted to fit screen)
-CENTER_X = 400.0
-CENTER_Y = 300.0
+from layout import load_layout
+
+_LAYOUT = load_layout()
+
+SCALE = _LAYOUT.scale  # Meters to pixels (adjusted to fit screen)
+CENTER_X, CENTER_Y = _LAYOUT.center
+
+# Flutter board bounds (board 101.6 x 143.8, centred on the origin)
+BOARD_HALF_WIDTH = _LAYOUT.half_width
+BOARD_HALF_HEIGHT = _LAYOUT.half_height
+
+# Flutter Forge2D positions of table components (Y positive down)
+FLUTTER_POSITIONS = {name: tuple(c["flutter"]) for name, c in _LAYOUT.data["components"].items() if "flutter" in c}
+
+# Components placed directly in Godot pixels (no Flutter counterpart)
+GODOT_POSITIONS = {name: tuple(c["godot"]) for name, c in _LAYOUT.data["components"].items() if "godot" in c}
 
 def flutter_to_godot(flutter_x, flutter_y):
     """Convert Flutter Forge2D coordinates to Godot pixel coordinates."""
@@ -13,37 +29,32 @@ def flutter_to_godot(flutter_x, flutter_y):
     godot_y = flutter_y * SCALE + CENTER_Y  # Same Y direction (both positive down)
     return godot_x, godot_y
 
+def godot_to_flutter(godot_x, godot_y):
+    """Convert Godot pixel coordinates to Flutter Forge2D coordinates."""
+    return (godot_x - CENTER_X) / SCALE, (godot_y - CENTER_Y) / SCALE
+
+def component_position(name):
+    """Godot position of a named component (as CoordinateConverterV4.get_component_position)."""
+    return _LAYOUT.position(name)
+
 def print_position(name, flutter_x, flutter_y):
     godot_x, godot_y = flutter_to_godot(flutter_x, flutter_y)
     print(f"{name:30} Flutter: ({flutter_x:6.2f}, {flutter_y:6.2f}) -> Godot: ({godot_x:6.1f}, {godot_y:6.1f})")
 
-print("=== Flutter Pinball to Godot Coordinate Conversion ===")
-print(f"Scale: {SCALE}, Center: ({CENTER_X}, {CENTER_Y})")
-print()
-
-print("=== Flippers ===")
-print_position("Left Flipper", -18.65, 43.6)
-print_position("Right Flipper", 4.75, 43.6)
-print()
-
-print("=== Android Acres Components ===")
-print_position("Android Spaceship", -26.5, -28.5)
-print_position("Android Bumper A", -25.2, 1.5)
-print_position("Android Bumper B", -32.9, -13.0)  # Estimated
-print_position("Android Bumper Cow", -20.7, -8.0)  # Estimated
-print()
-
-print("=== Zone Centers (Approximate) ===")
-print("Note: These are quadrant-based approximations")
-print("Android Acres (upper left): (200, 150)")
-print("Dino Desert (upper right): (600, 150)")
-print("Flutter Forest (lower left): (200, 400)")
-print("Sparky Scorch (lower right): (600, 400)")
-print("Google Gallery (center top): (400, 250)")
-print()
-
-print("=== Other Components ===")
-print("Launcher (bottom center): (400, 550)")
-print("Drain (bottom center): (400, 605)")
-print("Skill Shot (center): (400, 200)")
-print("Ramp (left side): (180, 180)")
\ No newline at end of file
+def main():
+    print("=== Flutter Pinball to Godot Coordinate Conversion ===")
+    print(f"Scale: {SCALE}, Center: ({CENTER_X}, {CENTER_Y})")
+    print()
+
+    print("=== Flutter Components ===")
+    for name, (x, y) in FLUTTER_POSITIONS.items():
+        print_position(name.replace("_", " ").title(), x, y)
+    print()
+
+    print("=== Godot-Placed Components ===")
+    print("Note: Zone centers are quadrant-based approximations")
+    for name, (x, y) in GODOT_POSITIONS.items():
+        print(f"{name.replace('_', ' ').title():30} Godot: ({x:6.1f}, {y:6.1f})")
+
+if __name__ == "__main__":
+    main()
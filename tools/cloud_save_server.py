@@ -0,0 +1,695 @@
+#!/usr/bin/env python3
+"""
+Cloud save server for CloudSaveV4
+Stand-in backend for scripts/v4/CloudSaveV4.gd that replaces its
+_simulate_upload/_simulate_download with real sync semantics. A save is
+stored as its leaf fields (JSON pointers; arrays are single leaves), each
+carrying a vector clock of per-client counters, plus the last few whole
+versions for restores. Every version has an ETag (conditional GET answers
+304). Clients sync with a JSON-patch style PATCH carrying only the fields
+they changed against a base version; each field is merged on its own
+(a dominating clock wins, a stale one is rejected, concurrent edits fall
+to the higher clock total, then the higher client id), and the reply
+carries every other field that changed since the base. PUT keeps the
+whole-document upload of the current script. Bodies are gzip-compressed
+both ways, and the server is a single asyncio loop holding any number of
+keep-alive connections.
+--simulate runs paired devices per save against an in-process server and
+compares bytes on the wire and sync latency for full-document sync,
+full-document sync with gzip, and delta sync.
+Usage: python3 tools/cloud_save_server.py --serve [--port N] [--data DIR] | --simulate [--saves N] [--syncs N]
+"""
+
+import argparse
+import asyncio
+import gzip
+import json
+import os
+import random
+import re
+import sys
+import time
+from collections import deque
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / ".tools_cache" / "cloud_save"
+MAX_VERSIONS = 5          # CloudSaveV4.max_backup_versions
+MAX_CHANGES = 256         # Versions a delta can be computed from
+MAX_BODY = 4 << 20
+MIN_COMPRESS = 256        # Smaller bodies are sent as they are
+FLUSH_INTERVAL = 1.0      # Seconds between write-behind flushes of --data
+SAVE_ID = re.compile(r"^/saves/([A-Za-z0-9_-]{1,64})(/versions)?$")
+
+
+# ---------------------------------------------------------------------------
+# Fields and vector clocks
+# ---------------------------------------------------------------------------
+
+def _escape(key):
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def flatten(doc, prefix="", out=None):
+    """{JSON pointer: leaf value}; empty objects and arrays are leaves"""
+    out = {} if out is None else out
+    if isinstance(doc, dict) and doc:
+        for key, value in doc.items():
+            flatten(value, f"{prefix}/{_escape(key)}", out)
+    else:
+        out[prefix] = doc
+    return out
+
+
+def unflatten(fields):
+    """Nested document for flattened fields (leaf values are shared, not copied)"""
+    if "" in fields:
+        return fields[""]
+    doc = {}
+    for path in sorted(fields):
+        keys = [k.replace("~1", "/").replace("~0", "~") for k in path[1:].split("/")]
+        node = doc
+        for key in keys[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                child = node[key] = {}
+            node = child
+        node[keys[-1]] = fields[path]
+    return doc
+
+
+def compare(a, b):
+    """Order of vector clocks a and b: 1 (a newer), -1 (a older or equal), 0 (concurrent)"""
+    a_ahead = any(n > b.get(c, 0) for c, n in a.items())
+    b_ahead = any(n > a.get(c, 0) for c, n in b.items())
+    if a_ahead and not b_ahead:
+        return 1
+    if not a_ahead:
+        return -1
+    return 0
+
+
+def merge_clocks(a, b):
+    merged = dict(a)
+    for client, n in b.items():
+        if n > merged.get(client, 0):
+            merged[client] = n
+    return merged
+
+
+def _overlapping(fields, path):
+    """Stored paths that a leaf at path replaces (its ancestors and descendants)"""
+    if path in fields:
+        return []
+    ancestors = [path[:i] for i in range(len(path)) if path[i] == "/"]
+    prefix = path + "/"
+    return [p for p in ancestors if p in fields] + [p for p in fields if p.startswith(prefix)]
+
+
+# ---------------------------------------------------------------------------
+# Save store
+# ---------------------------------------------------------------------------
+
+class SaveRecord:
+    """One save slot: current fields and clocks, recent changes and whole versions"""
+
+    def __init__(self):
+        self.version = 0
+        self.fields = {}
+        self.clocks = {}          # path -> clock; removed fields keep theirs as a tombstone
+        self.changes = deque(maxlen=MAX_CHANGES)   # (version, changed paths)
+        self.history = deque(maxlen=MAX_VERSIONS)  # (version, fields); values are replaced, never mutated
+        self.epoch = os.urandom(4).hex()  # Keeps ETags unique if the save is deleted and recreated
+
+    @property
+    def etag(self):
+        return f'"{self.epoch}-{self.version}"'
+
+    def _commit(self, paths):
+        self.version += 1
+        self.changes.append((self.version, frozenset(paths)))
+        self.history.append((self.version, dict(self.fields)))
+
+    def _set(self, path, value, clock):
+        if value is _REMOVED:
+            self.fields.pop(path, None)
+        else:
+            for stale in _overlapping(self.fields, path):
+                del self.fields[stale]
+            self.fields[path] = value
+        self.clocks[path] = clock
+
+    def apply(self, client, ops):
+        """Merge JSON-patch ops field by field; returns (applied paths, merged paths, rejected ops)
+
+        Merged paths were applied with a clock the writer does not have yet.
+        """
+        applied, merged, rejected = set(), set(), []
+        # Parse the whole batch first: a malformed op must reject it before any field changes
+        for path, value, clock in [_parse_op(op) for op in ops]:
+            stored = self.clocks.get(path, {})
+            order = compare(clock, stored)
+            if order == 0:
+                merged.add(path)
+                # Concurrent edits: the side with more history wins, then the higher client id
+                rival = max(stored, key=lambda c: (stored[c], c))
+                order = 1 if (sum(clock.values()), client) > (sum(stored.values()), rival) else -1
+                clock = merge_clocks(clock, stored)
+            if order == 1:
+                self._set(path, value, clock)
+                applied.add(path)
+            else:
+                rejected.append(self.op_for(path))
+        if applied:
+            self._commit(applied)
+        return applied, merged, rejected
+
+    def replace(self, client, doc):
+        """Whole-document upload: every differing field is overwritten by client"""
+        fields = flatten(doc)
+        changed = {p for p in fields if p not in self.fields or self.fields[p] != fields[p]}
+        changed |= {p for p in self.fields if p not in fields}
+        for path in changed:
+            clock = dict(self.clocks.get(path, {}))
+            clock[client] = clock.get(client, 0) + 1
+            self.clocks[path] = clock
+        self.fields = fields
+        if changed or not self.version:
+            self._commit(changed)
+
+    def op_for(self, path):
+        if path in self.fields:
+            return {"op": "replace", "path": path, "value": self.fields[path], "clock": self.clocks[path]}
+        return {"op": "remove", "path": path, "clock": self.clocks.get(path, {})}
+
+    def delta_since(self, base, exclude=()):
+        """Ops bringing a copy at version base up to date, or None when base is too old"""
+        if base == self.version:
+            return []
+        if not self.changes or base < self.changes[0][0] - 1 or base > self.version:
+            return None
+        paths = set()
+        for version, changed in reversed(self.changes):
+            if version <= base:
+                break
+            paths |= changed
+        return [self.op_for(p) for p in sorted(paths - set(exclude))]
+
+    def state(self):
+        return {"version": self.version, "epoch": self.epoch, "fields": self.fields, "clocks": self.clocks,
+                "history": [[v, fields] for v, fields in self.history]}
+
+    @classmethod
+    def from_state(cls, state):
+        record = cls()
+        record.version, record.epoch = state["version"], state["epoch"]
+        record.fields, record.clocks = state["fields"], state["clocks"]
+        record.history.extend((v, fields) for v, fields in state["history"])
+        return record
+
+
+_REMOVED = object()
+PATCH_OPS = ("add", "replace", "remove")
+
+
+def _parse_op(op):
+    """(path, value, clock) of a JSON-patch op; raises ValueError when it is malformed"""
+    if not isinstance(op, dict) or op.get("op") not in PATCH_OPS:
+        raise ValueError(f"expected an op with op in {', '.join(PATCH_OPS)}, got {op!r}")
+    path, clock = op.get("path"), op.get("clock", {})
+    if not isinstance(path, str) or not path.startswith("/"):
+        raise ValueError(f"op path must be a string starting with '/', got {path!r}")
+    if not isinstance(clock, dict):
+        raise ValueError(f"op clock must be an object, got {clock!r}")
+    if op["op"] != "remove" and "value" not in op:
+        raise ValueError(f"{op['op']} {path} has no value")
+    return path, _REMOVED if op["op"] == "remove" else op["value"], {str(c): int(n) for c, n in clock.items()}
+
+
+# ---------------------------------------------------------------------------
+# asyncio HTTP server
+# ---------------------------------------------------------------------------
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class CloudSaveServer:
+    """GET/PUT/PATCH /saves/<id>, GET /saves/<id>/versions, GET /stats"""
+
+    def __init__(self, data_dir=None):
+        self.saves = {}
+        self.data_dir = Path(data_dir) if data_dir else None
+        self.dirty = set()
+        self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0, "not_modified": 0,
+                      "conflicts": 0, "rejected": 0, "connections": 0}
+        self.server = None
+        self._flusher = None
+        self._connections = {}    # handler task -> writer
+        if self.data_dir:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            for path in self.data_dir.glob("*.json.gz"):
+                with gzip.open(path, "rt", encoding="utf-8") as f:
+                    self.saves[path.name[:-len(".json.gz")]] = SaveRecord.from_state(json.load(f))
+
+    async def start(self, port=0):
+        self.server = await asyncio.start_server(self._connection, "127.0.0.1", port)
+        if self.data_dir:
+            self._flusher = asyncio.create_task(self._flush_loop())
+        return f"http://127.0.0.1:{self.server.sockets[0].getsockname()[1]}"
+
+    async def stop(self):
+        self.server.close()
+        # Closing the transports ends each handler at its next read (cancelling them would log noise)
+        for writer in self._connections.values():
+            writer.close()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self.server.wait_closed()
+        if self._flusher:
+            self._flusher.cancel()
+            self.flush()
+
+    async def _flush_loop(self):
+        while True:
+            await asyncio.sleep(FLUSH_INTERVAL)
+            if self.dirty:
+                await asyncio.to_thread(self.flush)
+
+    def flush(self):
+        """Write changed saves to data_dir (atomically, one gzip file per save)"""
+        dirty, self.dirty = self.dirty, set()
+        for save_id in dirty:
+            path = self.data_dir / f"{save_id}.json.gz"
+            tmp = path.with_suffix(".tmp")
+            with gzip.open(tmp, "wt", encoding="utf-8", compresslevel=6) as f:
+                json.dump(self.saves[save_id].state(), f, separators=(",", ":"))
+            os.replace(tmp, path)
+
+    async def _connection(self, reader, writer):
+        self.stats["connections"] += 1
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                size = len(request_line)
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    size += len(line)
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get("content-length", 0))
+                if length > MAX_BODY:
+                    status, reply_headers, payload = 413, {}, {"error": "body too large"}
+                    body = b""
+                else:
+                    body = await reader.readexactly(length) if length else b""
+                    status, reply_headers, payload = self._handle(method, target, headers, body)
+                self.stats["requests"] += 1
+                self.stats["bytes_in"] += size + length
+                out = self._encode(status, reply_headers, payload, headers)
+                self.stats["bytes_out"] += len(out)
+                writer.write(out)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close" or status == 413:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    @staticmethod
+    def _encode(status, headers, payload, request_headers):
+        body = b"" if payload is None else json.dumps(payload, separators=(",", ":")).encode()
+        if len(body) >= MIN_COMPRESS and "gzip" in request_headers.get("accept-encoding", ""):
+            body = gzip.compress(body, 6)
+            headers["Content-Encoding"] = "gzip"
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+        headers["Content-Length"] = str(len(body))
+        reason = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+                  405: "Method Not Allowed", 412: "Precondition Failed", 413: "Payload Too Large"}.get(status, "")
+        lines = [f"HTTP/1.1 {status} {reason}"] + [f"{k}: {v}" for k, v in headers.items()]
+        return ("\r\n".join(lines) + "\r\n\r\n").encode() + body
+
+    def _handle(self, method, target, headers, body):
+        parts = urlsplit(target)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        try:
+            if parts.path == "/stats":
+                return 200, {}, dict(self.stats, saves=len(self.saves))
+            match = SAVE_ID.match(parts.path)
+            if not match:
+                raise HTTPError(404, f"unknown path {parts.path}")
+            save_id, versions = match.groups()
+            if headers.get("content-encoding") == "gzip":
+                body = gzip.decompress(body)
+            data = json.loads(body) if body else {}
+            if method == "GET" and versions:
+                record = self._record(save_id)
+                return 200, {}, [{"version": v, "fields": len(fields)} for v, fields in record.history]
+            if method == "GET":
+                return self._get(save_id, query, headers)
+            if method == "PUT":
+                return self._put(save_id, data, headers)
+            if method == "PATCH":
+                return self._patch(save_id, data)
+            raise HTTPError(405, f"{method} not allowed")
+        except HTTPError as e:
+            return e.status, {}, {"error": str(e)}
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            return 400, {}, {"error": f"{type(e).__name__}: {e}"}
+
+    def _record(self, save_id):
+        record = self.saves.get(save_id)
+        if record is None:
+            raise HTTPError(404, f"no save {save_id}")
+        return record
+
+    def _get(self, save_id, query, headers):
+        record = self._record(save_id)
+        if "version" in query:
+            for version, fields in record.history:
+                if version == int(query["version"]):
+                    return 200, {}, {"version": version, "doc": unflatten(fields)}
+            raise HTTPError(404, f"version {query['version']} of {save_id} is not kept")
+        if headers.get("if-none-match") == record.etag:
+            self.stats["not_modified"] += 1
+            return 304, {"ETag": record.etag}, None
+        if "since" in query:
+            ops = record.delta_since(int(query["since"]))
+            if ops is not None:
+                return 200, {"ETag": record.etag}, {"version": record.version, "etag": record.etag, "ops": ops}
+        reply = {"version": record.version, "etag": record.etag, "doc": unflatten(record.fields)}
+        if query.get("clocks") == "1":
+            reply["clocks"] = record.clocks
+        return 200, {"ETag": record.etag}, reply
+
+    def _put(self, save_id, data, headers):
+        record = self.saves.get(save_id)
+        if_match = headers.get("if-match")
+        if if_match and (record is None or if_match != record.etag):
+            raise HTTPError(412, "save changed since it was read")
+        if record is None:
+            record = self.saves[save_id] = SaveRecord()
+        record.replace(str(data.get("client", "")), data["doc"])
+        self.dirty.add(save_id)
+        return 200, {"ETag": record.etag}, {"version": record.version, "etag": record.etag}
+
+    def _patch(self, save_id, data):
+        record = self.saves.get(save_id)
+        if record is None:
+            record = self.saves[save_id] = SaveRecord()
+        client, base = str(data["client"]), int(data.get("base", 0))
+        applied, merged, rejected = record.apply(client, data.get("ops", []))
+        self.stats["conflicts"] += len(merged)
+        self.stats["rejected"] += len(rejected)
+        if applied:
+            self.dirty.add(save_id)
+        reply = {"version": record.version, "etag": record.etag}
+        ops = record.delta_since(base, exclude=applied - merged)
+        if ops is None:
+            # Base fell out of the change window: resend everything
+            reply.update(doc=unflatten(record.fields), clocks=record.clocks)
+        else:
+            seen = {op["path"] for op in ops}
+            reply["ops"] = ops + [op for op in rejected if op["path"] not in seen]
+        return 200, {"ETag": record.etag}, reply
+
+
+# ---------------------------------------------------------------------------
+# Client simulator
+# ---------------------------------------------------------------------------
+
+CHARACTERS = ("sparky", "dino", "dash", "android")
+
+
+def make_save(rng):
+    """A save shaped like CloudSaveV4._get_local_data() (leaderboard, achievements, settings) plus progress"""
+    entries = sorted(({"id": f"{rng.randrange(10 ** 9)}_AAA", "initials": "AAA",
+                       "score": rng.randrange(10 ** 6) // 10 * 10, "character": rng.choice(CHARACTERS),
+                       "timestamp": 1700000000 + rng.randrange(10 ** 7)} for _ in range(20)),
+                     key=lambda e: -e["score"])
+    return {
+        "leaderboard": {"entries": entries,
+                        "character_leaderboards": {c: [e for e in entries if e["character"] == c] for c in CHARACTERS}},
+        "achievements": {f"achievement_{i:02d}": {"unlocked": rng.random() < 0.3, "progress": rng.randrange(100)}
+                         for i in range(40)},
+        "settings": {"master_volume": 1.0, "music_volume": 0.8, "sfx_volume": 0.9, "language": "en",
+                     "fullscreen": True, "vsync": True, "haptics": False, "colorblind_mode": "none"},
+        "progress": {c: {"high_score": rng.randrange(10 ** 6), "games_played": rng.randrange(500),
+                         "balls_lost": rng.randrange(2000), "bonus_collected": rng.randrange(300),
+                         "unlocked_skins": [f"{c}_skin_{k}" for k in range(rng.randrange(1, 5))]}
+                     for c in CHARACTERS},
+        "wallet": {"coins": rng.randrange(10 ** 5), "gems": rng.randrange(500)},
+    }
+
+
+def mutate(fields, rng):
+    """Paths a play session would change, with their new values"""
+    changes = {}
+    character = rng.choice(CHARACTERS)
+    base = f"/progress/{character}"
+    changes[f"{base}/games_played"] = fields.get(f"{base}/games_played", 0) + 1
+    changes[f"{base}/balls_lost"] = fields.get(f"{base}/balls_lost", 0) + rng.randrange(1, 4)
+    changes["/wallet/coins"] = fields.get("/wallet/coins", 0) + rng.randrange(10, 200)
+    if rng.random() < 0.3:
+        i = rng.randrange(40)
+        changes[f"/achievements/achievement_{i:02d}/progress"] = rng.randrange(100)
+    if rng.random() < 0.1:
+        changes[f"/settings/{rng.choice(['master_volume', 'music_volume', 'sfx_volume'])}"] = round(rng.random(), 2)
+    if rng.random() < 0.15:
+        score = rng.randrange(10 ** 6)
+        changes[f"{base}/high_score"] = max(score, fields.get(f"{base}/high_score", 0))
+        entries = list(fields.get("/leaderboard/entries", []))
+        entries.append({"id": f"{rng.randrange(10 ** 9)}_BBB", "initials": "BBB", "score": score,
+                        "character": character, "timestamp": int(time.time())})
+        changes["/leaderboard/entries"] = sorted(entries, key=lambda e: -e["score"])[:20]
+    return changes
+
+
+class Device:
+    """One game install syncing a save over its own keep-alive connection"""
+
+    def __init__(self, base, save_id, client_id, mode):
+        parts = urlsplit(base)
+        self.host, self.port = parts.hostname, parts.port
+        self.save_id, self.client_id, self.mode = save_id, client_id, mode
+        self.gzip = mode != "full"
+        self.fields, self.clocks, self.pending = {}, {}, set()
+        self.version, self.etag = 0, None
+        self.sent = self.received = 0
+        self.latencies = []
+        self.conn = None
+
+    async def request(self, method, target, payload=None, headers=None):
+        if self.conn is None:
+            self.conn = await asyncio.open_connection(self.host, self.port)
+        reader, writer = self.conn
+        body = b"" if payload is None else json.dumps(payload, separators=(",", ":")).encode()
+        headers = dict(headers or {}, Host=f"{self.host}:{self.port}")
+        if self.gzip:
+            headers["Accept-Encoding"] = "gzip"
+            if len(body) >= MIN_COMPRESS:
+                body = gzip.compress(body, 6)
+                headers["Content-Encoding"] = "gzip"
+        if payload is not None:
+            headers["Content-Type"] = "application/json"
+        headers["Content-Length"] = str(len(body))
+        out = (f"{method} {target} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+               + "\r\n").encode() + body
+        writer.write(out)
+        await writer.drain()
+        self.sent += len(out)
+
+        status_line = await reader.readline()
+        size = len(status_line)
+        reply_headers = {}
+        while True:
+            line = await reader.readline()
+            size += len(line)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            reply_headers[name.strip().lower()] = value.strip()
+        data = await reader.readexactly(int(reply_headers.get("content-length", 0)))
+        self.received += size + len(data)
+        if reply_headers.get("content-encoding") == "gzip":
+            data = gzip.decompress(data)
+        return int(status_line.split()[1]), reply_headers, json.loads(data) if data else None
+
+    async def start(self, doc=None):
+        """Create the save (first device) or fetch it"""
+        if doc is not None:
+            self.fields = flatten(doc)
+            if self.mode == "delta":
+                ops = [{"op": "add", "path": p, "value": v, "clock": {self.client_id: 1}}
+                       for p, v in self.fields.items()]
+                self.clocks = {p: {self.client_id: 1} for p in self.fields}
+                _, _, reply = await self.request("PATCH", f"/saves/{self.save_id}",
+                                                 {"client": self.client_id, "base": 0, "ops": ops})
+            else:
+                _, _, reply = await self.request("PUT", f"/saves/{self.save_id}",
+                                                 {"client": self.client_id, "doc": doc})
+            self.version, self.etag = reply["version"], reply["etag"]
+        else:
+            _, _, reply = await self.request("GET", f"/saves/{self.save_id}?clocks=1")
+            self._adopt(reply)
+
+    def _adopt(self, reply):
+        self.fields = flatten(reply["doc"])
+        self.clocks = {p: dict(c) for p, c in reply.get("clocks", {}).items()}
+        self.version, self.etag = reply["version"], reply["etag"]
+
+    def play(self, rng):
+        for path, value in mutate(self.fields, rng).items():
+            for stale in _overlapping(self.fields, path):
+                del self.fields[stale]
+            self.fields[path] = value
+            clock = self.clocks.setdefault(path, {})
+            clock[self.client_id] = clock.get(self.client_id, 0) + 1
+            self.pending.add(path)
+
+    async def sync(self, timed=True):
+        start = time.perf_counter()
+        if self.mode == "delta":
+            ops = [{"op": "replace", "path": p, "value": self.fields[p], "clock": self.clocks[p]}
+                   for p in sorted(self.pending)]
+            _, _, reply = await self.request("PATCH", f"/saves/{self.save_id}",
+                                             {"client": self.client_id, "base": self.version, "ops": ops})
+            if "doc" in reply:
+                self._adopt(reply)
+            for op in reply.get("ops", []):
+                if op["op"] == "remove":
+                    self.fields.pop(op["path"], None)
+                else:
+                    for stale in _overlapping(self.fields, op["path"]):
+                        del self.fields[stale]
+                    self.fields[op["path"]] = op["value"]
+                self.clocks[op["path"]] = op["clock"]
+            self.version, self.etag = reply["version"], reply["etag"]
+        else:
+            # What CloudSaveV4.sync() does today: download everything, upload everything
+            _, _, reply = await self.request("GET", f"/saves/{self.save_id}")
+            await self.request("PUT", f"/saves/{self.save_id}", {"client": self.client_id,
+                                                                 "doc": unflatten(self.fields)})
+        self.pending.clear()
+        if timed:
+            self.latencies.append(time.perf_counter() - start)
+
+    def close(self):
+        if self.conn:
+            self.conn[1].close()
+
+
+async def _simulate_mode(mode, saves, syncs, devices, seed):
+    server = CloudSaveServer()
+    base = await server.start()
+    rng = random.Random(seed)
+    fleets = []
+    for s in range(saves):
+        doc = make_save(rng)
+        fleet = [Device(base, f"save_{s}", f"device_{s}_{d}", mode) for d in range(devices)]
+        await fleet[0].start(doc)
+        for device in fleet[1:]:
+            await device.start()
+        fleets.append(fleet)
+    setup = {"sent": sum(d.sent for f in fleets for d in f), "received": sum(d.received for f in fleets for d in f)}
+
+    async def session(device, device_rng):
+        for _ in range(syncs):
+            await asyncio.sleep(device_rng.random() * 0.01)
+            device.play(device_rng)
+            await device.sync()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(d, random.Random(f"{seed}/{d.client_id}")) for f in fleets for d in f))
+    elapsed = time.perf_counter() - start
+    traffic = {"sent": sum(d.sent for f in fleets for d in f), "received": sum(d.received for f in fleets for d in f)}
+
+    converged = None
+    if mode == "delta":
+        # Two quiet rounds let every device see every other device's last changes
+        for _ in range(2):
+            for fleet in fleets:
+                for device in fleet:
+                    await device.sync(timed=False)
+        converged = all(d.fields == server.saves[d.save_id].fields for f in fleets for d in f)
+    all_devices = [d for f in fleets for d in f]
+    latencies = sorted(lat for d in all_devices for lat in d.latencies)
+    result = {
+        "mode": mode, "syncs": len(latencies), "seconds": elapsed,
+        "sent": traffic["sent"] - setup["sent"], "received": traffic["received"] - setup["received"],
+        "p50": latencies[len(latencies) // 2] * 1000, "p99": latencies[int(len(latencies) * 0.99)] * 1000,
+        "conflicts": server.stats["conflicts"], "converged": converged,
+    }
+    for device in all_devices:
+        device.close()
+    await server.stop()
+    return result
+
+
+def simulate(saves=100, syncs=20, devices=2, seed=7):
+    """Run every sync mode against a fresh in-process server and print the comparison"""
+    print(f"🧪 Cloud save sync: {saves} saves x {devices} devices x {syncs} syncs")
+    print("=" * 60)
+    results = []
+    for mode in ("full", "full+gzip", "delta"):
+        result = asyncio.run(_simulate_mode(mode, saves, syncs, devices, seed))
+        results.append(result)
+        per_sync = (result["sent"] + result["received"]) / result["syncs"]
+        print(f"   {mode:<10} {per_sync / 1024:8.2f} KiB/sync (up {result['sent'] / result['syncs'] / 1024:6.2f},"
+              f" down {result['received'] / result['syncs'] / 1024:6.2f})  p50 {result['p50']:6.2f} ms"
+              f"  p99 {result['p99']:6.2f} ms  {result['syncs'] / result['seconds']:6.0f} syncs/s")
+    delta, full = results[-1], results[0]
+    ratio = (full["sent"] + full["received"]) / max(1, delta["sent"] + delta["received"])
+    print("=" * 60)
+    print(f"📊 Delta sync moves {ratio:.1f}x fewer bytes than full-document sync;"
+          f" {delta['conflicts']} concurrent field edits merged")
+    print("✅ All devices converged" if delta["converged"] else "❌ Devices did not converge")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cloud save server for CloudSaveV4")
+    parser.add_argument("--serve", action="store_true", help="run the server until interrupted")
+    parser.add_argument("--port", type=int, default=8766, help="port for --serve")
+    parser.add_argument("--data", type=Path, default=DATA_DIR, help="where --serve keeps saves")
+    parser.add_argument("--simulate", action="store_true", help="compare full-document and delta sync")
+    parser.add_argument("--saves", type=int, default=100, help="save slots (--simulate)")
+    parser.add_argument("--devices", type=int, default=2, help="devices sharing each save (--simulate)")
+    parser.add_argument("--syncs", type=int, default=20, help="syncs per device (--simulate)")
+    args = parser.parse_args()
+
+    if args.simulate:
+        results = simulate(args.saves, args.syncs, args.devices)
+        sys.exit(0 if results[-1]["converged"] else 1)
+    elif args.serve:
+        async def run():
+            server = CloudSaveServer(args.data)
+            base = await server.start(args.port)
+            print(f"☁️  Cloud save server at {base}, {len(server.saves)} saves in {args.data} (Ctrl+C to stop)")
+            try:
+                await asyncio.Event().wait()
+            finally:
+                await server.stop()
+        try:
+            asyncio.run(run())
+        except KeyboardInterrupt:
+            pass
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,11 @@ Download free pinball game assets from various sources
 This script helps download sounds and sprites from free/open-source repositories
 """
 
-import os
-import sys
-import requests
 from pathlib import Path
-import subprocess
-import json
+
+import asset_sync
+import downloader
+from audio_writer import check_ffmpeg, encode_directory
 
 # Directories
 SOUNDS_DIR = Path(__file__).parent.parent / "assets" / "sounds"
@@ -67,49 +66,29 @@ RESOURCE_LINKS = {
     }
 }
 
-def download_file(url, destination, description=""):
-    """Download a file from a URL"""
-    if not url:
-        print(f"⚠️  No URL provided for {description or destination.name}")
-        return False
-    
-    try:
-        print(f"📥 Downloading {description or destination.name}...")
-        response = requests.get(url, stream=True, timeout=30)
-        response.raise_for_status()
-        
-        # Save file
-        with open(destination, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                f.write(chunk)
-        
-        print(f"✅ Downloaded {destination.name}")
-        return True
-    except requests.exceptions.RequestException as e:
-        print(f"❌ Failed to download {description or destination.name}: {e}")
-        return False
+def download_files(urls, directory, extension):
+    """Download {name: url} into directory in parallel; returns the number of new files
 
-def convert_wav_to_ogg(wav_path, ogg_path):
-    """Convert WAV file to OGG using ffmpeg"""
-    try:
-        subprocess.run(
-            ["ffmpeg", "-i", str(wav_path), "-c:a", "libvorbis", "-q:a", "5", str(ogg_path)],
-            check=True,
-            capture_output=True
-        )
-        print(f"✅ Converted {wav_path.name} to OGG")
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        print(f"⚠️  ffmpeg not found or conversion failed. Install ffmpeg to convert WAV to OGG.")
-        return False
+    Files already matching their checksum in the asset manifest are skipped.
+    """
+    jobs = []
+    for name, url in urls.items():
+        if url:
+            jobs.append(downloader.job_for(url, directory / f"{name}{extension}"))
+        else:
+            print(f"⏭️  Skipping {name} (no URL - manual download required)")
+    if jobs:
+        print(f"📥 Downloading {len(jobs)} files...")
+    results = downloader.download_all(jobs)
+    return sum(r.status in ("downloaded", "resumed") for r in results)
 
-def check_ffmpeg():
-    """Check if ffmpeg is available"""
-    try:
-        subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True)
-        return True
-    except (subprocess.CalledProcessError, FileNotFoundError):
-        return False
+def convert_sounds(directory):
+    """Convert WAV files without an up-to-date OGG using parallel ffmpeg workers"""
+    for wav_path, status, _ in encode_directory(directory):
+        if status == "encoded":
+            print(f"✅ Converted {wav_path.name} to OGG")
+        elif status == "failed":
+            print(f"⚠️  Conversion of {wav_path.name} to OGG failed.")
 
 def download_sounds():
     """Download sound effects"""
@@ -122,19 +101,11 @@ def download_sounds():
         print("⚠️  ffmpeg not found. WAV files won't be converted to OGG.")
         print("   Install ffmpeg for automatic conversion: brew install ffmpeg (macOS)")
     
-    downloaded = 0
-    for sound_name, url in ASSET_URLS["sounds"].items():
-        if url:
-            wav_path = SOUNDS_DIR / f"{sound_name}.wav"
-            ogg_path = SOUNDS_DIR / f"{sound_name}.ogg"
-            
-            if download_file(url, wav_path, sound_name):
-                downloaded += 1
-                # Convert to OGG if ffmpeg is available
-                if has_ffmpeg and wav_path.exists():
-                    convert_wav_to_ogg(wav_path, ogg_path)
-        else:
-            print(f"⏭️  Skipping {sound_name} (no URL - manual download required)")
+    downloaded = download_files(ASSET_URLS["sounds"], SOUNDS_DIR, ".wav")
+    
+    # Convert every new or changed WAV to OGG in one parallel batch
+    if has_ffmpeg and downloaded:
+        convert_sounds(SOUNDS_DIR)
     
     if downloaded == 0:
         print("\n⚠️  No sounds downloaded automatically.")
@@ -149,14 +120,7 @@ def download_sprites():
     print("SPRITE ASSETS DOWNLOAD")
     print("="*60)
     
-    downloaded = 0
-    for sprite_name, url in ASSET_URLS["sprites"].items():
-        if url:
-            sprite_path = SPRITES_DIR / f"{sprite_name}.png"
-            if download_file(url, sprite_path, sprite_name):
-                downloaded += 1
-        else:
-            print(f"⏭️  Skipping {sprite_name} (no URL - manual download required)")
+    downloaded = download_files(ASSET_URLS["sprites"], SPRITES_DIR, ".png")
     
     if downloaded == 0:
         print("\n⚠️  No sprites downloaded automatically.")
@@ -166,35 +130,8 @@ def download_sprites():
     return downloaded
 
 def create_asset_manifest():
-    """Create a manifest file to track downloaded assets"""
-    manifest = {
-        "sounds": {},
-        "sprites": {},
-        "last_updated": None
-    }
-    
-    # Check which sound files exist
-    for sound_name in ASSET_URLS["sounds"].keys():
-        wav_path = SOUNDS_DIR / f"{sound_name}.wav"
-        ogg_path = SOUNDS_DIR / f"{sound_name}.ogg"
-        manifest["sounds"][sound_name] = {
-            "wav_exists": wav_path.exists(),
-            "ogg_exists": ogg_path.exists(),
-            "preferred": "ogg" if ogg_path.exists() else "wav" if wav_path.exists() else None
-        }
-    
-    # Check which sprite files exist
-    for sprite_name in ASSET_URLS["sprites"].keys():
-        sprite_path = SPRITES_DIR / f"{sprite_name}.png"
-        manifest["sprites"][sprite_name] = {
-            "exists": sprite_path.exists()
-        }
-    
-    manifest_path = Path(__file__).parent.parent / "assets" / "asset_manifest.json"
-    with open(manifest_path, 'w') as f:
-        json.dump(manifest, f, indent=2)
-    
-    print(f"\n📋 Asset manifest saved to {manifest_path}")
+    """Record size, mtime and SHA-256 of every asset in assets/asset_manifest.json"""
+    asset_sync.update_manifest()
 
 def print_manual_download_instructions():
     """Print instructions for manual downloads"""
@@ -238,17 +175,6 @@ def main():
     print("🎮 Pinball Game Asset Downloader")
     print("="*60)
     
-    # Check if requests is available
-    try:
-        import requests
-    except ImportError:
-        print("⚠️  Warning: 'requests' library not found.")
-        print("   Install with: pip install requests")
-        print("   Or use: pip3 install requests")
-        print("\n   For now, the script will show manual download instructions.")
-        print_manual_download_instructions()
-        sys.exit(0)
-    
     # Download assets
     sounds_downloaded = download_sounds()
     sprites_downloaded = download_sprites()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Concurrent, resumable asset downloader
+Downloads run on a bounded thread pool sharing one keep-alive connection pool
+per host (http.client, so the requests library is not needed). Each file is
+streamed into <name>.part and resumed with an HTTP Range request after a
+dropped connection; transient failures (connection errors, 5xx, 429) are
+retried with exponential backoff and jitter. Finished files are checked
+against the SHA-256 and size pinned for their URL in config/asset_pins.json
+before being renamed into place, and a destination that already matches its
+pin is not downloaded again. URLs without a pin are downloaded unverified
+every time; the local file is never its own reference.
+--serve starts a stand-in HTTP server (with Range support and optional fault
+injection) and --selftest uses it to download the ASSET_URLS entries of
+download_assets.py offline.
+Usage: python3 tools/downloader.py --selftest | --serve DIR [--port N] [--flaky]
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import unquote, urljoin, urlsplit
+
+from asset_sync import ASSETS_DIR, file_sha256
+
+BASE_DIR = Path(__file__).parent.parent
+PINS_PATH = BASE_DIR / "config" / "asset_pins.json"
+
+WORKERS = 4
+RETRIES = 4
+BACKOFF = 0.5          # First retry delay in seconds; doubles per attempt
+BACKOFF_MAX = 30.0
+TIMEOUT = 30
+CHUNK_SIZE = 1 << 16
+MAX_REDIRECTS = 5
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+
+Job = namedtuple("Job", "url dest sha256 size", defaults=(None, None))
+Result = namedtuple("Result", "job status bytes seconds error")
+
+
+class DownloadError(Exception):
+    """A failed attempt; transient ones are retried"""
+
+    def __init__(self, message, transient=True):
+        super().__init__(message)
+        self.transient = transient
+
+
+class ConnectionPool:
+    """Keep-alive HTTP(S) connections shared by all download threads, per host"""
+
+    def __init__(self, max_per_host=WORKERS, timeout=TIMEOUT):
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, scheme, netloc):
+        with self.lock:
+            idle = self.idle.get((scheme, netloc))
+            if idle:
+                return idle.pop()
+        cls = HTTPSConnection if scheme == "https" else HTTPConnection
+        return cls(netloc, timeout=self.timeout)
+
+    def release(self, scheme, netloc, conn, response):
+        """Return a connection whose response was fully read, unless the server closes it"""
+        if response.will_close:
+            conn.close()
+            return
+        with self.lock:
+            idle = self.idle.setdefault((scheme, netloc), [])
+            if len(idle) < self.max_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self.lock:
+            for idle in self.idle.values():
+                for conn in idle:
+                    conn.close()
+            self.idle.clear()
+
+
+def load_pins(path=PINS_PATH):
+    """{url: {sha256, size}} pinned for upstream files; empty when there is no pin file"""
+    try:
+        with open(path) as f:
+            return json.load(f).get("urls", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def job_for(url, dest, pins=None):
+    """Job whose expected checksum and size are pinned for the URL (unverified without a pin)"""
+    entry = (load_pins() if pins is None else pins).get(url, {})
+    return Job(url, Path(dest), entry.get("sha256"), entry.get("size"))
+
+
+def _get(pool, url, headers):
+    """GET following redirects; returns (response, release callback)"""
+    for _ in range(MAX_REDIRECTS + 1):
+        parts = urlsplit(url)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        conn = pool.acquire(parts.scheme, parts.netloc)
+        try:
+            conn.request("GET", target, headers=headers)
+            response = conn.getresponse()
+        except (OSError, HTTPException):
+            conn.close()
+            raise
+
+        def release(ok=True, conn=conn, parts=parts, response=response):
+            # A connection left mid-response cannot be reused
+            if ok:
+                pool.release(parts.scheme, parts.netloc, conn, response)
+            else:
+                conn.close()
+
+        if response.status in (301, 302, 303, 307, 308) and response.getheader("Location"):
+            response.read()
+            release()
+            url = urljoin(url, response.getheader("Location"))
+            continue
+        return response, release
+    raise DownloadError(f"too many redirects for {url}", transient=False)
+
+
+def _fetch(pool, job, part):
+    """Fetch the rest of job into part; returns (bytes received, resumed)"""
+    offset = part.stat().st_size if part.exists() else 0
+    if job.size is not None and offset == job.size:
+        return 0, True
+    headers = {"User-Agent": USER_AGENT, "Accept-Encoding": "identity"}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+    response, release = _get(pool, job.url, headers)
+    status = response.status
+    if status == 416 and offset:
+        # Nothing left to send: the part file is already complete
+        response.read()
+        release()
+        return 0, True
+    if status == 206 and response.getheader("Content-Range", "").startswith(f"bytes {offset}-"):
+        mode, resumed = "ab", True
+    elif status in (200, 206):
+        # The server ignored (or mangled) the range: start over
+        if status == 206:
+            release(ok=False)
+            part.unlink()
+            raise DownloadError("unexpected Content-Range")
+        mode, resumed = "wb", False
+    else:
+        response.read()
+        release()
+        raise DownloadError(f"HTTP {status} {response.reason}", transient=status >= 500 or status == 429)
+
+    received = 0
+    try:
+        with open(part, mode) as f:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                f.write(chunk)
+                received += len(chunk)
+    except BaseException:
+        release(ok=False)
+        raise
+    expected = response.getheader("Content-Length")
+    if expected is not None and received < int(expected):
+        # read() returns short instead of raising when the peer hangs up; keep the part to resume
+        release(ok=False)
+        raise DownloadError(f"connection dropped after {received} of {expected} bytes")
+    release()
+    return received, resumed
+
+
+def _verify(job, path):
+    if job.size is not None and path.stat().st_size != job.size:
+        raise DownloadError(f"size {path.stat().st_size} != {job.size}")
+    if job.sha256 and file_sha256(path) != job.sha256:
+        raise DownloadError("SHA-256 mismatch")
+
+
+def download(job, pool, retries=RETRIES, backoff=BACKOFF):
+    """Download one job; returns (status, bytes received) or raises DownloadError
+
+    status is "cached" (destination already verified), "downloaded" or "resumed".
+    """
+    dest = Path(job.dest)
+    if job.sha256 and dest.exists():
+        try:
+            _verify(job, dest)
+            return "cached", 0
+        except DownloadError:
+            pass
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    part = dest.with_name(dest.name + ".part")
+    total = 0
+    resumed_any = False
+    for attempt in range(retries + 1):
+        try:
+            received, resumed = _fetch(pool, job, part)
+            total += received
+            resumed_any = resumed_any or resumed
+            try:
+                _verify(job, part)
+            except DownloadError as e:
+                # Corrupt data cannot be resumed from. A resumed file may splice two
+                # upstream versions, so it gets a clean attempt; a clean mismatch is final
+                part.unlink()
+                raise DownloadError(str(e), transient=resumed) from None
+            os.replace(part, dest)
+            return ("resumed" if resumed_any else "downloaded"), total
+        except (OSError, HTTPException, DownloadError) as e:
+            if isinstance(e, DownloadError) and not e.transient or attempt == retries:
+                raise DownloadError(str(e) or type(e).__name__, transient=False) from e
+            time.sleep(min(BACKOFF_MAX, backoff * 2 ** attempt) * random.uniform(0.5, 1.0))
+
+
+def download_all(jobs, workers=WORKERS, retries=RETRIES, backoff=BACKOFF, verbose=True):
+    """Download jobs on a bounded thread pool; returns Results in job order"""
+    pool = ConnectionPool(max_per_host=workers)
+
+    def run(job):
+        start = time.perf_counter()
+        try:
+            status, received = download(job, pool, retries, backoff)
+            return Result(job, status, received, time.perf_counter() - start, None)
+        except DownloadError as e:
+            return Result(job, "failed", 0, time.perf_counter() - start, str(e))
+
+    results = {}
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(jobs)))) as executor:
+            futures = {executor.submit(run, job): i for i, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if verbose:
+                    name = Path(result.job.dest).name
+                    if result.status == "failed":
+                        print(f"❌ Failed to download {name}: {result.error}")
+                    elif result.status == "cached":
+                        print(f"⏭️  {name} already up to date")
+                    else:
+                        print(f"✅ {result.status.capitalize()} {name} ({result.bytes / 1024:.1f} KiB, {result.seconds:.2f}s)")
+    finally:
+        pool.close()
+    return [results[i] for i in range(len(jobs))]
+
+
+# ---------------------------------------------------------------------------
+# Stand-in server for offline testing
+# ---------------------------------------------------------------------------
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Serves files under server.root with single-range support
+
+    With server.flaky set, the first GET of every path is cut off halfway
+    and every fourth request answers 503, exercising resume and retry.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests += 1
+            count = server.requests
+            first = self.path not in server.seen
+            server.seen.add(self.path)
+        if server.flaky and count % 4 == 0:
+            return self._send_empty(503)
+        path = (server.root / unquote(urlsplit(self.path).path).lstrip("/")).resolve()
+        if server.root not in path.parents or not path.is_file():
+            return self._send_empty(404)
+        data = path.read_bytes()
+        start = 0
+        header = self.headers.get("Range", "")
+        if header.startswith("bytes=") and header.endswith("-"):
+            start = int(header[6:-1])
+            if start >= len(data):
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{len(data)}")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+        else:
+            self.send_response(200)
+        body = data[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+        if server.flaky and first and len(body) > 1:
+            self.wfile.write(body[:len(body) // 2])
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+    def _send_empty(self, status):
+        self.send_response(status)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+
+def serve(root, port=0, flaky=False):
+    """Start the stand-in server on a background thread; returns (server, base URL)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandInHandler)
+    server.daemon_threads = True
+    server.root = Path(root).resolve()
+    server.flaky = flaky
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.seen = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def selftest(workers=WORKERS):
+    """Download the ASSET_URLS entries from a flaky stand-in server and verify them"""
+    import shutil
+    from download_assets import ASSET_URLS
+
+    print("🧪 Downloader self-test (flaky stand-in server)")
+    print("=" * 60)
+    extensions = {"sounds": ".wav", "sprites": ".png"}
+    with tempfile.TemporaryDirectory() as tmp:
+        # Upstream copies and their pins live in the temp dir; nothing under assets/ is written
+        upstream, pins = Path(tmp) / "upstream", {}
+        server, base = serve(upstream, flaky=True)
+        jobs = []
+        for category, names in ASSET_URLS.items():
+            for name in names:
+                rel = f"{category}/{name}{extensions[category]}"
+                source = ASSETS_DIR / rel
+                if not source.is_file():
+                    print(f"⏭️  {rel} not in assets/, not served")
+                    continue
+                (upstream / rel).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copyfile(source, upstream / rel)
+                pins[f"{base}/{rel}"] = {"sha256": file_sha256(source), "size": source.stat().st_size}
+                jobs.append(job_for(f"{base}/{rel}", Path(tmp) / "out" / rel, pins))
+        # A wrong checksum must fail on the checksum, at once, from a server without injected faults
+        steady, steady_base = serve(upstream)
+        bad = jobs[0]._replace(url=jobs[0].url.replace(base, steady_base), dest=Path(tmp) / "corrupt.bin",
+                               sha256="0" * 64)
+        # Without a pin an existing file is fetched again, never trusted
+        unpinned = job_for(jobs[0].url, jobs[0].dest, {})
+        start = time.perf_counter()
+        results = download_all(jobs, workers=workers, backoff=0.01)
+        rejected = download_all([bad], workers=1, backoff=0.01)[0]
+        # Running again must find every file already verified
+        again = download_all(jobs, workers=workers, backoff=0.01, verbose=False)
+        refetched = download_all([unpinned], workers=1, backoff=0.01, verbose=False)
+        elapsed = time.perf_counter() - start
+        server.shutdown()
+        steady.shutdown()
+
+    ok = (all(r.status in ("downloaded", "resumed") for r in results)
+          and rejected.status == "failed" and rejected.error == "SHA-256 mismatch" and steady.requests == 1
+          and all(r.status == "cached" for r in again)
+          and refetched[0].status in ("downloaded", "resumed"))
+    resumed = sum(r.status == "resumed" for r in results)
+    print("=" * 60)
+    print(f"📊 {len(jobs)} files, {resumed} resumed, {server.requests} requests, {elapsed:.2f}s")
+    print("✅ Self-test passed" if ok else "❌ Self-test failed")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent, resumable asset downloader")
+    parser.add_argument("--selftest", action="store_true", help="download ASSET_URLS from a local flaky server")
+    parser.add_argument("--serve", metavar="DIR", help="run the stand-in server for DIR until interrupted")
+    parser.add_argument("--port", type=int, default=8000, help="port for --serve")
+    parser.add_argument("--flaky", action="store_true", help="inject dropped connections and 503s (--serve)")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="concurrent downloads")
+    args = parser.parse_args()
+
+    if args.serve:
+        server, base = serve(args.serve, args.port, args.flaky)
+        print(f"🌐 Serving {args.serve} at {base} (Ctrl+C to stop)")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+    elif args.selftest:
+        sys.exit(0 if selftest(args.workers) else 1)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Monte Carlo economy simulator for CurrencyManager earn rates and shop prices
+Simulates a player base (1,000,000 players by default) day by day as NumPy
+arrays: each player belongs to a cohort from config/economy_sim.json, plays a
+Poisson number of games whose scores come from a lognormal fit or from real
+scores (--scores: a leaderboard export, a list of entries or one score per
+line), earns coins per game, from daily challenges and rewarded ads, and may
+quit for good. Players buy items from config/items_database.json cheapest
+first per currency (the order items_db.py indexes), so ownership is a prefix
+of that order and one searchsorted over cumulative prices settles every
+purchase. The report gives time-to-unlock curves per item (share of the
+starting players owning it by each day, overall and per cohort) and currency
+inflation: coins minted and spent per day, the balance active players hold
+and the share with nothing left to buy. Prices and earn rates can be
+overridden from the command line to iterate without editing JSON.
+Usage: python3 tools/economy_sim.py [--players N] [--days D] [--scores FILE] [--price ITEM=AMOUNT ...] [--set KEY=VALUE ...] [--csv OUT]
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+from statistics import NormalDist
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from items_db import CURRENCIES, compile_table, load_items, validate
+
+BASE_DIR = Path(__file__).parent.parent
+CONFIG_PATH = BASE_DIR / "config" / "economy_sim.json"
+CHUNK = 250_000     # Players per block of per-game draws, bounds memory at 10^6+ players
+CURVE_DAYS = (1, 3, 7, 14, 30)
+
+# Allowed ranges of the config numbers: (low, high, low is exclusive, integer)
+INF = float("inf")
+CONFIG_LIMITS = {
+    "players": (1, INF, False, True),
+    "days": (1, INF, False, True),
+    "earn.points_per_coin": (0, INF, True, False),
+    "earn.score_mu": (-INF, INF, False, False),
+    "earn.score_sigma": (0, INF, False, False),
+    "earn.skill_correlation": (-1, 1, False, False),
+    "earn.challenges_per_day": (0, INF, False, True),
+    "earn.ad_coins": (0, INF, False, False),
+    "earn.ad_daily_limit": (0, INF, False, True),
+    "earn.gems_per_day": (0, INF, False, False),
+}
+COHORT_LIMITS = {
+    "share": (0, INF, False, False),
+    "games_per_day": (0, INF, False, False),
+    "skill": (-INF, INF, False, False),
+    "challenge_rate": (0, 1, False, False),
+    "ads_per_day": (0, INF, False, False),
+    "daily_churn": (0, 1, False, False),
+}
+
+
+# ---------------------------------------------------------------------------
+# Inputs
+# ---------------------------------------------------------------------------
+
+def load_config(path=CONFIG_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def apply_overrides(config, settings):
+    """--set earn.points_per_coin=50 / cohorts.casual.daily_churn=0.1 on a copy of the config"""
+    config = json.loads(json.dumps(config))
+    for setting in settings:
+        key, sep, value = setting.partition("=")
+        if not sep:
+            raise ValueError(f"expected KEY=VALUE, got {setting!r}")
+        *parents, leaf = key.split(".")
+        node = config
+        for part in parents:
+            if not isinstance(node.get(part), dict):
+                raise ValueError(f"unknown setting {key!r}")
+            node = node[part]
+        if leaf not in node:
+            raise ValueError(f"unknown setting {key!r}")
+        node[leaf] = json.loads(value)
+    check_config(config)
+    return config
+
+
+def _check_number(key, value, limit):
+    low, high, exclusive, integer = limit
+    kind = "an integer" if integer else "a number"
+    if isinstance(value, bool) or not isinstance(value, int if integer else (int, float)):
+        raise ValueError(f"{key} must be {kind}, got {value!r}")
+    if value < low or value > high or (exclusive and value == low):
+        bounds = f"{'>' if exclusive else '>='} {low}" + (f" and <= {high}" if high < INF else "")
+        raise ValueError(f"{key} must be {bounds}, got {value!r}")
+
+
+def check_config(config):
+    """Range-check every number simulate() reads; raises ValueError naming the bad setting"""
+    for key, limit in CONFIG_LIMITS.items():
+        node = config
+        for part in key.split("."):
+            node = node[part]
+        _check_number(key, node, limit)
+    rewards = config["earn"]["challenge_rewards"]
+    if not isinstance(rewards, list) or not rewards:
+        raise ValueError(f"earn.challenge_rewards must be a non-empty list, got {rewards!r}")
+    for reward in rewards:
+        _check_number("earn.challenge_rewards", reward, (0, INF, False, False))
+    for name, cohort in config["cohorts"].items():
+        for field, limit in COHORT_LIMITS.items():
+            _check_number(f"cohorts.{name}.{field}", cohort[field], limit)
+    if not sum(cohort["share"] for cohort in config["cohorts"].values()) > 0:
+        raise ValueError("cohorts: at least one share must be > 0")
+
+
+def load_scores(path):
+    """(scores, note) from a leaderboard export, a JSON list of entries or numbers, or one score per line"""
+    text = Path(path).read_text()
+    note = None
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        data = [float(line) for line in text.split() if line.strip()]
+    if isinstance(data, dict):
+        entries = list(data.get("entries", []))
+        for board in data.get("character_leaderboards", {}).values():
+            entries.extend(board)
+        # The same entry shows up in both lists; keep one copy per id
+        entries = list({e.get("id") or id(e): e for e in entries}.values())
+        note = "leaderboard export: only the best games are listed, so earnings are optimistic"
+        data = entries
+    scores = [float(e["score"] if isinstance(e, dict) else e) for e in data]
+    scores = [s for s in scores if s >= 0]
+    if len(scores) < 2:
+        raise ValueError(f"{path}: need at least two scores")
+    return scores, note
+
+
+class ScoreModel:
+    """Maps a latent standard-normal skill value to a game score
+
+    Without samples the score is lognormal(mu, sigma); with samples it is the
+    empirical quantile of the latent value, interpolated between the sorted
+    scores and clamped at the smallest and largest.
+    """
+
+    def __init__(self, mu, sigma, samples=None):
+        self.mu, self.sigma = mu, sigma
+        self.sorted = None
+        if samples is not None:
+            self.sorted = np.sort(np.asarray(samples, dtype=np.float64))
+            n = len(self.sorted)
+            normal = NormalDist()
+            self.latent = np.array([normal.inv_cdf((i + 0.5) / n) for i in range(n)])
+
+    def __call__(self, x):
+        if self.sorted is None:
+            return np.exp(self.mu + self.sigma * x)
+        return np.interp(x, self.latent, self.sorted)
+
+
+class PriceQueue:
+    """Items of one currency in purchase order, with cumulative prices
+
+    A player who has earned E in total owns the first k items where
+    cumulative[k] <= E, and holds E - cumulative[k].
+    """
+
+    def __init__(self, table, currency, prices):
+        # BY_PRICE is stable in database order; re-sort in case prices were overridden
+        self.rows = sorted(table["BY_PRICE"][currency], key=lambda r: prices[r])
+        self.ids = [table["STRINGS"][table["ID"][r]] for r in self.rows]
+        self.prices = np.array([prices[r] for r in self.rows], dtype=np.float64)
+        self.cumulative = np.concatenate(([0.0], np.cumsum(self.prices)))
+
+    def owned(self, earned):
+        return np.searchsorted(self.cumulative, earned, side="right") - 1
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+def simulate(config, items, players=None, days=None, scores=None, prices=None, seed=1):
+    """Run the economy; returns the per-day ownership counts and money supply"""
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("economy_sim needs NumPy (pip install numpy)")
+    rng = np.random.default_rng(seed)
+    earn = config["earn"]
+    players = players or config["players"]
+    days = days or config["days"]
+    names = list(config["cohorts"])
+    cohorts = [config["cohorts"][name] for name in names]
+
+    def column(key, dtype=np.float64):
+        return np.array([c[key] for c in cohorts], dtype=dtype)
+
+    share = column("share")
+    games_rate, skill, challenge_rate = column("games_per_day"), column("skill"), column("challenge_rate")
+    ads_rate, churn = column("ads_per_day"), column("daily_churn")
+
+    table = compile_table(items)
+    price_of = list(table["PRICE"])
+    for item_id, amount in (prices or {}).items():
+        price_of[table["ID_INDEX"][item_id]] = amount
+    queues = {c: PriceQueue(table, c, price_of) for c in CURRENCIES if table["BY_PRICE"][c]}
+
+    # Players are laid out cohort by cohort, so every draw below takes scalar
+    # parameters, and within a cohort by the day they quit (latest first), so
+    # the players still active on any day are a prefix of their cohort's range
+    sizes = rng.multinomial(players, share / share.sum())
+    firsts = np.cumsum(sizes) - sizes
+    cohort = np.repeat(np.arange(len(names), dtype=np.int8), sizes)
+    last_day = np.concatenate([-np.sort(-rng.geometric(max(churn[k], 1e-12), size)) for k, size in enumerate(sizes)])
+    rho = earn["skill_correlation"]
+    noise = (1.0 - rho * rho) ** 0.5
+    # A game's latent score is base + noise * N(0, 1): persistent skill plus the cohort's shift
+    base = (rho * rng.standard_normal(players) + skill[cohort]).astype(np.float32)
+    model = ScoreModel(earn["score_mu"], earn["score_sigma"], scores)
+    coin_scale = np.float32(1.0 / earn["points_per_coin"])
+    rewards = np.asarray(earn["challenge_rewards"], dtype=np.float64)
+    per_day = earn["challenges_per_day"]
+
+    earned = {c: np.zeros(players) for c in queues}
+    owned = {c: q.owned(earned[c]) for c, q in queues.items()}
+    # counts[currency][day, cohort, k]: players of a cohort owning exactly the first k items
+    counts = {c: np.zeros((days + 1, len(names), len(q.ids) + 1), dtype=np.int64) for c, q in queues.items()}
+    for c, q in queues.items():
+        counts[c][0] = _tally(cohort, owned[c], len(names), len(q.ids))
+    supply = {key: np.zeros(days + 1) for key in
+              ("active", "minted", "spent", "held", "saturated", "games", "gems_minted")}
+
+    for day in range(1, days + 1):
+        for c in queues:
+            counts[c][day] = counts[c][day - 1]
+        for k, first in enumerate(firsts):
+            live = int(np.count_nonzero(last_day[first:first + sizes[k]] >= day))
+            supply["active"][day] += live
+            for at in range(first, first + live, CHUNK):
+                block = slice(at, min(at + CHUNK, first + live))
+                n = block.stop - block.start
+                games = rng.poisson(games_rate[k], n)
+                total = int(games.sum())
+                latent = np.repeat(base[block], games)
+                latent += noise * rng.standard_normal(total, dtype=np.float32)
+                per_game = np.floor(model(latent) * coin_scale)
+                # Per-player sums over consecutive runs; reduceat needs an in-range start for 0-game players
+                starts = np.cumsum(games) - games
+                played = games > 0
+                coins = np.add.reduceat(np.append(per_game, per_game.dtype.type(0)), starts) * played
+                supply["games"][day] += total
+
+                # Challenges only complete on days the player plays; ads cap at the daily limit
+                done = rng.binomial(per_day, challenge_rate[k], n) * played
+                picks = rewards[rng.integers(0, len(rewards), int(done.sum()))]
+                coins += np.bincount(np.repeat(np.arange(n), done), weights=picks, minlength=n)
+                coins += np.minimum(rng.poisson(ads_rate[k], n), earn["ad_daily_limit"]) * earn["ad_coins"]
+                minted = {"coins": coins}
+                if "gems" in queues:
+                    minted["gems"] = rng.poisson(earn["gems_per_day"], n) if earn["gems_per_day"] > 0 else 0
+
+                for c, q in queues.items():
+                    before = owned[c][block].copy()
+                    earned[c][block] += minted[c]
+                    after = q.owned(earned[c][block])
+                    owned[c][block] = after
+                    width = len(q.ids) + 1
+                    counts[c][day, k] += np.bincount(after, minlength=width) - np.bincount(before, minlength=width)
+                    if c == "coins":
+                        supply["minted"][day] += float(coins.sum())
+                        supply["spent"][day] += float((q.cumulative[after] - q.cumulative[before]).sum())
+                        supply["held"][day] += float((earned[c][block] - q.cumulative[after]).sum())
+                        supply["saturated"][day] += int(np.count_nonzero(after == len(q.ids)))
+                    else:
+                        supply["gems_minted"][day] += float(np.sum(minted[c]))
+    supply["active"][0] = players
+    return {"names": names, "queues": queues, "counts": counts, "supply": supply,
+            "players": players, "days": days, "cohort_sizes": sizes}
+
+
+def _tally(cohort, owned, cohorts, items):
+    """Players per (cohort, number of items owned)"""
+    flat = np.bincount(cohort.astype(np.int64) * (items + 1) + owned, minlength=cohorts * (items + 1))
+    return flat.reshape(cohorts, items + 1)
+
+
+# ---------------------------------------------------------------------------
+# Report
+# ---------------------------------------------------------------------------
+
+def unlock_curves(result):
+    """{item_id: (currency, price, share[day], share_by_cohort[day, cohort])} of players owning the item"""
+    curves = {}
+    sizes = np.maximum(result["cohort_sizes"], 1)
+    for currency, q in result["queues"].items():
+        counts = result["counts"][currency]
+        # Owning item j means owning more than j items: suffix sums over k
+        at_least = np.cumsum(counts[:, :, ::-1], axis=2)[:, :, ::-1]
+        for j, item_id in enumerate(q.ids):
+            by_cohort = at_least[:, :, j + 1] / sizes
+            overall = at_least[:, :, j + 1].sum(axis=1) / result["players"]
+            curves[item_id] = (currency, int(q.prices[j]), overall, by_cohort)
+    return curves
+
+
+def first_day(share, level):
+    """First day the share reaches level, or None"""
+    hits = np.nonzero(share >= level)[0]
+    return int(hits[0]) if hits.size else None
+
+
+def _day(value):
+    return "-" if value is None else str(value)
+
+
+def write_csv(path, result, curves):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["day", "active", "games", "coins_minted", "coins_spent", "coins_held", "saturated",
+                         "gems_minted"] + [f"owned:{item_id}" for item_id in curves])
+        supply = result["supply"]
+        for day in range(result["days"] + 1):
+            writer.writerow([day] + [int(supply[k][day]) for k in
+                                     ("active", "games", "minted", "spent", "held", "saturated", "gems_minted")]
+                            + [f"{curve[2][day]:.6f}" for curve in curves.values()])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monte Carlo economy simulation of coin income and shop prices")
+    parser.add_argument("--players", type=int, help="simulated players (default from config)")
+    parser.add_argument("--days", type=int, help="simulated days (default from config)")
+    parser.add_argument("--scores", metavar="FILE", help="game scores to sample instead of the lognormal fit")
+    parser.add_argument("--price", action="append", default=[], metavar="ITEM=AMOUNT", help="override an item price")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a config value, e.g. earn.points_per_coin=200 or cohorts.casual.games_per_day=2")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--csv", metavar="OUT", help="write per-day supply and ownership to a CSV")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("❌ economy_sim.py needs NumPy: pip install numpy")
+        sys.exit(1)
+
+    data = load_items()
+    errors, _ = validate(data)
+    if errors:
+        print(f"❌ config/items_database.json is invalid ({errors[0]}): run python3 tools/items_db.py")
+        sys.exit(1)
+    items = data["items"]
+    try:
+        config = apply_overrides(load_config(), args.set)
+        prices = {}
+        for text in args.price:
+            item_id, _, amount = text.partition("=")
+            if item_id not in items:
+                raise ValueError(f"unknown item {item_id!r}")
+            prices[item_id] = int(amount)
+            if prices[item_id] < 0:
+                raise ValueError(f"price of {item_id!r} must be >= 0, got {prices[item_id]}")
+        scores, note = load_scores(args.scores) if args.scores else (None, None)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print("💰 Economy Simulation")
+    print("=" * 60)
+    started = time.perf_counter()
+    result = simulate(config, items, args.players, args.days, scores, prices, args.seed)
+    elapsed = time.perf_counter() - started
+    days, supply = result["days"], result["supply"]
+    print(f"{result['players']:,} players x {days} days, {int(supply['games'].sum()):,} games "
+          f"in {elapsed:.1f}s ({'scores from ' + args.scores if scores else 'lognormal scores'})")
+    if note:
+        print(f"⚠️  {note}")
+    sizes = ", ".join(f"{n} {s / result['players']:.0%}" for n, s in zip(result["names"], result["cohort_sizes"]))
+    print(f"Cohorts: {sizes}")
+
+    curves = unlock_curves(result)
+    marks = [d for d in CURVE_DAYS if d <= days]
+    print()
+    print("📊 Time to unlock (share of starting players owning the item by day N)")
+    header = f"  {'item':18} {'price':>10} " + " ".join(f"{'d' + str(d):>5}" for d in marks)
+    header += "   days to 50% " + " ".join(f"{n[:8]:>8}" for n in result["names"])
+    print(header)
+    for item_id, (currency, price, overall, by_cohort) in curves.items():
+        row = f"  {item_id:18} {price:>6} {currency:3} " + " ".join(f"{overall[d]:5.0%}" for d in marks)
+        row += f"   {_day(first_day(overall, 0.5)):>11} "
+        row += " ".join(f"{_day(first_day(by_cohort[:, k], 0.5)):>8}" for k in range(len(result["names"])))
+        print(row)
+
+    print()
+    print("📊 Coin supply (per active player per day)")
+    print(f"  {'day':>4} {'active':>9} {'minted':>8} {'spent':>8} {'held':>9} {'nothing left':>13}")
+    for day in sorted({1, *range(7, days + 1, 7), days}):
+        active = max(supply["active"][day], 1)
+        print(f"  {day:>4} {int(supply['active'][day]):>9,} {supply['minted'][day] / active:8.0f} "
+              f"{supply['spent'][day] / active:8.0f} {supply['held'][day] / active:9.0f} "
+              f"{supply['saturated'][day] / active:13.0%}")
+    last = days
+    week = max(1, last - 7)
+    held_now = supply["held"][last] / max(supply["active"][last], 1)
+    held_before = supply["held"][week] / max(supply["active"][week], 1)
+    sink = supply["spent"][1:].sum() / max(supply["minted"][1:].sum(), 1.0)
+    growth = (held_now / held_before - 1.0) if held_before > 0 else 0.0
+    print(f"Coins spent / minted over the run: {sink:.1%}; held balance growth over the last "
+          f"{last - week} days: {growth:+.0%}")
+    if sink < 0.5:
+        print("⚠️  Most minted coins are never spent: the shop runs out of coin sinks (inflation)")
+    if "gems" in result["queues"] and supply["gems_minted"].sum() == 0:
+        print("⚠️  No gem income (earn.gems_per_day = 0): gem-priced items never unlock")
+
+    if args.csv:
+        write_csv(args.csv, result, curves)
+        print(f"✅ Wrote {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
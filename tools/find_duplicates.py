@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Find duplicate and near-duplicate assets (textures and sounds)
+Every PNG gets a content hash (SHA-256 of the file), a pixel hash (SHA-256 of
+the decoded RGBA) and two 64-bit perceptual hashes of its downscaled,
+alpha-premultiplied luminance: dHash (gradient signs) and pHash (DCT signs).
+Similar images must also match pixel by pixel on a 16x16 RGBA thumbnail,
+compared only where either image is opaque.
+WAV (and OGG, when ffmpeg is available) files get a 64-bit fingerprint of
+their loudness envelope and zero-crossing rate. Other files (JPEG, ...) get the
+content hash only.
+Near duplicates are found through a multi-index Hamming index (the 64 bits
+are split into threshold + 1 bands; any match within the threshold shares a
+band exactly), so lookups stay sub-quadratic. Hashes are cached in
+.tools_cache/find_duplicates.json keyed on size + mtime, so only new or
+changed files are decoded.
+Usage: python3 tools/find_duplicates.py [--root DIR ...] [--threshold N] [--jobs N] [--json PATH|-]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from audio_writer import check_ffmpeg, ffmpeg_decode, read_wav
+from png_reader import read_png
+
+BASE_DIR = Path(__file__).parent.parent
+CACHE_PATH = BASE_DIR / ".tools_cache" / "find_duplicates.json"
+DEFAULT_ROOTS = ["assets"]
+
+# Bump when a hash definition changes so cached entries are recomputed
+HASH_VERSION = 3
+
+IMAGE_EXTS = {".png"}
+AUDIO_EXTS = {".wav", ".ogg"}
+OTHER_EXTS = {".jpg", ".jpeg", ".webp", ".mp3"}
+
+SAMPLE_GRID = 64       # Images are sampled on a 64x64 grid before hashing
+THUMB_SIZE = 16        # Side of the RGBA thumbnail that confirms similar images pixel by pixel
+AUDIO_FRAMES = 33      # Frames per sound (32 envelope / zero-crossing slopes)
+AUDIO_RATE = 11025     # Rate OGG files are decoded at for fingerprinting
+THRESHOLD = 6          # Max Hamming distance (of 64 bits) for a near duplicate
+ASPECT_TOLERANCE = 0.1
+DURATION_TOLERANCE = 0.1
+COLOR_TOLERANCE = 8    # Max mean per-pixel difference over the pixels either similar image covers
+
+# Copies under these folders are the ones to drop when a cluster is merged
+ARCHIVE_MARKERS = ("archived", "v1.0-v2.0", "backup")
+
+
+# ---------------------------------------------------------------------------
+# Image hashes
+# ---------------------------------------------------------------------------
+
+def sample_pixels(pixels, width, height, grid=SAMPLE_GRID):
+    """Alpha-premultiplied (r, g, b) lists (0..255) at grid x grid nearest-sampled points"""
+    xs = [(2 * i + 1) * width // (2 * grid) for i in range(grid)]
+    ys = [(2 * i + 1) * height // (2 * grid) for i in range(grid)]
+    if NUMPY_AVAILABLE:
+        px = np.asarray(pixels).reshape(height, width, 4)[np.ix_(ys, xs)].astype(np.int64)
+        return [(px[:, :, c] * px[:, :, 3] // 255).reshape(-1).tolist() for c in range(3)]
+    rgb = ([], [], [])
+    for y in ys:
+        for x in xs:
+            i = (y * width + x) * 4
+            for c in range(3):
+                rgb[c].append(pixels[i + c] * pixels[i + 3] // 255)
+    return rgb
+
+
+def luminance(rgb):
+    """Integer Rec. 601 luminance of sampled (r, g, b) lists"""
+    return [(299 * r + 587 * g + 114 * b) // 1000 for r, g, b in zip(*rgb)]
+
+
+def thumbnail(pixels, width, height, size=THUMB_SIZE):
+    """Nearest-sampled, alpha-premultiplied size x size RGBA as hex"""
+    xs = [(2 * i + 1) * width // (2 * size) for i in range(size)]
+    ys = [(2 * i + 1) * height // (2 * size) for i in range(size)]
+    flat = np.asarray(pixels).reshape(-1).tolist() if NUMPY_AVAILABLE else pixels
+    out = bytearray()
+    for y in ys:
+        for x in xs:
+            i = (y * width + x) * 4
+            r, g, b, a = flat[i:i + 4]
+            out += bytes((r * a // 255, g * a // 255, b * a // 255, a))
+    return out.hex()
+
+
+def pixel_distance(a, b):
+    """Mean largest channel difference of two thumbnails over the pixels either one covers
+
+    Hashes ignore hue and transparent margins dilute whole-image means, so this
+    is what tells a silver ball from a green one or a dimmed x4 from a dimmed x6.
+    """
+    ta, tb = bytes.fromhex(a), bytes.fromhex(b)
+    diffs = [max(abs(ta[i + c] - tb[i + c]) for c in range(4))
+             for i in range(0, len(ta), 4) if ta[i + 3] or tb[i + 3]]
+    return sum(diffs) / len(diffs) if diffs else 0.0
+
+
+def _box(lum, grid, out_w, out_h):
+    """Average the grid x grid samples down to out_w x out_h cells"""
+    cells = []
+    for cy in range(out_h):
+        y0, y1 = cy * grid // out_h, (cy + 1) * grid // out_h
+        for cx in range(out_w):
+            x0, x1 = cx * grid // out_w, (cx + 1) * grid // out_w
+            total = sum(sum(lum[y * grid + x0:y * grid + x1]) for y in range(y0, y1))
+            cells.append(total / ((y1 - y0) * (x1 - x0)))
+    return cells
+
+
+def _bits_to_hex(bits):
+    value = 0
+    for bit in bits:
+        value = (value << 1) | bool(bit)
+    return f"{value:016x}"
+
+
+def dhash(lum, grid=SAMPLE_GRID):
+    """Difference hash: is each of 8x8 cells darker than its right neighbour"""
+    cells = _box(lum, grid, 9, 8)
+    return _bits_to_hex(cells[r * 9 + c] < cells[r * 9 + c + 1] for r in range(8) for c in range(8))
+
+
+_DCT = [[math.cos(math.pi * (2 * x + 1) * u / 64) for x in range(32)] for u in range(8)]
+
+
+def phash(lum, grid=SAMPLE_GRID):
+    """Perceptual hash: signs of the 8x8 lowest 2-D DCT terms of a 32x32 image vs their median"""
+    cells = _box(lum, grid, 32, 32)
+    rows = [[sum(_DCT[u][x] * cells[y * 32 + x] for x in range(32)) for u in range(8)] for y in range(32)]
+    coeffs = [sum(_DCT[v][y] * rows[y][u] for y in range(32)) for v in range(8) for u in range(8)]
+    # The DC term only measures overall brightness; leave it out of the median
+    median = sorted(coeffs[1:])[31]
+    return _bits_to_hex(c > median for c in coeffs)
+
+
+# ---------------------------------------------------------------------------
+# Audio fingerprint
+# ---------------------------------------------------------------------------
+
+def audio_fingerprint(samples, channels, frames=AUDIO_FRAMES):
+    """64-bit fingerprint: rises of the RMS envelope and of the zero-crossing rate"""
+    if NUMPY_AVAILABLE:
+        mono = np.asarray(samples, dtype=np.float64)
+        mono = mono[:len(mono) // channels * channels].reshape(-1, channels).mean(axis=1)
+        size = len(mono) // frames
+        if size < 2:
+            return None
+        blocks = mono[:size * frames].reshape(frames, size)
+        rms = np.sqrt((blocks ** 2).mean(axis=1)).tolist()
+        zcr = (np.diff(np.signbit(blocks).astype(np.int8), axis=1) != 0).sum(axis=1).tolist()
+    else:
+        mono = [sum(samples[i:i + channels]) / channels for i in range(0, len(samples) - channels + 1, channels)]
+        size = len(mono) // frames
+        if size < 2:
+            return None
+        rms, zcr = [], []
+        for f in range(frames):
+            block = mono[f * size:(f + 1) * size]
+            rms.append(math.sqrt(sum(v * v for v in block) / size))
+            zcr.append(sum((a < 0) != (b < 0) for a, b in zip(block, block[1:])))
+    bits = [rms[i + 1] > rms[i] for i in range(32)] + [zcr[i + 1] > zcr[i] for i in range(32)]
+    return _bits_to_hex(bits)
+
+
+# ---------------------------------------------------------------------------
+# Hashing with a persistent cache
+# ---------------------------------------------------------------------------
+
+def hash_file(path):
+    """Hash entry of one file (runs in a worker process)"""
+    path = Path(path)
+    data = path.read_bytes()
+    st = path.stat()
+    entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha256": hashlib.sha256(data).hexdigest()}
+    ext = path.suffix.lower()
+    try:
+        if ext in IMAGE_EXTS:
+            width, height, pixels = read_png(path)
+            raw = pixels.tobytes() if NUMPY_AVAILABLE else bytes(pixels)
+            rgb = sample_pixels(pixels, width, height)
+            lum = luminance(rgb)
+            entry.update(kind="image", width=width, height=height, thumb=thumbnail(pixels, width, height),
+                         pixels=hashlib.sha256(raw).hexdigest(), dhash=dhash(lum), phash=phash(lum))
+        elif ext in AUDIO_EXTS:
+            entry["kind"] = "audio"
+            if ext == ".wav":
+                samples, rate, channels = read_wav(path)
+            else:
+                samples, rate, channels = ffmpeg_decode(path, AUDIO_RATE), AUDIO_RATE, 1
+            if samples is not None:
+                entry.update(duration=len(samples) / channels / rate,
+                             fingerprint=audio_fingerprint(samples, channels))
+        else:
+            entry["kind"] = "other"
+    except (ValueError, zlib.error, struct.error) as e:
+        # A corrupt file is reported, not allowed to abort the whole scan
+        entry.update(kind="other", error=str(e))
+    return entry
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache.get("files", {}) if cache.get("version") == HASH_VERSION else {}
+
+
+def save_cache(files):
+    CACHE_PATH.parent.mkdir(exist_ok=True)
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": HASH_VERSION, "files": files}, f, separators=(",", ":"))
+    os.replace(tmp, CACHE_PATH)
+
+
+def scan(roots=DEFAULT_ROOTS, jobs=None):
+    """Hash every asset under the roots; returns ({relative path: entry}, files rehashed)"""
+    exts = IMAGE_EXTS | AUDIO_EXTS | OTHER_EXTS
+    paths = []
+    for root in roots:
+        paths.extend(p for p in sorted((BASE_DIR / root).rglob("*")) if p.suffix.lower() in exts and p.is_file())
+    cache = load_cache()
+    entries = {}
+    stale = []
+    for path in paths:
+        rel = path.relative_to(BASE_DIR).as_posix()
+        st = path.stat()
+        cached = cache.get(rel)
+        if cached and cached["size"] == st.st_size and cached["mtime_ns"] == st.st_mtime_ns:
+            entries[rel] = cached
+        else:
+            stale.append(rel)
+    if stale:
+        jobs = jobs or os.cpu_count() or 1
+        full = [str(BASE_DIR / rel) for rel in stale]
+        if jobs > 1 and len(stale) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as pool:
+                hashed = list(pool.map(hash_file, full, chunksize=4))
+        else:
+            hashed = [hash_file(p) for p in full]
+        entries.update(zip(stale, hashed))
+    if stale or len(cache) != len(entries):
+        save_cache(entries)
+    return entries, len(stale)
+
+
+# ---------------------------------------------------------------------------
+# Index and clustering
+# ---------------------------------------------------------------------------
+
+class HammingIndex:
+    """Multi-index hashing over 64-bit values for Hamming-distance range queries
+
+    The bits are cut into threshold + 1 bands. By pigeonhole, two values within
+    `threshold` bits agree exactly on at least one band, so candidates come from
+    exact band lookups and only they are compared bit by bit.
+    """
+
+    def __init__(self, threshold=THRESHOLD, bits=64):
+        self.threshold = threshold
+        bands = threshold + 1
+        edges = [bits * i // bands for i in range(bands + 1)]
+        self.bands = [(lo, (1 << (hi - lo)) - 1) for lo, hi in zip(edges, edges[1:])]
+        self.tables = [{} for _ in self.bands]
+        self.values = {}
+
+    def add(self, key, value):
+        self.values[key] = value
+        for table, (shift, mask) in zip(self.tables, self.bands):
+            table.setdefault((value >> shift) & mask, []).append(key)
+
+    def query(self, value):
+        """Keys within the threshold of value, with their distances"""
+        seen = set()
+        for table, (shift, mask) in zip(self.tables, self.bands):
+            for key in table.get((value >> shift) & mask, ()):
+                if key not in seen:
+                    seen.add(key)
+                    distance = bin(self.values[key] ^ value).count("1")
+                    if distance <= self.threshold:
+                        yield key, distance
+
+
+class UnionFind:
+    def __init__(self):
+        self.parent = {}
+
+    def find(self, x):
+        self.parent.setdefault(x, x)
+        while self.parent[x] != x:
+            self.parent[x] = self.parent[self.parent[x]]
+            x = self.parent[x]
+        return x
+
+    def union(self, a, b):
+        self.parent[self.find(a)] = self.find(b)
+
+    def groups(self):
+        out = {}
+        for x in self.parent:
+            out.setdefault(self.find(x), []).append(x)
+        return [sorted(g) for g in out.values() if len(g) > 1]
+
+
+def _similar_shape(a, b):
+    if a["kind"] == "image":
+        ra, rb = a["width"] / a["height"], b["width"] / b["height"]
+        return (abs(ra - rb) <= ASPECT_TOLERANCE * max(ra, rb)
+                and pixel_distance(a["thumb"], b["thumb"]) <= COLOR_TOLERANCE)
+    return abs(a["duration"] - b["duration"]) <= DURATION_TOLERANCE * max(a["duration"], b["duration"])
+
+
+def find_clusters(entries, threshold=THRESHOLD):
+    """Group files into exact, pixel-identical and near-duplicate clusters
+
+    Returns a list of {"kind", "files", "distance"} dicts; each file appears in
+    at most one cluster, the strictest one that applies.
+    """
+    clusters = []
+    claimed = set()
+
+    def by_key(field, label):
+        buckets = {}
+        for rel, e in entries.items():
+            if rel not in claimed and e.get(field):
+                buckets.setdefault(e[field], []).append(rel)
+        for files in buckets.values():
+            if len(files) > 1:
+                clusters.append({"kind": label, "files": sorted(files), "distance": 0})
+                claimed.update(files)
+
+    by_key("sha256", "identical file")
+    by_key("pixels", "identical pixels")
+
+    for kind, field, label in (("image", "phash", "similar image"), ("audio", "fingerprint", "similar sound")):
+        index = HammingIndex(threshold)
+        union = UnionFind()
+        worst = {}
+        for rel, e in sorted(entries.items()):
+            if rel in claimed or e.get("kind") != kind or not e.get(field):
+                continue
+            value = int(e[field], 16)
+            for other, distance in index.query(value):
+                o = entries[other]
+                if not _similar_shape(e, o):
+                    continue
+                if kind == "image":
+                    # Both hashes must agree: pHash for structure, dHash for gradients
+                    distance = max(distance, bin(int(e["dhash"], 16) ^ int(o["dhash"], 16)).count("1"))
+                    if distance > threshold:
+                        continue
+                union.union(rel, other)
+                worst[rel] = max(worst.get(rel, 0), distance)
+                worst[other] = max(worst.get(other, 0), distance)
+            index.add(rel, value)
+        for files in union.groups():
+            clusters.append({"kind": label, "files": files, "distance": max(worst[f] for f in files)})
+    return clusters
+
+
+def keeper(files):
+    """File to keep in a cluster: outside archive/backup folders, then the shortest path"""
+    return min(files, key=lambda f: (any(m in f for m in ARCHIVE_MARKERS), len(f), f))
+
+
+def report(entries, clusters):
+    """Merge candidates with the bytes saved by keeping one file per cluster"""
+    rows = []
+    for cluster in clusters:
+        keep = keeper(cluster["files"])
+        drop = [f for f in cluster["files"] if f != keep]
+        rows.append(dict(cluster, keep=keep, drop=drop, bytes_saved=sum(entries[f]["size"] for f in drop)))
+    return sorted(rows, key=lambda r: r["bytes_saved"], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find duplicate and near-duplicate assets")
+    parser.add_argument("--root", action="append", default=None, metavar="DIR",
+                        help="directory to scan, relative to the project (default: assets; repeatable)")
+    parser.add_argument("--threshold", type=int, default=THRESHOLD,
+                        help="max differing bits (of 64) for near duplicates")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for hashing (default: CPU count)")
+    parser.add_argument("--json", metavar="PATH", help="write merge candidates as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    entries, rehashed = scan(args.root or DEFAULT_ROOTS, args.jobs)
+    rows = report(entries, find_clusters(entries, args.threshold))
+    elapsed = time.perf_counter() - start
+
+    if args.json == "-":
+        json.dump(rows, sys.stdout, indent=1)
+        print()
+        return
+    print("🔍 Duplicate Asset Finder")
+    print("=" * 60)
+    if not check_ffmpeg() and any(f.endswith(".ogg") for f in entries):
+        print("⚠️  ffmpeg not found: OGG files are compared by content hash only")
+    for row in rows:
+        distance = f" (≤{row['distance']} bits)" if row["distance"] else ""
+        print(f"\n{row['kind']}{distance}: save {row['bytes_saved'] / 1024:.1f} KiB")
+        print(f"   keep  {row['keep']}")
+        for f in row["drop"]:
+            print(f"   merge {f}")
+    total = sum(r["bytes_saved"] for r in rows)
+    print("\n" + "=" * 60)
+    print(f"📊 {len(entries)} files ({rehashed} hashed, {len(entries) - rehashed} cached), "
+          f"{len(rows)} merge candidates, {total / 1024:.1f} KiB saved, {elapsed:.2f} s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(rows, f, indent=1)
+        print(f"✅ JSON written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
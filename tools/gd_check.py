@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+Static checks for the project's GDScript files (everything outside addons/)
+Each script is tokenized (strings, raw/StringName/NodePath prefixes, triple
+quotes, comments, line continuations) into logical lines and parsed with an
+indentation stack, reporting what the editor would refuse to load:
+unbalanced or mismatched brackets, unterminated strings, mixed tabs/spaces,
+unexpected indents, missing blocks and inconsistent dedents, and members
+(func/signal/var/const/enum/class) declared twice in the same class.
+Across files it resolves extends chains and project.godot autoloads:
+emitting a signal the script (or its parents) never declares,
+get_node("/root/Name") for a name that is neither an autoload nor a scene
+root, and Autoload.signal.connect()/emit() on a member the autoload script
+does not have. Lookups guarded by get_node_or_null/has_node/has_signal, and
+GUT tests looking up nodes they then assert on, are warnings; everything
+else is an error.
+Per-file results are cached in .tools_cache/gd_check.json by content hash
+(size + mtime skips the read), changed files are analyzed in parallel, and
+the cross-file pass runs over cached facts, so an unchanged tree is checked
+in milliseconds.
+Usage: python3 tools/gd_check.py [PATH...] [--jobs N] [--no-cache] [--strict] [--json PATH|-]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from scene_graph import BASE_DIR, PROJECT_FILE, res_to_rel, walk_project
+
+CACHE_PATH = BASE_DIR / ".tools_cache" / "gd_check.json"
+CACHE_VERSION = 1
+# Cached facts are only valid for the analyzer that produced them
+ANALYZER_HASH = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()[:16]
+SKIP_PREFIXES = ("addons/",)
+GUT_TEST = "res://addons/gut/test.gd"
+BRACKETS = {"(": ")", "[": "]", "{": "}"}
+CLOSERS = {v: k for k, v in BRACKETS.items()}
+# Signals of engine classes scripts commonly emit or connect by name on themselves
+BUILTIN_SIGNALS = {
+    "ready", "tree_entered", "tree_exiting", "tree_exited", "renamed", "child_entered_tree",
+    "child_exiting_tree", "visibility_changed", "draw", "hidden", "item_rect_changed", "resized",
+    "focus_entered", "focus_exited", "gui_input", "mouse_entered", "mouse_exited", "pressed",
+    "button_down", "button_up", "toggled", "text_changed", "text_submitted", "value_changed",
+    "timeout", "finished", "animation_finished", "animation_started", "body_entered", "body_exited",
+    "area_entered", "area_exited", "body_shape_entered", "body_shape_exited", "input_event",
+    "sleeping_state_changed", "script_changed", "property_list_changed", "changed",
+}
+
+_MEMBER = re.compile(r"^(?:@\w+(?:\([^)]*\))?\s+)*(?:static\s+)?(func|signal|var|const|enum|class)\s+(\w+)")
+_EXTENDS = re.compile(r'^extends\s+(?:"\$(\d+)"|(\w+))')
+_CLASS_NAME = re.compile(r"^class_name\s+(\w+)")
+_INNER_CLASS = re.compile(r"^class\s+(\w+)(?:\s+extends\s+(?:\"\$(\d+)\"|(\w+)))?\s*:")
+_EMIT_SIGNAL = re.compile(r'(?<![\w.])emit_signal\(\s*"\$(\d+)"')
+_SELF_EMIT = re.compile(r"(?<![\w.$])(?:self\.)?(\w+)\.emit\(")
+_GET_NODE = re.compile(r'\b(get_node|get_node_or_null|has_node)\(\s*"\$(\d+)"')
+_BIND = re.compile(r'(?:\bvar\s+)?(\w+)(?:\s*:\s*\w+)?\s*:?=\s*get_node(?:_or_null)?\(\s*"\$(\d+)"\s*\)')
+_REMOTE = re.compile(r"(?<![\w.])(\w+)\.(\w+)\.(connect|disconnect|is_connected|emit)\(")
+_REMOTE_NAMED = re.compile(r'(?<![\w.])(\w+)\.(connect|disconnect|is_connected|emit_signal)\(\s*"\$(\d+)"')
+_HAS_SIGNAL = re.compile(r'\bhas_signal\(\s*"\$(\d+)"')
+_LOCAL_NAMES = re.compile(r"\bvar\s+(\w+)|\bfor\s+(\w+)\s+in\b")
+_PARAMS = re.compile(r"\bfunc\s*\w*\s*\(([^)]*)\)")
+_AUTOLOAD = re.compile(r'^(\w+)="\*?res://([^"]+)"')
+_SPECIAL = re.compile(r"""[\n#\\"'()\[\]{}]|(?<!\w)[r&^](?=["'])""")
+_ROOT_NODE = re.compile(r'^\[node name="([^"]+)"(?![^\]]*\bparent=)')
+_TOP_LEVEL = re.compile(r"(?:static\s+)?func\b|var\b|signal\b")
+
+
+# ---------------------------------------------------------------------------
+# Tokenizer
+# ---------------------------------------------------------------------------
+
+def logical_lines(text):
+    """(logical lines, errors): each line is (lineno, indent, code, strings)
+
+    code has comments removed and every string literal replaced by "$n", n
+    indexing strings; lines joined by open brackets or a trailing backslash
+    form one logical line.
+    """
+    lines, errors = [], []
+    stack = []  # (bracket, line, col)
+    code, strings = [], []
+    start = indent = None
+    i, n, lineno, col0 = 0, len(text), 1, 0
+    continued = False
+
+    def flush():
+        nonlocal code, strings, start
+        joined = "".join(code).strip()
+        if joined:
+            lines.append((start, indent, joined, strings))
+        code, strings, start = [], [], None
+
+    while i < n:
+        if start is None and not stack and not continued:
+            # Beginning of a logical line: measure indentation
+            j = i
+            while j < n and text[j] in " \t":
+                j += 1
+            if j < n and text[j] in "\r\n#" or j >= n:
+                # Blank or comment-only line never opens a logical line
+                k = text.find("\n", j)
+                if k < 0:
+                    break
+                i, lineno, col0 = k + 1, lineno + 1, k + 1
+                continue
+            indent, start, i = text[i:j], lineno, j
+        continued = False
+        match = _SPECIAL.search(text, i)
+        if not match:
+            code.append(text[i:])
+            break
+        if match.start() > i:
+            code.append(text[i:match.start()])
+            i = match.start()
+        c = text[i]
+        if c == "\n":
+            if stack and _TOP_LEVEL.match(text, i + 1):
+                # A declaration at column 0 cannot sit inside brackets: close them here
+                for opener, line, col in stack:
+                    errors.append((line, f"'{opener}' opened at {line}:{col} is not closed before line {lineno + 1}"))
+                stack.clear()
+                flush()
+            elif stack:
+                code.append(" ")
+            else:
+                flush()
+            i, lineno, col0 = i + 1, lineno + 1, i + 1
+            continue
+        if c == "#":
+            k = text.find("\n", i)
+            i = n if k < 0 else k
+            continue
+        if c == "\\" and text[i + 1:i + 2] in ("\n", "\r"):
+            continued = True
+            code.append(" ")
+            i = text.find("\n", i) + 1
+            lineno, col0 = lineno + 1, i
+            continue
+        prefixed = c in "r&^"
+        if c in "\"'" or prefixed:
+            q = i + 1 if prefixed else i
+            quote = text[q] * 3 if text[q:q + 3] in ('"""', "'''") else text[q]
+            j = q + len(quote)
+            body_start, line_at = j, lineno
+            while True:
+                if j >= n:
+                    errors.append((line_at, "unterminated string"))
+                    return lines, errors
+                ch = text[j]
+                if ch == "\\":
+                    if text[j + 1:j + 2] == "\n":
+                        lineno += 1
+                    j += 2
+                    continue
+                if text.startswith(quote, j):
+                    break
+                if ch == "\n":
+                    if len(quote) == 1:
+                        errors.append((line_at, "unterminated string"))
+                        stack.clear()  # brackets on this line are unreliable now
+                        break
+                    lineno += 1
+                j += 1
+            strings.append(text[body_start:j])
+            code.append(f'"${len(strings) - 1}"')
+            if j < n and text[j] == "\n":
+                i = j  # unterminated: resume at the newline
+            else:
+                i = j + len(quote)
+            continue
+        if c in BRACKETS:
+            stack.append((c, lineno, i - col0 + 1))
+        elif c in CLOSERS:
+            if not any(opener == CLOSERS[c] for opener, _, _ in stack):
+                errors.append((lineno, f"unmatched '{c}'"))
+            else:
+                # Recover at the matching opener so one typo does not swallow the file
+                while stack[-1][0] != CLOSERS[c]:
+                    opener, line, col = stack.pop()
+                    errors.append((line, f"'{opener}' opened at {line}:{col} is not closed before '{c}'"))
+                stack.pop()
+        code.append(c)
+        i += 1
+    for opener, line, col in stack:
+        errors.append((line, f"'{opener}' opened at {line}:{col} is never closed"))
+    flush()
+    return lines, errors
+
+
+# ---------------------------------------------------------------------------
+# Per-file analysis (cached by content hash)
+# ---------------------------------------------------------------------------
+
+def _new_scope(name, indent):
+    return {"name": name, "indent": indent, "extends": None, "members": {}, "signals": []}
+
+
+def analyze_text(text):
+    """Facts for one script: syntax errors, scopes (members, signals, extends), references"""
+    lines, errors = logical_lines(text)
+    errors = [[line, message] for line, message in errors]
+
+    # Like the engine: the first indented line fixes the indent character for the file
+    indent_char = None
+    for lineno, indent, _, _ in lines:
+        if not indent:
+            continue
+        indent_char = indent_char or indent[0]
+        if indent.strip(indent_char):
+            name = "tabs" if indent_char == "\t" else "spaces"
+            errors.append([lineno, f"mixed tabs and spaces in indentation (file indents with {name})"])
+            break
+
+    scopes = [_new_scope("", 0)]
+    open_scopes = [0]  # indices into scopes, innermost last
+    levels = [0]
+    expect_block = False
+    class_name = None
+    emits, node_refs, remote, guarded, locals_ = [], [], [], set(), set()
+    bindings = {}
+    prev_line = None
+
+    for lineno, indent, code, strings in lines:
+        width = len(indent)
+        if expect_block:
+            if width <= levels[-1]:
+                errors.append([lineno, f"expected an indented block after line {prev_line}"])
+            else:
+                levels.append(width)
+        elif width > levels[-1]:
+            errors.append([lineno, "unexpected indent"])
+            levels.append(width)
+        while width < levels[-1]:
+            levels.pop()
+        if width != levels[-1]:
+            errors.append([lineno, "unindent does not match any outer indentation level"])
+            levels.append(width)
+        while len(open_scopes) > 1 and width < scopes[open_scopes[-1]]["indent"]:
+            open_scopes.pop()
+        scope_index = open_scopes[-1]
+        scope = scopes[scope_index]
+        expect_block = code.endswith(":")
+        prev_line = lineno
+
+        if width == scope["indent"]:
+            match = _CLASS_NAME.match(code)
+            if match and scope_index == 0:
+                class_name = match.group(1)
+            match = _EXTENDS.match(code)
+            if match:
+                scope["extends"] = strings[int(match.group(1))] if match.group(1) else match.group(2)
+            match = _MEMBER.match(code)
+            if match:
+                kind, name = match.groups()
+                if name in scope["members"]:
+                    other_kind, other_line = scope["members"][name]
+                    where = f" in class {scope['name']}" if scope["name"] else ""
+                    errors.append([lineno, f"{kind} '{name}' already declared as {other_kind} at line {other_line}{where}"])
+                else:
+                    scope["members"][name] = (kind, lineno)
+                if kind == "signal":
+                    scope["signals"].append(name)
+                if kind == "class":
+                    inner = _new_scope(name, width + 1)
+                    inner_match = _INNER_CLASS.match(code)
+                    if inner_match and (inner_match.group(2) or inner_match.group(3)):
+                        inner["extends"] = (strings[int(inner_match.group(2))] if inner_match.group(2)
+                                            else inner_match.group(3))
+                    scopes.append(inner)
+                    open_scopes.append(len(scopes) - 1)
+
+        # Cheap substring tests keep the reference patterns off most lines
+        if "var " in code or "for " in code:
+            for match in _LOCAL_NAMES.finditer(code):
+                locals_.add(match.group(1) or match.group(2))
+        if "func" in code:
+            for match in _PARAMS.finditer(code):
+                for param in match.group(1).split(","):
+                    name = param.split(":")[0].split("=")[0].strip()
+                    if name:
+                        locals_.add(name)
+        if "emit" in code:
+            for match in _EMIT_SIGNAL.finditer(code):
+                emits.append([lineno, scope_index, strings[int(match.group(1))]])
+            for match in _SELF_EMIT.finditer(code):
+                emits.append([lineno, scope_index, match.group(1), True])
+        if "_node" in code:
+            for match in _GET_NODE.finditer(code):
+                path = strings[int(match.group(2))]
+                if path.startswith("/root/"):
+                    node_refs.append([lineno, match.group(1), path[len("/root/"):].split("/")[0]])
+            for match in _BIND.finditer(code):
+                path = strings[int(match.group(2))]
+                if path.startswith("/root/"):
+                    bindings[match.group(1)] = path[len("/root/"):].split("/")[0]
+        if "connect" in code or "emit" in code:
+            for match in _REMOTE.finditer(code):
+                remote.append([lineno, match.group(1), match.group(2)])
+            for match in _REMOTE_NAMED.finditer(code):
+                remote.append([lineno, match.group(1), strings[int(match.group(3))]])
+        if "has_signal" in code:
+            for match in _HAS_SIGNAL.finditer(code):
+                guarded.add(strings[int(match.group(1))])
+    if expect_block and lines:
+        errors.append([lines[-1][0], "expected an indented block at end of file"])
+
+    # Self emits of names that are really locals/parameters holding a Signal are not checked
+    emits = [e[:3] for e in emits if not (len(e) > 3 and e[2] in locals_)]
+    return {
+        "errors": sorted(errors),
+        "class_name": class_name,
+        "scopes": [{"name": s["name"], "extends": s["extends"], "signals": s["signals"],
+                    "members": sorted(s["members"])} for s in scopes],
+        "emits": emits,
+        "node_refs": node_refs,
+        "bindings": bindings,
+        "remote": remote,
+        "guarded": sorted(guarded),
+    }
+
+
+def analyze_file(path):
+    data = Path(path).read_bytes()
+    return hashlib.sha1(data).hexdigest(), analyze_text(data.decode("utf-8", errors="replace"))
+
+
+# ---------------------------------------------------------------------------
+# Cache and scan
+# ---------------------------------------------------------------------------
+
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            cache = json.load(f)
+        if cache.get("version") == CACHE_VERSION and cache.get("analyzer") == ANALYZER_HASH:
+            return cache["files"], cache["facts"]
+    except (OSError, ValueError, KeyError):
+        pass
+    return {}, {}
+
+
+def save_cache(files, facts):
+    CACHE_PATH.parent.mkdir(exist_ok=True)
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "analyzer": ANALYZER_HASH, "files": files, "facts": facts}, f, separators=(",", ":"))
+    os.replace(tmp, CACHE_PATH)
+
+
+def scan(root=BASE_DIR, use_cache=True, jobs=None, tree=None):
+    """({rel: facts} for every project script, files analyzed this run)"""
+    tree = walk_project(root) if tree is None else tree
+    scripts = [(rel, size, mtime_ns) for rel, size, mtime_ns in tree
+               if rel.endswith(".gd") and not rel.startswith(SKIP_PREFIXES)]
+    files, facts = load_cache() if use_cache else ({}, {})
+    digests, stale = {}, []
+    for rel, size, mtime_ns in scripts:
+        entry = files.get(rel)
+        if entry and entry["size"] == size and entry["mtime_ns"] == mtime_ns and entry["sha1"] in facts:
+            digests[rel] = entry["sha1"]
+            continue
+        data = (root / rel).read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+        files[rel] = {"size": size, "mtime_ns": mtime_ns, "sha1": digest}
+        digests[rel] = digest
+        if digest not in facts:
+            stale.append((rel, digest))
+
+    jobs = jobs or os.cpu_count() or 1
+    if stale:
+        paths = [root / rel for rel, _ in stale]
+        if jobs > 1 and len(stale) > 1:
+            with ProcessPoolExecutor(max_workers=min(jobs, len(stale))) as pool:
+                analyzed = list(pool.map(analyze_file, paths, chunksize=8))
+        else:
+            analyzed = [analyze_file(p) for p in paths]
+        for digest, result in analyzed:
+            facts[digest] = result
+
+    changed = bool(stale) or len(files) != len(digests)
+    live = set(digests.values())
+    files = {rel: files[rel] for rel in digests}
+    facts = {digest: f for digest, f in facts.items() if digest in live}
+    if use_cache and changed:
+        save_cache(files, facts)
+    return {rel: facts[digest] for rel, digest in digests.items()}, len(stale)
+
+
+# ---------------------------------------------------------------------------
+# Cross-file checks
+# ---------------------------------------------------------------------------
+
+def read_project(root=BASE_DIR, tree=None):
+    """(autoload name -> script rel, scene root node names)"""
+    autoloads, section = {}, None
+    for line in (root / PROJECT_FILE).read_text().splitlines():
+        if line.startswith("["):
+            section = line.strip()
+        elif section == "[autoload]":
+            match = _AUTOLOAD.match(line)
+            if match:
+                autoloads[match.group(1)] = match.group(2)
+    roots = set()
+    for rel, _, _ in walk_project(root) if tree is None else tree:
+        if rel.endswith(".tscn") and not rel.startswith(SKIP_PREFIXES):
+            with open(root / rel, encoding="utf-8", errors="replace") as f:
+                for line in f:
+                    match = _ROOT_NODE.match(line)
+                    if match:
+                        roots.add(match.group(1))
+                        break
+    return autoloads, roots
+
+
+class Project:
+    """Cross-file view over per-script facts: class names, extends chains, autoloads"""
+
+    def __init__(self, facts, autoloads, scene_roots):
+        self.facts = facts
+        self.autoloads = autoloads
+        self.scene_roots = scene_roots
+        self.classes = {f["class_name"]: rel for rel, f in facts.items() if f["class_name"]}
+
+    def _parent(self, extends):
+        """Script rel of a parent, None for engine classes, False for scripts we cannot see"""
+        if extends is None:
+            return None
+        if extends.startswith("res://"):
+            rel = res_to_rel(extends)
+            return rel if rel in self.facts else False
+        return self.classes.get(extends)
+
+    def chain(self, rel, scope_index=0):
+        """(signals, members, complete) along the extends chain of a script scope"""
+        signals, members = set(), set()
+        scope = self.facts[rel]["scopes"][scope_index]
+        seen = set()
+        while True:
+            signals.update(scope["signals"])
+            members.update(scope["members"])
+            parent = self._parent(scope["extends"])
+            if parent is None:
+                return signals, members, True
+            if parent is False or parent in seen:
+                return signals, members, False
+            seen.add(parent)
+            scope = self.facts[parent]["scopes"][0]
+
+    def check(self, rel):
+        """[(line, severity, message)] for one script"""
+        facts = self.facts[rel]
+        findings = [(line, "error", message) for line, message in facts["errors"]]
+        guarded = set(facts["guarded"])
+
+        for line, scope_index, name in facts["emits"]:
+            signals, _, complete = self.chain(rel, scope_index)
+            if complete and name not in signals and name not in BUILTIN_SIGNALS:
+                findings.append((line, "error", f"emits undeclared signal '{name}'"))
+
+        # GUT tests assert on what they look up, so a missing node is a test failure, not a load error
+        is_test = facts["scopes"][0]["extends"] == GUT_TEST
+        for line, call, name in facts["node_refs"]:
+            if name in self.autoloads or name in self.scene_roots:
+                continue
+            severity = "error" if call == "get_node" and not is_test else "warning"
+            findings.append((line, severity, f'{call}("/root/{name}"): no autoload or scene root named {name}'))
+
+        bindings = facts["bindings"]
+        for line, owner, name in facts["remote"]:
+            autoload = owner if owner in self.autoloads else bindings.get(owner)
+            script = self.autoloads.get(autoload)
+            if script not in self.facts:
+                continue
+            signals, members, complete = self.chain(script)
+            if not complete or name in signals or name in members or name in BUILTIN_SIGNALS:
+                continue
+            severity = "warning" if name in guarded else "error"
+            findings.append((line, severity, f"{autoload} ({script}) has no signal '{name}'"))
+        return sorted(set(findings))
+
+
+def run_checks(paths=None, root=BASE_DIR, use_cache=True, jobs=None):
+    """({rel: findings}, scripts, analyzed): findings for paths (default every project script)"""
+    tree = walk_project(root)
+    facts, analyzed = scan(root, use_cache, jobs, tree)
+    project = Project(facts, *read_project(root, tree))
+    if paths:
+        wanted = set()
+        for path in paths:
+            rel = res_to_rel(path) if path.startswith("res://") else Path(os.path.abspath(path)).relative_to(root).as_posix()
+            wanted.update(r for r in facts if r == rel or r.startswith(rel.rstrip("/") + "/"))
+    else:
+        wanted = set(facts)
+    return {rel: project.check(rel) for rel in sorted(wanted)}, len(facts), analyzed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Static checks for GDScript files")
+    parser.add_argument("paths", nargs="*", help="scripts or folders to report (default: all outside addons/)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes for changed files")
+    parser.add_argument("--no-cache", action="store_true", help="analyze every file again")
+    parser.add_argument("--strict", action="store_true", help="exit 1 on warnings too")
+    parser.add_argument("--json", metavar="PATH", help="write findings as JSON ('-' for stdout)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results, total, analyzed = run_checks(args.paths, use_cache=not args.no_cache, jobs=args.jobs)
+    elapsed = time.perf_counter() - start
+    errors = sum(1 for findings in results.values() for _, sev, _ in findings if sev == "error")
+    warnings = sum(1 for findings in results.values() for _, sev, _ in findings if sev == "warning")
+
+    if args.json:
+        report = {rel: [{"line": line, "severity": sev, "message": msg} for line, sev, msg in findings]
+                  for rel, findings in results.items() if findings}
+        text = json.dumps(report, indent=2)
+        if args.json == "-":
+            print(text)
+            return
+        Path(args.json).write_text(text)
+
+    print("🔎 GDScript Static Check")
+    print("=" * 60)
+    print(f"{len(results)} scripts checked ({analyzed} analyzed, {total - analyzed} cached) "
+          f"in {elapsed * 1000:.0f}ms")
+    for rel, findings in results.items():
+        for line, severity, message in findings:
+            icon = "❌" if severity == "error" else "⚠️ "
+            print(f"{icon} {rel}:{line}: {message}")
+    print("=" * 60)
+    if errors or (args.strict and warnings):
+        print(f"❌ {errors} errors, {warnings} warnings")
+        sys.exit(1)
+    print(f"✅ {errors} errors, {warnings} warnings")
+
+
+if __name__ == "__main__":
+    main()
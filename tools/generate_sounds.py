@@ -1,153 +1,71 @@
 #!/usr/bin/env python3
 """
 Generate simple pinball game sound effects
-Creates OGG files using procedural audio generation
-Requires: numpy (pip install numpy) and soundfile (pip install soundfile) or pydub (pip install pydub)
+Creates WAV files (convert to OGG for Godot) from synthesis graphs, see synth.py
+Optional: numpy (pip install numpy) renders every effect vectorized
 """
 
 import os
-import math
-import struct
 
-try:
-    import numpy as np
-    NUMPY_AVAILABLE = True
-except ImportError:
-    NUMPY_AVAILABLE = False
+from audio_writer import encode_wav, save_wav
+from synth import (ADSR, SAMPLE_RATE, Bank, Effect, ExpDecay, Seq, Sine, Sweep,
+                   NUMPY_AVAILABLE, render)
+
+if not NUMPY_AVAILABLE:
     print("Warning: numpy not available. Install with: pip install numpy")
     print("Will create simple sound files using basic math...")
 
-try:
-    import soundfile as sf
-    SOUNDFILE_AVAILABLE = True
-except ImportError:
-    SOUNDFILE_AVAILABLE = False
-    try:
-        from pydub import AudioSegment
-        from pydub.generators import Sine, WhiteNoise
-        PYDUB_AVAILABLE = True
-    except ImportError:
-        PYDUB_AVAILABLE = False
-        print("Warning: soundfile and pydub not available.")
-        print("Install one with: pip install soundfile OR pip install pydub")
-
-SAMPLE_RATE = 44100
+# Original pinball effects (assets/sounds)
+EFFECTS = [
+    # Flipper click - short, sharp click (2 kHz with fast exponential decay)
+    Effect('flipper_click', 0.05, 0.5 * ExpDecay(30) * Sine(2000)),
+    # Obstacle hit - impact sound (three partials)
+    Effect('obstacle_hit', 0.1, ExpDecay(15) * (0.3 * Sine(800) + 0.2 * Sine(1200) + 0.1 * Sine(2000))),
+    # Ball launch - rising whoosh (200 -> 800 Hz, 50 ms fade out)
+    Effect('ball_launch', 0.2, 0.4 * Sine(Sweep(200, 800)) * ADSR(0, 0, 1, 0.05)),
+    # Hold entry - success chime (600 then 800 Hz, then a 50 ms tail of silence)
+    Effect('hold_entry', 0.35, 0.3 * Seq((Sine(600), 0.15), (Sine(800), 0.15)) * ADSR(0.05, 0, 1, 0.2)),
+    # Ball lost - falling tone (400 then 200 Hz)
+    Effect('ball_lost', 0.3, 0.3 * Seq((Sine(400), 0.1), (Sine(200), 0.2)) * ADSR(0, 0, 1, 0.25)),
+]
 
-def generate_tone(frequency, duration, sample_rate=SAMPLE_RATE, amplitude=0.3):
-    """Generate a simple tone"""
-    if NUMPY_AVAILABLE:
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        wave = amplitude * np.sin(2 * np.pi * frequency * t)
-        return wave
-    else:
-        # Fallback without numpy
-        samples = []
-        for i in range(int(sample_rate * duration)):
-            t = i / sample_rate
-            wave = amplitude * math.sin(2 * math.pi * frequency * t)
-            samples.append(wave)
-        return samples
+# Default bfxr-style beep, used by v3.0 effects without a recipe of their own
+V3_DEFAULT_BEEP = 0.3 * Sine(800) * ExpDecay(20)
 
-def generate_click(duration=0.05, sample_rate=SAMPLE_RATE):
-    """Generate a click sound (high frequency pulse)"""
-    if NUMPY_AVAILABLE:
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        # Exponential decay envelope
-        envelope = np.exp(-t * 30)  # Fast decay
-        wave = 0.5 * envelope * np.sin(2 * np.pi * 2000 * t)
-        return wave
-    else:
-        samples = []
-        for i in range(int(sample_rate * duration)):
-            t = i / sample_rate
-            envelope = math.exp(-t * 30)
-            wave = 0.5 * envelope * math.sin(2 * math.pi * 2000 * t)
-            samples.append(wave)
-        return samples
+# v3.0 placeholder effects (assets/sounds/v3.0), formerly
+# download_v3_assets.generate_bfxr_sound
+EFFECTS_V3 = [
+    Effect('flipper_click', 0.1, 0.5 * ExpDecay(50) * Sine(2000)),
+    Effect('obstacle_hit', 0.15, 0.4 * ExpDecay(20) * (0.5 * Sine(600) + 0.3 * Sine(1200) + 0.2 * Sine(2400))),
+    Effect('ball_launch', 0.3, 0.3 * Sine(Sweep(200, 600)) * ExpDecay(3)),
+    Effect('hold_entry', 0.4, 0.3 * (0.5 * Sine(600) + 0.5 * Sine(800)) * ExpDecay(2)),
+    Effect('ball_lost', 0.5, 0.3 * Sine(Sweep(400, 200)) * ExpDecay(2)),
+    Effect('skill_shot', 0.1, V3_DEFAULT_BEEP),
+    Effect('multiball_activate', 0.1, V3_DEFAULT_BEEP),
+    Effect('multiball_end', 0.1, V3_DEFAULT_BEEP),
+    Effect('combo_hit', 0.1, V3_DEFAULT_BEEP),
+]
 
-def generate_hit(duration=0.1, sample_rate=SAMPLE_RATE):
-    """Generate a hit sound (multiple frequencies)"""
-    if NUMPY_AVAILABLE:
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        envelope = np.exp(-t * 15)
-        wave = envelope * (0.3 * np.sin(2 * np.pi * 800 * t) + 
-                          0.2 * np.sin(2 * np.pi * 1200 * t) +
-                          0.1 * np.sin(2 * np.pi * 2000 * t))
-        return wave
-    else:
-        samples = []
-        for i in range(int(sample_rate * duration)):
-            t = i / sample_rate
-            envelope = math.exp(-t * 15)
-            wave = envelope * (0.3 * math.sin(2 * math.pi * 800 * t) + 
-                              0.2 * math.sin(2 * math.pi * 1200 * t) +
-                              0.1 * math.sin(2 * math.pi * 2000 * t))
-            samples.append(wave)
-        return samples
+BANKS = {
+    'main': {e.name: e for e in EFFECTS},
+    'v3.0': {e.name: e for e in EFFECTS_V3},
+}
 
-def generate_launch(duration=0.2, sample_rate=SAMPLE_RATE):
-    """Generate a launch sound (rising frequency)"""
-    if NUMPY_AVAILABLE:
-        t = np.linspace(0, duration, int(sample_rate * duration))
-        # Rising frequency from 200Hz to 800Hz
-        frequency = 200 + (600 * t / duration)
-        wave = 0.4 * np.sin(2 * np.pi * frequency * t)
-        # Apply envelope
-        envelope = np.ones_like(t)
-        envelope[-int(sample_rate * 0.05):] = np.linspace(1, 0, int(sample_rate * 0.05))
-        return wave * envelope
-    else:
-        samples = []
-        for i in range(int(sample_rate * duration)):
-            t = i / sample_rate
-            frequency = 200 + (600 * t / duration)
-            wave = 0.4 * math.sin(2 * math.pi * frequency * t)
-            # Apply envelope
-            if i >= int(sample_rate * (duration - 0.05)):
-                envelope = 1.0 - (i - int(sample_rate * (duration - 0.05))) / (sample_rate * 0.05)
-            else:
-                envelope = 1.0
-            samples.append(wave * envelope)
-        return samples
+def render_effect(bank, name):
+    """Render one effect from a bank ('main' or 'v3.0') to float samples"""
+    return render(BANKS[bank][name])
 
 def write_wav(data, filename, sample_rate=SAMPLE_RATE):
-    """Write a WAV file (can be converted to OGG later)"""
-    # Ensure data is in correct format
-    if NUMPY_AVAILABLE:
-        if isinstance(data, np.ndarray):
-            data = np.clip(data, -1.0, 1.0)
-            data_int = (data * 32767).astype(np.int16)
-        else:
-            data = [max(-1.0, min(1.0, d)) for d in data]
-            data_int = np.array([int(d * 32767) for d in data], dtype=np.int16)
-    else:
-        data = [max(-1.0, min(1.0, d)) for d in data]
-        data_int = [int(d * 32767) for d in data]
-    
-    num_samples = len(data_int) if not NUMPY_AVAILABLE else data_int.shape[0]
-    
-    with open(filename, 'wb') as f:
-        # WAV header
-        f.write(b'RIFF')
-        f.write(struct.pack('<I', 36 + num_samples * 2))
-        f.write(b'WAVE')
-        f.write(b'fmt ')
-        f.write(struct.pack('<I', 16))  # fmt chunk size
-        f.write(struct.pack('<H', 1))   # audio format (1 = PCM)
-        f.write(struct.pack('<H', 1))   # num channels
-        f.write(struct.pack('<I', sample_rate))
-        f.write(struct.pack('<I', sample_rate * 2))  # byte rate
-        f.write(struct.pack('<H', 2))   # block align
-        f.write(struct.pack('<H', 16))  # bits per sample
-        f.write(b'data')
-        f.write(struct.pack('<I', num_samples * 2))
-        
-        # Write audio data
-        if NUMPY_AVAILABLE and isinstance(data_int, np.ndarray):
-            data_int.tofile(f)
-        else:
-            for sample in data_int:
-                f.write(struct.pack('<h', sample))
+    """Write a 16-bit mono WAV file (can be converted to OGG later)"""
+    save_wav(filename, data, sample_rate)
+
+# Sounds to generate: (file name, generator, generator arguments)
+SOUNDS = [(f'{e.name}.wav', render_effect, ('main', e.name)) for e in EFFECTS]
+SOUNDS_V3 = [(f'{e.name}.wav', render_effect, ('v3.0', e.name)) for e in EFFECTS_V3]
+
+def create_sound(generator, *args):
+    """Render a sound with its generator and return the WAV file bytes"""
+    return encode_wav(generator(*args))
 
 def main():
     """Generate all sound effects"""
@@ -156,57 +74,14 @@ def main():
     
     print("Generating pinball sound effects...")
     
-    # Flipper click - short, sharp click
-    print("  - flipper_click.wav")
-    click_sound = generate_click(0.05)
-    write_wav(click_sound, os.path.join(sounds_dir, 'flipper_click.wav'))
-    
-    # Obstacle hit - impact sound
-    print("  - obstacle_hit.wav")
-    hit_sound = generate_hit(0.1)
-    write_wav(hit_sound, os.path.join(sounds_dir, 'obstacle_hit.wav'))
-    
-    # Ball launch - rising whoosh
-    print("  - ball_launch.wav")
-    launch_sound = generate_launch(0.2)
-    write_wav(launch_sound, os.path.join(sounds_dir, 'ball_launch.wav'))
-    
-    # Hold entry - success chime
-    print("  - hold_entry.wav")
-    if NUMPY_AVAILABLE:
-        hold_sound = np.concatenate([generate_tone(600, 0.15), generate_tone(800, 0.15)])
-        envelope = np.concatenate([
-            np.linspace(0, 1, int(SAMPLE_RATE * 0.05)),
-            np.ones(int(SAMPLE_RATE * 0.1)),
-            np.linspace(1, 0, int(SAMPLE_RATE * 0.2))
-        ])
-        if len(hold_sound) > len(envelope):
-            envelope = np.pad(envelope, (0, len(hold_sound) - len(envelope)), 'constant')
-        elif len(envelope) > len(hold_sound):
-            hold_sound = np.pad(hold_sound, (0, len(envelope) - len(hold_sound)), 'constant')
-        hold_sound = hold_sound[:len(envelope)] * envelope
-    else:
-        hold_sound = generate_tone(600, 0.15) + generate_tone(800, 0.15)
-    write_wav(hold_sound, os.path.join(sounds_dir, 'hold_entry.wav'))
-    
-    # Ball lost - falling tone
-    print("  - ball_lost.wav")
-    if NUMPY_AVAILABLE:
-        lost_sound = np.concatenate([generate_tone(400, 0.1), generate_tone(200, 0.2)])
-        envelope = np.concatenate([
-            np.ones(int(SAMPLE_RATE * 0.05)),
-            np.linspace(1, 0, int(SAMPLE_RATE * 0.25))
-        ])
-        if len(lost_sound) > len(envelope):
-            envelope = np.pad(envelope, (0, len(lost_sound) - len(envelope)), 'constant')
-        lost_sound = lost_sound[:len(envelope)] * envelope
-    else:
-        lost_sound = generate_tone(400, 0.1) + generate_tone(200, 0.2)
-    write_wav(lost_sound, os.path.join(sounds_dir, 'ball_lost.wav'))
+    # Render the whole bank in one pass, then write each effect
+    for name, samples in Bank(EFFECTS).render().items():
+        print(f"  - {name}.wav")
+        write_wav(samples, os.path.join(sounds_dir, f'{name}.wav'))
     
     print("\nSound effects generated as WAV files.")
-    print("Note: Godot prefers OGG format. Convert WAV to OGG using:")
-    print("  ffmpeg -i assets/sounds/*.wav -c:a libvorbis assets/sounds/*.ogg")
+    print("Note: Godot prefers OGG format. Convert WAV to OGG (needs ffmpeg) using:")
+    print("  python3 tools/audio_writer.py assets/sounds")
     print("\nOr use online converters or audio software to convert WAV to OGG.")
     print("\nFor better quality commercial sounds, download from:")
     print("  - https://freesound.org (CC0 or CC-BY licenses)")
@@ -0,0 +1,465 @@
+#!/usr/bin/env python3
+"""
+Items database compiler: schema validation and an indexed GDScript table
+config/items_database.json stays the source of the shop and equip items. This
+module validates it against the schema declared below (categories, tiers,
+currencies, physics_stats keys per category, visual_stats keys, ability types
+and their parameters) and compiles it into scripts/v4/ItemsTableV4.gd: every
+string interned once in STRINGS, one packed column per scalar field, physics
+stats and ability parameters flattened into float columns, and precomputed
+indexes by id, category, tier and price, so ItemCatalogV4 answers listing and
+equip lookups from constants without parsing JSON at startup. --check fails
+when the database is invalid, when the table is out of date, or when decoding
+the table does not give back exactly the items in the JSON.
+Usage: python3 tools/items_db.py [--export] [--check] [--list CATEGORY] [--price CURRENCY LO HI]
+"""
+
+import argparse
+import bisect
+import json
+import math
+import re
+import sys
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+ITEMS_PATH = BASE_DIR / "config" / "items_database.json"
+GDSCRIPT_PATH = BASE_DIR / "scripts" / "v4" / "ItemsTableV4.gd"
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+# Category -> physics_stats key -> (type, minimum, maximum); None means unbounded
+PHYSICS_STATS = {
+    "ball": {
+        "mass": (float, 0.01, None),
+        "bounce": (float, 0.0, 2.0),
+        "linear_damp": (float, 0.0, None),
+        "gravity_scale": (float, 0.0, None),
+    },
+    "flipper": {
+        "length": (int, 1, None),
+        "rotation_speed": (float, 0.01, None),
+        "power_multiplier": (float, 0.01, None),
+    },
+}
+# Category -> visual_stats keys (string or null)
+VISUAL_STATS = {
+    "ball": ("icon", "texture", "trail_type"),
+    "flipper": ("icon", "texture"),
+}
+# Ability type -> parameter keys (non-negative numbers)
+ABILITIES = {
+    "magnetic_attraction": ("force", "radius"),
+}
+TIERS = ("common", "premium")
+CURRENCIES = ("coins", "gems")
+ITEM_KEYS = ("id", "name", "category", "tier", "price", "owned", "equipped",
+             "physics_stats", "visual_stats", "special_abilities", "description")
+# Columns that hold a STRINGS index (-1 for null), in table order
+STRING_COLUMNS = ("id", "name", "description", "category", "tier", "currency")
+FLAG_OWNED, FLAG_EQUIPPED = 1, 2
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value):
+    return (_is_int(value) or isinstance(value, float)) and math.isfinite(value)
+
+
+def _check_number(errors, where, value, kind, low, high):
+    if kind is int and not _is_int(value):
+        errors.append(f"{where}: expected an integer, got {value!r}")
+    elif not _is_number(value):
+        errors.append(f"{where}: expected a number, got {value!r}")
+    elif low is not None and value < low or high is not None and value > high:
+        bounds = f"[{low}, {high if high is not None else '∞'}]"
+        errors.append(f"{where}: {value!r} outside {bounds}")
+
+
+def validate(data):
+    """(errors, warnings) for a parsed items database"""
+    errors, warnings = [], []
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, dict) or not items:
+        return ["top level: expected a non-empty \"items\" object"], warnings
+    free = {category: [] for category in PHYSICS_STATS}
+    for item_id, item in items.items():
+        if not isinstance(item, dict):
+            errors.append(f"{item_id}: expected an object")
+            continue
+        missing = [key for key in ITEM_KEYS if key not in item]
+        unknown = sorted(set(item) - set(ITEM_KEYS))
+        if missing:
+            errors.append(f"{item_id}: missing {', '.join(missing)}")
+        if unknown:
+            errors.append(f"{item_id}: unknown key(s) {', '.join(unknown)}")
+        if item.get("id") != item_id:
+            errors.append(f"{item_id}: id {item.get('id')!r} does not match its key")
+        for key in ("name", "description"):
+            if key in item and not isinstance(item[key], str):
+                errors.append(f"{item_id}.{key}: expected a string")
+        for key in ("owned", "equipped"):
+            if key in item and not isinstance(item[key], bool):
+                errors.append(f"{item_id}.{key}: expected true or false")
+        category = item.get("category")
+        if category not in PHYSICS_STATS:
+            errors.append(f"{item_id}.category: {category!r} is not one of {', '.join(PHYSICS_STATS)}")
+            continue
+        if item.get("tier") not in TIERS:
+            errors.append(f"{item_id}.tier: {item.get('tier')!r} is not one of {', '.join(TIERS)}")
+
+        price = item.get("price")
+        if not isinstance(price, dict) or set(price) != {"currency", "amount"}:
+            errors.append(f"{item_id}.price: expected {{currency, amount}}")
+        else:
+            if price["currency"] not in CURRENCIES:
+                errors.append(f"{item_id}.price.currency: {price['currency']!r} is not one of {', '.join(CURRENCIES)}")
+            _check_number(errors, f"{item_id}.price.amount", price["amount"], int, 0, 2 ** 31 - 1)
+            if price["amount"] == 0:
+                free[category].append(item_id)
+
+        stats = item.get("physics_stats")
+        spec = PHYSICS_STATS[category]
+        if not isinstance(stats, dict):
+            errors.append(f"{item_id}.physics_stats: expected an object")
+        else:
+            for key in sorted(set(spec) - set(stats)):
+                errors.append(f"{item_id}.physics_stats: missing {key} (required for {category})")
+            for key in sorted(set(stats) - set(spec)):
+                errors.append(f"{item_id}.physics_stats.{key}: not a {category} stat")
+            for key, (kind, low, high) in spec.items():
+                if key in stats:
+                    _check_number(errors, f"{item_id}.physics_stats.{key}", stats[key], kind, low, high)
+
+        visual = item.get("visual_stats")
+        if not isinstance(visual, dict) or set(visual) != set(VISUAL_STATS[category]):
+            errors.append(f"{item_id}.visual_stats: expected exactly {', '.join(VISUAL_STATS[category])}")
+        else:
+            for key, value in visual.items():
+                if value is not None and not isinstance(value, str):
+                    errors.append(f"{item_id}.visual_stats.{key}: expected a string or null")
+
+        abilities = item.get("special_abilities")
+        if not isinstance(abilities, list):
+            errors.append(f"{item_id}.special_abilities: expected a list")
+            continue
+        for n, ability in enumerate(abilities):
+            where = f"{item_id}.special_abilities[{n}]"
+            kind = ability.get("type") if isinstance(ability, dict) else None
+            if kind not in ABILITIES:
+                errors.append(f"{where}: unknown ability type {kind!r}")
+                continue
+            if set(ability) != {"type", *ABILITIES[kind]}:
+                errors.append(f"{where}: {kind} takes exactly {', '.join(ABILITIES[kind])}")
+                continue
+            for key in ABILITIES[kind]:
+                _check_number(errors, f"{where}.{key}", ability[key], float, 0.0, None)
+    for category, ids in free.items():
+        if not ids:
+            warnings.append(f"no free {category}: new players have nothing to equip")
+    return errors, warnings
+
+
+# ---------------------------------------------------------------------------
+# Compiled table
+# ---------------------------------------------------------------------------
+
+def compile_table(items):
+    """Columns and indexes of ItemsTableV4.gd for a validated items dict"""
+    strings, interned = [], {}
+
+    def intern(value):
+        if value is None:
+            return -1
+        if value not in interned:
+            interned[value] = len(strings)
+            strings.append(value)
+        return interned[value]
+
+    rows = list(items.values())
+    table = {"STRINGS": strings}
+    for column in STRING_COLUMNS:
+        table[column.upper()] = []
+    table.update(PRICE=[], FLAGS=[], STAT_START=[], STATS=[], VISUALS=[],
+                 ABILITY_START=[], ABILITY_TYPE=[], ABILITY_PARAM_START=[], ABILITY_PARAMS=[])
+    for item in rows:
+        fields = dict(item, currency=item["price"]["currency"])
+        for column in STRING_COLUMNS:
+            table[column.upper()].append(intern(fields[column]))
+        table["PRICE"].append(item["price"]["amount"])
+        table["FLAGS"].append(FLAG_OWNED * item["owned"] | FLAG_EQUIPPED * item["equipped"])
+        table["STAT_START"].append(len(table["STATS"]))
+        table["STATS"] += [float(item["physics_stats"][key]) for key in PHYSICS_STATS[item["category"]]]
+        table["VISUALS"] += [intern(item["visual_stats"][key]) for key in VISUAL_STATS[item["category"]]]
+        table["ABILITY_START"].append(len(table["ABILITY_TYPE"]))
+        for ability in item["special_abilities"]:
+            table["ABILITY_TYPE"].append(intern(ability["type"]))
+            table["ABILITY_PARAM_START"].append(len(table["ABILITY_PARAMS"]))
+            table["ABILITY_PARAMS"] += [float(ability[key]) for key in ABILITIES[ability["type"]]]
+    table["ABILITY_START"].append(len(table["ABILITY_TYPE"]))
+
+    # Visuals are laid out like stats: VISUAL_KEYS[category] slots per row
+    table["VISUAL_START"], start = [], 0
+    for item in rows:
+        table["VISUAL_START"].append(start)
+        start += len(VISUAL_STATS[item["category"]])
+
+    ids = [item["id"] for item in rows]
+    table["ID_INDEX"] = {item_id: row for row, item_id in enumerate(ids)}
+    table["BY_CATEGORY"] = {c: [r for r, i in enumerate(rows) if i["category"] == c] for c in PHYSICS_STATS}
+    table["BY_TIER"] = {t: [r for r, i in enumerate(rows) if i["tier"] == t] for t in TIERS}
+    # Rows per currency in ascending price (ties keep database order) plus their
+    # prices, so a price range is two binary searches on PRICE_SORTED
+    table["BY_PRICE"], table["PRICE_SORTED"] = {}, {}
+    for currency in CURRENCIES:
+        order = sorted((r for r, i in enumerate(rows) if i["price"]["currency"] == currency),
+                       key=lambda r: table["PRICE"][r])
+        table["BY_PRICE"][currency] = order
+        table["PRICE_SORTED"][currency] = [table["PRICE"][r] for r in order]
+    return table
+
+
+def decode_table(table):
+    """Items dict rebuilt from compiled columns, the inverse of compile_table"""
+    strings = table["STRINGS"]
+
+    def text(index):
+        return strings[index] if index >= 0 else None
+
+    items = {}
+    for row in range(len(table["ID"])):
+        category = text(table["CATEGORY"][row])
+        stats_at, visual_at = table["STAT_START"][row], table["VISUAL_START"][row]
+        stats = {}
+        for n, (key, (kind, _, _)) in enumerate(PHYSICS_STATS[category].items()):
+            value = table["STATS"][stats_at + n]
+            stats[key] = int(value) if kind is int else value
+        abilities = []
+        for slot in range(table["ABILITY_START"][row], table["ABILITY_START"][row + 1]):
+            kind = text(table["ABILITY_TYPE"][slot])
+            at = table["ABILITY_PARAM_START"][slot]
+            ability = {"type": kind}
+            ability.update((key, table["ABILITY_PARAMS"][at + n]) for n, key in enumerate(ABILITIES[kind]))
+            abilities.append(ability)
+        item_id = text(table["ID"][row])
+        items[item_id] = {
+            "id": item_id,
+            "name": text(table["NAME"][row]),
+            "category": category,
+            "tier": text(table["TIER"][row]),
+            "price": {"currency": text(table["CURRENCY"][row]), "amount": table["PRICE"][row]},
+            "owned": bool(table["FLAGS"][row] & FLAG_OWNED),
+            "equipped": bool(table["FLAGS"][row] & FLAG_EQUIPPED),
+            "physics_stats": stats,
+            "visual_stats": {key: text(table["VISUALS"][visual_at + n])
+                             for n, key in enumerate(VISUAL_STATS[category])},
+            "special_abilities": abilities,
+            "description": text(table["DESCRIPTION"][row]),
+        }
+    return items
+
+
+def in_price_range(table, currency, low, high):
+    """Item ids priced in [low, high] in one currency, cheapest first"""
+    prices = table["PRICE_SORTED"].get(currency, [])
+    rows = table["BY_PRICE"].get(currency, [])[bisect.bisect_left(prices, low):bisect.bisect_right(prices, high)]
+    return [table["STRINGS"][table["ID"][r]] for r in rows]
+
+
+# ---------------------------------------------------------------------------
+# GDScript
+# ---------------------------------------------------------------------------
+
+# Constant name -> (GDScript type, description); order is the file order
+CONSTANTS = {
+    "STRINGS": ("PackedStringArray", "Every distinct string once; the columns below hold indexes into it (-1 = null)."),
+    "ID": ("PackedInt32Array", "Per-row string columns."),
+    "NAME": ("PackedInt32Array", ""),
+    "DESCRIPTION": ("PackedInt32Array", ""),
+    "CATEGORY": ("PackedInt32Array", ""),
+    "TIER": ("PackedInt32Array", ""),
+    "CURRENCY": ("PackedInt32Array", ""),
+    "PRICE": ("PackedInt32Array", "Price amount in CURRENCY."),
+    "FLAGS": ("PackedInt32Array", "Defaults for a new profile: FLAG_OWNED | FLAG_EQUIPPED."),
+    "STAT_START": ("PackedInt32Array", "physics_stats: STATS[STAT_START[row] + i] is STAT_KEYS[category][i]."),
+    "STATS": ("PackedFloat64Array", ""),
+    "VISUAL_START": ("PackedInt32Array", "visual_stats: VISUALS[VISUAL_START[row] + i] is VISUAL_KEYS[category][i]."),
+    "VISUALS": ("PackedInt32Array", ""),
+    "ABILITY_START": ("PackedInt32Array",
+                      "special_abilities of a row: ABILITY_TYPE[ABILITY_START[row]] up to ABILITY_START[row + 1]."),
+    "ABILITY_TYPE": ("PackedInt32Array", ""),
+    "ABILITY_PARAM_START": ("PackedInt32Array", "Ability parameters: ABILITY_PARAMS[ABILITY_PARAM_START[slot] + i] is ABILITY_KEYS[type][i]."),
+    "ABILITY_PARAMS": ("PackedFloat64Array", ""),
+    "ID_INDEX": ("Dictionary", "Row of each item id."),
+    "BY_CATEGORY": ("Dictionary", "Rows per category, in database order."),
+    "BY_TIER": ("Dictionary", "Rows per tier, in database order."),
+    "BY_PRICE": ("Dictionary", "Rows per currency, cheapest first; PRICE_SORTED holds their prices for bsearch."),
+    "PRICE_SORTED": ("Dictionary", ""),
+}
+SCHEMA_CONSTANTS = {
+    "STAT_KEYS": {c: list(keys) for c, keys in PHYSICS_STATS.items()},
+    "INTEGER_STATS": sorted(k for keys in PHYSICS_STATS.values() for k, spec in keys.items() if spec[0] is int),
+    "VISUAL_KEYS": {c: list(keys) for c, keys in VISUAL_STATS.items()},
+    "ABILITY_KEYS": {t: list(keys) for t, keys in ABILITIES.items()},
+}
+
+
+def _literal(value, packed=None):
+    """GDScript literal; JSON syntax is valid GDScript for strings, numbers, lists and dicts"""
+    if isinstance(value, dict):
+        inner = ", ".join(f"{json.dumps(k)}: {_literal(v, packed)}" for k, v in value.items())
+        return "{" + inner + "}"
+    body = json.dumps(value, ensure_ascii=False)
+    return f"{packed}({body})" if packed else body
+
+
+def to_gdscript(table):
+    """Source of scripts/v4/ItemsTableV4.gd"""
+    lines = [
+        "extends RefCounted",
+        "## Compiled items database for ItemCatalogV4.",
+        "## Generated by tools/items_db.py from config/items_database.json; do not edit by hand.",
+        "## Run `python3 tools/items_db.py --export` after changing the database.",
+        "",
+        f"const FLAG_OWNED: int = {FLAG_OWNED}",
+        f"const FLAG_EQUIPPED: int = {FLAG_EQUIPPED}",
+        "const STAT_KEYS: Dictionary = " + _literal(SCHEMA_CONSTANTS["STAT_KEYS"], "PackedStringArray"),
+        "const INTEGER_STATS: PackedStringArray = " + _literal(SCHEMA_CONSTANTS["INTEGER_STATS"], "PackedStringArray"),
+        "const VISUAL_KEYS: Dictionary = " + _literal(SCHEMA_CONSTANTS["VISUAL_KEYS"], "PackedStringArray"),
+        "const ABILITY_KEYS: Dictionary = " + _literal(SCHEMA_CONSTANTS["ABILITY_KEYS"], "PackedStringArray"),
+    ]
+    for name, (kind, comment) in CONSTANTS.items():
+        if comment:
+            lines += ["", f"## {comment}"]
+        value = table[name]
+        if name == "ID_INDEX":
+            lines.append(f"const {name}: Dictionary = {{")
+            lines += [f"\t{json.dumps(k, ensure_ascii=False)}: {v}," for k, v in value.items()]
+            lines.append("}")
+        elif kind == "Dictionary":
+            lines.append(f"const {name}: Dictionary = {_literal(value, 'PackedInt32Array')}")
+        elif name == "STRINGS":
+            lines.append(f"const {name}: {kind} = {kind}([")
+            lines += [f"\t{json.dumps(s, ensure_ascii=False)}," for s in value]
+            lines.append("])")
+        else:
+            lines.append(f"const {name}: {kind} = {_literal(value, kind)}")
+    lines.append("")
+    return "\n".join(lines)
+
+
+_CONST = re.compile(r"^const (\w+)(?::\s*[\w\[\]]+)? = ")
+# String literals are matched first so their contents are never rewritten
+_NOT_JSON = re.compile(r'("(?:[^"\\]|\\.)*")|Packed\w+Array\(|\]\)|,\s*(?=[\]}])')
+
+
+def parse_gdscript(source):
+    """Constants of a generated ItemsTableV4.gd as Python values"""
+    constants, name, body = {}, None, []
+
+    def finish():
+        if name is not None:
+            text = "".join(body)
+            # Drop Packed*Array( ... ) wrappers and trailing commas to get JSON back
+            text = _NOT_JSON.sub(lambda m: m.group(1) or ("]" if m.group(0) == "])" else ""), text)
+            constants[name] = json.loads(text)
+
+    for line in source.splitlines():
+        match = _CONST.match(line)
+        if match:
+            finish()
+            name, body = match.group(1), [line[match.end():]]
+        elif name is not None and line.startswith(("\t", "}", "]")):
+            body.append(line.strip())
+        else:
+            finish()
+            name, body = None, []
+    finish()
+    return constants
+
+
+def round_trip(items, source):
+    """Differences between the items and what the generated source decodes to (empty when equal)"""
+    decoded = decode_table(parse_gdscript(source))
+    problems = []
+    if list(decoded) != list(items):
+        problems.append(f"item order {list(decoded)} != {list(items)}")
+    for item_id, item in items.items():
+        got = decoded.get(item_id)
+        if got != item:
+            problems.append(f"{item_id}: decoded {json.dumps(got, sort_keys=True)} != {json.dumps(item, sort_keys=True)}")
+    return problems
+
+
+def load_items(path=ITEMS_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate and compile config/items_database.json")
+    parser.add_argument("--export", action="store_true", help=f"write {GDSCRIPT_PATH.relative_to(BASE_DIR)}")
+    parser.add_argument("--check", action="store_true",
+                        help="fail if the database is invalid, the table is stale or does not round-trip")
+    parser.add_argument("--list", metavar="CATEGORY", help="list the items of a category (or tier)")
+    parser.add_argument("--price", nargs=3, metavar=("CURRENCY", "LO", "HI"), help="list items priced in [LO, HI]")
+    args = parser.parse_args()
+
+    data = load_items()
+    print("🛒 Items Database")
+    print("=" * 60)
+    errors, warnings = validate(data)
+    for message in warnings:
+        print(f"⚠️  {message}")
+    for message in errors:
+        print(f"❌ {message}")
+    if errors:
+        sys.exit(1)
+
+    items = data["items"]
+    table = compile_table(items)
+    print(f"{len(items)} items, {len(table['STRINGS'])} interned strings, "
+          f"{len(table['STATS'])} stat values, {len(table['ABILITY_TYPE'])} abilities")
+
+    if args.list or args.price:
+        if args.list:
+            index = table["BY_CATEGORY"].get(args.list, table["BY_TIER"].get(args.list, []))
+            ids = [table["STRINGS"][table["ID"][r]] for r in index]
+        else:
+            currency, low, high = args.price
+            ids = in_price_range(table, currency, int(low), int(high))
+        for item_id in ids:
+            item = items[item_id]
+            print(f"  {item_id:20} {item['tier']:8} {item['price']['amount']:>6} {item['price']['currency']}")
+        return
+
+    source = to_gdscript(table)
+    rel = GDSCRIPT_PATH.relative_to(BASE_DIR)
+    problems = round_trip(items, source)
+    for message in problems:
+        print(f"❌ round trip: {message}")
+    if problems:
+        sys.exit(1)
+    print("✅ Compiled table decodes back to the JSON items")
+
+    current = GDSCRIPT_PATH.read_text() if GDSCRIPT_PATH.exists() else None
+    if args.export:
+        if current != source:
+            GDSCRIPT_PATH.write_text(source)
+            print(f"✅ Wrote {rel}")
+        else:
+            print(f"✅ {rel} is up to date")
+    elif current != source:
+        print(f"{'❌' if args.check else '⚠️ '} {rel} is out of date: run python3 tools/items_db.py --export")
+        if args.check:
+            sys.exit(1)
+    else:
+        print(f"✅ {rel} is up to date")
+
+
+if __name__ == "__main__":
+    main()
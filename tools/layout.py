@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+v4 table layout: bulk coordinate conversion, spatial index and GDScript export
+config/layout_v4.json is the single source of the table layout. This module
+loads every component into parallel lists (Flutter and Godot positions, footprint
+radii), converts point sets in bulk in both directions (vectorized with NumPy
+when available), and indexes the footprints in a uniform grid for
+nearest-neighbour and overlap queries. Validation reports overlapping solid
+components, pinch points narrower than the ball and footprints outside the
+board. --export writes scripts/v4/LayoutTableV4.gd, the constant Dictionary
+CoordinateConverterV4.get_component_position reads, and --check fails when
+that file is out of date, so the Python tools and the game cannot drift.
+Usage: python3 tools/layout.py [--export] [--check] [--nearest NAME [-k K]] [--at X Y]
+"""
+
+import argparse
+import json
+import math
+import sys
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+BASE_DIR = Path(__file__).parent.parent
+LAYOUT_PATH = BASE_DIR / "config" / "layout_v4.json"
+GDSCRIPT_PATH = BASE_DIR / "scripts" / "v4" / "LayoutTableV4.gd"
+BALL_RADIUS = 12.0      # scenes/Ball.tscn
+SOLID_KINDS = ("flipper", "launcher", "kicker", "bumper", "obstacle")
+
+
+# ---------------------------------------------------------------------------
+# Bulk conversion
+# ---------------------------------------------------------------------------
+
+def flutter_to_godot_many(points, scale=5.0, center=(400.0, 300.0)):
+    """Convert a sequence of Flutter (x, y) points to Godot pixels"""
+    if NUMPY_AVAILABLE:
+        return np.asarray(points, dtype=np.float64).reshape(-1, 2) * scale + np.asarray(center)
+    return [(x * scale + center[0], y * scale + center[1]) for x, y in points]
+
+
+def godot_to_flutter_many(points, scale=5.0, center=(400.0, 300.0)):
+    """Convert a sequence of Godot pixel points to Flutter board units"""
+    if NUMPY_AVAILABLE:
+        return (np.asarray(points, dtype=np.float64).reshape(-1, 2) - np.asarray(center)) / scale
+    return [((x - center[0]) / scale, (y - center[1]) / scale) for x, y in points]
+
+
+# ---------------------------------------------------------------------------
+# Spatial index
+# ---------------------------------------------------------------------------
+
+class GridIndex:
+    """Uniform-grid spatial hash over circles (centre, radius)
+
+    Every circle is registered in each cell its bounding box touches, so
+    radius and overlap queries only visit nearby cells; nearest-neighbour
+    queries search outwards ring by ring.
+    """
+
+    def __init__(self, centers, radii=None, cell=None):
+        self.centers = [(float(x), float(y)) for x, y in centers]
+        self.radii = [float(r) for r in radii] if radii is not None else [0.0] * len(self.centers)
+        self.cell = cell or max(2.0 * max(self.radii, default=0.0), 32.0)
+        self.cells = {}
+        self.points = {}
+        for i, ((x, y), r) in enumerate(zip(self.centers, self.radii)):
+            self.points.setdefault(self._key(x, y), []).append(i)
+            for key in self._keys(x - r, y - r, x + r, y + r):
+                self.cells.setdefault(key, []).append(i)
+        keys = list(self.points) or [(0, 0)]
+        self._span = max(max(abs(a), abs(b)) for a, b in keys) + 1
+
+    def _key(self, x, y):
+        return math.floor(x / self.cell), math.floor(y / self.cell)
+
+    def _keys(self, x0, y0, x1, y1):
+        (i0, j0), (i1, j1) = self._key(x0, y0), self._key(x1, y1)
+        return [(i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+    def gap(self, i, x, y, r=0.0):
+        """Clearance between circle i and the circle (x, y, r); negative when they overlap"""
+        cx, cy = self.centers[i]
+        return math.hypot(cx - x, cy - y) - self.radii[i] - r
+
+    def within(self, x, y, r=0.0):
+        """Indices of circles touching or overlapping the circle (x, y, r)"""
+        found = set()
+        for key in self._keys(x - r, y - r, x + r, y + r):
+            found.update(i for i in self.cells.get(key, ()) if self.gap(i, x, y, r) <= 0)
+        return sorted(found)
+
+    def nearest(self, x, y, k=1, exclude=()):
+        """k nearest centres to (x, y) as (distance, index), closest first"""
+        ci, cj = self._key(x, y)
+        best = []
+        ring = 0
+        while ring <= self._span + max(abs(ci), abs(cj)):
+            for i in range(ci - ring, ci + ring + 1):
+                for j in range(cj - ring, cj + ring + 1):
+                    if max(abs(i - ci), abs(j - cj)) != ring:
+                        continue
+                    for index in self.points.get((i, j), ()):
+                        if index not in exclude:
+                            cx, cy = self.centers[index]
+                            best.append((math.hypot(cx - x, cy - y), index))
+            best.sort()
+            # Anything in ring + 1 or beyond is at least `ring * cell` away
+            if len(best) >= k and best[k - 1][0] <= ring * self.cell:
+                break
+            ring += 1
+        return best[:k]
+
+    def close_pairs(self, clearance=0.0):
+        """Pairs (i, j, gap) whose footprints are closer than `clearance` (gap < 0 means overlap)"""
+        pairs = []
+        for i, ((x, y), r) in enumerate(zip(self.centers, self.radii)):
+            reach = r + clearance
+            for j in self.within(x, y, reach):
+                if j > i:
+                    pairs.append((i, j, self.gap(j, x, y, r)))
+        return sorted(pairs, key=lambda p: p[2])
+
+
+# ---------------------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------------------
+
+class Layout:
+    """All layout components as parallel lists, with lookups, queries and validation"""
+
+    def __init__(self, data):
+        self.data = data
+        self.scale = float(data["scale"])
+        self.center = tuple(float(c) for c in data["center"])
+        self.half_width = data["board"]["width"] / 2.0
+        self.half_height = data["board"]["height"] / 2.0
+        components = data["components"]
+        self.aliases = {name: c["alias"] for name, c in components.items() if "alias" in c}
+        self.names = [name for name, c in components.items() if "alias" not in c]
+        entries = [components[name] for name in self.names]
+        self.kinds = [c.get("kind", "fixture") for c in entries]
+        self.radii = [float(c.get("radius", 0.0)) for c in entries]
+        self.offsets = [tuple(c.get("offset", (0.0, 0.0))) for c in entries]
+        flutter, godot = [], []
+        for c in entries:
+            if "flutter" in c:
+                fx, fy = c["flutter"]
+                flutter.append((fx, fy))
+                godot.append((fx * self.scale + self.center[0], fy * self.scale + self.center[1]))
+            else:
+                gx, gy = c["godot"]
+                godot.append((gx, gy))
+                flutter.append(((gx - self.center[0]) / self.scale, (gy - self.center[1]) / self.scale))
+        self.flutter = flutter
+        self.godot = godot
+        self.index_of = {name: i for i, name in enumerate(self.names)}
+        self.solid = [i for i, kind in enumerate(self.kinds) if kind in SOLID_KINDS and self.radii[i] > 0]
+        self.footprints = [(self.godot[i][0] + self.offsets[i][0], self.godot[i][1] + self.offsets[i][1])
+                           for i in range(len(self.names))]
+        self.grid = GridIndex([self.footprints[i] for i in self.solid], [self.radii[i] for i in self.solid])
+        self.all_grid = GridIndex(self.godot)
+
+    def resolve(self, name):
+        return self.index_of[self.aliases.get(name, name)]
+
+    def position(self, name):
+        """Godot position of a component (or alias)"""
+        return self.godot[self.resolve(name)]
+
+    def flutter_to_godot(self, points):
+        return flutter_to_godot_many(points, self.scale, self.center)
+
+    def godot_to_flutter(self, points):
+        return godot_to_flutter_many(points, self.scale, self.center)
+
+    def board_rect(self):
+        """(left, top, right, bottom) of the board in Godot pixels"""
+        (left, top), (right, bottom) = self.flutter_to_godot(
+            [(-self.half_width, -self.half_height), (self.half_width, self.half_height)])
+        return float(left), float(top), float(right), float(bottom)
+
+    def nearest(self, x, y, k=1, exclude=()):
+        """k nearest components to a Godot point as (distance, name)"""
+        skip = {self.index_of[n] for n in exclude}
+        return [(d, self.names[i]) for d, i in self.all_grid.nearest(x, y, k, skip)]
+
+    def at(self, x, y):
+        """Solid components whose footprint contains the Godot point (x, y)"""
+        return [self.names[self.solid[i]] for i in self.grid.within(x, y)]
+
+    def validate(self):
+        """(errors, warnings): overlapping footprints, pinch points narrower than the ball, off-board parts"""
+        errors, warnings = [], []
+        for i, j, gap in self.grid.close_pairs(2.0 * BALL_RADIUS):
+            a, b = self.names[self.solid[i]], self.names[self.solid[j]]
+            if gap < 0:
+                errors.append(f"{a} overlaps {b} by {-gap:.1f}px")
+            elif self.kinds[self.solid[i]] != "flipper" or self.kinds[self.solid[j]] != "flipper":
+                # The gap between the flippers is the drain, narrow by design
+                warnings.append(f"{a} / {b}: {gap:.1f}px gap is narrower than the ball ({2 * BALL_RADIUS:.0f}px)")
+        left, top, right, bottom = self.board_rect()
+        for i in self.solid:
+            (x, y), r = self.footprints[i], self.radii[i]
+            if x - r < left or x + r > right or y - r < top or y + r > bottom:
+                errors.append(f"{self.names[i]} footprint leaves the board")
+        return errors, warnings
+
+    def to_gdscript(self):
+        """Source of scripts/v4/LayoutTableV4.gd"""
+        def vec(p):
+            return f"Vector2({_num(p[0])}, {_num(p[1])})"
+
+        lines = [
+            "extends RefCounted",
+            "## v4 table layout lookup tables.",
+            "## Generated by tools/layout.py from config/layout_v4.json; do not edit by hand.",
+            "## Run `python3 tools/layout.py --export` after changing the layout.",
+            "",
+            f"const SCALE: float = {_num(self.scale)}",
+            f"const CENTER: Vector2 = {vec(self.center)}",
+            f"const BOARD_SIZE: Vector2 = {vec((self.half_width * 2 * self.scale, self.half_height * 2 * self.scale))}",
+            "",
+            "## Godot position of every component (aliases included).",
+            "const POSITIONS: Dictionary = {",
+        ]
+        for name, i in [(n, self.index_of[n]) for n in self.names] + \
+                [(a, self.index_of[t]) for a, t in self.aliases.items()]:
+            lines.append(f'\t"{name}": {vec(self.godot[i])},')
+        lines += ["}", "", "## Solid footprint radius in pixels (components without one are not listed).",
+                  "const RADII: Dictionary = {"]
+        for i in self.solid:
+            lines.append(f'\t"{self.names[i]}": {_num(self.radii[i])},')
+        lines += ["}", ""]
+        return "\n".join(lines)
+
+
+def _num(value):
+    """GDScript float literal"""
+    text = repr(round(float(value), 4))
+    return text if "." in text or "e" in text else text + ".0"
+
+
+def load_layout(path=LAYOUT_PATH):
+    with open(path) as f:
+        return Layout(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="v4 table layout tools")
+    parser.add_argument("--export", action="store_true", help=f"write {GDSCRIPT_PATH.relative_to(BASE_DIR)}")
+    parser.add_argument("--check", action="store_true", help="fail if the layout is invalid or the GDScript table is stale")
+    parser.add_argument("--nearest", metavar="NAME", help="list the components nearest to NAME")
+    parser.add_argument("--at", nargs=2, type=float, metavar=("X", "Y"), help="list components nearest a Godot point")
+    parser.add_argument("-k", type=int, default=5, help="neighbours to list")
+    args = parser.parse_args()
+
+    layout = load_layout()
+    print("📐 v4 Table Layout")
+    print("=" * 60)
+    print(f"{len(layout.names)} components ({len(layout.solid)} solid), scale {layout.scale}, center {layout.center}")
+
+    if args.nearest or args.at:
+        x, y = layout.position(args.nearest) if args.nearest else args.at
+        exclude = [layout.aliases.get(args.nearest, args.nearest)] if args.nearest else []
+        print(f"Nearest to {args.nearest or (x, y)}:")
+        for distance, name in layout.nearest(x, y, args.k, exclude):
+            print(f"  {name:28} {distance:7.1f}px")
+        return
+
+    errors, warnings = layout.validate()
+    for message in warnings:
+        print(f"⚠️  {message}")
+    for message in errors:
+        print(f"❌ {message}")
+
+    source = layout.to_gdscript()
+    current = GDSCRIPT_PATH.read_text() if GDSCRIPT_PATH.exists() else None
+    rel = GDSCRIPT_PATH.relative_to(BASE_DIR)
+    if args.export:
+        if current != source:
+            GDSCRIPT_PATH.write_text(source)
+            print(f"✅ Wrote {rel}")
+        else:
+            print(f"✅ {rel} is up to date")
+    elif current != source:
+        print(f"{'❌' if args.check else '⚠️ '} {rel} is out of date: run python3 tools/layout.py --export")
+        if args.check:
+            sys.exit(1)
+    if errors and args.check:
+        sys.exit(1)
+    if not errors:
+        print("✅ Layout valid")
+
+
+if __name__ == "__main__":
+    main()
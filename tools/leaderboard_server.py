@@ -0,0 +1,685 @@
+#!/usr/bin/env python3
+"""
+Local leaderboard service
+Backs the global board that scripts/v4/LeaderboardV4.gd cannot: every entry
+is kept (not just the top 100) in an order-statistics index per character
+plus one for "all". Each index is a list of sorted score buckets with a
+Fenwick tree over the bucket sizes, so submit, remove, rank and top-k (from
+any offset) cost O(log n) searches plus a bounded in-bucket insert.
+Submissions can be batched; each batch is one append to the operation log,
+which is periodically compacted into a snapshot on a background thread.
+Entries use the LeaderboardV4 JSON shape (id, initials, score, character,
+timestamp), and /export and /import speak export_leaderboard() and
+import_leaderboard() documents.
+--bench fills a board (1,000,000 entries by default) and reports p50/p99
+latency per operation, in-process or against a running server (--url).
+Usage: python3 tools/leaderboard_server.py --serve [--port N] [--data DIR] | --bench [N] [--url URL]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from bisect import bisect_left, insort
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+BASE_DIR = Path(__file__).parent.parent
+DATA_DIR = BASE_DIR / ".tools_cache" / "leaderboard"
+CHARACTERS = ("sparky", "dino", "dash", "android")  # LeaderboardV4._character_leaderboards
+MAX_ENTRIES = 100       # LeaderboardV4.MAX_ENTRIES (export size of the "all" board)
+LOCAL_CACHE_SIZE = 50   # LeaderboardV4.LOCAL_CACHE_SIZE (export size per character)
+BUCKET_LOAD = 512       # Buckets split at twice this size
+SEQ_SPAN = 1 << 40      # Sort key = -score * SEQ_SPAN + submission sequence
+COMPACT_MIN = 10000     # Log entries before compaction is considered
+
+
+# ---------------------------------------------------------------------------
+# Order-statistics index
+# ---------------------------------------------------------------------------
+
+class RankIndex:
+    """Sorted multiset of int keys with O(log n) rank and select
+
+    Keys live in sorted buckets of at most 2 * BUCKET_LOAD; a Fenwick tree
+    over the bucket sizes turns "keys before bucket i" into a prefix sum.
+    """
+
+    def __init__(self, keys=()):
+        keys = sorted(keys)
+        self.buckets = [keys[i:i + BUCKET_LOAD] for i in range(0, len(keys), BUCKET_LOAD)]
+        self.maxes = [bucket[-1] for bucket in self.buckets]
+        self.size = len(keys)
+        self._rebuild()
+
+    def __len__(self):
+        return self.size
+
+    def _rebuild(self):
+        tree = [0] + [len(bucket) for bucket in self.buckets]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def _add(self, i, delta):
+        tree = self.tree
+        i += 1
+        while i < len(tree):
+            tree[i] += delta
+            i += i & -i
+
+    def _prefix(self, i):
+        """Number of keys in buckets before bucket i"""
+        tree, total = self.tree, 0
+        while i:
+            total += tree[i]
+            i -= i & -i
+        return total
+
+    def _locate(self, position):
+        """(bucket, offset) of the key at 0-based position"""
+        tree, i, step = self.tree, 0, 1 << (len(self.tree).bit_length() - 1)
+        while step:
+            if i + step < len(tree) and tree[i + step] <= position:
+                i += step
+                position -= tree[i]
+            step >>= 1
+        return i, position
+
+    def insert(self, key):
+        if not self.buckets:
+            self.buckets.append([key])
+            self.maxes.append(key)
+            self.size = 1
+            self._rebuild()
+            return
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            i -= 1
+            self.buckets[i].append(key)
+            self.maxes[i] = key
+        else:
+            insort(self.buckets[i], key)
+        self.size += 1
+        bucket = self.buckets[i]
+        if len(bucket) > 2 * BUCKET_LOAD:
+            self.buckets[i:i + 1] = [bucket[:BUCKET_LOAD], bucket[BUCKET_LOAD:]]
+            self.maxes[i:i + 1] = [bucket[BUCKET_LOAD - 1], bucket[-1]]
+            self._rebuild()
+        else:
+            self._add(i, 1)
+
+    def remove(self, key):
+        """Remove key; returns False when it is not present"""
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return False
+        bucket = self.buckets[i]
+        j = bisect_left(bucket, key)
+        if j == len(bucket) or bucket[j] != key:
+            return False
+        del bucket[j]
+        self.size -= 1
+        if not bucket:
+            del self.buckets[i], self.maxes[i]
+            self._rebuild()
+        else:
+            self.maxes[i] = bucket[-1]
+            self._add(i, -1)
+        return True
+
+    def rank(self, key):
+        """Number of keys smaller than key"""
+        i = bisect_left(self.maxes, key)
+        if i == len(self.maxes):
+            return self.size
+        return self._prefix(i) + bisect_left(self.buckets[i], key)
+
+    def slice(self, start, count):
+        """Up to count keys from 0-based position start"""
+        if start >= self.size or count <= 0:
+            return []
+        i, j = self._locate(start)
+        out = self.buckets[i][j:j + count]
+        while len(out) < count and i + 1 < len(self.buckets):
+            i += 1
+            out.extend(self.buckets[i][:count - len(out)])
+        return out
+
+
+# ---------------------------------------------------------------------------
+# Leaderboard with append-only log
+# ---------------------------------------------------------------------------
+
+def normalize_entry(raw, default_id=None):
+    """LeaderboardV4 entry tuple (id, initials, score, character, timestamp); raises ValueError"""
+    if not isinstance(raw, dict):
+        raise ValueError("entry must be an object")
+    score = raw.get("score")
+    if isinstance(score, float) and score.is_integer():
+        score = int(score)
+    if not isinstance(score, int) or isinstance(score, bool) or score < 0:
+        raise ValueError(f"invalid score {score!r}")
+    initials = str(raw.get("initials", "")).upper()[:3]
+    character = str(raw.get("character") or "sparky")
+    if character == "all":
+        raise ValueError('"all" is not a character')
+    timestamp = raw.get("timestamp")
+    stamped = isinstance(timestamp, (int, float)) and not isinstance(timestamp, bool)
+    if not stamped:
+        timestamp = int(time.time())
+    entry_id = raw.get("id")
+    if not entry_id and stamped:
+        # Id-less entries (LeaderboardV4's defaults) get a content id, so re-imports dedupe them
+        content = json.dumps([initials, score, character, timestamp])
+        entry_id = "h_" + hashlib.sha1(content.encode()).hexdigest()[:16]
+    entry_id = entry_id or default_id
+    if not entry_id:
+        raise ValueError("entry has no id")
+    return str(entry_id), initials, score, character, timestamp
+
+
+def entry_json(entry):
+    entry_id, initials, score, character, timestamp = entry
+    return {"id": entry_id, "initials": initials, "score": score, "character": character, "timestamp": timestamp}
+
+
+class Leaderboard:
+    """Entries indexed per character and overall; changes go through the log in data_dir"""
+
+    def __init__(self, data_dir=None, fsync=False, compact_min=COMPACT_MIN):
+        self.lock = threading.RLock()
+        self.records = []        # seq -> entry tuple, None once removed
+        self.seq_of = {}         # id -> seq
+        self.boards = {"all": RankIndex()}
+        self.fsync = fsync
+        self.compact_min = compact_min
+        self.log_entries = 0
+        self.compactions = 0
+        self._compactor = None
+        self.data_dir = Path(data_dir) if data_dir else None
+        self._log = None
+        if self.data_dir:
+            self.data_dir.mkdir(parents=True, exist_ok=True)
+            self._load()
+            self._log = open(self.data_dir / "log.jsonl", "a", encoding="utf-8")
+
+    # -- persistence ---------------------------------------------------------
+
+    def _load(self):
+        """Snapshot, then the log being compacted (if any), then the live log, op by op in order
+
+        An add inserts or replaces its id and a remove deletes only what is live
+        at that point, so an entry removed and then submitted again survives, and
+        replaying log.old over a snapshot that already includes it is harmless.
+        """
+        live = {}
+        snapshot = self.data_dir / "snapshot.jsonl"
+        if snapshot.exists():
+            with open(snapshot, encoding="utf-8") as f:
+                for line in f:
+                    entry = normalize_entry(json.loads(line))
+                    live[entry[0]] = entry
+        for name in ("log.old.jsonl", "log.jsonl"):
+            path = self.data_dir / name
+            if not path.exists():
+                continue
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        op = json.loads(line)
+                    except ValueError:
+                        break  # torn final write
+                    for raw in op.get("add", ()):
+                        entry = normalize_entry(raw)
+                        live[entry[0]] = entry
+                    for entry_id in op.get("remove", ()):
+                        live.pop(entry_id, None)
+                    self.log_entries += len(op.get("add", ())) + len(op.get("remove", ()))
+        self._bulk_load(list(live.values()))
+
+    def _bulk_load(self, entries):
+        self.records = list(entries)
+        self.seq_of = {entry[0]: seq for seq, entry in enumerate(entries)}
+        keys = {"all": []}
+        for seq, entry in enumerate(entries):
+            key = -entry[2] * SEQ_SPAN + seq
+            keys["all"].append(key)
+            keys.setdefault(entry[3], []).append(key)
+        self.boards = {name: RankIndex(k) for name, k in keys.items()}
+
+    def _append_log(self, op):
+        if self._log is None:
+            return
+        self._log.write(json.dumps(op, separators=(",", ":")) + "\n")
+        self._log.flush()
+        if self.fsync:
+            os.fsync(self._log.fileno())
+        self.log_entries += len(op.get("add", ())) + len(op.get("remove", ()))
+
+    def _maybe_compact(self):
+        """Compact once the log holds as many operations as there are live entries"""
+        if self.log_entries >= max(self.compact_min, len(self.seq_of)):
+            self.compact()
+
+    def compact(self, wait=False):
+        """Rotate the log and write a snapshot of the live entries on a background thread"""
+        with self.lock:
+            if self._log is None or (self._compactor and self._compactor.is_alive()):
+                return False
+            old = self.data_dir / "log.old.jsonl"
+            if old.exists():
+                return False  # a previous compaction never finished; its log is still needed
+            self._log.close()
+            os.replace(self.data_dir / "log.jsonl", old)
+            self._log = open(self.data_dir / "log.jsonl", "a", encoding="utf-8")
+            self.log_entries = 0
+            live = [entry for entry in self.records if entry is not None]
+            self._compactor = threading.Thread(target=self._write_snapshot, args=(live, old), daemon=True)
+            self._compactor.start()
+        if wait:
+            self._compactor.join()
+        return True
+
+    def _write_snapshot(self, live, old):
+        snapshot = self.data_dir / "snapshot.jsonl"
+        tmp = snapshot.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            for start in range(0, len(live), 4096):
+                f.write("".join(json.dumps(entry_json(e), separators=(",", ":")) + "\n"
+                                for e in live[start:start + 4096]))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, snapshot)
+        old.unlink()
+        self.compactions += 1
+
+    def close(self):
+        with self.lock:
+            if self._compactor:
+                self._compactor.join()
+            if self._log:
+                self._log.close()
+                self._log = None
+
+    # -- updates -------------------------------------------------------------
+
+    def _insert(self, entry):
+        seq = len(self.records)
+        self.records.append(entry)
+        self.seq_of[entry[0]] = seq
+        key = -entry[2] * SEQ_SPAN + seq
+        self.boards["all"].insert(key)
+        board = self.boards.get(entry[3])
+        if board is None:
+            board = self.boards[entry[3]] = RankIndex()
+        board.insert(key)
+        return key
+
+    def submit_batch(self, raws):
+        """Add entries (ids already present are skipped); returns [(entry id, rank or None)]"""
+        with self.lock:
+            stamp = time.time_ns() // 1000000
+            added, new_ids, results = [], set(), []
+            for n, raw in enumerate(raws):
+                initials = str(raw.get("initials", "")).upper()[:3] if isinstance(raw, dict) else ""
+                entry = normalize_entry(raw, f"{stamp}_{len(self.records) + n}_{initials}")
+                fresh = entry[0] not in self.seq_of and entry[0] not in new_ids
+                if fresh:
+                    new_ids.add(entry[0])
+                    added.append(entry)
+                results.append((entry[0], fresh))
+            if added:
+                self._append_log({"add": [entry_json(e) for e in added]})
+            for entry in added:
+                self._insert(entry)
+            self._maybe_compact()
+            return [(entry_id, self.rank_of(entry_id) if fresh else None) for entry_id, fresh in results]
+
+    def submit(self, initials, score, character="sparky"):
+        """LeaderboardV4.submit_score(); returns the entry id"""
+        return self.submit_batch([{"initials": initials, "score": score, "character": character}])[0][0]
+
+    def remove(self, entry_ids):
+        """Remove entries by id; returns how many existed"""
+        with self.lock:
+            gone = [entry_id for entry_id in dict.fromkeys(entry_ids) if entry_id in self.seq_of]
+            if gone:
+                self._append_log({"remove": gone})
+            for entry_id in gone:
+                seq = self.seq_of.pop(entry_id)
+                entry = self.records[seq]
+                self.records[seq] = None
+                key = -entry[2] * SEQ_SPAN + seq
+                self.boards["all"].remove(key)
+                self.boards[entry[3]].remove(key)
+            self._maybe_compact()
+            return len(gone)
+
+    # -- queries -------------------------------------------------------------
+
+    def _board(self, character):
+        return self.boards.get(character or "all") or RankIndex()
+
+    def top(self, count=10, character="all", offset=0):
+        """LeaderboardV4.get_leaderboard(), with an optional offset for paging"""
+        with self.lock:
+            keys = self._board(character).slice(offset, count)
+            return [entry_json(self.records[key % SEQ_SPAN]) for key in keys]
+
+    def rank_of(self, entry_id, character="all"):
+        """1-based rank of an entry (ties go to the earlier submission), or None"""
+        with self.lock:
+            seq = self.seq_of.get(entry_id)
+            if seq is None:
+                return None
+            entry = self.records[seq]
+            if character not in ("all", "", None) and entry[3] != character:
+                return None
+            return self._board(character).rank(-entry[2] * SEQ_SPAN + seq) + 1
+
+    def rank_for_score(self, score, character="all"):
+        """Rank a new submission of score would get (after every existing equal score)"""
+        with self.lock:
+            return self._board(character).rank(-score * SEQ_SPAN + SEQ_SPAN - 1) + 1
+
+    def is_high_score(self, score, limit=MAX_ENTRIES, character="all"):
+        return self.rank_for_score(score, character) <= limit
+
+    def get(self, entry_id):
+        with self.lock:
+            seq = self.seq_of.get(entry_id)
+            return entry_json(self.records[seq]) if seq is not None else {}
+
+    def statistics(self):
+        """LeaderboardV4.get_statistics() over every entry"""
+        with self.lock:
+            top = self.top(1)
+            return {
+                "total_entries": len(self.seq_of),
+                "highest_score": top[0]["score"] if top else 0,
+                "character_counts": {name: len(board) for name, board in self.boards.items() if name != "all"},
+                "log_entries": self.log_entries,
+                "compactions": self.compactions,
+            }
+
+    # -- LeaderboardV4 documents ---------------------------------------------
+
+    def export(self, count=MAX_ENTRIES, per_character=LOCAL_CACHE_SIZE):
+        """export_leaderboard() document of the top entries"""
+        with self.lock:
+            characters = sorted(set(CHARACTERS) | (set(self.boards) - {"all"}))
+            return {
+                "entries": self.top(count),
+                "character_leaderboards": {c: self.top(per_character, c) for c in characters},
+                "export_timestamp": int(time.time()),
+            }
+
+    def import_document(self, data, merge=True):
+        """import_leaderboard(): entries from both lists, deduplicated by id; returns how many were added"""
+        if not isinstance(data, dict) or "entries" not in data:
+            raise ValueError('document has no "entries"')
+        raws = list(data["entries"])
+        for entries in data.get("character_leaderboards", {}).values():
+            raws.extend(entries)
+        with self.lock:
+            if not merge:
+                self.remove(list(self.seq_of))
+            return sum(rank is not None for _, rank in self.submit_batch(raws))
+
+
+# ---------------------------------------------------------------------------
+# HTTP service
+# ---------------------------------------------------------------------------
+
+class LeaderboardHandler(BaseHTTPRequestHandler):
+    """JSON API:
+    GET  /top?character=&count=&offset=   GET /rank?id= | ?score=&character=
+    GET  /entry?id=   GET /stats   GET /export
+    POST /scores (an entry, or {"entries": [...]})   POST /import?merge=0|1   POST /remove {"ids": [...]}
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # Small JSON replies: do not let Nagle wait on the client's delayed ACK
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload, separators=(",", ":")).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def do_GET(self):
+        board = self.server.board
+        parts = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+        character = query.get("character", "all")
+        try:
+            if parts.path == "/top":
+                return self._send(200, board.top(int(query.get("count", 10)), character, int(query.get("offset", 0))))
+            if parts.path == "/rank":
+                if "id" in query:
+                    rank = board.rank_of(query["id"], character)
+                    return self._send(200 if rank else 404, {"rank": rank})
+                return self._send(200, {"rank": board.rank_for_score(int(query["score"]), character)})
+            if parts.path == "/entry":
+                entry = board.get(query.get("id"))
+                return self._send(200 if entry else 404, entry)
+            if parts.path == "/stats":
+                return self._send(200, board.statistics())
+            if parts.path == "/export":
+                return self._send(200, board.export())
+        except (KeyError, ValueError) as e:
+            return self._send(400, {"error": str(e)})
+        self._send(404, {"error": f"unknown path {parts.path}"})
+
+    def do_POST(self):
+        board = self.server.board
+        parts = urlsplit(self.path)
+        try:
+            data = self._body()
+            if parts.path == "/scores":
+                raws = data["entries"] if isinstance(data, dict) and "entries" in data else [data]
+                results = board.submit_batch(raws)
+                return self._send(200, {"results": [{"id": i, "rank": r} for i, r in results]})
+            if parts.path == "/import":
+                merge = parse_qs(parts.query).get("merge", ["1"])[-1] != "0"
+                return self._send(200, {"added": board.import_document(data, merge)})
+            if parts.path == "/remove":
+                return self._send(200, {"removed": board.remove(data.get("ids", []))})
+        except (KeyError, ValueError, TypeError) as e:
+            return self._send(400, {"error": str(e)})
+        self._send(404, {"error": f"unknown path {parts.path}"})
+
+
+def serve(board, port=0):
+    """Start the service on a background thread; returns (server, base URL)"""
+    server = ThreadingHTTPServer(("127.0.0.1", port), LeaderboardHandler)
+    server.daemon_threads = True
+    server.board = board
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+class Client:
+    """Keep-alive JSON client for the service"""
+
+    def __init__(self, base):
+        self.netloc = urlsplit(base).netloc
+        self.conn = HTTPConnection(self.netloc, timeout=30)
+        self.conn.connect()
+        self.conn.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def call(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        self.conn.request(method, path, body=body, headers=headers)
+        response = self.conn.getresponse()
+        return response.status, json.loads(response.read() or b"null")
+
+    def close(self):
+        self.conn.close()
+
+
+# ---------------------------------------------------------------------------
+# Load generator
+# ---------------------------------------------------------------------------
+
+def _random_entry(rng, n):
+    # Long-tailed scores like real play: most games are short, a few run long
+    score = int(rng.lognormvariate(11.5, 1.1)) // 10 * 10
+    return {"initials": "".join(rng.choice("ABCDEFGHIJKLMNOPQRSTUVWXYZ") for _ in range(3)),
+            "score": score, "character": CHARACTERS[n % len(CHARACTERS)],
+            "timestamp": 1700000000 + n}
+
+
+def _percentiles(samples):
+    samples = sorted(samples)
+    pick = lambda q: samples[min(len(samples) - 1, int(q * len(samples)))] / 1000
+    return pick(0.50), pick(0.99), samples[-1] / 1000
+
+
+def bench(entries=1000000, ops=20000, batch=1000, url=None, seed=1):
+    """Fill a board with entries, then time each operation ops times; returns {name: (p50, p99, max) in µs}"""
+    rng = random.Random(seed)
+    tmp = None
+    if url:
+        client = Client(url)
+        call = client.call
+    else:
+        tmp = tempfile.TemporaryDirectory()
+        board = Leaderboard(tmp.name)
+
+    print(f"📊 Leaderboard load test: {entries:,} entries, {ops:,} ops per operation"
+          + (f" against {url}" if url else " in-process"))
+    print("=" * 60)
+    start = time.perf_counter()
+    ids = []
+    for first in range(0, entries, batch):
+        raws = [_random_entry(rng, n) for n in range(first, min(entries, first + batch))]
+        if url:
+            ids.extend(r["id"] for r in call("POST", "/scores", {"entries": raws})[1]["results"])
+        else:
+            ids.extend(entry_id for entry_id, _ in board.submit_batch(raws))
+    elapsed = time.perf_counter() - start
+    print(f"   fill: {entries / elapsed:,.0f} entries/s in batches of {batch} ({elapsed:.1f}s)")
+
+    if url:
+        operations = {
+            "submit": lambda n: call("POST", "/scores", _random_entry(rng, n)),
+            "submit x100": lambda n: call("POST", "/scores", {"entries": [_random_entry(rng, n + i) for i in range(100)]}),
+            "rank(id)": lambda n: call("GET", f"/rank?id={rng.choice(ids)}"),
+            "rank(score)": lambda n: call("GET", f"/rank?score={rng.randrange(2000000)}&character={CHARACTERS[n % 4]}"),
+            "top 10": lambda n: call("GET", f"/top?count=10&character={CHARACTERS[n % 4]}"),
+            "page 10": lambda n: call("GET", f"/top?count=10&offset={rng.randrange(entries)}"),
+        }
+    else:
+        operations = {
+            "submit": lambda n: board.submit_batch([_random_entry(rng, n)]),
+            "submit x100": lambda n: board.submit_batch([_random_entry(rng, n + i) for i in range(100)]),
+            "rank(id)": lambda n: board.rank_of(rng.choice(ids)),
+            "rank(score)": lambda n: board.rank_for_score(rng.randrange(2000000), CHARACTERS[n % 4]),
+            "top 10": lambda n: board.top(10, CHARACTERS[n % 4]),
+            "page 10": lambda n: board.top(10, "all", rng.randrange(entries)),
+        }
+    report = {}
+    clock = time.perf_counter_ns
+    for name, op in operations.items():
+        count = ops // 100 if name == "submit x100" else ops
+        samples = []
+        for n in range(count):
+            t = clock()
+            op(entries + n)
+            samples.append(clock() - t)
+        report[name] = _percentiles(samples)
+        p50, p99, worst = report[name]
+        print(f"   {name:<12} p50 {p50:>8.1f} µs   p99 {p99:>8.1f} µs   max {worst:>9.1f} µs")
+
+    if url:
+        client.close()
+    else:
+        stats = board.statistics()
+        board.close()
+        print(f"   log: {stats['compactions']} compactions, {stats['log_entries']:,} entries since the last")
+        start = time.perf_counter()
+        reloaded = Leaderboard(tmp.name)
+        print(f"   reload: {len(reloaded.seq_of):,} entries in {time.perf_counter() - start:.1f}s")
+        reloaded.close()
+        tmp.cleanup()
+    print("=" * 60)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local leaderboard service")
+    parser.add_argument("--serve", action="store_true", help="run the service until interrupted")
+    parser.add_argument("--port", type=int, default=8765, help="port for --serve")
+    parser.add_argument("--data", type=Path, default=DATA_DIR, help="snapshot and log directory")
+    parser.add_argument("--fsync", action="store_true", help="fsync the log after every batch")
+    parser.add_argument("--import", dest="import_path", type=Path, metavar="JSON",
+                        help="merge an export_leaderboard() document into --data")
+    parser.add_argument("--export", dest="export_path", metavar="JSON", help="write the top entries ('-' for stdout)")
+    parser.add_argument("--bench", type=int, nargs="?", const=1000000, metavar="N", help="load test with N entries")
+    parser.add_argument("--ops", type=int, default=20000, help="timed calls per operation (--bench)")
+    parser.add_argument("--batch", type=int, default=1000, help="entries per fill batch (--bench)")
+    parser.add_argument("--url", help="benchmark a running service instead of an in-process board")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench, args.ops, args.batch, args.url)
+        return
+    if not (args.serve or args.import_path or args.export_path):
+        parser.print_help()
+        return
+
+    start = time.perf_counter()
+    board = Leaderboard(args.data, fsync=args.fsync)
+    print(f"📂 {len(board.seq_of):,} entries loaded from {args.data} in {time.perf_counter() - start:.2f}s",
+          file=sys.stderr)
+    try:
+        if args.import_path:
+            with open(args.import_path, encoding="utf-8") as f:
+                added = board.import_document(json.load(f))
+            print(f"✅ Imported {added} new entries from {args.import_path}", file=sys.stderr)
+        if args.export_path:
+            text = json.dumps(board.export(), indent="\t")
+            if args.export_path == "-":
+                print(text)
+            else:
+                Path(args.export_path).write_text(text + "\n", encoding="utf-8")
+        if args.serve:
+            server, base = serve(board, args.port)
+            print(f"🌐 Leaderboard service at {base} (Ctrl+C to stop)", file=sys.stderr)
+            try:
+                while True:
+                    time.sleep(3600)
+            except KeyboardInterrupt:
+                server.shutdown()
+    finally:
+        board.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Pack the sprites of each zone into power-of-two texture atlases
+Every PNG under assets/sprites is trimmed to its opaque bounds and packed with
+MaxRects (best short side fit) into atlases per zone (the first folder under
+assets/sprites; loose files form the "common" zone). For each sprite an
+AtlasTexture .tres is written whose region/margin restore the original size,
+and atlas_index.json maps every original res:// path to its AtlasTexture so
+AssetLoaderV4 can keep loading sprites by their old paths.
+Sprites larger than --max-sprite stay standalone textures.
+Usage: python3 tools/pack_atlases.py [--max-size N] [--max-sprite N] [--padding N]
+                                     [--rotate] [--zone NAME] [--out DIR] [--dry-run]
+"""
+
+import argparse
+import json
+import time
+from collections import namedtuple
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from build_assets import write_if_changed
+from png_reader import read_png
+from png_writer import encode_png
+
+BASE_DIR = Path(__file__).parent.parent
+SPRITES_DIR = BASE_DIR / "assets" / "sprites"
+ATLAS_DIR = BASE_DIR / "assets" / "atlases"
+INDEX_NAME = "atlas_index.json"
+COMMON_ZONE = "common"
+
+MAX_SIZE = 2048     # Largest atlas page, safe for low-end mobile GPUs
+MAX_SPRITE = 1024   # Trimmed sprites wider or taller than this stay standalone
+PADDING = 2         # Transparent pixels between packed sprites (filtering bleed)
+
+# A source sprite: trim is the (x, y, w, h) of its visible pixels
+Sprite = namedtuple("Sprite", "key path zone width height trim")
+# A packed sprite: position of its trimmed pixels on an atlas page
+Placement = namedtuple("Placement", "sprite x y rotated")
+Page = namedtuple("Page", "zone index width height placements")
+
+
+def res_path(path):
+    """Godot res:// path of a file inside the project (plain path for files outside it)"""
+    path = Path(path).resolve()
+    try:
+        return "res://" + path.relative_to(BASE_DIR.resolve()).as_posix()
+    except ValueError:
+        return path.as_posix()
+
+
+# ---------------------------------------------------------------------------
+# Loading and trimming
+# ---------------------------------------------------------------------------
+
+def trim_bounds(pixels, width, height):
+    """Bounding box (x, y, w, h) of the pixels with non-zero alpha (1x1 if none)"""
+    if NUMPY_AVAILABLE:
+        alpha = np.asarray(pixels).reshape(height, width, 4)[:, :, 3]
+        rows = np.flatnonzero(alpha.any(axis=1))
+        if not len(rows):
+            return (0, 0, 1, 1)
+        cols = np.flatnonzero(alpha.any(axis=0))
+        return (int(cols[0]), int(rows[0]), int(cols[-1] - cols[0] + 1), int(rows[-1] - rows[0] + 1))
+    alpha = bytes(pixels)[3::4]
+    empty = bytes(width)
+    rows = [y for y in range(height) if alpha[y * width:(y + 1) * width] != empty]
+    if not rows:
+        return (0, 0, 1, 1)
+    x0, x1 = width, -1
+    for y in rows:
+        line = alpha[y * width:(y + 1) * width]
+        x0 = min(x0, next(x for x in range(width) if line[x]))
+        x1 = max(x1, next(x for x in range(width - 1, -1, -1) if line[x]))
+    return (x0, rows[0], x1 - x0 + 1, rows[-1] - rows[0] + 1)
+
+
+def zone_of(path):
+    """Zone of a sprite: its first folder under assets/sprites"""
+    parts = path.relative_to(SPRITES_DIR).parts
+    return parts[0] if len(parts) > 1 else COMMON_ZONE
+
+
+def load_sprites(zone=None):
+    """Decode and trim every sprite; returns {res path: Sprite} and {res path: pixels}"""
+    sprites = {}
+    pixels = {}
+    for path in sorted(SPRITES_DIR.rglob("*.png")):
+        if zone and zone_of(path) != zone:
+            continue
+        width, height, data = read_png(path)
+        key = res_path(path)
+        sprites[key] = Sprite(key, path, zone_of(path), width, height, trim_bounds(data, width, height))
+        pixels[key] = data
+    return sprites, pixels
+
+
+# ---------------------------------------------------------------------------
+# MaxRects bin packing
+# ---------------------------------------------------------------------------
+
+class MaxRectsBin:
+    """One bin packed with the MaxRects algorithm (best short side fit)
+
+    The free space is kept as a list of maximal free rectangles; each placed
+    rectangle splits every free rectangle it overlaps, and rectangles that end
+    up inside another are pruned.
+    """
+
+    def __init__(self, width, height, allow_rotation=False):
+        self.width = width
+        self.height = height
+        self.allow_rotation = allow_rotation
+        self.free = [(0, 0, width, height)]
+
+    def _score(self, w, h):
+        """Best (short side, long side, x, y) leftover over the free rectangles"""
+        best = None
+        for fx, fy, fw, fh in self.free:
+            if w <= fw and h <= fh:
+                leftover = (min(fw - w, fh - h), max(fw - w, fh - h), fx, fy)
+                if best is None or leftover < best:
+                    best = leftover
+        return best
+
+    def insert(self, w, h):
+        """Place a w x h rectangle; returns (x, y, rotated) or None if it does not fit"""
+        best = self._score(w, h)
+        rotated = False
+        if self.allow_rotation and w != h:
+            turned = self._score(h, w)
+            if turned is not None and (best is None or turned < best):
+                best, rotated = turned, True
+        if best is None:
+            return None
+        x, y = best[2], best[3]
+        if rotated:
+            w, h = h, w
+        self._split(x, y, w, h)
+        return x, y, rotated
+
+    def _split(self, x, y, w, h):
+        kept = []
+        for fx, fy, fw, fh in self.free:
+            if x >= fx + fw or x + w <= fx or y >= fy + fh or y + h <= fy:
+                kept.append((fx, fy, fw, fh))
+                continue
+            if x > fx:
+                kept.append((fx, fy, x - fx, fh))
+            if x + w < fx + fw:
+                kept.append((x + w, fy, fx + fw - x - w, fh))
+            if y > fy:
+                kept.append((fx, fy, fw, y - fy))
+            if y + h < fy + fh:
+                kept.append((fx, y + h, fw, fy + fh - y - h))
+        # Prune rectangles contained in another one
+        kept = sorted(set(kept), key=lambda r: r[2] * r[3], reverse=True)
+        self.free = []
+        for r in kept:
+            if not any(r[0] >= o[0] and r[1] >= o[1] and r[0] + r[2] <= o[0] + o[2] and r[1] + r[3] <= o[1] + o[3]
+                       for o in self.free):
+                self.free.append(r)
+
+
+def _pack_bin(sprites, width, height, padding, allow_rotation):
+    """Pack all sprites into one width x height bin; returns placements or None"""
+    # Every rectangle and the bin grow by the padding, so only inner edges are padded
+    packer = MaxRectsBin(width + padding, height + padding, allow_rotation)
+    placements = []
+    for sprite in sprites:
+        spot = packer.insert(sprite.trim[2] + padding, sprite.trim[3] + padding)
+        if spot is None:
+            return None
+        placements.append(Placement(sprite, *spot))
+    return placements
+
+
+def _pot_sizes(min_area, max_size):
+    """Power-of-two (width, height) pairs up to max_size, smallest area first"""
+    sizes = []
+    w = 1
+    while w <= max_size:
+        h = 1
+        while h <= max_size:
+            if w * h >= min_area:
+                sizes.append((w * h, max(w, h), w, h))
+            h *= 2
+        w *= 2
+    return [(w, h) for _, _, w, h in sorted(sizes)]
+
+
+def pack_zone(sprites, max_size=MAX_SIZE, padding=PADDING, allow_rotation=False):
+    """Pack one zone's sprites into as few power-of-two pages as possible"""
+    order = sorted(sprites, key=lambda s: (max(s.trim[2], s.trim[3]), s.trim[2] * s.trim[3], s.key), reverse=True)
+    # First fill full-size pages greedily, then shrink each to the smallest power of two
+    groups = []
+    for sprite in order:
+        for group in groups:
+            if group[0].insert(sprite.trim[2] + padding, sprite.trim[3] + padding):
+                group[1].append(sprite)
+                break
+        else:
+            packer = MaxRectsBin(max_size + padding, max_size + padding, allow_rotation)
+            packer.insert(sprite.trim[2] + padding, sprite.trim[3] + padding)
+            groups.append((packer, [sprite]))
+
+    pages = []
+    for index, (_, members) in enumerate(groups):
+        area = sum((s.trim[2] + padding) * (s.trim[3] + padding) for s in members)
+        # The full max_size page always succeeds: it repeats the greedy packing
+        for width, height in _pot_sizes(area, max_size):
+            placements = _pack_bin(members, width, height, padding, allow_rotation)
+            if placements:
+                break
+        pages.append(Page(members[0].zone, index, width, height, placements))
+    return pages
+
+
+# ---------------------------------------------------------------------------
+# Output
+# ---------------------------------------------------------------------------
+
+def _blit(atlas, width, placement, data):
+    """Copy a sprite's trimmed pixels into the atlas (rotated 90 degrees clockwise if needed)"""
+    sprite = placement.sprite
+    tx, ty, tw, th = sprite.trim
+    if NUMPY_AVAILABLE:
+        block = np.asarray(data).reshape(sprite.height, sprite.width, 4)[ty:ty + th, tx:tx + tw]
+        if placement.rotated:
+            block = np.rot90(block, k=-1)
+        atlas[placement.y:placement.y + block.shape[0], placement.x:placement.x + block.shape[1]] = block
+        return
+    src = memoryview(data)
+    if not placement.rotated:
+        for row in range(th):
+            start = ((ty + row) * sprite.width + tx) * 4
+            dest = ((placement.y + row) * width + placement.x) * 4
+            atlas[dest:dest + tw * 4] = src[start:start + tw * 4]
+        return
+    for row in range(th):
+        for col in range(tw):
+            start = ((ty + row) * sprite.width + tx + col) * 4
+            dest = ((placement.y + col) * width + placement.x + th - 1 - row) * 4
+            atlas[dest:dest + 4] = src[start:start + 4]
+
+
+def render_page(page, pixels):
+    """RGBA8 pixels of one atlas page"""
+    if NUMPY_AVAILABLE:
+        atlas = np.zeros((page.height, page.width, 4), dtype=np.uint8)
+    else:
+        atlas = bytearray(page.width * page.height * 4)
+    for placement in page.placements:
+        _blit(atlas, page.width, placement, pixels[placement.sprite.key])
+    return atlas
+
+
+def atlas_texture_tres(atlas_path, placement):
+    """AtlasTexture resource text for one packed (unrotated) sprite"""
+    sprite = placement.sprite
+    tx, ty, tw, th = sprite.trim
+    return (
+        '[gd_resource type="AtlasTexture" load_steps=2 format=3]\n\n'
+        f'[ext_resource type="Texture2D" path="{atlas_path}" id="1_atlas"]\n\n'
+        '[resource]\n'
+        'atlas = ExtResource("1_atlas")\n'
+        f'region = Rect2({placement.x}, {placement.y}, {tw}, {th})\n'
+        f'margin = Rect2({tx}, {ty}, {sprite.width - tw}, {sprite.height - th})\n'
+        'filter_clip = true\n'
+    )
+
+
+def write_atlases(pages, pixels, standalone, out_dir, options):
+    """Write atlas PNGs, AtlasTexture resources and the JSON index; returns the index"""
+    index = {"version": 1, "options": options, "atlases": [], "sprites": {}, "standalone": sorted(standalone)}
+    for page in pages:
+        png = out_dir / page.zone / f"{page.zone}_{page.index}.png"
+        atlas_path = res_path(png)
+        write_if_changed(png, encode_png(render_page(page, pixels), page.width, page.height))
+        used = sum(p.sprite.trim[2] * p.sprite.trim[3] for p in page.placements)
+        index["atlases"].append({
+            "path": atlas_path, "zone": page.zone, "width": page.width, "height": page.height,
+            "sprites": len(page.placements), "occupancy": round(used / (page.width * page.height), 4),
+        })
+        for placement in page.placements:
+            sprite = placement.sprite
+            tx, ty, tw, th = sprite.trim
+            texture = None
+            # AtlasTexture has no rotation, so rotated sprites are only described in the index
+            if not placement.rotated:
+                rel = sprite.path.relative_to(SPRITES_DIR).with_suffix(".tres")
+                tres = out_dir / (rel if sprite.zone != COMMON_ZONE else Path(COMMON_ZONE) / rel)
+                write_if_changed(tres, atlas_texture_tres(atlas_path, placement).encode())
+                texture = res_path(tres)
+            index["sprites"][sprite.key] = {
+                "atlas": atlas_path, "texture": texture, "rotated": placement.rotated,
+                "region": [placement.x, placement.y, tw, th],
+                "margin": [tx, ty, sprite.width - tw, sprite.height - th],
+                "size": [sprite.width, sprite.height],
+            }
+    index["sprites"] = dict(sorted(index["sprites"].items()))
+    write_if_changed(out_dir / INDEX_NAME, (json.dumps(index, indent=1) + "\n").encode())
+    return index
+
+
+def print_report(sprites, pages, standalone):
+    """Occupancy, memory and estimated draw calls per zone"""
+    print(f"{'zone':18} {'sprites':>7} {'pages':>5} {'standalone':>10} {'occupancy':>9} "
+          f"{'MiB before':>10} {'MiB after':>9} {'draws':>9}")
+    print("-" * 86)
+    totals = [0, 0, 0, 0, 0]
+    for zone in sorted({s.zone for s in sprites.values()}):
+        members = [s for s in sprites.values() if s.zone == zone]
+        zone_pages = [p for p in pages if p.zone == zone]
+        alone = [s for s in members if s.key in standalone]
+        page_area = sum(p.width * p.height for p in zone_pages)
+        used = sum(pl.sprite.trim[2] * pl.sprite.trim[3] for p in zone_pages for pl in p.placements)
+        before = sum(s.width * s.height * 4 for s in members)
+        after = page_area * 4 + sum(s.width * s.height * 4 for s in alone)
+        # One draw call per distinct texture when a zone's sprites are drawn together
+        draws_before = len(members)
+        draws_after = len(zone_pages) + len(alone)
+        occupancy = f"{100 * used / page_area:8.1f}%" if page_area else f"{'-':>9}"
+        print(f"{zone:18} {len(members):7d} {len(zone_pages):5d} {len(alone):10d} {occupancy} "
+              f"{before / 2**20:10.2f} {after / 2**20:9.2f} {draws_before:4d}->{draws_after:<4d}")
+        for i, value in enumerate((before, after, draws_before, draws_after, len(members))):
+            totals[i] += value
+    print("-" * 86)
+    before, after, draws_before, draws_after, count = totals
+    print(f"📊 {count} sprites, {len(pages)} atlas pages, {len(standalone)} standalone")
+    print(f"   Texture memory (RGBA8): {before / 2**20:.1f} MiB -> {after / 2**20:.1f} MiB")
+    if draws_before:
+        print(f"   Estimated draw calls: {draws_before} -> {draws_after} "
+              f"({100 * (1 - draws_after / draws_before):.0f}% fewer)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack sprites into per-zone power-of-two atlases")
+    parser.add_argument("--max-size", type=int, default=MAX_SIZE, help="largest atlas page side (power of two)")
+    parser.add_argument("--max-sprite", type=int, default=MAX_SPRITE,
+                        help="trimmed sprites with a larger side stay standalone")
+    parser.add_argument("--padding", type=int, default=PADDING, help="transparent pixels between sprites")
+    parser.add_argument("--rotate", action="store_true",
+                        help="allow 90 degree rotation (rotated sprites get no AtlasTexture, index only)")
+    parser.add_argument("--zone", default=None, help="only pack this zone")
+    parser.add_argument("--out", type=Path, default=ATLAS_DIR, help="output directory")
+    parser.add_argument("--dry-run", action="store_true", help="pack and report without writing files")
+    args = parser.parse_args()
+
+    print("🧩 Sprite Atlas Packer")
+    print("=" * 60)
+    start = time.perf_counter()
+    sprites, pixels = load_sprites(args.zone)
+    limit = min(args.max_sprite, args.max_size)
+    standalone = {s.key for s in sprites.values() if max(s.trim[2], s.trim[3]) > limit}
+    pages = []
+    for zone in sorted({s.zone for s in sprites.values()}):
+        members = [s for s in sprites.values() if s.zone == zone and s.key not in standalone]
+        if members:
+            pages.extend(pack_zone(members, args.max_size, args.padding, args.rotate))
+    if not args.dry_run:
+        options = {"max_size": args.max_size, "max_sprite": args.max_sprite,
+                   "padding": args.padding, "rotate": args.rotate}
+        write_atlases(pages, pixels, standalone, args.out, options)
+        print(f"✅ Wrote {len(pages)} atlases and {INDEX_NAME} to {args.out}")
+    print_report(sprites, pages, standalone)
+    print(f"⏱️  {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
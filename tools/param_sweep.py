@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+Parallel parameter sweeps over item physics_stats with a resumable result cache
+A sweep varies some physics_stats of one item from config/items_database.json
+(ball or flipper) over a grid, uniform-random or Latin-hypercube design and
+scores every point with an evaluation function. Points fan out over a process
+pool whose workers keep warm state (items database, resolved evaluator and
+the evaluator's own reference runs) between points. Every result is stored in
+.tools_cache/param_sweep/ under a hash of the evaluator and its source (with
+pinball_sim and every other tools/ module it imports), item, parameters,
+settings and the reference items' stats, so an interrupted or repeated sweep only evaluates missing points.
+Rows stream into a CSV as points complete.
+The default evaluator runs pinball_sim against the category's reference item
+(ball_standard / flipper_standard) and reports the survival vs scoring
+trade-off: balance = |ln(bumper hits per ball / reference)|, 0 when the
+survival an item buys is paid for exactly in scoring rate (e.g. ball_heavy's
+mass against ball_standard). Custom evaluators are "module:function" (or
+"path/to/file.py:function") taking (item_id, stats, settings) and returning a
+dict of numbers.
+Usage: python3 tools/param_sweep.py ITEM --param NAME=LOW:HIGH [--param ...] [--design grid|random|lhs] [--points N] [--out sweep.csv]
+"""
+
+import argparse
+import csv
+import hashlib
+import importlib
+import importlib.util
+import itertools
+import json
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from build_assets import TOOLS_DIR, source_hash
+
+BASE_DIR = Path(__file__).parent.parent
+ITEMS_PATH = BASE_DIR / "config" / "items_database.json"
+CACHE_DIR = BASE_DIR / ".tools_cache" / "param_sweep"
+DEFAULT_EVAL = "param_sweep:balance"
+REFERENCE_ITEMS = {"ball": "ball_standard", "flipper": "flipper_standard"}
+DESIGNS = ("grid", "random", "lhs")
+
+# Worker-local state, filled once per process by _init_worker
+_WARM = {}
+
+
+# ---------------------------------------------------------------------------
+# Designs
+# ---------------------------------------------------------------------------
+
+def parse_param(text):
+    """'mass=0.4:1.2' -> ("mass", 0.4, 1.2); 'mass=0.6' fixes the value"""
+    name, sep, span = text.partition("=")
+    if not sep:
+        raise ValueError(f"expected NAME=LOW:HIGH, got {text!r}")
+    low, _, high = span.partition(":")
+    return name.strip(), float(low), float(high or low)
+
+
+def grid_design(ranges, points):
+    """Every combination of `points` evenly spaced values per parameter"""
+    axes = []
+    for _, low, high in ranges:
+        count = points if high != low else 1
+        axes.append([low + (high - low) * i / max(count - 1, 1) for i in range(count)])
+    return [list(values) for values in itertools.product(*axes)]
+
+
+def random_design(ranges, points, seed=0):
+    rng = random.Random(seed)
+    return [[rng.uniform(low, high) for _, low, high in ranges] for _ in range(points)]
+
+
+def lhs_design(ranges, points, seed=0):
+    """Latin hypercube: each parameter's range is cut into `points` strata, each used exactly once"""
+    rng = random.Random(seed)
+    columns = []
+    for _, low, high in ranges:
+        strata = list(range(points))
+        rng.shuffle(strata)
+        columns.append([low + (high - low) * (s + rng.random()) / points for s in strata])
+    return [list(row) for row in zip(*columns)]
+
+
+def make_design(ranges, design="grid", points=5, seed=0):
+    if design == "grid":
+        return grid_design(ranges, points)
+    if design == "random":
+        return random_design(ranges, points, seed)
+    if design == "lhs":
+        return lhs_design(ranges, points, seed)
+    raise ValueError(f"unknown design {design!r} (expected one of {', '.join(DESIGNS)})")
+
+
+# ---------------------------------------------------------------------------
+# Evaluation
+# ---------------------------------------------------------------------------
+
+def load_items(path=ITEMS_PATH):
+    with open(path) as f:
+        return json.load(f)["items"]
+
+
+def resolve_eval(spec):
+    """'module:function' or 'path/to/file.py:function' -> callable"""
+    if spec == DEFAULT_EVAL:
+        return balance
+    target, _, name = spec.rpartition(":")
+    if target.endswith(".py"):
+        module_spec = importlib.util.spec_from_file_location(Path(target).stem, target)
+        module = importlib.util.module_from_spec(module_spec)
+        module_spec.loader.exec_module(module)
+    else:
+        module = importlib.import_module(target)
+    return getattr(module, name)
+
+
+def point_stats(item, names, values):
+    """The item's physics_stats with the swept values applied (integers stay integers)"""
+    stats = dict(item["physics_stats"])
+    for name, value in zip(names, values):
+        if name not in stats:
+            raise KeyError(f"{item['id']} has no physics_stats field {name!r}")
+        stats[name] = round(value) if isinstance(stats[name], int) else round(value, 6)
+    return stats
+
+
+def eval_source_hash(spec):
+    """Hash of the evaluator's source and every tools/ module it pulls in (pinball_sim for the default)"""
+    target = spec.rpartition(":")[0]
+    path = Path(target) if target.endswith(".py") else TOOLS_DIR / f"{target}.py"
+    if path.resolve().parent == TOOLS_DIR.resolve() and path.exists():
+        return source_hash(path.stem)
+    if not target.endswith(".py"):
+        path = Path(importlib.util.find_spec(target).origin)
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def cache_key(eval_spec, item_id, stats, settings, items):
+    """Result key: evaluator source, item, swept stats, settings and the reference items' stats"""
+    references = {ref: items[ref]["physics_stats"] for ref in REFERENCE_ITEMS.values() if ref in items}
+    text = json.dumps({"eval": eval_spec, "source": eval_source_hash(eval_spec), "item": item_id,
+                       "stats": stats, "settings": settings, "references": references}, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def load_cached(key):
+    try:
+        with open(CACHE_DIR / f"{key}.json") as f:
+            return json.load(f)["metrics"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def store_cached(key, item_id, stats, metrics):
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = CACHE_DIR / f"{key}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        json.dump({"item": item_id, "stats": stats, "metrics": metrics}, f)
+    os.replace(tmp, CACHE_DIR / f"{key}.json")
+
+
+def _sim_metrics(result):
+    return {
+        "drain_time": result["mean_drain_time"],
+        "survival": result["survival"],
+        "stuck_in_lane": result.get("stuck_in_lane", 0.0),
+        "bumper_hits_per_ball": result["bumper_hits_per_ball"],
+        "bumper_hits_per_minute": result["bumper_hits_per_minute"],
+        "flipper_hits_per_ball": result["flipper_hits_per_ball"],
+    }
+
+
+def balance(item_id, stats, settings):
+    """Default evaluator: simulate the item against its category's reference item"""
+    import pinball_sim
+
+    items = _WARM.get("items") or load_items()
+    category = items[item_id]["category"]
+    reference = REFERENCE_ITEMS[category]
+    candidate = dict(items[item_id], physics_stats=stats)
+    pair = {"ball": REFERENCE_ITEMS["ball"], "flipper": REFERENCE_ITEMS["flipper"]}
+    sim_items = dict(items, _candidate=candidate)
+    config = pinball_sim.make_config(**{**pair, category: "_candidate"}, items=sim_items)
+    sim_args = (settings["balls"], settings["seconds"], pinball_sim.DT, settings["seed"])
+
+    # The reference run is the same for every point, so each worker simulates it once
+    ref_key = (reference, json.dumps(settings, sort_keys=True))
+    if ref_key not in _WARM:
+        _WARM[ref_key] = _sim_metrics(pinball_sim.simulate([pinball_sim.make_config(**pair, items=items)],
+                                                           *sim_args)[0])
+    ref = _WARM[ref_key]
+    metrics = _sim_metrics(pinball_sim.simulate([config], *sim_args)[0])
+    ratio = metrics["bumper_hits_per_ball"] / max(ref["bumper_hits_per_ball"], 1e-9)
+    metrics.update(
+        drain_ratio=metrics["drain_time"] / max(ref["drain_time"], 1e-9),
+        scoring_ratio=metrics["bumper_hits_per_minute"] / max(ref["bumper_hits_per_minute"], 1e-9),
+        value_ratio=ratio,
+        balance=abs(math.log(max(ratio, 1e-9))),
+    )
+    return metrics
+
+
+def _init_worker(eval_spec):
+    _WARM["items"] = load_items()
+    _WARM["evaluate"] = resolve_eval(eval_spec)
+
+
+def _evaluate(task):
+    """Worker entry: evaluate one point and cache its metrics"""
+    index, key, item_id, stats, settings = task
+    if "evaluate" not in _WARM:
+        raise RuntimeError("worker not initialised")
+    metrics = _WARM["evaluate"](item_id, stats, settings)
+    store_cached(key, item_id, stats, metrics)
+    return index, metrics
+
+
+# ---------------------------------------------------------------------------
+# Sweep
+# ---------------------------------------------------------------------------
+
+def sweep(item_id, ranges, design="grid", points=5, eval_spec=DEFAULT_EVAL, settings=None,
+          out=None, jobs=None, seed=0, use_cache=True):
+    """Evaluate every design point (cached points are free); yields (index, values, metrics, cached)"""
+    settings = dict({"balls": 100, "seconds": 20.0, "seed": seed}, **(settings or {}))
+    items = load_items()
+    if item_id not in items:
+        raise KeyError(f"unknown item {item_id!r}")
+    names = [name for name, _, _ in ranges]
+    rows = make_design(ranges, design, points, seed)
+    tasks = []
+    for index, values in enumerate(rows):
+        stats = point_stats(items[item_id], names, values)
+        key = cache_key(eval_spec, item_id, stats, settings, items)
+        metrics = load_cached(key) if use_cache else None
+        if metrics is not None:
+            yield index, stats, metrics, True
+        else:
+            tasks.append((index, key, item_id, stats, settings))
+    stats_of = {task[0]: task[3] for task in tasks}
+
+    jobs = min(jobs or os.cpu_count() or 1, len(tasks))
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(eval_spec,)) as pool:
+            for future in as_completed([pool.submit(_evaluate, task) for task in tasks]):
+                index, metrics = future.result()
+                yield index, stats_of[index], metrics, False
+    elif tasks:
+        _init_worker(eval_spec)
+        for task in tasks:
+            index, metrics = _evaluate(task)
+            yield index, stats_of[index], metrics, False
+
+
+class CsvStream:
+    """CSV writer whose header is fixed by the first row; flushed after every row"""
+
+    def __init__(self, path):
+        self.file = open(path, "w", newline="")
+        self.writer = None
+
+    def write(self, row):
+        if self.writer is None:
+            self.writer = csv.DictWriter(self.file, fieldnames=list(row))
+            self.writer.writeheader()
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel physics_stats sweep with a resumable cache")
+    parser.add_argument("item", help="item id from config/items_database.json (ball or flipper)")
+    parser.add_argument("--param", action="append", required=True, metavar="NAME=LOW:HIGH",
+                        help="physics_stats field to vary (repeatable)")
+    parser.add_argument("--design", choices=DESIGNS, default="grid")
+    parser.add_argument("--points", type=int, default=5, help="values per axis (grid) or total points")
+    parser.add_argument("--eval", default=DEFAULT_EVAL, metavar="MODULE:FUNC", help="evaluation function")
+    parser.add_argument("--balls", type=int, default=100, help="balls per simulation (default evaluator)")
+    parser.add_argument("--seconds", type=float, default=20.0, help="simulated seconds (default evaluator)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", default="sweep.csv", help="CSV output path")
+    parser.add_argument("--no-cache", action="store_true", help="re-evaluate cached points")
+    args = parser.parse_args()
+
+    ranges = [parse_param(p) for p in args.param]
+    settings = {"balls": args.balls, "seconds": args.seconds, "seed": args.seed}
+    print(f"🔬 Sweeping {args.item}: {', '.join(f'{n}={lo:g}..{hi:g}' for n, lo, hi in ranges)} ({args.design})")
+    print("=" * 60)
+    start = time.perf_counter()
+    stream = CsvStream(args.out)
+    done = cached = stuck = 0
+    best = None
+    try:
+        for index, stats, metrics, hit in sweep(args.item, ranges, args.design, args.points, args.eval,
+                                                settings, jobs=args.jobs, seed=args.seed,
+                                                use_cache=not args.no_cache):
+            stream.write({"point": index, "item": args.item, **stats, **metrics})
+            done += 1
+            cached += hit
+            # A point whose balls cannot leave the shooter lane is broken, not balanced
+            if metrics.get("stuck_in_lane", 0) > 0:
+                stuck += 1
+            elif "balance" in metrics and (best is None or metrics["balance"] < best[1]["balance"]):
+                best = (stats, metrics)
+            values = ", ".join(f"{n}={stats[n]:g}" for n, _, _ in ranges)
+            summary = ", ".join(f"{k}={v:.3g}" for k, v in metrics.items() if isinstance(v, (int, float)))
+            print(f"{'⏭️ ' if hit else '✅'} #{index:<4} {values}: {summary}")
+    finally:
+        stream.close()
+    print("=" * 60)
+    print(f"📊 {done} points ({cached} cached) in {time.perf_counter() - start:.1f}s -> {args.out}")
+    if stuck:
+        print(f"⚠️  {stuck} point(s) had balls stuck in the shooter lane and are not considered for the best")
+    if best:
+        print(f"⚖️  Most balanced: {json.dumps(best[0])} (balance {best[1]['balance']:.3f})")
+
+
+if __name__ == "__main__":
+    main()
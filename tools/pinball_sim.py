@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+Headless deterministic pinball physics simulator for batch tuning
+Balls are rigid circles on the v4 table: walls, flippers, the three bumper
+clusters, kickers and obstacles are placed from the Flutter layout in
+calculate_positions.py (same SCALE / CENTER as CoordinateConverterV4), and the
+physics constants follow the Godot scripts (BumperV4 impulse, Flipper.gd
+elasticity, Launcher.gd force range, Godot's default gravity and damping).
+Every ball is an independent trial with its own item configuration (ball
+physics_stats from config/items_database.json, flipper length / speed /
+power, bumper force), so thousands of balls across many configurations step
+together as NumPy arrays at a fixed timestep. A simple autoplayer flips when
+the ball reaches a flipper. Each configuration reports drain-time
+percentiles, survival and bumper / flipper hit rates. A ball whose launches
+keep falling back without clearing the lane gate (too heavy for the launcher)
+is retired as stuck: it is reported separately and left out of the other
+statistics, so it cannot pass for a ball that never drains.
+Runs are deterministic: launch strengths are drawn per configuration from a
+seed derived from the configuration itself, so a configuration's result does
+not depend on what else is in the batch.
+Usage: python3 tools/pinball_sim.py [--balls N] [--seconds S] [--ball ID ...] [--flipper ID ...] [--json PATH]
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import sys
+import time
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from calculate_positions import (BOARD_HALF_HEIGHT, BOARD_HALF_WIDTH, SCALE, component_position,
+                                 flutter_to_godot)
+
+BASE_DIR = Path(__file__).parent.parent
+ITEMS_PATH = BASE_DIR / "config" / "items_database.json"
+
+DT = 1.0 / 240.0             # Fixed timestep (four substeps per 60 Hz physics tick, no tunnelling)
+GRAVITY = 980.0              # Godot default 2D gravity, px/s^2
+DEFAULT_LINEAR_DAMP = 0.1    # Project default damp, combined (added) with the body's own
+BALL_RADIUS = 12.0           # scenes/Ball.tscn
+WALL_THICKNESS = 4.0
+MAX_SPEED = 3000.0           # px/s; keeps per-step travel below the wall contact reach
+BUMPER_RADIUS = 25.0         # scenes/zones/*/Android*Bumper*.tscn
+BUMPER_FORCE = 300.0         # BumperV4._apply_bounce_impulse / DifficultySystem "normal"
+BUMPER_COOLDOWN = 0.2        # BumperV4.hit_cooldown
+KICKER_RADIUS = 15.0
+KICKER_IMPULSE = 335.0       # |Vector2(300, -150)|, the DinoDesertV4 slingshot impulse
+LAUNCH_FORCE = (400.0, 800.0)  # Launcher.gd base_launch_force .. max_launch_force
+FLIPPER_REST = math.radians(30.0)      # Flipper.gd rest_angle
+FLIPPER_PRESSED = math.radians(-10.0)  # Flipper.gd pressed_angle
+FLIPPER_ELASTICITY = 0.7     # Flipper.gd elasticity
+FLIPPER_THICKNESS = 6.0
+FLIPPER_HOLD = 0.25          # Autoplayer: seconds a flip is held
+FLIPPER_RELEASE = 0.15       # Autoplayer: seconds released before flipping again (no cradling)
+FLIPPER_REACH = 24.0         # Autoplayer: flip when the ball is this close to a flipper
+STANDARD_FLIPPER_LENGTH = 64.0
+MAX_LAUNCHES = 32
+STUCK_LAUNCHES = 8           # Launches in a row that never clear the lane gate: the ball is stuck in the lane
+
+# Ball parameters taken from an item's physics_stats and flipper parameters
+# taken from a flipper item's physics_stats, plus the table's bumper force
+CONFIG_KEYS = ("mass", "bounce", "linear_damp", "gravity_scale",
+               "flipper_length", "rotation_speed", "power_multiplier", "bumper_force")
+
+
+# ---------------------------------------------------------------------------
+# Table layout
+# ---------------------------------------------------------------------------
+
+def build_table():
+    """Static geometry in Godot pixels: segments, circles and flipper pivots"""
+    left, top = flutter_to_godot(-BOARD_HALF_WIDTH, -BOARD_HALF_HEIGHT)
+    right, drain_y = flutter_to_godot(BOARD_HALF_WIDTH, BOARD_HALF_HEIGHT)
+    launcher = component_position("launcher")
+    lane_x = launcher[0] - BALL_RADIUS - 13.0
+    # Flutter places both flipper bodies by their left edge; the right one hinges at its right end
+    pivot_left = component_position("flipper_left")
+    fr = component_position("flipper_right")
+    pivot_right = (fr[0] + STANDARD_FLIPPER_LENGTH, fr[1])
+    inlane_y = pivot_left[1] - 100.0
+    gate_y = launcher[1] - 300.0
+    segments = [
+        ((left, drain_y), (left, top + 100)),               # Left wall
+        ((left, top + 100), (left + 100, top)),             # Top-left corner
+        ((left + 100, top), (right - 100, top)),            # Top
+        ((right - 100, top), (right, top + 100)),           # Top-right corner (deflects launches)
+        ((right, top + 100), (right, drain_y)),             # Right wall
+        ((lane_x, launcher[1] + 30), (lane_x, gate_y + 20)),  # Shooter lane wall
+        ((lane_x, launcher[1] + 30), (right, launcher[1] + 30)),  # Lane floor
+        ((left, inlane_y), (pivot_left[0], pivot_left[1] - 8)),   # Left inlane guide
+        ((lane_x, inlane_y), (pivot_right[0], pivot_right[1] - 8)),  # Right inlane guide
+        ((right, gate_y - 20), (lane_x, gate_y + 20)),      # One-way lane gate (must stay last)
+    ]
+    circles = []  # (x, y, radius, kind): kind 0 obstacle, 1 bumper, 2 kicker
+    for name in ("android_bumper_a", "android_bumper_b", "android_bumper_cow",
+                 "sparky_bumper_a", "sparky_bumper_b", "sparky_bumper_c",
+                 "dash_bumper_a", "dash_bumper_b", "dash_bumper_main"):
+        circles.append((*component_position(name), BUMPER_RADIUS, 1))
+    for name in ("kicker_left", "kicker_right"):
+        circles.append((*component_position(name), KICKER_RADIUS, 2))
+    circles.append((*component_position("android_spaceship"), 6.0 * SCALE, 0))
+    circles.append((*component_position("chrome_dino"), 5.0 * SCALE, 0))
+    return {
+        "segments": np.array(segments, dtype=np.float64),
+        "circles": np.array([c[:3] for c in circles], dtype=np.float64),
+        "circle_kind": np.array([c[3] for c in circles]),
+        "pivots": np.array([pivot_left, pivot_right], dtype=np.float64),
+        "launcher": np.array(launcher, dtype=np.float64),
+        "lane_x": lane_x,
+        "left": left - BALL_RADIUS,
+        "right": right + BALL_RADIUS,
+        "drain_y": drain_y,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Configurations
+# ---------------------------------------------------------------------------
+
+def load_items(path=ITEMS_PATH):
+    with open(path) as f:
+        return json.load(f)["items"]
+
+
+def make_config(ball="ball_standard", flipper="flipper_standard", items=None, **overrides):
+    """Simulation parameters for a ball item + flipper item, with optional overrides"""
+    items = items or load_items()
+    b = items[ball]["physics_stats"]
+    f = items[flipper]["physics_stats"]
+    config = {
+        "mass": b["mass"], "bounce": b["bounce"], "linear_damp": b["linear_damp"],
+        "gravity_scale": b["gravity_scale"], "flipper_length": float(f["length"]),
+        "rotation_speed": f["rotation_speed"], "power_multiplier": f["power_multiplier"],
+        "bumper_force": BUMPER_FORCE,
+    }
+    unknown = set(overrides) - set(CONFIG_KEYS)
+    if unknown:
+        raise ValueError(f"unknown simulation parameters: {', '.join(sorted(unknown))}")
+    config.update(overrides)
+    return config
+
+
+def config_seed(config, seed=0):
+    """Stable 64-bit seed for one configuration"""
+    text = json.dumps({k: config[k] for k in CONFIG_KEYS}, sort_keys=True)
+    return int.from_bytes(hashlib.sha256(f"{seed}:{text}".encode()).digest()[:8], "little")
+
+
+# ---------------------------------------------------------------------------
+# Simulation
+# ---------------------------------------------------------------------------
+
+def _segment_contacts(x, y, ax, ay, dx, dy, reach, ignore=None):
+    """Deepest contact of each ball with segments from (ax, ay) along (dx, dy), broadcast to (N, M)
+
+    Returns the segment index, penetration depth, contact normal and the
+    position of the contact along the segment (0..1) for every ball.
+    """
+    rx = x[:, None] - ax
+    ry = y[:, None] - ay
+    t = np.clip((rx * dx + ry * dy) / np.maximum(dx * dx + dy * dy, 1e-9), 0.0, 1.0)
+    ex = rx - t * dx
+    ey = ry - t * dy
+    d2 = ex * ex + ey * ey
+    if ignore is not None:
+        d2[ignore] = np.inf
+    rows = np.arange(len(x))
+    j = d2.argmin(axis=1)
+    dist = np.sqrt(d2[rows, j])
+    inv = 1.0 / np.maximum(dist, 1e-9)
+    return j, reach - dist, ex[rows, j] * inv, ey[rows, j] * inv, t[rows, j]
+
+
+def _resolve(x, y, vx, vy, nx, ny, depth, restitution, sx=0.0, sy=0.0):
+    """Push touching balls out along the normal and reflect their velocity relative to the surface (sx, sy)
+
+    Returns the mask of balls that were moving into the surface and bounced.
+    """
+    hit = depth > 0
+    push = np.where(hit, depth, 0.0)
+    x += push * nx
+    y += push * ny
+    vn = (vx - sx) * nx + (vy - sy) * ny
+    bounced = hit & (vn < 0)
+    k = np.where(bounced, (1.0 + restitution) * vn, 0.0)
+    vx -= k * nx
+    vy -= k * ny
+    return bounced
+
+
+def simulate(configs, balls=200, seconds=30.0, dt=DT, seed=0):
+    """Simulate `balls` independent balls per configuration; returns one stats dict per configuration"""
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("pinball_sim needs NumPy (pip install numpy)")
+    table = build_table()
+    n_configs = len(configs)
+    n = n_configs * balls
+    param = {k: np.repeat(np.array([c[k] for c in configs], dtype=np.float64), balls) for k in CONFIG_KEYS}
+    config_of = np.repeat(np.arange(n_configs), balls)
+    charges = np.concatenate([np.random.default_rng(config_seed(c, seed)).uniform(size=(balls, MAX_LAUNCHES))
+                              for c in configs])
+    force = LAUNCH_FORCE[0] + (LAUNCH_FORCE[1] - LAUNCH_FORCE[0]) * charges
+
+    seg = table["segments"]
+    sax, say = seg[:, 0, 0], seg[:, 0, 1]
+    sdx, sdy = seg[:, 1, 0] - sax, seg[:, 1, 1] - say
+    cx, cy, cr = table["circles"].T
+    kind = table["circle_kind"]
+    pivx, pivy = table["pivots"].T
+    mirror = np.array([1.0, -1.0])  # The right flipper points left from its hinge
+    centre_x = pivx.mean()
+    launch_x, launch_y = table["launcher"]
+
+    # Live state, one row per ball in play; `ids` maps rows back to balls as drained rows are dropped
+    ids = np.arange(n)
+    x = np.full(n, launch_x)
+    y = np.full(n, launch_y)
+    vx = np.zeros(n)
+    vy = -force[:, 0] / param["mass"]
+    launches = np.ones(n, dtype=np.int64)
+    lane_launches = np.ones(n, dtype=np.int64)  # Launches since the ball was last out of the shooter lane
+    angle = np.full((n, 2), FLIPPER_REST)
+    hold = np.full((n, 2), -FLIPPER_RELEASE)
+    cooldown = np.zeros((n, len(cx)))
+    p = dict(param)
+
+    drain_time = np.full(n, np.nan)
+    bumper_hits = np.zeros(n, dtype=np.int64)
+    flipper_hits = np.zeros(n, dtype=np.int64)
+    escaped = np.zeros(n, dtype=bool)
+    stuck = np.zeros(n, dtype=bool)
+    total_launches = np.zeros(n, dtype=np.int64)
+
+    steps = int(round(seconds / dt))
+    for step in range(steps):
+        now = step * dt
+
+        # Integrate (semi-implicit Euler, Godot-style damping)
+        vy += GRAVITY * p["gravity_scale"] * dt
+        damp = np.maximum(0.0, 1.0 - (DEFAULT_LINEAR_DAMP + p["linear_damp"]) * dt)
+        damp *= np.minimum(1.0, MAX_SPEED / np.maximum(np.sqrt(vx * vx + vy * vy), 1e-9))
+        vx *= damp
+        vy *= damp
+        x += vx * dt
+        y += vy * dt
+
+        # Walls; the lane gate (last segment) only stops balls moving down
+        gate_open = np.zeros((len(x), len(sax)), dtype=bool)
+        gate_open[:, -1] = vy <= 0
+        _, depth, nx, ny, _ = _segment_contacts(x, y, sax, say, sdx, sdy, BALL_RADIUS + WALL_THICKNESS, gate_open)
+        _resolve(x, y, vx, vy, nx, ny, depth, p["bounce"])
+
+        # Bumpers, kickers and obstacles
+        ex = x[:, None] - cx
+        ey = y[:, None] - cy
+        dist = np.sqrt(ex * ex + ey * ey)
+        rows = np.arange(len(x))
+        j = (cr - dist).argmax(axis=1)
+        inv = 1.0 / np.maximum(dist[rows, j], 1e-9)
+        nx, ny = ex[rows, j] * inv, ey[rows, j] * inv
+        depth = BALL_RADIUS + cr[j] - dist[rows, j]
+        _resolve(x, y, vx, vy, nx, ny, depth, p["bounce"])
+        ready = (depth > 0) & (kind[j] > 0) & (cooldown[rows, j] <= now)
+        bumper = ready & (kind[j] == 1)
+        kick = np.where(ready, np.where(bumper, p["bumper_force"], KICKER_IMPULSE) / p["mass"], 0.0)
+        vx += kick * nx
+        vy += kick * ny
+        cooldown[rows[ready], j[ready]] = now + BUMPER_COOLDOWN
+        bumper_hits[ids[bumper]] += 1
+
+        # Flippers: the autoplayer flips when a ball comes within reach above a flipper
+        length = p["flipper_length"][:, None]
+        near = (x[:, None] - pivx) ** 2 + (y[:, None] - pivy) ** 2 < (length + FLIPPER_REACH) ** 2
+        side = (x[:, None] > centre_x) == (mirror < 0)
+        trigger = near & side & (y[:, None] < pivy + BALL_RADIUS) & (vy[:, None] > -200.0)
+        hold = np.where(trigger & (hold <= -FLIPPER_RELEASE), FLIPPER_HOLD, hold - dt)
+        turn = p["rotation_speed"][:, None] * dt
+        target = np.where(hold > 0, FLIPPER_PRESSED, FLIPPER_REST)
+        new_angle = np.clip(angle + np.clip(target - angle, -turn, turn), FLIPPER_PRESSED, FLIPPER_REST)
+        omega = (new_angle - angle) / dt
+        angle = new_angle
+
+        dirx = np.cos(angle) * mirror
+        diry = np.sin(angle)
+        j, depth, nx, ny, t = _segment_contacts(x, y, pivx, pivy, dirx * length, diry * length,
+                                                BALL_RADIUS + FLIPPER_THICKNESS)
+        # Surface velocity of the contact point r from the hinge (mirrored for the right flipper)
+        reach = t * length[:, 0]
+        rx, ry = dirx[rows, j] * reach, diry[rows, j] * reach
+        w = omega[rows, j] * p["power_multiplier"] * mirror[j]
+        struck = _resolve(x, y, vx, vy, nx, ny, depth, FLIPPER_ELASTICITY, -w * ry, w * rx)
+        flipper_hits[ids[struck & (omega[rows, j] < 0)]] += 1
+
+        # Balls that fell back down the shooter lane are relaunched
+        lane_launches[x < table["lane_x"]] = 0
+        relaunch = (x > table["lane_x"]) & (y >= launch_y) & (vy >= 0)
+        if relaunch.any():
+            k = np.minimum(launches[relaunch], MAX_LAUNCHES - 1)
+            x[relaunch] = launch_x
+            y[relaunch] = launch_y
+            vx[relaunch] = 0.0
+            vy[relaunch] = -force[ids[relaunch], k] / p["mass"][relaunch]
+            launches[relaunch] += 1
+            lane_launches[relaunch] += 1
+
+        # Drain; a ball outside the walls has escaped the table and is retired with the drained ones,
+        # and a ball that cannot leave the shooter lane is retired as stuck (no drain time)
+        outside = (x < table["left"]) | (x > table["right"]) | ~(np.isfinite(x) & np.isfinite(y))
+        drained = (y > table["drain_y"]) | outside
+        jammed = lane_launches > STUCK_LAUNCHES
+        retired = drained | jammed
+        if retired.any():
+            drain_time[ids[drained]] = now + dt
+            escaped[ids[outside]] = True
+            stuck[ids[jammed & ~drained]] = True
+            total_launches[ids[retired]] = launches[retired]
+            keep = ~retired
+            ids, x, y, vx, vy, angle, hold, cooldown, launches, lane_launches = (
+                a[keep] for a in (ids, x, y, vx, vy, angle, hold, cooldown, launches, lane_launches))
+            p = {k: v[keep] for k, v in p.items()}
+            if not len(ids):
+                break
+    total_launches[ids] = launches
+
+    results = []
+    for c, config in enumerate(configs):
+        # Stuck balls never reached the playfield; every other statistic is over the rest
+        sel = (config_of == c) & ~stuck
+        played = max(int(sel.sum()), 1)
+        times = drain_time[sel]
+        censored = np.where(np.isnan(times), seconds, times)
+        alive_minutes = censored.sum() / 60.0
+        results.append({
+            "config": config,
+            "balls": balls,
+            "stuck_in_lane": float(stuck[config_of == c].mean()),
+            "drain_time": {f"p{q}": float(np.percentile(censored, q)) if times.size else 0.0 for q in (10, 50, 90)},
+            "mean_drain_time": float(censored.sum() / played),
+            "survival": float(np.isnan(times).sum() / played),
+            "bumper_hits_per_ball": float(bumper_hits[sel].sum() / played),
+            "bumper_hits_per_minute": float(bumper_hits[sel].sum() / max(alive_minutes, 1e-9)),
+            "flipper_hits_per_ball": float(flipper_hits[sel].sum() / played),
+            "launches_per_ball": float(total_launches[config_of == c].mean()),
+            "escaped": int(escaped[sel].sum()),
+        })
+    return results
+
+
+def print_results(results, labels, elapsed, steps):
+    print(f"{'configuration':32} {'drain p10/p50/p90 (s)':>24} {'alive':>6} {'bumper/min':>10} {'flips/ball':>10}"
+          f" {'stuck':>6}")
+    for label, r in zip(labels, results):
+        d = r["drain_time"]
+        print(f"{label:32} {d['p10']:7.1f} {d['p50']:7.1f} {d['p90']:7.1f}   {r['survival']:6.1%}"
+              f" {r['bumper_hits_per_minute']:10.1f} {r['flipper_hits_per_ball']:10.1f} {r['stuck_in_lane']:6.1%}")
+    for label, r in zip(labels, results):
+        if r["stuck_in_lane"] > 0:
+            print(f"⚠️  {label}: {r['stuck_in_lane']:.0%} of balls never cleared the shooter lane "
+                  f"(the launcher is too weak for this mass); they are left out of the other columns")
+    balls = sum(r["balls"] for r in results)
+    print("=" * 60)
+    print(f"📊 {balls} balls x {steps} steps in {elapsed:.1f}s ({balls * steps / elapsed / 1e6:.1f}M ball-steps/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless batch pinball physics simulator")
+    parser.add_argument("--balls", type=int, default=200, help="balls per configuration")
+    parser.add_argument("--seconds", type=float, default=30.0, help="simulated seconds per ball")
+    parser.add_argument("--dt", type=float, default=DT, help="fixed timestep in seconds")
+    parser.add_argument("--ball", nargs="+", help="ball item ids (default: every ball item)")
+    parser.add_argument("--flipper", nargs="+", help="flipper item ids (default: every flipper item)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="write per-configuration statistics as JSON")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("❌ pinball_sim.py needs NumPy: pip install numpy")
+        sys.exit(1)
+    items = load_items()
+    balls = args.ball or [k for k, v in items.items() if v["category"] == "ball"]
+    flippers = args.flipper or [k for k, v in items.items() if v["category"] == "flipper"]
+    combos = [(b, f) for b in balls for f in flippers]
+    configs = [make_config(b, f, items) for b, f in combos]
+
+    print("🎱 Headless Pinball Simulator")
+    print("=" * 60)
+    start = time.perf_counter()
+    results = simulate(configs, args.balls, args.seconds, args.dt, args.seed)
+    elapsed = time.perf_counter() - start
+    print_results(results, [f"{b} + {f}" for b, f in combos], elapsed, int(round(args.seconds / args.dt)))
+    if args.json:
+        for (b, f), r in zip(combos, results):
+            r.update(ball=b, flipper=f)
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=1)
+        print(f"✅ Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
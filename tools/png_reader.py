@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+PNG decoder for tools that read sprites back (atlas packing, budgets, diffs)
+Decodes every non-interlaced colour type and bit depth to RGBA8: a (height,
+width, 4) uint8 array with NumPy, or a flat bytearray without it, the same
+layouts png_writer accepts. 16-bit channels keep their high byte.
+read_header() reads only the IHDR chunk, for callers that need sizes alone.
+"""
+
+import struct
+import zlib
+from collections import namedtuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from png_writer import (CHANNELS, COLOR_GRAY, COLOR_GRAY_ALPHA, COLOR_PALETTE, COLOR_RGB,
+                        FILTER_AVERAGE, FILTER_NONE, FILTER_PAETH, FILTER_SUB, FILTER_UP,
+                        PNG_SIGNATURE, _paeth)
+
+# Average/Paeth rows above which the diagonal sweep replaces per-row reconstruction
+WAVEFRONT_MIN_ROWS = 16
+
+PNGHeader = namedtuple("PNGHeader", "width height bit_depth color_type interlace")
+
+
+def _check_signature(data):
+    if data[:8] != PNG_SIGNATURE:
+        raise ValueError("not a PNG file")
+
+
+def parse_header(data):
+    """Parse the IHDR chunk from the first 33 bytes of a PNG"""
+    _check_signature(data)
+    if len(data) < 33 or data[12:16] != b'IHDR':
+        raise ValueError("PNG is missing its IHDR chunk")
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack('>IIBBBBB', data[16:29])
+    return PNGHeader(width, height, bit_depth, color_type, interlace)
+
+
+def read_header(path):
+    """Width, height, bit depth, colour type and interlace flag without decoding pixels"""
+    with open(path, 'rb') as f:
+        return parse_header(f.read(33))
+
+
+def iter_chunks(data):
+    """Yield (chunk type, chunk data) for every chunk after the signature"""
+    _check_signature(data)
+    pos = 8
+    while pos + 8 <= len(data):
+        length, chunk_type = struct.unpack('>I4s', data[pos:pos + 8])
+        yield chunk_type, data[pos + 8:pos + 8 + length]
+        if chunk_type == b'IEND':
+            return
+        pos += 12 + length
+
+
+# ---------------------------------------------------------------------------
+# Scanline reconstruction
+# ---------------------------------------------------------------------------
+
+def _unfilter_row_python(ftype, line, prev, bpp):
+    """Undo one row's filter in place (line and prev are bytearrays)"""
+    n = len(line)
+    if ftype == FILTER_SUB:
+        for i in range(bpp, n):
+            line[i] = (line[i] + line[i - bpp]) & 0xff
+    elif ftype == FILTER_UP:
+        for i in range(n):
+            line[i] = (line[i] + prev[i]) & 0xff
+    elif ftype == FILTER_AVERAGE:
+        for i in range(n):
+            left = line[i - bpp] if i >= bpp else 0
+            line[i] = (line[i] + ((left + prev[i]) >> 1)) & 0xff
+    elif ftype == FILTER_PAETH:
+        for i in range(n):
+            if i >= bpp:
+                line[i] = (line[i] + _paeth(line[i - bpp], prev[i], prev[i - bpp])) & 0xff
+            else:
+                line[i] = (line[i] + prev[i]) & 0xff
+    elif ftype != FILTER_NONE:
+        raise ValueError(f"invalid PNG filter type {ftype}")
+
+
+def _unfilter_wavefront(filtered, types, bpp):
+    """Reconstruct all rows at once along anti-diagonals (NumPy)
+
+    Pixel (y, x) only depends on (y, x-1), (y-1, x) and (y-1, x-1), so every
+    pixel with the same x + y can be computed in one step whatever the row
+    filters are. Pixels are stored by diagonal (pixel (y, x) at [y + x + 1,
+    y + 1], with a zero border) so each step reads and writes contiguous runs.
+    """
+    height, stride = filtered.shape
+    width = stride // bpp
+    span = width + height + 1
+    src = np.zeros((span, height, bpp), dtype=np.int16)
+    dst = np.zeros((span, height + 1, bpp), dtype=np.int16)
+    pixels = filtered.reshape(height, width, bpp)
+    for y in range(height):
+        src[y + 1:y + 1 + width, y] = pixels[y]
+    # Per-row 0/1 weights for each filter, and where each run of equal filters ends
+    masks = [(types == kind).astype(np.int16)[:, None] for kind in range(5)]
+    run_end = np.empty(height, dtype=np.intp)
+    run_end[-1] = height
+    for y in range(height - 2, -1, -1):
+        run_end[y] = run_end[y + 1] if types[y] == types[y + 1] else y + 1
+    for d in range(1, width + height):
+        lo, hi = max(0, d - width), min(height, d)
+        a = dst[d - 1, lo + 1:hi + 1]
+        b = dst[d - 1, lo:hi]
+        c = dst[d - 2, lo:hi]
+        kind = int(types[lo]) if run_end[lo] >= hi else None
+        if kind in (None, FILTER_PAETH):
+            pa, pb, pc = np.abs(b - c), np.abs(a - c), np.abs(a + b - 2 * c)
+            paeth = np.where((pa <= pb) & (pa <= pc), a, np.where(pb <= pc, b, c))
+        if kind is None:
+            predicted = (a * masks[FILTER_SUB][lo:hi] + b * masks[FILTER_UP][lo:hi]
+                         + ((a + b) >> 1) * masks[FILTER_AVERAGE][lo:hi] + paeth * masks[FILTER_PAETH][lo:hi])
+        else:
+            predicted = (0, a, b, (a + b) >> 1, paeth if kind == FILTER_PAETH else None)[kind]
+        dst[d, lo + 1:hi + 1] = (src[d, lo:hi] + predicted) & 0xff
+    out = np.empty((height, width, bpp), dtype=np.uint8)
+    for y in range(height):
+        out[y] = dst[y + 1:y + 1 + width, y + 1]
+    return out.reshape(height, stride)
+
+
+def _unfilter(raw, height, stride, bpp):
+    """Reconstruct filtered scanlines: (height, stride) uint8 array or flat bytearray"""
+    if len(raw) < height * (stride + 1):
+        raise ValueError("PNG image data is truncated")
+    if NUMPY_AVAILABLE:
+        rows = np.frombuffer(raw, dtype=np.uint8, count=height * (stride + 1)).reshape(height, stride + 1)
+        types = rows[:, 0]
+        if types.max(initial=0) > FILTER_PAETH:
+            raise ValueError(f"invalid PNG filter type {int(types.max())}")
+        if np.count_nonzero(types >= FILTER_AVERAGE) > WAVEFRONT_MIN_ROWS and stride % bpp == 0:
+            # Many Average/Paeth rows: one diagonal sweep beats a Python loop per row
+            return _unfilter_wavefront(rows[:, 1:], types, bpp)
+        out = rows[:, 1:].copy()
+        zero = np.zeros(stride, dtype=np.uint8)
+        for y in np.flatnonzero(types).tolist():
+            ftype = int(types[y])
+            prev = out[y - 1] if y else zero
+            if ftype == FILTER_SUB and stride % bpp == 0:
+                # Running sum per channel, wrapping at 256
+                out[y] = np.cumsum(out[y].reshape(-1, bpp), axis=0, dtype=np.uint8).reshape(-1)
+            elif ftype == FILTER_UP:
+                out[y] += prev
+            else:
+                # Average and Paeth depend on the reconstructed left neighbour
+                line = bytearray(out[y].tobytes())
+                _unfilter_row_python(ftype, line, prev.tobytes(), bpp)
+                out[y] = np.frombuffer(line, dtype=np.uint8)
+        return out
+    out = bytearray(height * stride)
+    prev = bytearray(stride)
+    for y in range(height):
+        start = y * (stride + 1)
+        line = bytearray(raw[start + 1:start + 1 + stride])
+        _unfilter_row_python(raw[start], line, prev, bpp)
+        out[y * stride:(y + 1) * stride] = line
+        prev = line
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Conversion to RGBA8
+# ---------------------------------------------------------------------------
+
+def _samples_numpy(rows, width, channels, bit_depth):
+    """Unpack scanlines to one uint8 (or uint16) sample per channel: (height, width*channels)"""
+    count = width * channels
+    if bit_depth == 8:
+        return rows[:, :count]
+    if bit_depth == 16:
+        return rows[:, :2 * count].view('>u2')
+    bits = np.unpackbits(rows, axis=1)[:, :count * bit_depth]
+    weights = (1 << np.arange(bit_depth - 1, -1, -1)).astype(np.uint8)
+    return (bits.reshape(len(rows), count, bit_depth) * weights).sum(axis=2, dtype=np.uint8)
+
+
+def _to_rgba_numpy(rows, header, palette, trns):
+    width, height, bit_depth, color_type = header.width, header.height, header.bit_depth, header.color_type
+    channels = CHANNELS[color_type]
+    samples = _samples_numpy(rows, width, channels, bit_depth).reshape(height, width, channels)
+    if color_type == COLOR_PALETTE:
+        table = np.zeros((256, 4), dtype=np.uint8)
+        table[:, 3] = 255
+        table[:len(palette) // 3, :3] = np.frombuffer(palette, dtype=np.uint8).reshape(-1, 3)
+        table[:len(trns), 3] = np.frombuffer(trns, dtype=np.uint8)
+        return table[samples[:, :, 0]]
+    key = None
+    if trns and color_type in (COLOR_GRAY, COLOR_RGB):
+        key = np.array(struct.unpack(f'>{len(trns) // 2}H', trns), dtype=samples.dtype)
+        key = np.all(samples == key, axis=2)
+    if bit_depth == 16:
+        samples = (samples >> 8).astype(np.uint8)
+    elif bit_depth < 8:
+        samples = samples * np.uint8(255 // ((1 << bit_depth) - 1))
+    out = np.empty((height, width, 4), dtype=np.uint8)
+    if color_type in (COLOR_GRAY, COLOR_GRAY_ALPHA):
+        out[:, :, :3] = samples[:, :, :1]
+    else:
+        out[:, :, :3] = samples[:, :, :3]
+    if channels in (2, 4):
+        out[:, :, 3] = samples[:, :, -1]
+    else:
+        out[:, :, 3] = 255
+        if key is not None:
+            out[:, :, 3][key] = 0
+    return out
+
+
+def _samples_python(rows, width, height, channels, bit_depth):
+    """Pure-Python counterpart of _samples_numpy: list of per-row sample sequences"""
+    stride = (width * channels * bit_depth + 7) // 8
+    count = width * channels
+    result = []
+    for y in range(height):
+        row = rows[y * stride:(y + 1) * stride]
+        if bit_depth == 8:
+            result.append(row)
+        elif bit_depth == 16:
+            result.append([(row[i] << 8) | row[i + 1] for i in range(0, 2 * count, 2)])
+        else:
+            per_byte = 8 // bit_depth
+            mask = (1 << bit_depth) - 1
+            values = [(byte >> (8 - bit_depth * (k + 1))) & mask for byte in row for k in range(per_byte)]
+            result.append(values[:count])
+    return result
+
+
+def _to_rgba_python(rows, header, palette, trns):
+    width, height, bit_depth, color_type = header.width, header.height, header.bit_depth, header.color_type
+    channels = CHANNELS[color_type]
+    out = bytearray(width * height * 4)
+    if color_type == COLOR_PALETTE:
+        table = [bytes(palette[3 * i:3 * i + 3]) + bytes([trns[i] if i < len(trns) else 255])
+                 for i in range(len(palette) // 3)]
+        table += [b'\x00\x00\x00\xff'] * (256 - len(table))
+        for y, row in enumerate(_samples_python(rows, width, height, 1, bit_depth)):
+            out[y * width * 4:(y + 1) * width * 4] = b''.join(table[i] for i in row)
+        return out
+    key = None
+    if trns and color_type in (COLOR_GRAY, COLOR_RGB):
+        key = list(struct.unpack(f'>{len(trns) // 2}H', trns))
+    scale = 255 // ((1 << bit_depth) - 1) if bit_depth < 8 else 1
+    for y, row in enumerate(_samples_python(rows, width, height, channels, bit_depth)):
+        if bit_depth == 16:
+            row8 = bytes(v >> 8 for v in row)
+        elif bit_depth < 8:
+            row8 = bytes(v * scale for v in row)
+        else:
+            row8 = bytes(row)
+        line = bytearray(width * 4)
+        if color_type in (COLOR_GRAY, COLOR_GRAY_ALPHA):
+            for c in range(3):
+                line[c::4] = row8[0::channels]
+        else:
+            for c in range(3):
+                line[c::4] = row8[c::channels]
+        if channels in (2, 4):
+            line[3::4] = row8[channels - 1::channels]
+        else:
+            line[3::4] = b'\xff' * width
+            if key is not None:
+                for x in range(width):
+                    if list(row[x * channels:(x + 1) * channels]) == key:
+                        line[4 * x + 3] = 0
+        out[y * width * 4:(y + 1) * width * 4] = line
+    return out
+
+
+def decode_png(data):
+    """Decode PNG file contents; returns (width, height, RGBA8 pixels)"""
+    header = parse_header(data)
+    if header.interlace:
+        raise ValueError("interlaced (Adam7) PNGs are not supported")
+    palette = b''
+    trns = b''
+    idat = []
+    for chunk_type, chunk in iter_chunks(data):
+        if chunk_type == b'PLTE':
+            palette = chunk
+        elif chunk_type == b'tRNS':
+            trns = chunk
+        elif chunk_type == b'IDAT':
+            idat.append(chunk)
+    raw = zlib.decompress(b''.join(idat))
+    channels = CHANNELS[header.color_type]
+    bits = channels * header.bit_depth
+    stride = (header.width * bits + 7) // 8
+    rows = _unfilter(raw, header.height, stride, max(1, bits // 8))
+    if NUMPY_AVAILABLE:
+        pixels = _to_rgba_numpy(rows, header, palette, trns)
+    else:
+        pixels = _to_rgba_python(rows, header, palette, trns)
+    return header.width, header.height, pixels
+
+
+def read_png(path):
+    """Decode a PNG file on disk; returns (width, height, RGBA8 pixels)"""
+    with open(path, 'rb') as f:
+        return decode_png(f.read())
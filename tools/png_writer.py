@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Streaming PNG encoder for generated sprites
+Rows are filtered (adaptive Sub/Up/Average/Paeth per row) and streamed through
+a zlib.compressobj into IDAT chunks, and the smallest lossless colour type is
+picked automatically (palette, grayscale, grayscale+alpha, RGB or RGBA).
+Input is RGBA8 in any buffer (bytes, bytearray, memoryview, NumPy array) and is
+read in place without copying. NumPy is optional; without it rows are filtered
+in pure Python.
+"""
+
+import io
+import struct
+import zlib
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+# Colour types (PNG spec, IHDR)
+COLOR_GRAY = 0
+COLOR_RGB = 2
+COLOR_PALETTE = 3
+COLOR_GRAY_ALPHA = 4
+COLOR_RGBA = 6
+
+CHANNELS = {COLOR_GRAY: 1, COLOR_RGB: 3, COLOR_PALETTE: 1, COLOR_GRAY_ALPHA: 2, COLOR_RGBA: 4}
+
+# Row filter types
+FILTER_NONE = 0
+FILTER_SUB = 1
+FILTER_UP = 2
+FILTER_AVERAGE = 3
+FILTER_PAETH = 4
+ADAPTIVE = 'adaptive'
+
+IDAT_CHUNK_SIZE = 1 << 16   # Flush compressed data into IDAT chunks of this size
+ROWS_PER_BLOCK = 256        # Rows filtered per NumPy pass (bounds peak memory)
+TRIAL_MAX_PIXELS = 1 << 14  # encode_png tries every colour type up to this size
+
+
+def write_chunk(f, chunk_type, data):
+    """Write one length-prefixed, CRC-terminated PNG chunk"""
+    f.write(struct.pack('>I', len(data)))
+    f.write(chunk_type)
+    f.write(data)
+    f.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type)) & 0xffffffff))
+
+
+def _as_buffer(pixels, width, height):
+    """View RGBA8 pixel data as a flat byte memoryview (no copy)"""
+    buf = memoryview(pixels)
+    if buf.format != 'B' or buf.ndim != 1:
+        buf = buf.cast('B')
+    if len(buf) != width * height * 4:
+        raise ValueError(f"expected {width * height * 4} RGBA bytes for {width}x{height}, got {len(buf)}")
+    return buf
+
+
+# ---------------------------------------------------------------------------
+# Colour type selection
+# ---------------------------------------------------------------------------
+
+def _palette_of(buf, limit=256):
+    """Distinct RGBA colours in first-seen order, or None if there are more than limit"""
+    if NUMPY_AVAILABLE:
+        packed = np.frombuffer(buf, dtype='>u4')
+        colors, first = np.unique(packed, return_index=True)
+        if len(colors) > limit:
+            return None
+        return [int(c).to_bytes(4, 'big') for c in colors[np.argsort(first)]]
+    seen = {}
+    for i in range(0, len(buf), 4):
+        color = bytes(buf[i:i + 4])
+        if color not in seen:
+            if len(seen) == limit:
+                return None
+            seen[color] = len(seen)
+    return list(seen)
+
+
+def _palette_depth(palette):
+    """Smallest PNG palette bit depth that can index every entry"""
+    return next(d for d in (1, 2, 4, 8) if len(palette) <= 1 << d)
+
+
+def _color_options(buf):
+    """Every lossless colour type for the image: ({type: (bits per pixel, bit depth)}, palette)"""
+    r, g, b, a = (bytes(buf[i::4]) for i in range(4))
+    opaque = a.count(255) == len(a)
+    gray = r == g and g == b
+    palette = _palette_of(buf)
+
+    options = {COLOR_RGBA: (32, 8)}
+    if opaque:
+        options[COLOR_RGB] = (24, 8)
+    if gray:
+        options[COLOR_GRAY_ALPHA] = (16, 8)
+    if gray and opaque:
+        options[COLOR_GRAY] = (8, 8)
+    if palette is not None:
+        depth = _palette_depth(palette)
+        # Non-palette types win ties because they need no PLTE/tRNS chunks
+        options[COLOR_PALETTE] = (depth + 0.5, depth)
+        # Transparent entries first so tRNS can stop at the last non-opaque one
+        palette.sort(key=lambda c: c[3] == 255)
+    return options, palette
+
+
+def choose_color_type(pixels, width, height, color_type=None):
+    """Pick the most compact lossless colour type and bit depth for RGBA8 data
+
+    Returns (color_type, bit_depth, palette). The palette is a list of RGBA
+    byte strings (transparent entries first) when color_type is COLOR_PALETTE,
+    otherwise None. Passing color_type forces that type and raises ValueError
+    if it cannot hold the image losslessly.
+    """
+    options, palette = _color_options(_as_buffer(pixels, width, height))
+    if color_type is None:
+        color_type = min(options, key=lambda t: options[t][0])
+    elif color_type not in options:
+        raise ValueError(f"colour type {color_type} cannot represent this image losslessly")
+    return color_type, options[color_type][1], palette if color_type == COLOR_PALETTE else None
+
+
+# ---------------------------------------------------------------------------
+# Pixel conversion to the target colour type (raw scanline bytes, no filter)
+# ---------------------------------------------------------------------------
+
+def _pack_indices(indices, bit_depth):
+    """Pack palette indices (rows of uint8) into sub-byte scanlines"""
+    if bit_depth == 8:
+        return indices
+    per_byte = 8 // bit_depth
+    rows, width = indices.shape
+    padded = -width % per_byte
+    if padded:
+        indices = np.pad(indices, ((0, 0), (0, padded)))
+    groups = indices.reshape(rows, -1, per_byte).astype(np.uint8)
+    packed = np.zeros(groups.shape[:2], dtype=np.uint8)
+    for j in range(per_byte):
+        packed |= groups[:, :, j] << (8 - bit_depth * (j + 1))
+    return packed
+
+
+def _pack_row(indices, bit_depth):
+    """Pure-Python counterpart of _pack_indices for a single row"""
+    if bit_depth == 8:
+        return bytes(indices)
+    per_byte = 8 // bit_depth
+    out = bytearray((len(indices) + per_byte - 1) // per_byte)
+    for x, index in enumerate(indices):
+        out[x // per_byte] |= index << (8 - bit_depth * (x % per_byte + 1))
+    return bytes(out)
+
+
+def _raw_blocks_numpy(buf, width, height, color_type, bit_depth, palette):
+    """Yield blocks of raw scanlines as 2-D uint8 arrays"""
+    rgba = np.frombuffer(buf, dtype=np.uint8).reshape(height, width, 4)
+    lookup = None
+    if color_type == COLOR_PALETTE:
+        keys = np.array([int.from_bytes(c, 'big') for c in palette], dtype=np.uint32)
+        order = np.argsort(keys)
+        lookup = (keys[order], order.astype(np.uint8))
+    for y0 in range(0, height, ROWS_PER_BLOCK):
+        block = rgba[y0:y0 + ROWS_PER_BLOCK]
+        rows = block.shape[0]
+        if color_type == COLOR_RGBA:
+            yield block.reshape(rows, width * 4)
+        elif color_type == COLOR_RGB:
+            yield np.ascontiguousarray(block[:, :, :3]).reshape(rows, width * 3)
+        elif color_type == COLOR_GRAY:
+            yield np.ascontiguousarray(block[:, :, 0])
+        elif color_type == COLOR_GRAY_ALPHA:
+            yield np.ascontiguousarray(block[:, :, [0, 3]]).reshape(rows, width * 2)
+        else:
+            sorted_keys, sorted_index = lookup
+            packed = np.ascontiguousarray(block).view('>u4').reshape(rows, width)
+            indices = sorted_index[np.searchsorted(sorted_keys, packed)]
+            yield _pack_indices(indices, bit_depth)
+
+
+def _raw_rows_python(buf, width, height, color_type, bit_depth, palette):
+    """Yield raw scanlines one row at a time as bytes-like objects"""
+    stride = width * 4
+    index = {c: i for i, c in enumerate(palette)} if palette else None
+    for y in range(height):
+        row = buf[y * stride:(y + 1) * stride]
+        if color_type == COLOR_RGBA:
+            yield row
+        elif color_type == COLOR_RGB:
+            out = bytearray(width * 3)
+            for ch in range(3):
+                out[ch::3] = row[ch::4]
+            yield bytes(out)
+        elif color_type == COLOR_GRAY:
+            yield bytes(row[0::4])
+        elif color_type == COLOR_GRAY_ALPHA:
+            out = bytearray(width * 2)
+            out[0::2] = row[0::4]
+            out[1::2] = row[3::4]
+            yield bytes(out)
+        else:
+            yield _pack_row([index[bytes(row[i:i + 4])] for i in range(0, stride, 4)], bit_depth)
+
+
+# ---------------------------------------------------------------------------
+# Row filtering
+# ---------------------------------------------------------------------------
+
+def _filter_block_numpy(raw, prev, bpp, strategy):
+    """Filter a block of rows; returns (filtered rows with type byte, last raw row)"""
+    raw = raw.astype(np.int16)
+    up = np.vstack([prev[None, :], raw[:-1]])
+    left = np.zeros_like(raw)
+    left[:, bpp:] = raw[:, :-bpp]
+    up_left = np.zeros_like(raw)
+    up_left[:, bpp:] = up[:, :-bpp]
+
+    if strategy == ADAPTIVE:
+        types = (FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_AVERAGE, FILTER_PAETH)
+    else:
+        types = (strategy,)
+    candidates = []
+    for filter_type in types:
+        if filter_type == FILTER_NONE:
+            out = raw
+        elif filter_type == FILTER_SUB:
+            out = raw - left
+        elif filter_type == FILTER_UP:
+            out = raw - up
+        elif filter_type == FILTER_AVERAGE:
+            out = raw - ((left + up) >> 1)
+        else:
+            pa = np.abs(up - up_left)
+            pb = np.abs(left - up_left)
+            pc = np.abs(left + up - 2 * up_left)
+            predictor = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, up_left))
+            out = raw - predictor
+        candidates.append(out.astype(np.uint8))
+
+    if len(candidates) == 1:
+        choice = np.zeros(raw.shape[0], dtype=np.intp)
+    else:
+        # Minimum sum of absolute differences (bytes read as signed), as libpng does
+        scores = np.stack([np.abs(c.view(np.int8).astype(np.int32)).sum(axis=1) for c in candidates])
+        choice = scores.argmin(axis=0)
+    stacked = np.stack(candidates)
+    rows = stacked[choice, np.arange(raw.shape[0])]
+    filter_bytes = np.asarray(types, dtype=np.uint8)[choice]
+    return np.hstack([filter_bytes[:, None], rows]), raw[-1]
+
+
+def _paeth(a, b, c):
+    p = a + b - c
+    pa = abs(p - a)
+    pb = abs(p - b)
+    pc = abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    if pb <= pc:
+        return b
+    return c
+
+
+def _filter_row_python(row, prev, bpp, strategy):
+    """Filter one row in pure Python; returns the type byte followed by the data"""
+    row = bytes(row)
+    n = len(row)
+    # Cheap exact shortcuts for flat art: a repeated row is all zeros under Up,
+    # and a row of one repeated pixel is all zeros after the first pixel under Sub.
+    if strategy == ADAPTIVE:
+        if row == prev:
+            return bytes([FILTER_UP]) + bytes(n)
+        if row == row[:bpp] * (n // bpp):
+            return bytes([FILTER_SUB]) + row[:bpp] + bytes(n - bpp)
+        types = (FILTER_NONE, FILTER_SUB, FILTER_UP, FILTER_AVERAGE, FILTER_PAETH)
+    else:
+        types = (strategy,)
+
+    best = None
+    for filter_type in types:
+        if filter_type == FILTER_NONE:
+            out = row
+        else:
+            out = bytearray(n)
+            for i in range(n):
+                a = row[i - bpp] if i >= bpp else 0
+                b = prev[i]
+                if filter_type == FILTER_SUB:
+                    pred = a
+                elif filter_type == FILTER_UP:
+                    pred = b
+                elif filter_type == FILTER_AVERAGE:
+                    pred = (a + b) >> 1
+                else:
+                    pred = _paeth(a, b, prev[i - bpp] if i >= bpp else 0)
+                out[i] = (row[i] - pred) & 0xff
+        if len(types) == 1:
+            return bytes([filter_type]) + bytes(out)
+        score = sum(v if v < 128 else 256 - v for v in out)
+        if best is None or score < best[0]:
+            best = (score, filter_type, out)
+    return bytes([best[1]]) + bytes(best[2])
+
+
+# ---------------------------------------------------------------------------
+# Encoder
+# ---------------------------------------------------------------------------
+
+def write_png(f, pixels, width, height, color_type=None, level=9, filters=None):
+    """Stream RGBA8 pixels to an open binary file as PNG
+
+    color_type: None to choose automatically, or one of the COLOR_* constants
+    (raises ValueError if it cannot hold the image losslessly).
+    filters: ADAPTIVE, one FILTER_* type, or None for the PNG recommendation
+    (adaptive for 8-bit gray/truecolour, none for palette images).
+    """
+    buf = _as_buffer(pixels, width, height)
+    color_type, bit_depth, palette = choose_color_type(buf, width, height, color_type)
+    if filters is None:
+        filters = FILTER_NONE if color_type == COLOR_PALETTE else ADAPTIVE
+
+    f.write(PNG_SIGNATURE)
+    write_chunk(f, b'IHDR', struct.pack('>IIBBBBB', width, height, bit_depth, color_type, 0, 0, 0))
+    if palette is not None:
+        write_chunk(f, b'PLTE', b''.join(c[:3] for c in palette))
+        alphas = bytes(c[3] for c in palette).rstrip(b'\xff')
+        if alphas:
+            write_chunk(f, b'tRNS', alphas)
+
+    bpp = max(1, CHANNELS[color_type] * bit_depth // 8)
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, 9)
+    pending = bytearray()
+
+    def feed(data):
+        pending.extend(compressor.compress(data))
+        if len(pending) >= IDAT_CHUNK_SIZE:
+            write_chunk(f, b'IDAT', bytes(pending))
+            del pending[:]
+
+    if NUMPY_AVAILABLE:
+        prev = None
+        for raw in _raw_blocks_numpy(buf, width, height, color_type, bit_depth, palette):
+            if prev is None:
+                prev = np.zeros(raw.shape[1], dtype=np.int16)
+            filtered, prev = _filter_block_numpy(raw, prev, bpp, filters)
+            feed(filtered.tobytes())
+    else:
+        prev = None
+        for row in _raw_rows_python(buf, width, height, color_type, bit_depth, palette):
+            if prev is None:
+                prev = bytes(len(row))
+            feed(_filter_row_python(row, prev, bpp, filters))
+            prev = bytes(row)
+
+    pending.extend(compressor.flush())
+    write_chunk(f, b'IDAT', bytes(pending))
+    write_chunk(f, b'IEND', b'')
+
+
+def encode_png(pixels, width, height, optimize=True, **options):
+    """Encode RGBA8 pixels and return the PNG file contents
+
+    With optimize (the default) and no explicit colour type or filter, small
+    images are encoded with every lossless colour type and both filter
+    strategies and the smallest result is kept. For tiny sprites the chunk
+    overhead of a palette can outweigh its smaller pixels.
+    """
+    if optimize and width * height <= TRIAL_MAX_PIXELS and not options.keys() & {'color_type', 'filters'}:
+        buf = _as_buffer(pixels, width, height)
+        color_types, _ = _color_options(buf)
+        trials = (encode_png(buf, width, height, optimize=False, color_type=color_type, filters=filters, **options)
+                  for color_type in color_types for filters in (FILTER_NONE, ADAPTIVE))
+        return min(trials, key=len)
+    out = io.BytesIO()
+    write_png(out, pixels, width, height, **options)
+    return out.getvalue()
+
+
+def save_png(path, pixels, width, height, **options):
+    """Encode RGBA8 pixels straight to a file on disk"""
+    with open(path, 'wb') as f:
+        write_png(f, pixels, width, height, **options)
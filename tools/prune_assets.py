@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Unused-asset report and export filter driven by the scene dependency graph
+Starting from project.godot (main scene, autoloads, icon), walks everything
+reachable through .tscn/.tres ext_resources, script preloads and res://
+literals (scene_graph.py). Paths scripts build at runtime are followed too:
+a directory or format-string literal such as "res://assets/sounds/" or
+THEME_PATHS + "%sball.png" marks files under that prefix as used when the
+same script names them ("ball.png", "flipper_hit"), and as maybe-used
+otherwise. Every exportable file is classified used / maybe-used / unused;
+unused files (legacy v1.0-v2.0 copies, archived/, tests, GUT, unreferenced
+scenes) become an export_presets.cfg exclude_filter, collapsed to directory
+globs where a whole folder is unused.
+Also reports the projected package-size reduction and the texture/audio
+decode work (and estimated import time) the excluded files no longer cost.
+Usage: python3 tools/prune_assets.py [--list unused|maybe|used] [--write] [--json PATH] [--import-rate MIB_PER_S]
+"""
+
+import argparse
+import json
+import re
+from pathlib import Path, PurePosixPath
+
+from asset_budget import analyze_audio, analyze_texture
+from scene_graph import BASE_DIR, PROJECT_FILE, build_graph
+
+PRESETS_PATH = BASE_DIR / "export_presets.cfg"
+# Files Godot packs into an export (sources of imported resources and native resources)
+EXPORT_SUFFIXES = (".tscn", ".tres", ".res", ".scn", ".gd", ".gdshader", ".json",
+                   ".png", ".jpg", ".jpeg", ".webp", ".svg", ".wav", ".ogg", ".mp3", ".ttf", ".otf")
+IMPORT_MIB_PER_S = 40.0  # Rough decode + compress rate of the texture/audio importers
+CLASSES = ("used", "maybe", "unused")
+
+_STRING = re.compile(r'"([^"\n]*)"')
+
+
+def exportable(sizes):
+    return {rel: size for rel, size in sizes.items() if rel.lower().endswith(EXPORT_SUFFIXES)}
+
+
+def _runtime_matches(prefix, files, literals):
+    """Split files under a runtime path prefix into (named by a script literal, merely under the prefix)"""
+    named, under = [], []
+    for rel in files:
+        if not rel.startswith(prefix):
+            continue
+        tail = rel[len(prefix):]
+        stem = PurePosixPath(tail).stem
+        if tail in literals or f"%s{tail}" in literals or stem in literals or tail.split("/")[-1] in literals:
+            named.append(rel)
+        else:
+            under.append(rel)
+    return named, under
+
+
+def classify(graph, root=BASE_DIR):
+    """{rel: (class, reason)} for every exportable file"""
+    files = exportable(graph.sizes)
+    result = {}
+    used = set()
+    stack = []
+
+    def mark(rel, reason):
+        if rel not in used:
+            used.add(rel)
+            result[rel] = ("used", reason)
+            stack.append(rel)
+
+    for rel in sorted(graph.roots()):
+        mark(rel, f"{PROJECT_FILE} setting")
+    maybe = {}
+    expanded = set()
+    while stack:
+        while stack:
+            source = stack.pop()
+            for target, kind in graph.edges.get(source, ()):
+                mark(target, f"{'loaded at runtime' if kind == 'literal' else 'loaded'} by {source}")
+        # Runtime-built paths in reachable scripts
+        for source in sorted(used - expanded):
+            expanded.add(source)
+            prefixes = graph.prefixes.get(source)
+            if not prefixes:
+                continue
+            literals = set(_STRING.findall((root / source).read_text(encoding="utf-8", errors="replace")))
+            for literal in prefixes:
+                prefix = literal.split("%", 1)[0].split("{", 1)[0]
+                named, under = _runtime_matches(prefix, files, literals)
+                for rel in named:
+                    mark(rel, f"named at runtime by {source} (res://{prefix}...)")
+                for rel in under:
+                    maybe.setdefault(rel, f"under res://{prefix} built at runtime by {source}")
+
+    for rel in files:
+        if rel in used:
+            continue
+        result[rel] = ("maybe", maybe[rel]) if rel in maybe else ("unused", "not reachable from project.godot")
+    return {rel: result[rel] for rel in sorted(files)}
+
+
+def exclude_patterns(classes):
+    """Globs covering every unused file: whole folders as dir/*, otherwise single files"""
+    keep_dirs = set()
+    for rel, (cls, _) in classes.items():
+        if cls != "unused":
+            parts = rel.split("/")[:-1]
+            keep_dirs.update("/".join(parts[:i]) for i in range(len(parts) + 1))
+    patterns = set()
+    for rel, (cls, _) in classes.items():
+        if cls != "unused":
+            continue
+        parts = rel.split("/")
+        # Topmost folder containing nothing we keep
+        for i in range(1, len(parts)):
+            folder = "/".join(parts[:i])
+            if folder not in keep_dirs:
+                patterns.add(f"{folder}/*")
+                break
+        else:
+            patterns.add(rel)
+    return sorted(patterns)
+
+
+def decode_cost(root, rel):
+    """Decoded bytes the importer processes for a texture or sound (0 for other files)"""
+    path = root / rel
+    kind = path.suffix.lower().lstrip(".").replace("jpeg", "jpg")
+    try:
+        if kind in ("png", "jpg"):
+            return analyze_texture(path, kind)[3]
+        if kind in ("wav", "ogg"):
+            return analyze_audio(path, kind)[3]
+    except (OSError, ValueError, KeyError):
+        pass
+    return 0
+
+
+def write_presets(patterns, path=PRESETS_PATH):
+    """Set exclude_filter in every [preset.N] section; returns the number of presets updated"""
+    lines = path.read_text().splitlines()
+    value = f'exclude_filter="{", ".join(patterns)}"'
+    out, section, updated, seen = [], None, 0, False
+    for line in lines + ["[end]"]:
+        if line.startswith("["):
+            if section is not None and not seen:
+                out.append(value)
+                updated += 1
+            section = line if re.match(r"^\[preset\.\d+\]$", line) else None
+            seen = False
+        elif section is not None and line.startswith("exclude_filter="):
+            line, seen = value, True
+            updated += 1
+        out.append(line)
+    if updated:
+        path.write_text("\n".join(out[:-1]) + "\n")
+    return updated
+
+
+def _mib(n):
+    return n / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Unused-asset report and export exclude filter")
+    parser.add_argument("--list", choices=CLASSES, help="list the files of one class with the reason")
+    parser.add_argument("--write", action="store_true", help="set exclude_filter in export_presets.cfg presets")
+    parser.add_argument("--json", metavar="PATH", help="write the classification as JSON")
+    parser.add_argument("--import-rate", type=float, default=IMPORT_MIB_PER_S,
+                        help="decoded MiB/s assumed for the import time estimate")
+    args = parser.parse_args()
+
+    graph, _ = build_graph()
+    classes = classify(graph)
+    totals = {cls: [0, 0, 0] for cls in CLASSES}  # files, bytes, decoded bytes
+    for rel, (cls, _) in classes.items():
+        totals[cls][0] += 1
+        totals[cls][1] += graph.sizes[rel]
+        totals[cls][2] += decode_cost(BASE_DIR, rel)
+    patterns = exclude_patterns(classes)
+
+    print("✂️  Unused Asset Report")
+    print("=" * 60)
+    for cls in CLASSES:
+        files, size, decoded = totals[cls]
+        print(f"{cls:8} {files:5} files {_mib(size):8.2f} MiB on disk {_mib(decoded):8.2f} MiB decoded")
+    if args.list:
+        print()
+        for rel, (cls, reason) in classes.items():
+            if cls == args.list:
+                print(f"  {rel:60} {reason}")
+    by_top = {}
+    for rel, (cls, _) in classes.items():
+        if cls == "unused":
+            top = rel.split("/")[0] if "/" in rel else "."
+            by_top[top] = by_top.get(top, 0) + graph.sizes[rel]
+    print()
+    print("Unused by top-level folder:")
+    for top, size in sorted(by_top.items(), key=lambda kv: -kv[1]):
+        print(f"  {top:30} {_mib(size):8.2f} MiB")
+
+    all_bytes = sum(t[1] for t in totals.values())
+    saved, decoded = totals["unused"][1], totals["unused"][2]
+    print("=" * 60)
+    print(f"📦 Package: {_mib(all_bytes):.2f} MiB -> {_mib(all_bytes - saved):.2f} MiB "
+          f"(-{saved / max(all_bytes, 1):.0%}) with {len(patterns)} exclude patterns")
+    print(f"⏱️  Import work: -{_mib(decoded):.2f} MiB decoded, about -{_mib(decoded) / args.import_rate:.1f}s "
+          f"at {args.import_rate:g} MiB/s")
+    if totals["maybe"][0]:
+        print(f"⚠️  {totals['maybe'][0]} maybe-used files kept (under runtime-built paths); see --list maybe")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps({
+            "files": {rel: {"class": cls, "reason": reason, "bytes": graph.sizes[rel]}
+                      for rel, (cls, reason) in classes.items()},
+            "exclude_filter": patterns,
+        }, indent=1))
+    if args.write:
+        updated = write_presets(patterns)
+        if updated:
+            print(f"✅ exclude_filter set in {updated} preset(s) of {PRESETS_PATH.name}")
+        else:
+            print(f"⚠️  {PRESETS_PATH.name} defines no presets; add this exclude_filter when creating one:")
+    if not args.write or not updated:
+        print(f'exclude_filter="{", ".join(patterns)}"')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,475 @@
+#!/usr/bin/env python3
+"""
+Compact columnar binary format for ReplayV4 sessions (.replayb)
+scripts/v4/ReplayV4.gd saves each session as tab-indented JSON with one
+{"frame", "time", "input"} dict per frame. This module stores the same data
+in blocks of KEYFRAME_INTERVAL frames: frame times are delta-encoded at the
+narrowest integer width that fits (in ms, or µs for fractional times; times
+finer than that are kept as raw float64), boolean inputs (flippers, launch) are
+bit-packed one column per action, and any other input values go in a sparse
+JSON column. Each block is compressed on its own (zlib, or zstd when the
+zstandard package is installed) and listed in a keyframe index, so a reader
+can seek to a frame or time by decompressing a single block.
+Conversion is lossless in both directions (frame dicts and metadata compare
+equal after a JSON -> binary -> JSON round trip).
+Usage: python3 tools/replay_format.py to-binary|to-json|info PATH [OUT] [--codec zlib|zstd|none]
+       python3 tools/replay_format.py bench [--minutes 5 15 30]
+"""
+
+import argparse
+import bisect
+import json
+import math
+import random
+import struct
+import sys
+import time
+import zlib
+from array import array
+from itertools import accumulate, chain
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+MAGIC = b"PBRP"
+FORMAT_VERSION = 1
+KEYFRAME_INTERVAL = 256
+
+CODECS = {"none": 0, "zlib": 1, "zstd": 2}
+CODEC_NAMES = {v: k for k, v in CODECS.items()}
+
+HEADER = struct.Struct("<4sBBHI")          # magic, version, codec, reserved, meta length
+INDEX_ENTRY = struct.Struct("<qqQII")      # first frame, first time, offset, stored size, frames
+LITTLE_ENDIAN = sys.byteorder == "little"
+WIDTH_CODES = {1: "B", 2: "H", 4: "I", 8: "Q"}
+
+# byte -> its 8 bits, least significant first
+_BITS = [tuple(bool(b >> i & 1) for i in range(8)) for b in range(256)]
+
+
+# ---------------------------------------------------------------------------
+# Column primitives
+# ---------------------------------------------------------------------------
+
+def _zigzag(values):
+    return [(v << 1) ^ (v >> 63) for v in values]
+
+
+def _unzigzag(values):
+    return [(v >> 1) ^ -(v & 1) for v in values]
+
+
+def _pack_ints(values):
+    """Zigzag values at the narrowest fixed width: width byte + little-endian array"""
+    encoded = _zigzag(values)
+    peak = max(encoded, default=0)
+    width = next(w for w in (1, 2, 4, 8) if peak < 1 << (8 * w))
+    packed = array(WIDTH_CODES[width], encoded)
+    if not LITTLE_ENDIAN and width > 1:
+        packed.byteswap()
+    return bytes([width]) + packed.tobytes()
+
+
+def _unpack_ints(buf, pos, count):
+    width = buf[pos]
+    packed = array(WIDTH_CODES[width])
+    packed.frombytes(buf[pos + 1:pos + 1 + width * count])
+    if not LITTLE_ENDIAN and width > 1:
+        packed.byteswap()
+    return _unzigzag(packed), pos + 1 + width * count
+
+
+def _pack_floats(values):
+    """Raw little-endian float64 array"""
+    packed = array("d", values)
+    if not LITTLE_ENDIAN:
+        packed.byteswap()
+    return packed.tobytes()
+
+
+def _unpack_floats(buf, pos, count):
+    packed = array("d")
+    packed.frombytes(buf[pos:pos + 8 * count])
+    if not LITTLE_ENDIAN:
+        packed.byteswap()
+    return packed.tolist(), pos + 8 * count
+
+
+def _pack_bits(flags):
+    """LSB-first bitset of a bool column"""
+    return (sum(1 << i for i, f in enumerate(flags) if f)).to_bytes((len(flags) + 7) // 8, "little")
+
+
+def _unpack_bits(buf, pos, count):
+    size = (count + 7) // 8
+    bits = list(chain.from_iterable(_BITS[b] for b in buf[pos:pos + size]))
+    return bits[:count], pos + size
+
+
+def _compress(raw, codec):
+    if codec == CODECS["zlib"]:
+        return zlib.compress(raw, 9)
+    if codec == CODECS["zstd"]:
+        return zstandard.ZstdCompressor(level=19).compress(raw)
+    return raw
+
+
+def _decompress(data, codec):
+    if codec == CODECS["zlib"]:
+        return zlib.decompress(data)
+    if codec == CODECS["zstd"]:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("replay is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return data
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def _button_keys(frames):
+    """Input keys that are present and boolean in every frame"""
+    if not frames:
+        return []
+    keys = [k for k, v in frames[0].get("input", {}).items() if isinstance(v, bool)]
+    for frame in frames:
+        inputs = frame.get("input", {})
+        keys = [k for k in keys if isinstance(inputs.get(k), bool)]
+    return keys
+
+
+def _time_format(frames):
+    """(time_float, time_scale): times are stored as integers of 1/scale ms, or as float64 when scale is 0"""
+    times = [f["time"] for f in frames]
+    time_float = any(isinstance(t, float) for t in times)
+    if all(float(t).is_integer() for t in times):
+        return time_float, 1
+    if all(round(t * 1000) / 1000 == t for t in times):
+        return True, 1000
+    return True, 0
+
+
+def encode_replay(data, codec="zlib", keyframe_interval=KEYFRAME_INTERVAL):
+    """Encode a ReplayV4 dict ({..., "frames": [...]}) to .replayb bytes"""
+    if codec not in CODECS:
+        raise ValueError(f"unknown codec {codec!r} (expected one of {', '.join(CODECS)})")
+    if codec == "zstd" and not ZSTD_AVAILABLE:
+        raise ValueError("zstd codec needs the zstandard package (pip install zstandard)")
+    frames = data.get("frames", [])
+    for i, frame in enumerate(frames):
+        if not isinstance(frame.get("frame"), (int, float)) or not isinstance(frame.get("time"), (int, float)):
+            raise ValueError(f"frame {i} lacks a numeric 'frame' or 'time'")
+        if not float(frame["frame"]).is_integer():
+            # Frame numbers are stored as integers; a fractional one would not round-trip
+            raise ValueError(f"frame {i} has a non-integral frame number {frame['frame']!r}")
+    buttons = _button_keys(frames)
+    time_float, time_scale = _time_format(frames)
+    frame_float = any(isinstance(f["frame"], float) for f in frames)
+
+    meta = {k: v for k, v in data.items() if k != "frames"}
+    meta["_format"] = {
+        "buttons": buttons,
+        "frame_count": len(frames),
+        "frame_float": frame_float,
+        "has_frames": "frames" in data,
+        "keyframe_interval": keyframe_interval,
+        "time_float": time_float,
+        "time_scale": time_scale,
+    }
+    meta_bytes = json.dumps(meta, separators=(",", ":")).encode()
+
+    codec_id = CODECS[codec]
+    index = []
+    blocks = []
+    offset = 0
+    for start in range(0, len(frames), keyframe_interval):
+        block = frames[start:start + keyframe_interval]
+        numbers = [int(f["frame"]) for f in block]
+        if time_scale:
+            times = [round(f["time"] * time_scale) for f in block]
+            parts = [struct.pack("<I", len(block)), _pack_ints([b - a for a, b in zip(times, times[1:])])]
+        else:
+            # The index keeps whole ms below the first time; seek_time walks on from there
+            times = [math.floor(block[0]["time"])]
+            parts = [struct.pack("<I", len(block)), _pack_floats([float(f["time"]) for f in block])]
+        # Frame numbers are usually 0, 1, 2, ...: store only the exceptions
+        if numbers == list(range(numbers[0], numbers[0] + len(block))):
+            parts.append(b"\0")
+        else:
+            parts.append(b"\1" + _pack_ints([b - a for a, b in zip(numbers, numbers[1:])]))
+        parts.extend(_pack_bits([f["input"][k] for f in block]) for k in buttons)
+        extras = []
+        for i, frame in enumerate(block):
+            extra = {k: v for k, v in frame.items() if k not in ("frame", "time", "input")}
+            inputs = {k: v for k, v in frame.get("input", {}).items() if k not in buttons}
+            if inputs or "input" not in frame:
+                extra["input"] = inputs if "input" in frame else None
+            if extra:
+                extras.append([i, extra])
+        extras_bytes = json.dumps(extras, separators=(",", ":")).encode() if extras else b""
+        parts.append(struct.pack("<I", len(extras_bytes)) + extras_bytes)
+        stored = _compress(b"".join(parts), codec_id)
+        index.append(INDEX_ENTRY.pack(numbers[0], times[0], offset, len(stored), len(block)))
+        blocks.append(stored)
+        offset += len(stored)
+
+    return b"".join([HEADER.pack(MAGIC, FORMAT_VERSION, codec_id, 0, len(meta_bytes)), meta_bytes,
+                     struct.pack("<I", len(index)), *index, *blocks])
+
+
+# ---------------------------------------------------------------------------
+# Decoding
+# ---------------------------------------------------------------------------
+
+class ReplayReader:
+    """Lazy reader: parses the header and keyframe index, decodes blocks on demand"""
+
+    def __init__(self, blob):
+        blob = memoryview(blob)
+        magic, version, codec, _, meta_len = HEADER.unpack_from(blob, 0)
+        if magic != MAGIC:
+            raise ValueError("not a .replayb file")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported .replayb version {version}")
+        if codec not in CODEC_NAMES:
+            raise ValueError(f"unknown codec id {codec}")
+        self.codec = codec
+        pos = HEADER.size
+        self.meta = json.loads(bytes(blob[pos:pos + meta_len]))
+        self.format = self.meta.pop("_format")
+        pos += meta_len
+        (count,) = struct.unpack_from("<I", blob, pos)
+        pos += 4
+        self.index = [INDEX_ENTRY.unpack_from(blob, pos + i * INDEX_ENTRY.size) for i in range(count)]
+        self._blocks = blob[pos + count * INDEX_ENTRY.size:]
+        self._first_frames = [entry[0] for entry in self.index]
+        self._first_times = [entry[1] for entry in self.index]
+
+    @property
+    def frame_count(self):
+        return self.format["frame_count"]
+
+    @property
+    def duration(self):
+        """Time of the last frame, in seconds (as ReplayV4._calculate_duration)"""
+        if not self.index:
+            return 0.0
+        return self.block_columns(len(self.index) - 1)["time"][-1] / 1000.0
+
+    def block_columns(self, block):
+        """Decode one block into {"frame", "time", <button>..., "extras"} columns"""
+        first_frame, first_time, offset, size, count = self.index[block]
+        raw = _decompress(self._blocks[offset:offset + size], self.codec)
+        pos = 4
+        scale = self.format["time_scale"]
+        if scale == 0:
+            times, pos = _unpack_floats(raw, pos, count)
+        else:
+            deltas, pos = _unpack_ints(raw, pos, count - 1)
+            times = list(accumulate(deltas, initial=first_time))
+            if scale != 1:
+                times = [t / scale for t in times]
+            elif self.format["time_float"]:
+                times = [float(t) for t in times]
+        mode = raw[pos]
+        pos += 1
+        if mode == 0:
+            numbers = list(range(first_frame, first_frame + count))
+        else:
+            deltas, pos = _unpack_ints(raw, pos, count - 1)
+            numbers = list(accumulate(deltas, initial=first_frame))
+        if self.format["frame_float"]:
+            numbers = [float(n) for n in numbers]
+        columns = {"frame": numbers, "time": times}
+        for key in self.format["buttons"]:
+            columns[key], pos = _unpack_bits(raw, pos, count)
+        (extras_len,) = struct.unpack_from("<I", raw, pos)
+        pos += 4
+        columns["extras"] = dict(json.loads(bytes(raw[pos:pos + extras_len]))) if extras_len else {}
+        return columns
+
+    def _block_frames(self, block):
+        columns = self.block_columns(block)
+        buttons = self.format["buttons"]
+        extras = columns["extras"]
+        key_columns = [columns[k] for k in buttons]
+        frames = []
+        for i, (number, t, *pressed) in enumerate(zip(columns["frame"], columns["time"], *key_columns)):
+            frame = {"frame": number, "time": t, "input": dict(zip(buttons, pressed))}
+            extra = extras.get(i)
+            if extra:
+                inputs = extra.pop("input", {})
+                if inputs is None:
+                    del frame["input"]
+                else:
+                    frame["input"].update(inputs)
+                frame.update(extra)
+            frames.append(frame)
+        return frames
+
+    def frames(self, start=0, stop=None):
+        """Frame dicts with list positions in [start, stop), decoding only the blocks needed"""
+        stop = self.frame_count if stop is None else min(stop, self.frame_count)
+        interval = self.format["keyframe_interval"]
+        for block in range(start // interval, (stop + interval - 1) // interval):
+            base = block * interval
+            for i, frame in enumerate(self._block_frames(block)):
+                if start <= base + i < stop:
+                    yield frame
+
+    def seek_frame(self, number):
+        """Position of the first frame whose "frame" value is >= number"""
+        block = max(0, bisect.bisect_right(self._first_frames, number) - 1)
+        return self._seek(block, "frame", number)
+
+    def seek_time(self, ms):
+        """Position of the first frame recorded at or after ms"""
+        scale = self.format["time_scale"]
+        if scale == 0:
+            # Indexed times are floored: start at the last block that surely begins before ms
+            block = max(0, bisect.bisect_left(self._first_times, math.floor(ms)) - 1)
+        else:
+            block = max(0, bisect.bisect_right(self._first_times, ms * scale) - 1)
+        return self._seek(block, "time", ms, walk=scale == 0)
+
+    def _seek(self, block, column, value, walk=False):
+        if not self.index:
+            return 0
+        values = self.block_columns(block)[column]
+        position = bisect.bisect_left(values, value)
+        while walk and position == len(values) and block + 1 < len(self.index):
+            block += 1
+            values = self.block_columns(block)[column]
+            position = bisect.bisect_left(values, value)
+        return block * self.format["keyframe_interval"] + position
+
+    def to_dict(self):
+        data = dict(self.meta)
+        if self.format["has_frames"]:
+            data["frames"] = [f for block in range(len(self.index)) for f in self._block_frames(block)]
+        return data
+
+
+def decode_replay(blob):
+    """Decode .replayb bytes back to the ReplayV4 dict"""
+    return ReplayReader(blob).to_dict()
+
+
+def load_json_replay(path):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def dump_json_replay(data):
+    """Serialize like ReplayV4._save_replay (JSON.stringify(data, "\\t"))"""
+    return json.dumps(data, indent="\t", ensure_ascii=False)
+
+
+# ---------------------------------------------------------------------------
+# Synthetic sessions and benchmark
+# ---------------------------------------------------------------------------
+
+def synthetic_replay(minutes, fps=60, seed=0, character="sparky"):
+    """A ReplayV4-shaped session with flipper taps, launches and ~1 ms frame jitter"""
+    rng = random.Random(seed)
+    frames = []
+    state = {"flipper_left": False, "flipper_right": False, "launch_ball": False}
+    t = 0.0
+    for n in range(int(minutes * 60 * fps)):
+        for key in state:
+            # Taps: rare presses, releases after ~100-300 ms
+            state[key] = rng.random() < (0.93 if state[key] else 0.01)
+        frame_input = dict(state)
+        if state["launch_ball"] and rng.random() < 0.2:
+            frame_input["plunger_power"] = round(rng.random(), 3)
+        frames.append({"frame": n, "time": float(round(t)), "input": frame_input})
+        t += 1000.0 / fps + rng.uniform(-1.0, 1.0)
+    return {
+        "id": "1700000000.0", "timestamp": 1700000000.0, "start_time": 1700000000.0,
+        "final_score": rng.randrange(10 ** 6), "character": character, "frames": frames,
+        "metadata": {"game_version": "1.0.0", "platform": "Linux"},
+    }
+
+
+def _best_time(fn, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark(minutes_list=(5, 15, 30)):
+    print("📊 Replay format benchmark (synthetic 60 fps sessions)")
+    print("=" * 60)
+    codecs = ["none", "zlib"] + (["zstd"] if ZSTD_AVAILABLE else [])
+    for minutes in minutes_list:
+        data = synthetic_replay(minutes)
+        text = dump_json_replay(data)
+        raw = text.encode()
+        json_parse = _best_time(lambda: json.loads(raw))
+        print(f"\n{minutes} min, {len(data['frames'])} frames")
+        print(f"   JSON          {len(raw) / 1024:9.1f} KiB   parse {json_parse * 1000:7.1f} ms")
+        for codec in codecs:
+            blob = encode_replay(data, codec)
+            assert decode_replay(blob) == json.loads(raw), "round trip mismatch"
+            parse = _best_time(lambda: decode_replay(blob))
+            reader = ReplayReader(blob)
+            columns = _best_time(lambda: [reader.block_columns(b) for b in range(len(reader.index))])
+
+            def seek_middle():
+                # Open the file and fetch the frame at the session midpoint
+                r = ReplayReader(blob)
+                position = r.seek_time(minutes * 30000)
+                next(r.frames(position, position + 1))
+
+            seek = _best_time(seek_middle)
+            print(f"   {codec:13} {len(blob) / 1024:9.1f} KiB   parse {parse * 1000:7.1f} ms"
+                  f"   columns {columns * 1000:6.1f} ms   seek {seek * 1000:5.2f} ms"
+                  f"   ({len(raw) / len(blob):.0f}x smaller)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert ReplayV4 JSON replays to/from .replayb")
+    parser.add_argument("command", choices=["to-binary", "to-json", "info", "bench"])
+    parser.add_argument("path", nargs="?", help="input replay")
+    parser.add_argument("out", nargs="?", help="output path (default: input with the other extension)")
+    parser.add_argument("--codec", choices=list(CODECS), default="zlib", help="block compression (to-binary)")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[5, 15, 30], help="session lengths (bench)")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        benchmark(args.minutes)
+        return
+    if not args.path:
+        parser.error(f"{args.command} needs a replay path")
+
+    if args.command == "to-binary":
+        out = args.out or args.path.rsplit(".", 1)[0] + ".replayb"
+        blob = encode_replay(load_json_replay(args.path), args.codec)
+        with open(out, "wb") as f:
+            f.write(blob)
+        print(f"✅ {args.path} → {out} ({len(blob) / 1024:.1f} KiB, {args.codec})")
+    elif args.command == "to-json":
+        out = args.out or args.path.rsplit(".", 1)[0] + ".replay"
+        with open(args.path, "rb") as f:
+            text = dump_json_replay(decode_replay(f.read()))
+        with open(out, "w", encoding="utf-8") as f:
+            f.write(text)
+        print(f"✅ {args.path} → {out}")
+    else:
+        with open(args.path, "rb") as f:
+            reader = ReplayReader(f.read())
+        print(f"🎮 {reader.meta.get('id', '?')} ({reader.meta.get('character', '?')}, "
+              f"score {reader.meta.get('final_score', 0)})")
+        print(f"   {reader.frame_count} frames, {reader.duration:.1f} s, {len(reader.index)} keyframes, "
+              f"codec {CODEC_NAMES[reader.codec]}, buttons: {', '.join(reader.format['buttons']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+#!/usr/bin/env python3
+"""
+Streaming analytics over ReplayV4 replay files (.replay JSON and .replayb)
+Each file is read with an incremental JSON parser: the top-level object is
+scanned in fixed-size chunks and frames are decoded one at a time, so memory
+per file stays constant however long the session is. Files fan out over a
+process pool; every worker returns a small per-session summary (score,
+character, duration, input presses per minute, frame-time gaps), and the
+parent aggregates them into:
+  - per-character score distributions (percentiles and a histogram)
+  - an input-rate histogram (presses per minute)
+  - session-duration percentiles
+  - anomaly flags: hitches (frame-time gaps), time running backwards,
+    skipped frame numbers, empty or unreadable files, score outliers
+The summary is columnar JSON (one list per per-file column, plus aggregates).
+Usage: python3 tools/replay_stats.py PATH... [--jobs N] [--out summary.json] [--hitch-ms 100]
+       python3 tools/replay_stats.py --generate N --into DIR   (synthetic QA replays)
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from replay_format import ReplayReader, dump_json_replay, synthetic_replay
+
+CHUNK_SIZE = 1 << 16
+HITCH_MS = 100          # A frame-time gap this long is a visible hitch (6 frames at 60 fps)
+RATE_BIN = 15           # Input-rate histogram bin width, presses per minute
+RATE_BINS = 20
+SCORE_BINS = 10
+OUTLIER_IQR = 3.0       # Scores beyond Q1/Q3 -/+ this many IQRs are flagged
+PERCENTILES = (10, 25, 50, 75, 90, 99)
+CHARACTERS = ("sparky", "dino", "dash", "android")
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_ITEM_END = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+_NUMBER_CHARS = frozenset("0123456789.eE+-")
+_DECODER = json.JSONDecoder()
+
+
+# ---------------------------------------------------------------------------
+# Incremental JSON reader
+# ---------------------------------------------------------------------------
+
+class ReplayStream:
+    """Stream the frames of a .replay JSON file without loading the document
+
+    Iterating yields frame dicts in order; the other top-level keys are
+    collected into .meta as they are passed (all of them once iteration ends).
+    """
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
+        self.meta = {}
+
+    def _fill(self):
+        data = self._file.read(self.chunk_size)
+        if not data:
+            self._eof = True
+            return False
+        self._buf = self._buf[self._pos:] + data
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """Next non-whitespace character (consumed whitespace is dropped)"""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                raise ValueError(f"{self.path}: unexpected end of file")
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise ValueError(f"{self.path}: expected {char!r} near byte {self._file.tell()}")
+        self._pos += 1
+
+    def _value(self):
+        """Decode the next JSON value once the buffer surely holds all of it"""
+        self._peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+                # A number ending at the buffer end ("17", "17.") may continue in the next chunk
+                if self._eof or end < len(self._buf) and self._buf[end] not in _NUMBER_CHARS:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError as e:
+                if self._eof:
+                    raise ValueError(f"{self.path}: {e}") from None
+            self._fill()
+
+    def _items(self):
+        """Array elements up to and including the closing bracket"""
+        decode, item_end = _DECODER.raw_decode, _ITEM_END.match
+        while True:
+            # Fast path: value and separator both complete within the buffer
+            buf, pos = self._buf, self._pos
+            try:
+                value, end = decode(buf, pos)
+                match = item_end(buf, end)
+            except json.JSONDecodeError:
+                match = None
+            if match is None or match.end() == len(buf):
+                value = self._value()
+                closing = self._peek() == "]"
+                if closing:
+                    self._pos += 1
+                else:
+                    self._expect(",")
+                    # Leave the position on the next value so the fast path can resume
+                    self._peek()
+            else:
+                self._pos = match.end()
+                closing = match.group(1) == "]"
+            yield value
+            if closing:
+                return
+
+    def __iter__(self):
+        with open(self.path, encoding="utf-8") as self._file:
+            self._buf, self._pos, self._eof = "", 0, False
+            self._expect("{")
+            if self._peek() == "}":
+                return
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == "frames" and self._peek() == "[":
+                    self._pos += 1
+                    if self._peek() == "]":
+                        self._pos += 1
+                    else:
+                        yield from self._items()
+                else:
+                    self.meta[key] = self._value()
+                if self._peek() == "}":
+                    return
+                self._expect(",")
+
+
+def iter_frames(path):
+    """(frame iterator, meta dict) for a .replay or .replayb file"""
+    if str(path).endswith(".replayb"):
+        with open(path, "rb") as f:
+            reader = ReplayReader(f.read())
+        return reader.frames(), reader.meta
+    stream = ReplayStream(path)
+    return iter(stream), stream.meta
+
+
+# ---------------------------------------------------------------------------
+# Per-session summary (runs in worker processes)
+# ---------------------------------------------------------------------------
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def summarize_file(path, hitch_ms=HITCH_MS):
+    """Constant-memory summary of one replay file"""
+    row = {"path": str(path), "id": None, "character": None, "final_score": None, "frames": 0,
+           "duration": 0.0, "presses": 0, "input_rate": 0.0, "max_gap_ms": 0.0, "hitches": 0, "flags": []}
+    frames = 0
+    presses = 0
+    hitches = backwards = skips = 0
+    max_gap = 0.0
+    last_time = last_number = None
+    previous = {}
+    try:
+        frame_iter, meta = iter_frames(path)
+        for frame in frame_iter:
+            frames += 1
+            if not isinstance(frame, dict):
+                raise ValueError(f"frame {frames} is not an object")
+            t = frame.get("time", 0)
+            number = frame.get("frame")
+            inputs = frame.get("input", {})
+            if not _is_number(t) or not (number is None or _is_number(number)) or not isinstance(inputs, dict):
+                raise ValueError(f"frame {frames} has a non-numeric time or frame, or a non-object input")
+            if last_time is not None:
+                gap = t - last_time
+                if gap < 0:
+                    backwards += 1
+                elif gap >= hitch_ms:
+                    hitches += 1
+                max_gap = max(max_gap, gap)
+            if last_number is not None and number is not None and number != last_number + 1:
+                skips += 1
+            last_time, last_number = t, number
+            # A press is a boolean input going from released to held
+            for key, held in inputs.items():
+                if held is True and previous.get(key) is not True:
+                    presses += 1
+                previous[key] = held
+    except (OSError, ValueError, UnicodeDecodeError) as e:
+        row["flags"].append("unreadable")
+        row["error"] = str(e)
+        return row
+
+    duration = (last_time or 0) / 1000.0
+    row.update(id=meta.get("id"), character=meta.get("character"), final_score=meta.get("final_score"),
+               frames=frames, duration=duration, presses=presses,
+               input_rate=presses / (duration / 60.0) if duration > 0 else 0.0,
+               max_gap_ms=max_gap, hitches=hitches)
+    if frames == 0:
+        row["flags"].append("empty")
+    if hitches:
+        row["flags"].append("hitch")
+    if backwards:
+        row["flags"].append("time_backwards")
+    if skips:
+        row["flags"].append("frame_skip")
+    return row
+
+
+def _summarize(args):
+    return summarize_file(*args)
+
+
+# ---------------------------------------------------------------------------
+# Aggregation
+# ---------------------------------------------------------------------------
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * q / 100.0
+    lo = math.floor(k)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def histogram(values, edges):
+    """Counts per [edges[i], edges[i+1]); the last bin also takes values beyond it"""
+    counts = [0] * (len(edges) - 1)
+    for v in values:
+        i = min(max(0, int((v - edges[0]) / (edges[1] - edges[0]))), len(counts) - 1)
+        counts[i] += 1
+    return counts
+
+
+def _percentiles(values):
+    values = sorted(values)
+    return {f"p{q}": percentile(values, q) for q in PERCENTILES}
+
+
+def aggregate(rows):
+    """Columnar summary of per-session rows"""
+    readable = [r for r in rows if "unreadable" not in r["flags"]]
+
+    by_character = {}
+    for row in readable:
+        if isinstance(row["final_score"], (int, float)):
+            by_character.setdefault(row["character"] or "unknown", []).append(row)
+    characters = {}
+    for name, group in sorted(by_character.items()):
+        scores = sorted(r["final_score"] for r in group)
+        q1, q3 = percentile(scores, 25), percentile(scores, 75)
+        low, high = q1 - OUTLIER_IQR * (q3 - q1), q3 + OUTLIER_IQR * (q3 - q1)
+        for r in group:
+            if not low <= r["final_score"] <= high:
+                r["flags"].append("score_outlier")
+        step = (scores[-1] - scores[0]) / SCORE_BINS or 1
+        edges = [scores[0] + i * step for i in range(SCORE_BINS + 1)]
+        characters[name] = {
+            "sessions": len(group),
+            "score_mean": sum(scores) / len(scores),
+            "score": _percentiles(scores),
+            "score_histogram": {"edges": edges, "counts": histogram(scores, edges)},
+            "duration": _percentiles(r["duration"] for r in group),
+            "input_rate": _percentiles(r["input_rate"] for r in group),
+        }
+
+    rate_edges = [i * RATE_BIN for i in range(RATE_BINS + 1)]
+    columns = ["path", "id", "character", "final_score", "frames", "duration",
+               "presses", "input_rate", "max_gap_ms", "hitches", "flags"]
+    flag_counts = {}
+    for row in rows:
+        for flag in row["flags"]:
+            flag_counts[flag] = flag_counts.get(flag, 0) + 1
+    return {
+        "sessions": len(rows),
+        "files": {c: [r.get(c) for r in rows] for c in columns},
+        "characters": characters,
+        "duration": _percentiles(r["duration"] for r in readable),
+        "input_rate_histogram": {"edges": rate_edges,
+                                 "counts": histogram([r["input_rate"] for r in readable], rate_edges)},
+        "flags": flag_counts,
+        "anomalies": [{"path": r["path"], "flags": r["flags"], **({"error": r["error"]} if "error" in r else {})}
+                      for r in rows if r["flags"]],
+    }
+
+
+def find_replays(paths):
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(p for p in path.rglob("*") if p.suffix in (".replay", ".replayb")))
+        else:
+            files.append(path)
+    return files
+
+
+def analyze(paths, jobs=None, hitch_ms=HITCH_MS):
+    files = find_replays(paths)
+    jobs = jobs or os.cpu_count() or 1
+    work = [(str(f), hitch_ms) for f in files]
+    if jobs > 1 and len(files) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            rows = list(pool.map(_summarize, work, chunksize=max(1, len(work) // (jobs * 8))))
+    else:
+        rows = [_summarize(w) for w in work]
+    return aggregate(rows)
+
+
+def generate(count, directory, minutes=1.0, seed=0):
+    """Write count synthetic QA replays (with occasional hitches) into directory"""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    for i in range(count):
+        character = rng.choice(CHARACTERS)
+        data = synthetic_replay(rng.uniform(0.25, 2.0) * minutes, seed=seed + i, character=character)
+        data["id"] = f"{1700000000 + i}.0"
+        data["final_score"] = int(rng.lognormvariate(11 + CHARACTERS.index(character) * 0.1, 0.6))
+        if rng.random() < 0.05 and data["frames"]:
+            # Stall: every frame after a random point is pushed back 150-500 ms
+            stall = rng.randrange(len(data["frames"]))
+            delay = rng.uniform(150, 500)
+            for frame in data["frames"][stall:]:
+                frame["time"] = float(round(frame["time"] + delay))
+        (directory / f"{data['id']}.replay").write_text(dump_json_replay(data), encoding="utf-8")
+
+
+def _fmt(value, digits=0):
+    return "-" if value is None else f"{value:,.{digits}f}"
+
+
+def print_report(summary, elapsed):
+    print("🎮 Replay Analytics")
+    print("=" * 60)
+    for name, c in summary["characters"].items():
+        s = c["score"]
+        print(f"\n{name} ({c['sessions']} sessions)")
+        print(f"   score    p10 {_fmt(s['p10'])}  p50 {_fmt(s['p50'])}  p90 {_fmt(s['p90'])}  p99 {_fmt(s['p99'])}")
+        d = c["duration"]
+        print(f"   duration p50 {_fmt(d['p50'], 1)} s  p90 {_fmt(d['p90'], 1)} s")
+        r = c["input_rate"]
+        print(f"   presses  p50 {_fmt(r['p50'], 1)}/min  p90 {_fmt(r['p90'], 1)}/min")
+    d = summary["duration"]
+    print(f"\n⏱️  Session duration: p50 {_fmt(d['p50'], 1)} s, p90 {_fmt(d['p90'], 1)} s, p99 {_fmt(d['p99'], 1)} s")
+    hist = summary["input_rate_histogram"]
+    peak = max(hist["counts"]) or 1
+    print("🕹️  Input rate (presses/min):")
+    for lo, count in zip(hist["edges"], hist["counts"]):
+        if count:
+            print(f"   {lo:4}+ {'█' * max(1, round(30 * count / peak))} {count}")
+    flags = ", ".join(f"{k}: {v}" for k, v in sorted(summary["flags"].items())) or "none"
+    print(f"⚠️  Anomalies: {flags}")
+    print("=" * 60)
+    print(f"📊 {summary['sessions']} replays in {elapsed:.1f}s ({summary['sessions'] / max(elapsed, 1e-9):.0f}/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate statistics over many replay files")
+    parser.add_argument("paths", nargs="*", help="replay files or directories (searched recursively)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--out", metavar="PATH", help="write the columnar JSON summary here")
+    parser.add_argument("--hitch-ms", type=float, default=HITCH_MS, help="frame-time gap flagged as a hitch")
+    parser.add_argument("--generate", type=int, metavar="N", help="write N synthetic replays instead")
+    parser.add_argument("--into", metavar="DIR", help="directory for --generate")
+    parser.add_argument("--minutes", type=float, default=1.0, help="typical synthetic session length")
+    args = parser.parse_args()
+
+    if args.generate:
+        if not args.into:
+            parser.error("--generate needs --into DIR")
+        generate(args.generate, args.into, args.minutes)
+        print(f"✅ Wrote {args.generate} synthetic replays to {args.into}")
+        return
+    if not args.paths:
+        parser.error("no replay paths given")
+
+    start = time.perf_counter()
+    summary = analyze(args.paths, args.jobs, args.hitch_ms)
+    elapsed = time.perf_counter() - start
+    print_report(summary, elapsed)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(summary, f, indent=1)
+        print(f"✅ Summary written to {args.out}")
+    if summary["sessions"] == 0:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,700 @@
+#!/usr/bin/env python3
+"""
+Bulk save-bundle migration and compaction
+A bundle is one player's exported user:// data: {"id": ..., "files": {path:
+contents}} with pinball_save.json (SaveManager) and, from v4 on,
+saves/statistics.json, leaderboard.json, achievements.json and
+settings.json. Each bundle's schema version is detected, the chained
+migrations up to the current version are applied (1 -> 2 -> 3 -> 4), and
+the input and result are validated against config/save_schemas.json.
+Version 4 is one canonical document: sorted keys, compact separators,
+integral floats written as ints (Godot's parser reads every number as a
+float), and fields that are redundant across the split files are stored
+once:
+  - character leaderboards are derived from the merged entry list
+  - achievement stats that mirror statistics counters
+  - statistics.achievements.unlocked_count (derived from the unlocked list)
+  - per-game state (statistics.session, bonus_types_earned_this_game)
+  - per-file timestamps (collapsed into saved_at)
+--expand turns canonical documents back into the user:// files the game loads.
+Corpora are JSON Lines (one bundle per line), read as a stream and
+migrated in chunks on a process pool. Output is written in input order,
+and a per-version report covers counts, failures, validation issues and
+bytes saved.
+Usage: python3 tools/save_migrate.py CORPUS... [--out migrated.jsonl] [--report report.json] [--jobs N] [--verify]
+       python3 tools/save_migrate.py --generate N --into corpus.jsonl | --bench [N] | --expand migrated.jsonl --into DIR
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+SCHEMA_PATH = BASE_DIR / "config" / "save_schemas.json"
+CURRENT_VERSION = 4
+CHUNK = 64               # Bundles per worker task
+IN_FLIGHT = 4            # Outstanding tasks per worker
+MAX_ISSUES = 20          # Distinct validation messages kept per version in the report
+
+MAIN_FILE = "pinball_save.json"
+STATS_FILE = "saves/statistics.json"
+LEADERBOARD_FILE = "saves/leaderboard.json"
+ACHIEVEMENTS_FILE = "saves/achievements.json"
+SETTINGS_FILE = "saves/settings.json"
+V4_FILES = (STATS_FILE, LEADERBOARD_FILE, ACHIEVEMENTS_FILE, SETTINGS_FILE)
+
+# Defaults the game writes for a fresh profile (SaveManager, StatisticsTrackerV4)
+DEFAULT_OWNED = ["ball_standard", "flipper_standard"]
+DEFAULT_EQUIPPED = {"ball": "ball_standard", "flipper": "flipper_standard"}
+DEFAULT_STATISTICS = {
+    "lifetime": {"games_played": 0, "total_score": 0, "total_time_played": 0, "total_balls_lost": 0,
+                 "total_bonus_balls": 0, "high_score": 0, "favorite_character": "sparky",
+                 "first_played": 0, "last_played": 0},
+    "scoring": {"total_hits": 0, "total_bumper_hits": 0, "total_ramp_hits": 0, "total_letter_hits": 0,
+                "total_word_completions": 0, "highest_multiplier_reached": 0, "highest_combo": 0},
+    "zones": {"android_acres_bonuses": 0, "google_words_completed": 0, "dash_nests_completed": 0,
+              "dino_chomps": 0, "sparky_turbos": 0, "favorite_zone": "android_acres"},
+}
+MAX_ENTRIES = 100        # LeaderboardV4.MAX_ENTRIES
+LOCAL_CACHE_SIZE = 50    # LeaderboardV4.LOCAL_CACHE_SIZE
+CHARACTERS = ("sparky", "dino", "dash", "android")
+
+# AchievementSystemV4 stats that repeat a StatisticsTrackerV4 counter
+MIRRORED_STATS = {
+    "games_played": ("lifetime", "games_played"),
+    "total_bonus_balls": ("lifetime", "total_bonus_balls"),
+    "max_combo": ("scoring", "highest_combo"),
+    "max_multiplier_reached": ("scoring", "highest_multiplier_reached"),
+    "android_acres_bonuses": ("zones", "android_acres_bonuses"),
+    "google_words_completed": ("zones", "google_words_completed"),
+    "dash_nests_completed": ("zones", "dash_nests_completed"),
+    "dino_chomps": ("zones", "dino_chomps"),
+    "sparky_turbos": ("zones", "sparky_turbos"),
+}
+TRANSIENT_STATS = ("bonus_types_earned_this_game",)
+
+
+class MigrationError(Exception):
+    """A bundle that cannot be migrated"""
+
+
+# ---------------------------------------------------------------------------
+# Schemas
+# ---------------------------------------------------------------------------
+
+_PY_TYPES = {"object": (dict,), "array": (list,), "string": (str,), "boolean": (bool,),
+             "number": (int, float), "integer": (int,)}
+
+
+def _path(link):
+    """JSON pointer of a (parent link, key) chain; only built when an issue is reported"""
+    keys = []
+    while link is not None:
+        link, key = link
+        keys.append(str(key))
+    return "/" + "/".join(reversed(keys))
+
+
+def compile_schema(node, schemas, cache=None):
+    """Validator closure (value, path link, issues) for a schema node of the JSON Schema subset
+
+    Paths travel as (parent, key) links and are formatted only for issues,
+    since almost every value validates.
+    """
+    cache = {} if cache is None else cache
+    if "$ref" in node:
+        ref = node["$ref"]
+        if ref not in cache:
+            cache[ref] = cell = [None]
+            if ref.startswith("#"):
+                version, _, name = ref[1:].partition("/")
+                target = schemas["versions"][version][name]
+            else:
+                target = schemas["definitions"][ref]
+            cell[0] = compile_schema(target, schemas, cache)
+        cell = cache[ref]
+        return cell[0] or (lambda value, path, issues: cell[0](value, path, issues))
+
+    names = node.get("type", [])
+    names = [names] if isinstance(names, str) else names
+    exact = {t for name in names for t in _PY_TYPES[name]}
+    integral = "integer" in names and "number" not in names
+    label = "/".join(names)
+    enum = node.get("enum")
+    low, high, longest = node.get("minimum"), node.get("maximum"), node.get("maxLength")
+    required = node.get("required", ())
+    properties = {k: compile_schema(v, schemas, cache) for k, v in node.get("properties", {}).items()}
+    extra = node.get("additionalProperties", True)
+    extra_check = compile_schema(extra, schemas, cache) if isinstance(extra, dict) else None
+    check_keys = bool(properties) or extra is not True
+    item_check = compile_schema(node["items"], schemas, cache) if "items" in node else None
+
+    def validate(value, path, issues):
+        kind = type(value)
+        if exact and kind not in exact and not (integral and kind is float and value.is_integer()):
+            issues.append(f"{_path(path)}: expected {label}")
+            return  # The remaining checks would only repeat it
+        if enum is not None and value not in enum:
+            issues.append(f"{_path(path)}: not one of {enum}")
+        if kind is int or kind is float:
+            if low is not None and value < low:
+                issues.append(f"{_path(path)}: below {low}")
+            if high is not None and value > high:
+                issues.append(f"{_path(path)}: above {high}")
+        elif kind is dict:
+            for key in required:
+                if key not in value:
+                    issues.append(f"{_path((path, key))}: missing")
+            if check_keys:
+                for key, item in value.items():
+                    check = properties.get(key, extra_check)
+                    if check is not None:
+                        check(item, (path, key), issues)
+                    elif extra is False:
+                        issues.append(f"{_path((path, key))}: unexpected")
+        elif kind is list:
+            if item_check is not None:
+                for n, item in enumerate(value):
+                    item_check(item, (path, n), issues)
+        elif kind is str and longest is not None and len(value) > longest:
+            issues.append(f"{_path(path)}: longer than {longest}")
+    return validate
+
+
+def load_validators(path=SCHEMA_PATH):
+    """{version: {file path: validator}}"""
+    with open(path, encoding="utf-8") as f:
+        schemas = json.load(f)
+    cache = {}
+    return {int(version): {name: compile_schema(node, schemas, cache) for name, node in files.items()}
+            for version, files in schemas["versions"].items()}
+
+
+def validate(validators, version, files):
+    """Issues of a bundle's files against the declared schema of version"""
+    issues = []
+    for name, check in validators[version].items():
+        if name == "":
+            check(files, None, issues)
+        elif name in files:
+            found = []
+            check(files[name], None, found)
+            issues.extend(f"{name}:{issue}" for issue in found)
+    return issues
+
+
+# ---------------------------------------------------------------------------
+# Detection and migrations
+# ---------------------------------------------------------------------------
+
+def bundle_files(bundle):
+    """{path relative to user://: parsed contents} of a bundle"""
+    if not isinstance(bundle, dict):
+        raise MigrationError("bundle is not an object")
+    if bundle.get("format") == "pinball-save":
+        return bundle
+    files = bundle.get("files", bundle)
+    out = {}
+    for name, contents in files.items():
+        if isinstance(contents, str) and name.endswith(".json"):
+            try:
+                contents = json.loads(contents)  # Exports that kept the raw file text
+            except ValueError:
+                raise MigrationError(f"{name} is not valid JSON")
+        if isinstance(contents, dict):
+            out[name[len("user://"):] if name.startswith("user://") else name] = contents
+    return out
+
+
+def detect_version(files):
+    if files.get("format") == "pinball-save":
+        return int(files.get("version", 0))
+    main = files.get(MAIN_FILE)
+    if any(name in files for name in V4_FILES):
+        return 3
+    if main is None:
+        raise MigrationError(f"no {MAIN_FILE} and no v4 save files")
+    if "version" not in main:
+        return 1
+    if str(main["version"]).split(".")[0] == "2":
+        return 2
+    raise MigrationError(f"unknown {MAIN_FILE} version {main['version']!r}")
+
+
+def _v1_to_v2(files, notes):
+    """Currency moves under "currency"; the save gets SaveManager's version stamp"""
+    main = dict(files[MAIN_FILE])
+    currency = {"coins": main.pop("coins", 0), "gems": main.pop("gems", 0)}
+    main.update(version="2.0", currency=currency)
+    main.setdefault("owned_items", list(DEFAULT_OWNED))
+    main.setdefault("equipped_items", dict(DEFAULT_EQUIPPED))
+    return dict(files, **{MAIN_FILE: main})
+
+
+def _v2_to_v3(files, notes):
+    """Profiles from before v4 get the files v4 creates on first launch"""
+    files = dict(files)
+    files.setdefault(MAIN_FILE, {"version": "2.0", "currency": {"coins": 0, "gems": 0}})
+    files.setdefault(STATS_FILE, json.loads(json.dumps(DEFAULT_STATISTICS)))
+    files.setdefault(LEADERBOARD_FILE, {"entries": []})
+    files.setdefault(ACHIEVEMENTS_FILE, {"unlocked": [], "stats": {}})
+    files.setdefault(SETTINGS_FILE, {})
+    return files
+
+
+def _entry_key(entry):
+    return -entry.get("score", 0), entry.get("timestamp", 0), entry.get("id", "")
+
+
+def _v3_to_v4(files, notes):
+    """Merge the split files into the canonical document, storing redundant fields once"""
+    main = files.get(MAIN_FILE) or {"currency": {}}
+    currency = main.get("currency") or {}
+    owned = main.get("owned_items", DEFAULT_OWNED)
+    if len(set(owned)) != len(owned):
+        notes["duplicate owned_items"] += len(owned) - len(set(owned))
+
+    stats = {k: dict(v) for k, v in (files.get(STATS_FILE) or {}).items() if isinstance(v, dict)}
+    for section in ("session", "achievements"):
+        if section in stats:
+            stats.pop(section)
+            notes[f"statistics.{section} dropped"] += 1
+    # The tracker indexes these sections without checks, so they are always complete
+    for section, defaults in DEFAULT_STATISTICS.items():
+        stats[section] = dict(defaults, **stats.get(section, {}))
+
+    achievements = files.get(ACHIEVEMENTS_FILE) or {}
+    unlocked = sorted(set(achievements.get("unlocked", [])))
+    ach_stats = dict(achievements.get("stats", {}))
+    for key in TRANSIENT_STATS:
+        if ach_stats.pop(key, None) is not None:
+            notes[f"achievements.{key} dropped"] += 1
+    for key, (section, name) in MIRRORED_STATS.items():
+        if key in ach_stats and stats.get(section, {}).get(name) == ach_stats[key]:
+            del ach_stats[key]
+            notes["mirrored achievement stats"] += 1
+        elif key in ach_stats:
+            notes["diverged achievement stats kept"] += 1
+
+    board = files.get(LEADERBOARD_FILE) or {}
+    entries, seen = [], set()
+    lists = [board.get("entries", [])] + list((board.get("character_leaderboards") or {}).values())
+    for entry in (e for entry_list in lists for e in entry_list):
+        key = entry.get("id") or json.dumps(entry, sort_keys=True)
+        if key in seen:
+            notes["duplicate leaderboard entries"] += 1
+            continue
+        seen.add(key)
+        entries.append(entry)
+    entries.sort(key=_entry_key)
+    leaderboard = {"entries": entries}
+    if board.get("last_sync"):
+        leaderboard["last_sync"] = board["last_sync"]
+
+    settings = dict(files.get(SETTINGS_FILE) or {})
+    stamps = [settings.pop("last_saved", 0), board.get("timestamp", 0), achievements.get("timestamp", 0)]
+    settings.pop("version", None)
+    saved_at = int(max(s for s in stamps if isinstance(s, (int, float))))
+
+    doc = {
+        "format": "pinball-save",
+        "version": 4,
+        "profile": {"coins": currency.get("coins", 0), "gems": currency.get("gems", 0),
+                    "owned_items": sorted(set(owned)),
+                    "equipped_items": main.get("equipped_items", dict(DEFAULT_EQUIPPED))},
+        "statistics": stats,
+        "achievements": {"unlocked": unlocked, "stats": ach_stats},
+        "leaderboard": leaderboard,
+        "settings": settings,
+    }
+    if saved_at:
+        doc["saved_at"] = saved_at
+    return doc
+
+
+MIGRATIONS = {1: _v1_to_v2, 2: _v2_to_v3, 3: _v3_to_v4}
+
+
+def _integral(value):
+    """Integral floats as ints, recursively (Godot's JSON parser returns every number as a float)"""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {k: _integral(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_integral(v) for v in value]
+    return value
+
+
+def canonical_text(doc):
+    return json.dumps(doc, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def migrate(bundle, validators):
+    """(canonical document, source version, input issues, notes); raises MigrationError"""
+    files = bundle_files(bundle)
+    version = detect_version(files)
+    if version not in validators:
+        raise MigrationError(f"no schema for version {version}")
+    issues = validate(validators, version, files)
+    notes = Counter()
+    doc = files
+    for step in range(version, CURRENT_VERSION):
+        doc = MIGRATIONS[step](doc, notes)
+    doc = _integral(doc)
+    problems = validate(validators, CURRENT_VERSION, doc)
+    if problems:
+        raise MigrationError(f"result fails the v{CURRENT_VERSION} schema: " + "; ".join(problems[:3]))
+    return doc, version, issues, notes
+
+
+def expand(doc):
+    """The user:// files of a canonical document, as the game writes them"""
+    profile = doc["profile"]
+    stats = {section: dict(DEFAULT_STATISTICS.get(section, {}), **values)
+             for section, values in doc["statistics"].items()}
+    stats["session"] = {"current_session_start": 0, "session_score": 0, "session_balls_lost": 0,
+                        "session_bonus_balls": 0}
+    stats["achievements"] = {"unlocked_count": len(doc["achievements"]["unlocked"]), "total_points": 0}
+    ach_stats = dict(doc["achievements"]["stats"])
+    for key, (section, name) in MIRRORED_STATS.items():
+        if key not in ach_stats and name in stats.get(section, {}):
+            ach_stats[key] = stats[section][name]
+    entries = doc["leaderboard"]["entries"]
+    board = {"entries": entries[:MAX_ENTRIES],
+             "character_leaderboards": {c: [e for e in entries if e.get("character") == c][:LOCAL_CACHE_SIZE]
+                                        for c in CHARACTERS},
+             "last_sync": doc["leaderboard"].get("last_sync", 0), "timestamp": doc.get("saved_at", 0)}
+    settings = dict(doc["settings"])
+    if settings:
+        settings.update(version="1.0.0", last_saved=doc.get("saved_at", 0))
+    files = {
+        MAIN_FILE: {"version": "2.0", "currency": {"coins": profile["coins"], "gems": profile["gems"]},
+                    "owned_items": profile["owned_items"], "equipped_items": profile["equipped_items"]},
+        STATS_FILE: stats,
+        LEADERBOARD_FILE: board,
+        ACHIEVEMENTS_FILE: {"unlocked": doc["achievements"]["unlocked"], "stats": ach_stats,
+                            "timestamp": doc.get("saved_at", 0)},
+    }
+    if settings:
+        files[SETTINGS_FILE] = settings
+    return files
+
+
+# ---------------------------------------------------------------------------
+# Bulk processing
+# ---------------------------------------------------------------------------
+
+_VALIDATORS = None
+
+
+def _migrate_chunk(task):
+    """Worker: [(label, line)] -> [(label, canonical line or None, row)]"""
+    global _VALIDATORS
+    schema_path, verify, items = task
+    if _VALIDATORS is None:
+        _VALIDATORS = load_validators(schema_path)
+    out = []
+    for label, line in items:
+        row = {"bytes_in": len(line.encode()), "version": None}
+        try:
+            try:
+                bundle = json.loads(line)
+            except ValueError as e:
+                raise MigrationError(f"unreadable JSON ({getattr(e, 'msg', e)})")
+            doc, version, issues, notes = migrate(bundle, _VALIDATORS)
+            if isinstance(bundle, dict) and "id" in bundle:
+                doc["id"] = str(bundle["id"])
+            text = canonical_text(doc)
+            if verify:
+                again, *_ = migrate({"files": expand(doc)}, _VALIDATORS)
+                again.pop("id", None)
+                expected = dict(doc)
+                expected.pop("id", None)
+                if canonical_text(again) != canonical_text(expected):
+                    raise MigrationError("expand + migrate does not reproduce the canonical document")
+            row.update(version=version, issues=issues, notes=dict(notes), bytes_out=len(text.encode()))
+            out.append((label, text, row))
+        except (MigrationError, KeyError, TypeError, AttributeError) as e:
+            if isinstance(e, MigrationError) and row["version"] is None:
+                try:
+                    row["version"] = detect_version(bundle_files(json.loads(line)))
+                except (MigrationError, ValueError, AttributeError):
+                    pass
+            row["error"] = str(e) if isinstance(e, MigrationError) else f"{type(e).__name__}: {e}"
+            out.append((label, None, row))
+    return out
+
+
+def read_corpus(paths):
+    """Stream (label, JSON text) per bundle from .jsonl corpora, .json bundles and directories"""
+    for path in paths:
+        path = Path(path)
+        if path.is_dir():
+            if (path / MAIN_FILE).exists() or (path / "saves").is_dir():
+                # A raw user:// dump is one bundle
+                files = {}
+                for name in (MAIN_FILE,) + V4_FILES:
+                    if (path / name).exists():
+                        files[name] = (path / name).read_text(encoding="utf-8")
+                yield str(path), json.dumps({"id": path.name, "files": files})
+                continue
+            yield from read_corpus(sorted(p for p in path.iterdir() if p.is_dir() or p.suffix in (".json", ".jsonl")))
+        elif path.suffix == ".jsonl":
+            with open(path, encoding="utf-8") as f:
+                for n, line in enumerate(f, 1):
+                    if line.strip():
+                        yield f"{path}:{n}", line
+        else:
+            yield str(path), path.read_text(encoding="utf-8")
+
+
+def _chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def migrate_corpus(paths, out=None, jobs=None, verify=False, schema_path=SCHEMA_PATH, on_row=None):
+    """Migrate every bundle in paths, writing canonical JSON lines to out in input order; returns the report"""
+    jobs = jobs or os.cpu_count() or 1
+    tasks = ((str(schema_path), verify, chunk) for chunk in _chunks(read_corpus(paths), CHUNK))
+    report = {}
+    start = time.perf_counter()
+
+    def consume(results):
+        for label, text, row in results:
+            version = str(row["version"]) if row["version"] is not None else "unknown"
+            entry = report.setdefault(version, {"bundles": 0, "migrated": 0, "failed": 0, "bytes_in": 0,
+                                                "bytes_out": 0, "with_issues": 0, "issues": Counter(),
+                                                "errors": Counter(), "notes": Counter()})
+            entry["bundles"] += 1
+            entry["bytes_in"] += row["bytes_in"]
+            if text is None:
+                entry["failed"] += 1
+                entry["errors"][row["error"]] += 1
+            else:
+                entry["migrated"] += 1
+                entry["bytes_out"] += row["bytes_out"]
+                entry["with_issues"] += bool(row["issues"])
+                entry["issues"].update(row["issues"])
+                entry["notes"].update(row["notes"])
+                if out is not None:
+                    out.write(text + "\n")
+            if on_row:
+                on_row(label, row)
+
+    if jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            # Bounded look-ahead keeps memory flat on large corpora while preserving order
+            pending = deque()
+            for task in tasks:
+                pending.append(pool.submit(_migrate_chunk, task))
+                if len(pending) >= jobs * IN_FLIGHT:
+                    consume(pending.popleft().result())
+            while pending:
+                consume(pending.popleft().result())
+    else:
+        for task in tasks:
+            consume(_migrate_chunk(task))
+
+    for entry in report.values():
+        entry["issues"] = dict(entry["issues"].most_common(MAX_ISSUES))
+        entry["errors"] = dict(entry["errors"].most_common(MAX_ISSUES))
+        entry["notes"] = dict(sorted(entry["notes"].items()))
+    return {"seconds": round(time.perf_counter() - start, 3), "versions": dict(sorted(report.items()))}
+
+
+def print_report(report):
+    versions = report["versions"]
+    total = sum(v["bundles"] for v in versions.values())
+    print("=" * 60)
+    for version, entry in versions.items():
+        icon = "✅" if not entry["failed"] else "⚠️ "
+        size = entry["bytes_out"] / entry["bytes_in"] if entry["migrated"] and entry["bytes_in"] else 0
+        print(f"{icon} v{version}: {entry['bundles']} bundles, {entry['migrated']} migrated, "
+              f"{entry['failed']} failed, {entry['with_issues']} with schema issues, output {size:.0%} of input")
+        for note, count in entry["notes"].items():
+            print(f"     {note}: {count}")
+        for message, count in list(entry["errors"].items())[:5]:
+            print(f"     ❌ {count}x {message}")
+        for message, count in list(entry["issues"].items())[:5]:
+            print(f"     ⚠️  {count}x {message}")
+    rate = total / report["seconds"] if report["seconds"] else 0
+    print("=" * 60)
+    print(f"📊 {total} bundles in {report['seconds']:.2f}s ({rate:,.0f} bundles/s)")
+
+
+# ---------------------------------------------------------------------------
+# Synthetic corpora
+# ---------------------------------------------------------------------------
+
+def _godot_numbers(value, rng):
+    """Numbers as a save written by Godot and read back may hold them (integral floats)"""
+    if isinstance(value, int) and not isinstance(value, bool) and rng.random() < 0.5:
+        return float(value)
+    if isinstance(value, dict):
+        return {k: _godot_numbers(v, rng) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_godot_numbers(v, rng) for v in value]
+    return value
+
+
+def synthetic_bundle(rng, n, version=None):
+    """One exported bundle of the given (or a random) version, with the redundancy real saves carry"""
+    version = version or rng.choice((1, 2, 3, 3, 3))
+    coins, gems = rng.randrange(50000), rng.randrange(300)
+    owned = DEFAULT_OWNED + [f"{kind}_{rng.randrange(12)}" for kind in ("ball", "flipper", "trail")
+                             for _ in range(rng.randrange(3))]
+    equipped = {"ball": rng.choice([o for o in owned if o.startswith("ball")]), "flipper": "flipper_standard"}
+    if version == 1:
+        main = {"coins": coins, "gems": gems, "owned_items": owned, "equipped_items": equipped}
+        return {"id": f"player_{n}", "files": {f"user://{MAIN_FILE}": main}}
+    main = {"version": "2.0", "currency": {"coins": coins, "gems": gems}, "owned_items": owned,
+            "equipped_items": equipped}
+    if version == 2:
+        return {"id": f"player_{n}", "files": {f"user://{MAIN_FILE}": main}}
+
+    games = rng.randrange(1, 400)
+    now = 1760000000 + rng.random() * 1e7
+    zones = {"android_acres_bonuses": rng.randrange(games * 2), "google_words_completed": rng.randrange(games),
+             "dash_nests_completed": rng.randrange(games), "dino_chomps": rng.randrange(games),
+             "sparky_turbos": rng.randrange(games), "favorite_zone": "android_acres"}
+    stats = json.loads(json.dumps(DEFAULT_STATISTICS))
+    stats["lifetime"].update(games_played=games, total_score=games * rng.randrange(20000, 90000),
+                             high_score=rng.randrange(100000, 2000000), first_played=now - 1e6, last_played=now,
+                             total_bonus_balls=rng.randrange(games))
+    stats["scoring"].update(highest_combo=rng.randrange(30), highest_multiplier_reached=rng.randrange(1, 7),
+                            total_hits=games * rng.randrange(50, 200))
+    stats["zones"].update(zones)
+    unlocked = rng.sample(["first_game", "score_100k", "score_1m", "first_bonus", "five_bonus", "all_bonuses",
+                           "combo_10", "multiplier_6", "dino_master", "sparky_master"], rng.randrange(11))
+    stats["session"] = {"current_session_start": now, "session_score": rng.randrange(90000),
+                        "session_balls_lost": 3, "session_bonus_balls": rng.randrange(3)}
+    stats["achievements"] = {"unlocked_count": len(unlocked), "total_points": 10 * len(unlocked)}
+    ach_stats = {"games_played": games, "max_single_game_score": stats["lifetime"]["high_score"],
+                 "max_multiplier_reached": stats["scoring"]["highest_multiplier_reached"],
+                 "max_combo": stats["scoring"]["highest_combo"], "all_zones_bonus": rng.random() < 0.2,
+                 "total_bonus_balls": stats["lifetime"]["total_bonus_balls"], "max_bonus_balls_single_game": 2,
+                 "all_bonus_types_earned": False, "bonus_types_earned_this_game": ["android_acres"]}
+    ach_stats.update({k: v for k, v in zones.items() if k != "favorite_zone"})
+    if rng.random() < 0.1:
+        ach_stats["games_played"] = games - 1  # Written before the last game was counted
+    entries = [{"id": f"{rng.randrange(10 ** 9)}_{i}", "initials": "".join(rng.choice("ABCXYZ") for _ in range(3)),
+                "score": rng.randrange(10 ** 6), "character": rng.choice(CHARACTERS), "timestamp": now - i * 3600}
+               for i in range(rng.randrange(5, 60))]
+    entries.sort(key=_entry_key)
+    board = {"entries": entries[:MAX_ENTRIES],
+             "character_leaderboards": {c: [e for e in entries if e["character"] == c][:LOCAL_CACHE_SIZE]
+                                        for c in CHARACTERS},
+             "last_sync": 0, "timestamp": now}
+    settings = {"audio": {"master_volume": round(rng.random(), 2), "sfx_volume": 0.8, "music_volume": 0.6,
+                          "ui_volume": 0.7, "sound_enabled": True},
+                "video": {"fullscreen": rng.random() < 0.5, "vsync": True, "cr_effect": True},
+                "gameplay": {"difficulty": rng.choice(["easy", "normal", "hard"]), "flipper_sensitivity": 1.0},
+                "version": "1.0.0", "last_saved": now}
+    files = {MAIN_FILE: main, STATS_FILE: stats, LEADERBOARD_FILE: board,
+             ACHIEVEMENTS_FILE: {"unlocked": unlocked, "stats": ach_stats, "timestamp": now},
+             SETTINGS_FILE: settings}
+    return {"id": f"player_{n}", "files": {f"user://{k}": _godot_numbers(v, rng) for k, v in files.items()}}
+
+
+def write_corpus(path, count, seed=1, broken=0.002):
+    """JSON Lines corpus of count synthetic bundles; a small share is damaged on purpose"""
+    rng = random.Random(seed)
+    with open(path, "w", encoding="utf-8") as f:
+        for n in range(count):
+            line = json.dumps(synthetic_bundle(rng, n))
+            roll = rng.random()
+            if roll < broken:
+                line = line[:len(line) // 2]
+            elif roll < 2 * broken:
+                line = line.replace('"coins": ', '"coins": -', 1)
+            f.write(line + "\n")
+
+
+def bench(count=20000, seed=1):
+    """Migration throughput on a synthetic corpus, single process and on every core"""
+    with tempfile.TemporaryDirectory() as tmp:
+        corpus = Path(tmp) / "corpus.jsonl"
+        write_corpus(corpus, count, seed)
+        size = corpus.stat().st_size
+        print(f"🧪 Save migration benchmark: {count:,} bundles, {size / 1048576:.1f} MiB")
+        print("=" * 60)
+        results = {}
+        for jobs in sorted({1, os.cpu_count() or 1}):
+            for verify in (False, True):
+                with open(Path(tmp) / "out.jsonl", "w", encoding="utf-8") as out:
+                    report = migrate_corpus([corpus], out, jobs=jobs, verify=verify)
+                label = f"{jobs} job{'s' if jobs > 1 else ''}" + (" + verify" if verify else "")
+                results[label] = report
+                out_size = (Path(tmp) / "out.jsonl").stat().st_size
+                print(f"   {label:<16} {count / report['seconds']:>8,.0f} bundles/s"
+                      f"  {size / 1048576 / report['seconds']:6.1f} MiB/s  output {out_size / size:.0%} of input")
+        print_report(results["1 job"])
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk save-bundle migration and compaction")
+    parser.add_argument("paths", nargs="*", help=".jsonl corpora, .json bundles or user:// dump directories")
+    parser.add_argument("--out", type=Path, help="write canonical bundles here (JSON Lines, input order)")
+    parser.add_argument("--report", type=Path, help="write the per-version report as JSON")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--verify", action="store_true", help="check expand + migrate reproduces each result")
+    parser.add_argument("--schemas", type=Path, default=SCHEMA_PATH, help="declared schemas")
+    parser.add_argument("--generate", type=int, metavar="N", help="write a synthetic corpus of N bundles")
+    parser.add_argument("--expand", type=Path, metavar="JSONL", help="write canonical bundles back as user:// files")
+    parser.add_argument("--into", type=Path, help="destination for --generate (file) or --expand (directory)")
+    parser.add_argument("--bench", type=int, nargs="?", const=20000, metavar="N", help="throughput benchmark")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench)
+    elif args.generate:
+        if not args.into:
+            parser.error("--generate needs --into FILE")
+        write_corpus(args.into, args.generate)
+        print(f"✅ Wrote {args.generate} synthetic bundles to {args.into}")
+    elif args.expand:
+        if not args.into:
+            parser.error("--expand needs --into DIR")
+        count = 0
+        with open(args.expand, encoding="utf-8") as f:
+            for n, line in enumerate(f, 1):
+                doc = json.loads(line)
+                target = args.into / str(doc.get("id", f"bundle_{n}"))
+                for name, contents in expand(doc).items():
+                    (target / name).parent.mkdir(parents=True, exist_ok=True)
+                    (target / name).write_text(json.dumps(contents, indent="\t"), encoding="utf-8")
+                count += 1
+        print(f"✅ Expanded {count} bundles into {args.into}")
+    elif args.paths:
+        out = open(args.out, "w", encoding="utf-8") if args.out else None
+        try:
+            report = migrate_corpus(args.paths, out, args.jobs, args.verify, args.schemas)
+        finally:
+            if out:
+                out.close()
+        print_report(report)
+        if args.report:
+            args.report.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        sys.exit(1 if any(v["failed"] for v in report["versions"].values()) else 0)
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
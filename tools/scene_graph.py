@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Dependency graph of the Godot project (.tscn/.tres scenes and resources, .gd scripts)
+Text scenes and resources are parsed line by line: [ext_resource] headers give
+load-time dependencies (resolved by uid first, then path, as Godot does),
+[sub_resource]/[node] sections and ExtResource()/SubResource() references
+give per-file usage, and scripts contribute preload()/extends (load-time) and
+res:// string literals (runtime loads). Parsed records are cached in
+.tools_cache/scene_graph.json keyed on size + mtime, so a warm run only stats
+the tree.
+Reports per scene the transitive load cost (bytes on disk, textures, scripts,
+scenes), dangling references (missing targets, unknown uids, undeclared ids),
+unused declarations (ext/sub resources a file never references), scenes and
+resources nothing references, and dependency cycles. --check fails on cycles
+and on broken load-time references in files reachable from project.godot
+(main scene, autoloads); legacy and runtime-only breakage is reported only.
+Usage: python3 tools/scene_graph.py [SCENE...] [--deps] [--json PATH|-] [--check]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).parent.parent
+CACHE_PATH = BASE_DIR / ".tools_cache" / "scene_graph.json"
+CACHE_VERSION = 1
+PROJECT_FILE = "project.godot"
+SKIP_DIRS = {".git", ".godot", ".import", ".tools_cache", "__pycache__", "node_modules"}
+PARSED_SUFFIXES = (".tscn", ".tres", ".gd")
+TEXTURE_SUFFIXES = (".png", ".jpg", ".jpeg", ".webp", ".svg", ".bmp", ".tga")
+LOAD_TIME = ("ext", "preload")  # Edge kinds resolved while the owning file loads
+
+_HEADER = re.compile(r"^\[(\w+)(.*)\]\s*$")
+_ATTR = re.compile(r'(\w+)=("(?:[^"\\]|\\.)*"|[^\s\]]+)')
+_REF = re.compile(r'\b(ExtResource|SubResource)\(\s*"?([^")\s]+)"?\s*\)')
+_RES_LITERAL = re.compile(r'"(res://[^"]*)"')
+_UID_LITERAL = re.compile(r'"(uid://[^"]+)"')
+_PRELOAD = re.compile(r'\bpreload\(\s*"(res://[^"]+)"\s*\)')
+_EXTENDS = re.compile(r'^extends\s+"(res://[^"]+)"', re.M)
+_IMPORT_UID = re.compile(r'^uid="(uid://[^"]+)"', re.M)
+
+
+def res_to_rel(res):
+    return res[len("res://"):] if res.startswith("res://") else res
+
+
+def _unquote(value):
+    return value[1:-1] if value.startswith('"') and value.endswith('"') else value
+
+
+def _open_quotes(line):
+    """True when a line leaves a string literal open (odd number of unescaped quotes)"""
+    return len(re.findall(r'(?<!\\)"', line)) % 2 == 1
+
+
+def _is_pattern(path):
+    """True for res:// literals that are directories, format strings or name prefixes rather than files"""
+    return path == "" or path.endswith("/") or "%" in path or "{" in path or "." not in path.rsplit("/", 1)[-1]
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def parse_text_resource(path):
+    """Parse a .tscn/.tres file into a dependency record"""
+    record = {"kind": "scene" if path.suffix == ".tscn" else "resource", "uid": None,
+              "refs": [], "nodes": 0, "unused": [], "undeclared": []}
+    declared_ext, declared_sub = {}, set()
+    used_ext, used_sub = set(), set()
+    in_string = False
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if not in_string and line.startswith("["):
+                match = _HEADER.match(line)
+                if match:
+                    tag, rest = match.groups()
+                    attrs = {k: _unquote(v) for k, v in _ATTR.findall(rest)}
+                    if tag in ("gd_scene", "gd_resource"):
+                        record["uid"] = attrs.get("uid")
+                    elif tag == "ext_resource":
+                        declared_ext[attrs.get("id")] = len(record["refs"])
+                        record["refs"].append({"path": res_to_rel(attrs.get("path", "")), "uid": attrs.get("uid"),
+                                               "kind": "ext", "type": attrs.get("type")})
+                    elif tag == "sub_resource":
+                        declared_sub.add(attrs.get("id"))
+                    elif tag == "node":
+                        record["nodes"] += 1
+                    for kind, ref in _REF.findall(rest):
+                        (used_ext if kind == "ExtResource" else used_sub).add(ref)
+                    continue
+            for kind, ref in _REF.findall(line):
+                (used_ext if kind == "ExtResource" else used_sub).add(ref)
+            if _open_quotes(line):
+                in_string = not in_string
+    record["unused"] = sorted(f"ExtResource({i})" for i in declared_ext if i not in used_ext) + \
+        sorted(f"SubResource({i})" for i in declared_sub if i not in used_sub)
+    record["undeclared"] = sorted(f"ExtResource({i})" for i in used_ext if i not in declared_ext) + \
+        sorted(f"SubResource({i})" for i in used_sub if i not in declared_sub)
+    return record
+
+
+def parse_script(path):
+    """Parse a .gd file: preload()/extends paths load with it, other res:// literals are runtime loads"""
+    source = path.read_text(encoding="utf-8", errors="replace")
+    refs = []
+    load_time = set(_PRELOAD.findall(source)) | set(_EXTENDS.findall(source))
+    for res in sorted(load_time):
+        refs.append({"path": res_to_rel(res), "uid": None, "kind": "preload", "type": None})
+    for res in sorted(set(_RES_LITERAL.findall(source)) - load_time):
+        refs.append({"path": res_to_rel(res), "uid": None, "kind": "literal", "type": None})
+    for uid in sorted(set(_UID_LITERAL.findall(source))):
+        refs.append({"path": "", "uid": uid, "kind": "literal", "type": None})
+    return {"kind": "script", "uid": None, "refs": refs, "nodes": 0, "unused": [], "undeclared": []}
+
+
+def parse_project(path):
+    """project.godot: the main scene, autoloads and any other res:// settings are graph roots"""
+    source = path.read_text(encoding="utf-8", errors="replace")
+    refs = [{"path": res_to_rel(res.lstrip("*")), "uid": None, "kind": "root", "type": None}
+            for res in re.findall(r'"\*?(res://[^"]+)"', source)]
+    return {"kind": "project", "uid": None, "refs": refs, "nodes": 0, "unused": [], "undeclared": []}
+
+
+def parse_file(path):
+    if path.name == PROJECT_FILE:
+        return parse_project(path)
+    if path.suffix == ".gd":
+        return parse_script(path)
+    return parse_text_resource(path)
+
+
+def read_uid(path):
+    """uid:// of a .uid sidecar or .import file"""
+    text = path.read_text(encoding="utf-8", errors="replace")
+    if path.suffix == ".uid":
+        return text.strip() or None
+    match = _IMPORT_UID.search(text)
+    return match.group(1) if match else None
+
+
+# ---------------------------------------------------------------------------
+# Project scan with cache
+# ---------------------------------------------------------------------------
+
+def walk_project(root=BASE_DIR):
+    """Every project file as (rel path, size, mtime_ns), skipping tool and VCS folders"""
+    files = []
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS and not (Path(entry.path) / ".gdignore").exists():
+                        stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    st = entry.stat()
+                    files.append((Path(entry.path).relative_to(root).as_posix(), st.st_size, st.st_mtime_ns))
+    return files
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            cache = json.load(f)
+        return cache["files"] if cache.get("version") == CACHE_VERSION else {}
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def save_cache(entries):
+    CACHE_PATH.parent.mkdir(exist_ok=True)
+    tmp = CACHE_PATH.with_suffix(".tmp")
+    with open(tmp, "w") as f:
+        json.dump({"version": CACHE_VERSION, "files": entries}, f, separators=(",", ":"))
+    os.replace(tmp, CACHE_PATH)
+
+
+def scan(root=BASE_DIR, use_cache=True):
+    """(sizes, records, uids, parsed count): records for parsed files, uid -> path for the project"""
+    files = walk_project(root)
+    cache = load_cache() if use_cache else {}
+    entries = {}
+    parsed = 0
+    for rel, size, mtime_ns in files:
+        parse = rel.endswith(PARSED_SUFFIXES) or rel == PROJECT_FILE
+        sidecar = rel.endswith((".uid", ".import"))
+        if not (parse or sidecar):
+            continue
+        cached = cache.get(rel)
+        if cached and cached["size"] == size and cached["mtime_ns"] == mtime_ns:
+            entries[rel] = cached
+            continue
+        path = root / rel
+        if parse:
+            entry = {"size": size, "mtime_ns": mtime_ns, "record": parse_file(path)}
+        else:
+            entry = {"size": size, "mtime_ns": mtime_ns, "uid": read_uid(path)}
+        entries[rel] = entry
+        parsed += 1
+    if use_cache and (parsed or len(entries) != len(cache)):
+        save_cache(entries)
+
+    sizes = {rel: size for rel, size, _ in files}
+    records = {rel: e["record"] for rel, e in entries.items() if "record" in e}
+    uids = {}
+    for rel, entry in entries.items():
+        if "record" in entry and entry["record"]["uid"]:
+            uids[entry["record"]["uid"]] = rel
+        elif entry.get("uid"):
+            uids[entry["uid"]] = rel[:-len(".uid")] if rel.endswith(".uid") else rel[:-len(".import")]
+    return sizes, records, uids, parsed
+
+
+# ---------------------------------------------------------------------------
+# Graph
+# ---------------------------------------------------------------------------
+
+class SceneGraph:
+    """Resolved dependency graph with cost, dangling, unused and cycle queries"""
+
+    def __init__(self, sizes, records, uids):
+        self.sizes = sizes
+        self.records = records
+        self.uids = uids
+        self.edges = {}       # rel -> [(target rel, kind)]
+        self.dangling = []    # (source, reference, reason, edge kind)
+        self.stale_paths = []  # (source, declared path, path the uid resolves to)
+        self.prefixes = {}    # rel -> runtime path prefixes (directories or partial names)
+        for rel, record in records.items():
+            out = []
+            for ref in record["refs"]:
+                target = self._resolve(rel, ref)
+                if target:
+                    out.append((target, ref["kind"]))
+            self.edges[rel] = out
+            for ref in record["undeclared"]:
+                self.dangling.append((rel, ref, "used but not declared", "ext"))
+
+    def _resolve(self, source, ref):
+        path, uid = ref["path"], ref["uid"]
+        if uid and uid in self.uids:
+            target = self.uids[uid]
+            if path and path != target:
+                self.stale_paths.append((source, path, target))
+            return target
+        if path in self.sizes:
+            return path
+        if ref["kind"] == "literal" and not uid and _is_pattern(path):
+            # Runtime paths built by concatenation or formatting: kept for reachability tools
+            self.prefixes.setdefault(source, []).append(path)
+            return None
+        label = f"res://{path}" if path else uid
+        reason = "unknown uid and missing path" if uid else "missing file"
+        self.dangling.append((source, label, reason, ref["kind"]))
+        return None
+
+    def dependencies(self, rel, kinds=LOAD_TIME):
+        """Transitive dependencies of rel following the given edge kinds"""
+        seen = set()
+        stack = [rel]
+        while stack:
+            node = stack.pop()
+            for target, kind in self.edges.get(node, ()):
+                if kind in kinds and target not in seen and target != rel:
+                    seen.add(target)
+                    stack.append(target)
+        return seen
+
+    def load_cost(self, rel):
+        """Bytes on disk and counts of everything loaded with rel"""
+        deps = self.dependencies(rel)
+        return {
+            "bytes": self.sizes.get(rel, 0) + sum(self.sizes.get(d, 0) for d in deps),
+            "files": len(deps),
+            "textures": sum(d.lower().endswith(TEXTURE_SUFFIXES) for d in deps),
+            "scripts": sum(d.endswith(".gd") for d in deps),
+            "scenes": sum(d.endswith(".tscn") for d in deps),
+        }
+
+    def roots(self):
+        """Files project.godot starts from: main scene, autoloads and other settings"""
+        return {target for target, _ in self.edges.get(PROJECT_FILE, ())}
+
+    def reachable(self):
+        """Everything reachable from the project roots through any edge kind"""
+        seen = self.roots()
+        stack = list(seen)
+        while stack:
+            for target, _ in self.edges.get(stack.pop(), ()):
+                if target not in seen:
+                    seen.add(target)
+                    stack.append(target)
+        return seen
+
+    def broken(self):
+        """Dangling load-time references in files reachable from project.godot"""
+        live = self.reachable() | {PROJECT_FILE}
+        return [d for d in self.dangling if d[0] in live and d[3] in LOAD_TIME + ("root",)]
+
+    def referenced(self):
+        return {target for out in self.edges.values() for target, _ in out}
+
+    def unreferenced(self, kinds=("scene", "resource")):
+        """Scenes/resources no other file references (addons excluded)"""
+        refs = self.referenced()
+        return sorted(rel for rel, record in self.records.items()
+                      if record["kind"] in kinds and rel not in refs and not rel.startswith("addons/"))
+
+    def unused_declarations(self):
+        return [(rel, record["unused"]) for rel, record in sorted(self.records.items()) if record["unused"]]
+
+    def cycles(self, kinds=LOAD_TIME):
+        """Strongly connected components (size > 1, or self-loops) over load-time edges (Tarjan)"""
+        index, low, on_stack, stack, result = {}, {}, set(), [], []
+        counter = [0]
+
+        for start in sorted(self.edges):
+            if start in index:
+                continue
+            work = [(start, iter(self.edges.get(start, ())))]
+            index[start] = low[start] = counter[0]
+            counter[0] += 1
+            stack.append(start)
+            on_stack.add(start)
+            while work:
+                node, it = work[-1]
+                advanced = False
+                for target, kind in it:
+                    if kind not in kinds:
+                        continue
+                    if target not in index:
+                        index[target] = low[target] = counter[0]
+                        counter[0] += 1
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(self.edges.get(target, ()))))
+                        advanced = True
+                        break
+                    if target in on_stack:
+                        low[node] = min(low[node], index[target])
+                if advanced:
+                    continue
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    self_loop = any(t == node and k in kinds for t, k in self.edges.get(node, ()))
+                    if len(component) > 1 or self_loop:
+                        result.append(sorted(component))
+        return result
+
+
+def build_graph(root=BASE_DIR, use_cache=True):
+    sizes, records, uids, parsed = scan(root, use_cache)
+    return SceneGraph(sizes, records, uids), parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Godot scene/resource dependency graph")
+    parser.add_argument("scenes", nargs="*", help="scenes to report (default: every scene)")
+    parser.add_argument("--deps", action="store_true", help="list each reported scene's load-time dependencies")
+    parser.add_argument("--json", metavar="PATH", help="write the report as JSON ('-' for stdout)")
+    parser.add_argument("--no-cache", action="store_true", help="parse every file again")
+    parser.add_argument("--check", action="store_true", help="exit 1 on cycles or broken load-time references from the main scene and autoloads")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    graph, parsed = build_graph(use_cache=not args.no_cache)
+    scenes = [res_to_rel(s) for s in args.scenes] or sorted(r for r, rec in graph.records.items()
+                                                            if rec["kind"] == "scene")
+    costs = {s: graph.load_cost(s) for s in scenes}
+    cycles = graph.cycles()
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "scenes": costs,
+        "dangling": [{"file": s, "ref": r, "reason": why, "kind": k} for s, r, why, k in graph.dangling],
+        "broken": [{"file": s, "ref": r, "reason": why} for s, r, why, _ in graph.broken()],
+        "stale_paths": [{"file": s, "path": p, "resolves_to": t} for s, p, t in graph.stale_paths],
+        "unused_declarations": dict(graph.unused_declarations()),
+        "unreferenced": graph.unreferenced(),
+        "cycles": cycles,
+    }
+    if args.json:
+        text = json.dumps(report, indent=1)
+        if args.json == "-":
+            print(text)
+            return
+        Path(args.json).write_text(text)
+
+    print("🕸️  Scene Dependency Graph")
+    print("=" * 60)
+    print(f"{len(graph.records)} files indexed ({parsed} parsed) in {elapsed * 1000:.0f}ms")
+    print(f"{'scene':52} {'KiB':>8} {'files':>6} {'tex':>5} {'gd':>4} {'tscn':>5}")
+    for scene, cost in sorted(costs.items(), key=lambda kv: -kv[1]["bytes"]):
+        print(f"{scene:52} {cost['bytes'] / 1024:8.0f} {cost['files']:6} {cost['textures']:5} "
+              f"{cost['scripts']:4} {cost['scenes']:5}")
+        if args.deps:
+            for dep in sorted(graph.dependencies(scene)):
+                print(f"    {dep}")
+    print()
+    broken = {(item["file"], item["ref"]) for item in report["broken"]}
+    for item in report["dangling"]:
+        fatal = (item["file"], item["ref"]) in broken
+        where = "reachable from project.godot" if fatal else "runtime load" if item["kind"] == "literal" else "unreachable"
+        print(f"{'❌' if fatal else '⚠️ '} {item['file']}: {item['ref']} ({item['reason']}, {where})")
+    for item in report["stale_paths"]:
+        print(f"⚠️  {item['file']}: uid points at {item['resolves_to']}, path says {item['path']}")
+    for rel, ids in report["unused_declarations"].items():
+        print(f"⚠️  {rel}: declared but never used: {', '.join(ids)}")
+    for rel in report["unreferenced"]:
+        print(f"⏭️  {rel}: not referenced by any scene, script or project setting")
+    for cycle in cycles:
+        print(f"❌ Cycle: {' -> '.join(cycle)}")
+    problems = len(report["broken"]) + len(cycles)
+    print("=" * 60)
+    print(f"{'✅' if not problems else '❌'} {len(report['broken'])} broken, {len(report['dangling'])} dangling, "
+          f"{len(cycles)} cycles, "
+          f"{len(report['unreferenced'])} unreferenced, {len(report['unused_declarations'])} files with unused ids")
+    if args.check and problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Visual regression check for game screenshots
+Pairs baseline and current screenshots (two files, or two folders matched by
+file name), decodes them with png_reader and compares the game window
+region configured in config/screenshot_masks.json. Luminance SSIM is
+computed on 8x8 blocks and averaged per 32x32 tile, alongside a perceptual
+colour distance ("redmean" weighted RGB) per pixel; masked regions such as
+the score display are left out of both. A tile fails when its SSIM drops
+below the threshold or too many of its pixels visibly change, and a
+screenshot fails when more tiles fail than allowed.
+--heatmaps writes, per pair, the current screenshot dimmed with changed
+blocks in red, failing tiles outlined and masked regions tinted blue.
+Byte-identical pairs are passed without decoding, and decoded pixels are
+kept in .tools_cache/screenshot_diff by content hash, so an unchanged
+baseline set is decoded once.
+Usage: python3 tools/screenshot_diff.py BASELINE CURRENT [--heatmaps DIR] [--json PATH|-] [--report-only]
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+from png_reader import read_png
+from png_writer import save_png
+
+BASE_DIR = Path(__file__).parent.parent
+CONFIG_PATH = BASE_DIR / "config" / "screenshot_masks.json"
+CACHE_DIR = BASE_DIR / ".tools_cache" / "screenshot_diff"
+C1 = (0.01 * 255) ** 2  # SSIM stabilisers for 8-bit luminance
+C2 = (0.03 * 255) ** 2
+LUMA = (0.299, 0.587, 0.114)
+
+
+def load_config(path=CONFIG_PATH):
+    with open(path) as f:
+        return json.load(f)
+
+
+def screen_for(name, config):
+    """First configured screen whose match pattern fits the file name"""
+    for screen in config["screens"]:
+        if fnmatch.fnmatch(name, screen["match"]):
+            return screen
+    return {"match": "*", "crop": None, "masks": {}}
+
+
+def pair_files(baseline, current):
+    """[(name, baseline path or None, current path or None)] for two files or two folders"""
+    baseline, current = Path(baseline), Path(current)
+    if baseline.is_file() or current.is_file():
+        for path in (baseline, current):
+            if not path.is_file():
+                raise FileNotFoundError(f"no such screenshot: {path}")
+        return [(current.name, baseline, current)]
+    names = sorted({p.name for p in baseline.glob("*.png")} | {p.name for p in current.glob("*.png")})
+    return [(name, baseline / name if (baseline / name).exists() else None,
+             current / name if (current / name).exists() else None) for name in names]
+
+
+def _scaled(rect, sx, sy):
+    x, y, w, h = rect
+    return int(round(x * sx)), int(round(y * sy)), int(round(w * sx)), int(round(h * sy))
+
+
+def _rgb(path, digest):
+    """Decoded RGB pixels, reusing .tools_cache/screenshot_diff/<sha1>.npy when present"""
+    cached = CACHE_DIR / f"{digest}.npy"
+    try:
+        return np.load(cached)
+    except (OSError, ValueError):
+        pass
+    width, height, pixels = read_png(path)
+    rgb = np.ascontiguousarray(np.asarray(pixels).reshape(height, width, 4)[..., :3])
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_suffix(f".{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, rgb)
+    os.replace(tmp, cached)
+    return rgb
+
+
+# ---------------------------------------------------------------------------
+# Comparison
+# ---------------------------------------------------------------------------
+
+def _block_sums(values, block):
+    """Sum over non-overlapping block x block cells of a (H, W) array (H, W multiples of block)"""
+    h, w = values.shape
+    return values.reshape(h // block, block, w // block, block).sum(axis=(1, 3))
+
+
+def compare_images(base, cur, screen, config):
+    """Per-tile comparison of two (H, W, 3) uint8 images; returns (result dict, maps for the heatmap)"""
+    height, width = cur.shape[:2]
+    ref_w, ref_h = config["reference_size"]
+    sx, sy = width / ref_w, height / ref_h
+    block, tile = config["block"], config["tile"]
+
+    x0, y0, cw, ch = _scaled(screen["crop"], sx, sy) if screen.get("crop") else (0, 0, width, height)
+    x0, y0 = max(0, x0), max(0, y0)
+    cw, ch = min(cw, width - x0), min(ch, height - y0)
+    cw, ch = cw - cw % block, ch - ch % block  # partial blocks at the right/bottom edge are skipped
+    base = base[y0:y0 + ch, x0:x0 + cw].astype(np.float32)
+    cur = cur[y0:y0 + ch, x0:x0 + cw].astype(np.float32)
+
+    weight = np.ones((ch, cw), dtype=np.float32)
+    masks = []
+    for name, rect in screen.get("masks", {}).items():
+        mx, my, mw, mh = _scaled(rect, sx, sy)
+        masks.append((name, mx, my, mw, mh))
+        weight[max(0, my - y0):max(0, my - y0 + mh), max(0, mx - x0):max(0, mx - x0 + mw)] = 0
+
+    # Luminance SSIM per block (masked pixels carry no weight)
+    luma = np.asarray(LUMA, dtype=np.float32)
+    x, y = base @ luma, cur @ luma
+    n = _block_sums(weight, block)
+    live = n >= block * block / 2
+    n_safe = np.where(live, n, 1)
+    mx = _block_sums(weight * x, block) / n_safe
+    my = _block_sums(weight * y, block) / n_safe
+    vx = np.maximum(_block_sums(weight * x * x, block) / n_safe - mx * mx, 0)
+    vy = np.maximum(_block_sums(weight * y * y, block) / n_safe - my * my, 0)
+    cov = _block_sums(weight * x * y, block) / n_safe - mx * my
+    ssim = ((2 * mx * my + C1) * (2 * cov + C2)) / ((mx * mx + my * my + C1) * (vx + vy + C2))
+    ssim = np.where(live, ssim, np.nan)
+
+    # Perceptual colour distance ("redmean" weighted RGB, scaled to 0-255)
+    d = base - cur
+    rmean = (base[..., 0] + cur[..., 0]) * 0.5
+    delta = np.sqrt((2 + rmean / 256) * d[..., 0] ** 2 + 4 * d[..., 1] ** 2
+                    + (2 + (255 - rmean) / 256) * d[..., 2] ** 2) / 3
+    changed = (delta > config["delta_threshold"]) & (weight > 0)
+    changed_blocks = np.where(live, _block_sums(changed.astype(np.float32), block), 0)
+
+    # Group blocks into tiles (edge tiles may hold fewer blocks)
+    per = max(1, tile // block)
+    bh, bw = ssim.shape
+    th, tw = -(-bh // per), -(-bw // per)
+    pad = ((0, th * per - bh), (0, tw * per - bw))
+    with np.errstate(invalid="ignore"):
+        tiles_ssim = np.nanmean(np.pad(ssim, pad, constant_values=np.nan)
+                                .reshape(th, per, tw, per).transpose(0, 2, 1, 3).reshape(th, tw, -1), axis=2)
+    tiles_changed = np.pad(changed_blocks, pad).reshape(th, per, tw, per).sum(axis=(1, 3))
+    tiles_weight = np.pad(np.where(live, n, 0), pad).reshape(th, per, tw, per).sum(axis=(1, 3))
+    tiles_live = tiles_weight > 0
+    tiles_frac = np.where(tiles_live, tiles_changed / np.maximum(tiles_weight, 1), 0)
+    failing = tiles_live & ((np.nan_to_num(tiles_ssim, nan=1.0) < config["ssim_threshold"])
+                            | (tiles_frac > config["max_changed_fraction"]))
+
+    failed = [{"x": int(x0 + tx * tile), "y": int(y0 + ty * tile), "ssim": round(float(tiles_ssim[ty, tx]), 4),
+               "changed": round(float(tiles_frac[ty, tx]), 4)}
+              for ty, tx in zip(*np.nonzero(failing))]
+    total = float(weight.sum())
+    result = {
+        "ssim": round(float(np.nanmean(tiles_ssim[tiles_live])), 4) if tiles_live.any() else 1.0,
+        "min_ssim": round(float(np.nanmin(tiles_ssim[tiles_live])), 4) if tiles_live.any() else 1.0,
+        "changed": round(float(changed.sum()) / total, 5) if total else 0.0,
+        "tiles": int(tiles_live.sum()),
+        "failed_tiles": failed,
+        "masked": [name for name, *_ in masks],
+        "passed": len(failed) <= config["max_failed_tiles"],
+    }
+    maps = {"origin": (x0, y0), "size": (cw, ch), "ssim": ssim, "changed": changed_blocks / (block * block),
+            "failing": failing, "masks": masks}
+    return result, maps
+
+
+def render_heatmap(cur, maps, config):
+    """RGBA8 heatmap: dimmed current image, red by block dissimilarity, failing tiles outlined"""
+    height, width = cur.shape[:2]
+    block, tile = config["block"], config["tile"]
+    gray = (cur.astype(np.float32) @ np.asarray(LUMA, dtype=np.float32)) * 0.35
+    out = np.repeat(gray[..., None], 3, axis=2)
+    x0, y0 = maps["origin"]
+    cw, ch = maps["size"]
+
+    dissimilar = np.clip((1 - np.nan_to_num(maps["ssim"], nan=1.0)) / (1 - config["ssim_threshold"]), 0, 1)
+    heat = np.maximum(dissimilar, np.clip(maps["changed"] / max(config["max_changed_fraction"], 1e-6), 0, 1))
+    heat = np.repeat(np.repeat(heat, block, axis=0), block, axis=1)[..., None]
+    region = out[y0:y0 + ch, x0:x0 + cw]
+    region += (np.asarray([255, 40, 40], dtype=np.float32) - region) * heat * 0.75
+    for _, mx, my, mw, mh in maps["masks"]:
+        area = out[max(0, my):my + mh, max(0, mx):mx + mw]
+        area += (np.asarray([60, 90, 255], dtype=np.float32) - area) * 0.5
+    for ty, tx in zip(*np.nonzero(maps["failing"])):
+        ty0, tx0 = y0 + ty * tile, x0 + tx * tile
+        ty1, tx1 = min(ty0 + tile, y0 + ch), min(tx0 + tile, x0 + cw)
+        for sl in ((slice(ty0, ty0 + 2), slice(tx0, tx1)), (slice(ty1 - 2, ty1), slice(tx0, tx1)),
+                   (slice(ty0, ty1), slice(tx0, tx0 + 2)), (slice(ty0, ty1), slice(tx1 - 2, tx1))):
+            out[sl] = (255, 230, 0)
+    rgba = np.empty((height, width, 4), dtype=np.uint8)
+    rgba[..., :3] = np.clip(out, 0, 255)
+    rgba[..., 3] = 255
+    return rgba
+
+
+def _digest(path):
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def compare_pair(task):
+    """Compare one (name, baseline, current, config, heatmap dir) task; returns a result dict"""
+    name, base_path, cur_path, config, heatmap_dir = task
+    start = time.perf_counter()
+    if base_path is None or cur_path is None:
+        status = "new" if base_path is None else "missing"
+        return {"name": name, "status": status, "passed": status == "new", "seconds": 0.0}
+    base_digest, cur_digest = _digest(base_path), _digest(cur_path)
+    if base_digest == cur_digest:
+        return {"name": name, "status": "identical", "passed": True, "ssim": 1.0, "changed": 0.0,
+                "digests": [base_digest], "seconds": time.perf_counter() - start}
+    try:
+        base, cur = _rgb(base_path, base_digest), _rgb(cur_path, cur_digest)
+    except (ValueError, zlib.error, struct.error) as e:
+        # Not a PNG or a truncated one (e.g. an HTTP error page saved as .png)
+        return {"name": name, "status": "unreadable", "passed": False, "detail": str(e),
+                "seconds": time.perf_counter() - start}
+    if base.shape != cur.shape:
+        return {"name": name, "status": "size", "passed": False, "seconds": time.perf_counter() - start,
+                "detail": f"{base.shape[1]}x{base.shape[0]} vs {cur.shape[1]}x{cur.shape[0]}"}
+    result, maps = compare_images(base, cur, screen_for(name, config), config)
+    result.update(name=name, status="compared", digests=[base_digest, cur_digest])
+    if heatmap_dir:
+        heatmap = render_heatmap(cur, maps, config)
+        save_png(Path(heatmap_dir) / f"{Path(name).stem}_diff.png", heatmap, cur.shape[1], cur.shape[0],
+                 color_type=2, level=1)
+        result["heatmap"] = f"{Path(name).stem}_diff.png"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def compare_sets(baseline, current, config, heatmap_dir=None, jobs=None):
+    """Compare every screenshot pair; returns results in file-name order"""
+    if heatmap_dir:
+        Path(heatmap_dir).mkdir(parents=True, exist_ok=True)
+    tasks = [(name, b, c, config, heatmap_dir) for name, b, c in pair_files(baseline, current)]
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(jobs, len(tasks))) as pool:
+            results = list(pool.map(compare_pair, tasks))
+    else:
+        results = [compare_pair(task) for task in tasks]
+    # Keep decoded pixels only for the screenshots of this run
+    live = {digest for r in results for digest in r.pop("digests", ())}
+    for stale in CACHE_DIR.glob("*.npy") if CACHE_DIR.exists() else ():
+        if stale.stem not in live:
+            stale.unlink()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Visual regression check for screenshots")
+    parser.add_argument("baseline", help="baseline screenshot or folder")
+    parser.add_argument("current", help="current screenshot or folder")
+    parser.add_argument("--config", default=str(CONFIG_PATH), help="masks and thresholds JSON")
+    parser.add_argument("--heatmaps", metavar="DIR", help="write a diff heatmap per compared pair")
+    parser.add_argument("--json", metavar="PATH", help="write results as JSON ('-' for stdout)")
+    parser.add_argument("--jobs", type=int, default=None, help="worker processes")
+    parser.add_argument("--report-only", action="store_true", help="always exit 0")
+    args = parser.parse_args()
+
+    if not NUMPY_AVAILABLE:
+        print("❌ NumPy is required: pip install numpy")
+        sys.exit(1)
+    config = load_config(args.config)
+    start = time.perf_counter()
+    try:
+        results = compare_sets(args.baseline, args.current, config, args.heatmaps, args.jobs)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        text = json.dumps(results, indent=2)
+        if args.json == "-":
+            print(text)
+            return
+        Path(args.json).write_text(text)
+
+    print("🖼️  Screenshot Visual Diff")
+    print("=" * 60)
+    for r in results:
+        icon = "✅" if r["passed"] else "❌"
+        if r["status"] == "compared":
+            masked = f", masked {', '.join(r['masked'])}" if r["masked"] else ""
+            print(f"{icon} {r['name']:28} SSIM {r['ssim']:.4f} (min {r['min_ssim']:.4f}), "
+                  f"{r['changed']:.2%} changed, {len(r['failed_tiles'])}/{r['tiles']} tiles failed{masked}")
+            for t in r["failed_tiles"][:5]:
+                print(f"     tile at ({t['x']}, {t['y']}): SSIM {t['ssim']:.3f}, {t['changed']:.1%} changed")
+        elif r["status"] == "identical":
+            print(f"⏭️  {r['name']:28} identical")
+        elif r["status"] == "size":
+            print(f"{icon} {r['name']:28} size differs ({r['detail']})")
+        elif r["status"] == "unreadable":
+            print(f"{icon} {r['name']:28} unreadable ({r['detail']})")
+        else:
+            print(f"{'⚠️ ' if r['passed'] else icon} {r['name']:28} {r['status']} "
+                  f"({'no baseline' if r['status'] == 'new' else 'not in current set'})")
+    failed = sum(not r["passed"] for r in results)
+    print("=" * 60)
+    print(f"📊 {len(results)} screenshots, {failed} failed, {elapsed:.2f}s")
+    if failed and not args.report_only:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,10 @@ This script works without external dependencies for basic operations
 
 import os
 import sys
-import shutil
 from pathlib import Path
 
+import asset_sync
+
 # Directories
 BASE_DIR = Path(__file__).parent.parent
 SOUNDS_V1_V2_DIR = BASE_DIR / "assets" / "sounds" / "v1.0-v2.0"
@@ -19,32 +20,12 @@ SOUNDS_MAIN_DIR = BASE_DIR / "assets" / "sounds"
 SPRITES_MAIN_DIR = BASE_DIR / "assets" / "sprites"
 
 def backup_existing_assets():
-    """Backup existing assets to v1.0-v2.0 directories"""
+    """Backup existing assets to v1.0-v2.0 directories (files already backed up are kept)"""
     print("\n" + "="*60)
     print("BACKING UP EXISTING ASSETS (v1.0/v2.0)")
     print("="*60)
     
-    backed_up = 0
-    
-    # Backup sounds (skip .import files and directories)
-    if SOUNDS_MAIN_DIR.exists():
-        for sound_file in SOUNDS_MAIN_DIR.iterdir():
-            if sound_file.is_file() and not sound_file.name.endswith('.import') and sound_file.suffix in ['.wav', '.ogg']:
-                dest = SOUNDS_V1_V2_DIR / sound_file.name
-                if not dest.exists():
-                    shutil.copy2(sound_file, dest)
-                    print(f"✅ Backed up sound: {sound_file.name}")
-                    backed_up += 1
-    
-    # Backup sprites (skip .import files and directories)
-    if SPRITES_MAIN_DIR.exists():
-        for sprite_file in SPRITES_MAIN_DIR.iterdir():
-            if sprite_file.is_file() and not sprite_file.name.endswith('.import') and sprite_file.suffix == '.png':
-                dest = SPRITES_V1_V2_DIR / sprite_file.name
-                if not dest.exists():
-                    shutil.copy2(sprite_file, dest)
-                    print(f"✅ Backed up sprite: {sprite_file.name}")
-                    backed_up += 1
+    backed_up = len(asset_sync.backup_main())
     
     if backed_up == 0:
         print("ℹ️  No new assets to backup (already backed up or none exist)")
@@ -111,49 +92,17 @@ def generate_v3_assets():
     return generated
 
 def copy_v3_to_main():
-    """Copy v3.0 assets to main directories (for active use)"""
+    """Sync v3.0 assets into main directories (for active use); only changed files are written"""
     print("\n" + "="*60)
-    print("COPYING v3.0 ASSETS TO MAIN DIRECTORIES")
+    print("SYNCING v3.0 ASSETS TO MAIN DIRECTORIES")
     print("="*60)
     
-    copied = 0
-    
-    # Copy sounds (prefer OGG, fall back to WAV)
-    if SOUNDS_V3_DIR.exists():
-        ogg_files = list(SOUNDS_V3_DIR.glob("*.ogg"))
-        wav_files = list(SOUNDS_V3_DIR.glob("*.wav"))
-        
-        # Copy OGG files first
-        for ogg_file in ogg_files:
-            if not ogg_file.name.endswith('.import'):
-                dest = SOUNDS_MAIN_DIR / ogg_file.name
-                shutil.copy2(ogg_file, dest)
-                print(f"✅ Copied {ogg_file.name} to main sounds directory")
-                copied += 1
-        
-        # Copy WAV files that don't have OGG equivalents
-        for wav_file in wav_files:
-            if not wav_file.name.endswith('.import'):
-                ogg_equivalent = SOUNDS_V3_DIR / f"{wav_file.stem}.ogg"
-                if not ogg_equivalent.exists():
-                    dest = SOUNDS_MAIN_DIR / wav_file.name
-                    shutil.copy2(wav_file, dest)
-                    print(f"✅ Copied {wav_file.name} to main sounds directory")
-                    copied += 1
-    
-    # Copy sprites
-    if SPRITES_V3_DIR.exists():
-        for sprite_file in SPRITES_V3_DIR.glob("*.png"):
-            if not sprite_file.name.endswith('.import'):
-                dest = SPRITES_MAIN_DIR / sprite_file.name
-                shutil.copy2(sprite_file, dest)
-                print(f"✅ Copied {sprite_file.name} to main sprites directory")
-                copied += 1
+    copied = len(asset_sync.activate_v3())
     
     if copied == 0:
-        print("ℹ️  No v3.0 assets to copy (generate or download assets first)")
+        print("ℹ️  Main directories already match v3.0 (or no v3.0 assets yet)")
     else:
-        print(f"\n✅ Copied {copied} v3.0 assets to main directories")
+        print(f"\n✅ Synced {copied} v3.0 assets to main directories")
     
     return copied
 
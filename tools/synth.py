@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Small synthesis graph for procedural sound effects
+Effects are built from nodes (oscillators, envelopes, noise) combined with
+* (multiply / ring-modulate / apply envelope), + (mix), Seq (play one after
+another) and At (delay). A Bank renders many effects into one preallocated
+float32 buffer; every node writes into its output slice in place and shares a
+single time axis, so nothing rebuilds np.linspace per sound.
+Without NumPy the same graph renders sample by sample into array('f') buffers.
+"""
+
+import math
+import random
+from array import array
+from bisect import bisect_right
+from collections import namedtuple
+from contextlib import contextmanager
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+SAMPLE_RATE = 44100
+TWO_PI = 2 * math.pi
+
+# A named effect: its length in seconds and the graph that renders it
+Effect = namedtuple("Effect", "name duration graph")
+
+
+class Context:
+    """Shared render state: sample rate, the common time axis and scratch buffers"""
+
+    def __init__(self, sample_rate, max_samples):
+        self.sample_rate = sample_rate
+        self.max_samples = max_samples
+        if NUMPY_AVAILABLE:
+            self._time = np.arange(max_samples, dtype=np.float64) / sample_rate
+        self._free = {"f": [], "d": []}
+
+    def time(self, n):
+        """Time in seconds of the first n samples (a view, never rebuilt)"""
+        if NUMPY_AVAILABLE:
+            return self._time[:n]
+        return [i / self.sample_rate for i in range(n)]
+
+    @contextmanager
+    def scratch(self, n, kind="f"):
+        """Borrow a reusable work buffer of n float32 ('f') or float64 ('d') samples"""
+        pool = self._free[kind]
+        buf = pool.pop() if pool else _alloc(self.max_samples, kind)
+        try:
+            yield buf[:n]
+        finally:
+            pool.append(buf)
+
+
+def _alloc(n, kind="f"):
+    """Zeroed float32/float64 buffer: an ndarray, or a memoryview over array()"""
+    if NUMPY_AVAILABLE:
+        return np.zeros(n, dtype=np.float32 if kind == "f" else np.float64)
+    return memoryview(array(kind, bytes(4 * n if kind == "f" else 8 * n)))
+
+
+def _fill(out, value):
+    if NUMPY_AVAILABLE:
+        out.fill(value)
+    else:
+        for i in range(len(out)):
+            out[i] = value
+
+
+def _as_node(value):
+    return value if isinstance(value, Node) else Const(value)
+
+
+class Node:
+    """Base class: render(ctx, out) writes len(out) samples into out in place"""
+
+    def render(self, ctx, out):
+        raise NotImplementedError
+
+    def __mul__(self, other):
+        return Mul(self, other)
+
+    def __rmul__(self, other):
+        return Mul(other, self)
+
+    def __add__(self, other):
+        return Mix(self, other)
+
+    def __radd__(self, other):
+        return Mix(other, self)
+
+
+class Const(Node):
+    """A constant signal"""
+
+    def __init__(self, value):
+        self.value = float(value)
+
+    def render(self, ctx, out):
+        _fill(out, self.value)
+
+    def __repr__(self):
+        return f"Const({self.value!r})"
+
+
+class Mul(Node):
+    """Product of its inputs (gain, envelope or ring modulation)"""
+
+    def __init__(self, *inputs):
+        self.inputs = [_as_node(i) for i in inputs]
+
+    def render(self, ctx, out):
+        consts = [i.value for i in self.inputs if isinstance(i, Const)]
+        signals = [i for i in self.inputs if not isinstance(i, Const)]
+        gain = math.prod(consts)
+        if not signals:
+            _fill(out, gain)
+            return
+        signals[0].render(ctx, out)
+        with ctx.scratch(len(out)) as tmp:
+            for node in signals[1:]:
+                node.render(ctx, tmp)
+                if NUMPY_AVAILABLE:
+                    out *= tmp
+                else:
+                    for i in range(len(out)):
+                        out[i] *= tmp[i]
+        if gain != 1.0:
+            if NUMPY_AVAILABLE:
+                out *= np.float32(gain)
+            else:
+                for i in range(len(out)):
+                    out[i] *= gain
+
+    def __repr__(self):
+        return f"Mul({', '.join(map(repr, self.inputs))})"
+
+
+class Mix(Node):
+    """Sum of its inputs"""
+
+    def __init__(self, *inputs):
+        self.inputs = [_as_node(i) for i in inputs]
+
+    def render(self, ctx, out):
+        self.inputs[0].render(ctx, out)
+        with ctx.scratch(len(out)) as tmp:
+            for node in self.inputs[1:]:
+                node.render(ctx, tmp)
+                if NUMPY_AVAILABLE:
+                    out += tmp
+                else:
+                    for i in range(len(out)):
+                        out[i] += tmp[i]
+
+    def __repr__(self):
+        return f"Mix({', '.join(map(repr, self.inputs))})"
+
+
+class Seq(Node):
+    """Play (node, seconds) parts back to back; each part starts at its own t = 0"""
+
+    def __init__(self, *parts):
+        self.parts = [(_as_node(node), seconds) for node, seconds in parts]
+
+    def render(self, ctx, out):
+        _fill(out, 0.0)
+        start = 0
+        for node, seconds in self.parts:
+            end = min(len(out), start + int(ctx.sample_rate * seconds))
+            if end > start:
+                node.render(ctx, out[start:end])
+            start = end
+
+    def __repr__(self):
+        return f"Seq({', '.join(f'({n!r}, {s!r})' for n, s in self.parts)})"
+
+
+class At(Node):
+    """Delay a node so it starts `seconds` into the output (silence before)"""
+
+    def __init__(self, seconds, node):
+        self.seconds = seconds
+        self.node = _as_node(node)
+
+    def render(self, ctx, out):
+        start = min(len(out), int(ctx.sample_rate * self.seconds))
+        _fill(out[:start], 0.0)
+        if start < len(out):
+            self.node.render(ctx, out[start:])
+
+    def __repr__(self):
+        return f"At({self.seconds!r}, {self.node!r})"
+
+
+# ---------------------------------------------------------------------------
+# Parameters and envelopes
+# ---------------------------------------------------------------------------
+
+class Sweep(Node):
+    """Glide from start to end over `seconds` (default: the whole output), then hold
+
+    curve is "linear" or "exp" (exponential, i.e. linear in pitch).
+    """
+
+    def __init__(self, start, end, seconds=None, curve="linear"):
+        self.start = start
+        self.end = end
+        self.seconds = seconds
+        self.curve = curve
+
+    def render(self, ctx, out):
+        n = len(out)
+        span = self.seconds if self.seconds is not None else n / ctx.sample_rate
+        if NUMPY_AVAILABLE:
+            x = np.minimum(ctx.time(n) / span, 1.0)
+            if self.curve == "exp":
+                out[:] = self.start * (self.end / self.start) ** x
+            else:
+                out[:] = self.start + (self.end - self.start) * x
+            return
+        for i, t in enumerate(ctx.time(n)):
+            x = min(t / span, 1.0)
+            if self.curve == "exp":
+                out[i] = self.start * (self.end / self.start) ** x
+            else:
+                out[i] = self.start + (self.end - self.start) * x
+
+    def __repr__(self):
+        return f"Sweep({self.start!r}, {self.end!r}, {self.seconds!r}, {self.curve!r})"
+
+
+class ExpDecay(Node):
+    """Exponential envelope exp(-rate * t)"""
+
+    def __init__(self, rate):
+        self.rate = rate
+
+    def render(self, ctx, out):
+        n = len(out)
+        if NUMPY_AVAILABLE:
+            with ctx.scratch(n, "d") as x:
+                np.multiply(ctx.time(n), -self.rate, out=x)
+                np.exp(x, out=out, casting="same_kind")
+            return
+        for i, t in enumerate(ctx.time(n)):
+            out[i] = math.exp(-self.rate * t)
+
+    def __repr__(self):
+        return f"ExpDecay({self.rate!r})"
+
+
+class Segments(Node):
+    """Piecewise-linear envelope through (seconds, level) points; holds the last level"""
+
+    def __init__(self, *points):
+        self.points = list(points)
+
+    def _points(self, n, sample_rate):
+        return self.points
+
+    def render(self, ctx, out):
+        n = len(out)
+        points = self._points(n, ctx.sample_rate)
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        if NUMPY_AVAILABLE:
+            out[:] = np.interp(ctx.time(n), xs, ys)
+            return
+        # Same semantics as np.interp: clamp outside, linear inside
+        for i, t in enumerate(ctx.time(n)):
+            k = bisect_right(xs, t)
+            if k == 0:
+                out[i] = ys[0]
+            elif k == len(xs):
+                out[i] = ys[-1]
+            else:
+                u = (t - xs[k - 1]) / (xs[k] - xs[k - 1])
+                out[i] = ys[k - 1] + (ys[k] - ys[k - 1]) * u
+
+    def __repr__(self):
+        return f"Segments({', '.join(map(repr, self.points))})"
+
+
+class ADSR(Segments):
+    """Attack / decay / sustain level / release envelope
+
+    The sustain stage fills whatever time the output leaves between the decay
+    and the release, so the release always ends exactly at the last sample.
+    """
+
+    def __init__(self, attack, decay, sustain, release):
+        super().__init__()
+        self.attack = attack
+        self.decay = decay
+        self.sustain = sustain
+        self.release = release
+
+    def _points(self, n, sample_rate):
+        total = (n - 1) / sample_rate if n > 1 else 0.0
+        a = min(self.attack, total)
+        d = min(self.decay, total - a)
+        r_start = max(a + d, total - self.release)
+        return [(0.0, 0.0 if self.attack > 0 else 1.0), (a, 1.0), (a + d, self.sustain),
+                (r_start, self.sustain), (total, 0.0)]
+
+    def __repr__(self):
+        return f"ADSR({self.attack!r}, {self.decay!r}, {self.sustain!r}, {self.release!r})"
+
+
+# ---------------------------------------------------------------------------
+# Sources
+# ---------------------------------------------------------------------------
+
+class Oscillator(Node):
+    """Periodic source whose frequency is a number or any node (e.g. a Sweep)
+
+    The phase is the running integral of the frequency, so sweeps stay
+    phase-continuous instead of computing sin(2*pi*f(t)*t).
+    """
+
+    def __init__(self, freq, phase=0.0):
+        self.freq = freq
+        self.phase = phase
+
+    def _phase(self, ctx, n, phase):
+        """Fill a float64 buffer with the phase in cycles"""
+        if NUMPY_AVAILABLE:
+            if isinstance(self.freq, Node):
+                with ctx.scratch(n) as f:
+                    self.freq.render(ctx, f)
+                    np.cumsum(f, out=phase, dtype=np.float64)
+                    phase -= f
+                phase /= ctx.sample_rate
+            else:
+                np.multiply(ctx.time(n), self.freq, out=phase)
+            if self.phase:
+                phase += self.phase
+            return
+        if isinstance(self.freq, Node):
+            with ctx.scratch(n) as f:
+                self.freq.render(ctx, f)
+                acc = 0.0
+                for i in range(n):
+                    phase[i] = acc / ctx.sample_rate + self.phase
+                    acc += f[i]
+        else:
+            for i in range(n):
+                phase[i] = self.freq * i / ctx.sample_rate + self.phase
+
+    def render(self, ctx, out):
+        n = len(out)
+        with ctx.scratch(n, "d") as phase:
+            self._phase(ctx, n, phase)
+            self._shape(phase, out)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.freq!r}, {self.phase!r})"
+
+
+class Sine(Oscillator):
+    def _shape(self, phase, out):
+        if NUMPY_AVAILABLE:
+            phase *= TWO_PI
+            np.sin(phase, out=out, casting="same_kind")
+        else:
+            for i in range(len(out)):
+                out[i] = math.sin(TWO_PI * phase[i])
+
+
+class Square(Oscillator):
+    def _shape(self, phase, out):
+        if NUMPY_AVAILABLE:
+            np.mod(phase, 1.0, out=phase)
+            out[:] = np.where(phase < 0.5, 1.0, -1.0)
+        else:
+            for i in range(len(out)):
+                out[i] = 1.0 if phase[i] % 1.0 < 0.5 else -1.0
+
+
+class Saw(Oscillator):
+    def _shape(self, phase, out):
+        if NUMPY_AVAILABLE:
+            np.mod(phase, 1.0, out=phase)
+            np.subtract(phase * 2.0, 1.0, out=out, casting="same_kind")
+        else:
+            for i in range(len(out)):
+                out[i] = 2.0 * (phase[i] % 1.0) - 1.0
+
+
+class Triangle(Oscillator):
+    def _shape(self, phase, out):
+        if NUMPY_AVAILABLE:
+            np.mod(phase, 1.0, out=phase)
+            np.subtract(1.0, np.abs(phase * 4.0 - 2.0), out=out, casting="same_kind")
+        else:
+            for i in range(len(out)):
+                out[i] = 1.0 - abs(4.0 * (phase[i] % 1.0) - 2.0)
+
+
+class Noise(Node):
+    """Uniform white noise in [-1, 1), reproducible from its seed"""
+
+    def __init__(self, seed=0):
+        self.seed = seed
+
+    def render(self, ctx, out):
+        if NUMPY_AVAILABLE:
+            np.random.default_rng(self.seed).random(len(out), dtype=np.float32, out=out)
+            out *= 2.0
+            out -= 1.0
+            return
+        rng = random.Random(self.seed)
+        for i in range(len(out)):
+            out[i] = rng.random() * 2.0 - 1.0
+
+    def __repr__(self):
+        return f"Noise({self.seed!r})"
+
+
+# ---------------------------------------------------------------------------
+# Rendering
+# ---------------------------------------------------------------------------
+
+class Bank:
+    """A set of effects rendered together into one preallocated float32 buffer"""
+
+    def __init__(self, effects, sample_rate=SAMPLE_RATE):
+        self.effects = list(effects)
+        self.sample_rate = sample_rate
+        self.lengths = [round(sample_rate * e.duration) for e in self.effects]
+
+    def render(self):
+        """Render every effect; returns {name: float32 buffer view}"""
+        total = sum(self.lengths)
+        buffer = _alloc(total)
+        ctx = Context(self.sample_rate, max(self.lengths, default=0))
+        views = {}
+        start = 0
+        for effect, n in zip(self.effects, self.lengths):
+            view = buffer[start:start + n]
+            effect.graph.render(ctx, view)
+            views[effect.name] = view
+            start += n
+        return views
+
+
+def render(effect, sample_rate=SAMPLE_RATE):
+    """Render a single effect to a float32 buffer"""
+    return Bank([effect], sample_rate).render()[effect.name]